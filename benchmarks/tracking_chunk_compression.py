@@ -0,0 +1,119 @@
+"""This benchmark measures the chunk codec of `binary_converter.encode_chunk` on a synthetic motion trace.
+
+Ten minutes of tracking at 72 fps are generated: a slowly swaying head, two hands moving around it, thumb sticks that
+are touched now and then and triggers that are mostly released. The trace is split into chunks of 720 frames, and the
+compression ratio and the encode and decode throughput of the uncompressed records are reported for each compression.
+The plain compression without the delta/XOR transform is shown for reference.
+
+Usage:
+    ```
+    python benchmarks/tracking_chunk_compression.py
+    ```
+"""
+
+import lzma
+import time
+import zlib
+
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+from vrchat_recorder.vr.binary_converter import (
+    binary_dtype,
+    binary_format,
+    decode_chunk,
+    encode_chunk,
+)
+from vrchat_recorder.vr.constants import Compressions
+
+FRAME_RATE = 72
+NUM_FRAMES = FRAME_RATE * 60 * 10
+FRAMES_PER_CHUNK = 720
+
+
+def make_motion_trace(num_frames: int) -> bytes:
+    rng = np.random.default_rng(0)
+    t = np.arange(num_frames) / FRAME_RATE
+    records = np.zeros(num_frames, dtype=binary_dtype(binary_format))
+    fields = records.dtype.names
+    records[fields[0]] = 1.7e9 + t + rng.normal(0, 1e-4, num_frames)
+
+    # position (3) and orientation (4) of the hmd, left and right controller, followed by 10 axes for controllers.
+    offset = 1
+    for device, has_axes in [(0, False), (1, True), (2, True)]:
+        phase = device * 1.3
+        position = np.stack(
+            [
+                0.3 * np.sin(0.21 * t + phase) + (device - 1) * 0.3,
+                1.4 - 0.3 * device + 0.05 * np.sin(0.5 * t + phase),
+                0.2 * np.cos(0.17 * t + phase),
+            ],
+            axis=1,
+        )
+        position += rng.normal(0, 2e-4, position.shape)  # tracking noise.
+        rotvec = np.stack([0.3 * np.sin(0.3 * t + phase), 0.8 * np.sin(0.1 * t), 0.1 * np.cos(0.4 * t)], axis=1)
+        quaternion = Rotation.from_rotvec(rotvec).as_quat()
+        for column in np.concatenate([position, quaternion], axis=1).T:
+            records[fields[offset]] = column
+            offset += 1
+
+        if has_axes:
+            touching = (np.sin(0.05 * t + phase) > 0.7).astype(float)
+            axes = [touching * np.sin(2 * t), touching * np.cos(2 * t)]
+            axes += [np.clip(np.sin(0.3 * t + phase) * 2 - 1.5, 0, 1), np.zeros(num_frames)]
+            axes += [np.zeros(num_frames)] * 6
+            for column in axes:
+                records[fields[offset]] = column
+                offset += 1
+
+    return records.tobytes()
+
+
+def plain_compress(data: bytes, compression: str) -> bytes:
+    return zlib.compress(data, 6) if compression == Compressions.ZLIB else lzma.compress(data, preset=1)
+
+
+def plain_decompress(data: bytes, compression: str) -> bytes:
+    return zlib.decompress(data) if compression == Compressions.ZLIB else lzma.decompress(data)
+
+
+def measure(chunks: list[bytes], encode, decode) -> tuple[float, float, float]:
+    start = time.perf_counter()
+    encoded = [encode(chunk) for chunk in chunks]
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = [decode(chunk) for chunk in encoded]
+    decode_time = time.perf_counter() - start
+    assert decoded == chunks
+
+    size = sum(len(chunk) for chunk in chunks)
+    return size / sum(len(chunk) for chunk in encoded), size / encode_time / 1e6, size / decode_time / 1e6
+
+
+def main():
+    trace = make_motion_trace(NUM_FRAMES)
+    chunk_size = FRAMES_PER_CHUNK * binary_dtype(binary_format).itemsize
+    chunks = [trace[i : i + chunk_size] for i in range(0, len(trace), chunk_size)]
+    print(f"{NUM_FRAMES} frames, {len(trace) / 1e6:.1f} MB in {len(chunks)} chunks of {FRAMES_PER_CHUNK} frames")
+
+    print(f"{'codec':>16} {'ratio':>7} {'encode [MB/s]':>14} {'decode [MB/s]':>14}")
+    for compression in [Compressions.ZLIB, Compressions.LZMA]:
+        results = {
+            f"{compression}": measure(
+                chunks,
+                lambda chunk: plain_compress(chunk, compression),
+                lambda chunk: plain_decompress(chunk, compression),
+            ),
+            f"xor+{compression}": measure(
+                chunks,
+                lambda chunk: encode_chunk(chunk, binary_format, compression),
+                lambda chunk: decode_chunk(chunk, binary_format, compression),
+            ),
+        }
+        for name, (ratio, encode_speed, decode_speed) in results.items():
+            print(f"{name:>16} {ratio:>7.2f} {encode_speed:>14.1f} {decode_speed:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
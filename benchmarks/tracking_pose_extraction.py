@@ -0,0 +1,98 @@
+"""This benchmark measures the per-frame cost of `TrackingRecorder._update_frame`.
+
+The batched pose extraction is compared with the former per-device implementation at 1, 3 and 16 connected devices.
+No VR runtime is needed: a fake VR system returns fixed device classes and controller states.
+
+Usage:
+    ```
+    python benchmarks/tracking_pose_extraction.py
+    ```
+"""
+
+import timeit
+
+import numpy as np
+import openvr
+from scipy.spatial.transform import Rotation
+
+from vrchat_recorder.vr.tracking_data_holders import (
+    Axis,
+    Orientation,
+    Position,
+    VRDeviceTrackingDataHolder,
+    create_empty_data_holder,
+)
+from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
+
+NUM_DEVICES = [1, 3, 16]
+NUM_FRAMES = 2000
+
+
+class FakeVRSystem:
+    """VR system that reports an HMD at index 0, two controllers at index 1 and 2 and trackers afterward."""
+
+    def getTrackedDeviceClass(self, device_index):
+        if device_index == 0:
+            return openvr.TrackedDeviceClass_HMD
+        elif device_index in (1, 2):
+            return openvr.TrackedDeviceClass_Controller
+        return openvr.TrackedDeviceClass_GenericTracker
+
+    def getControllerRoleForTrackedDeviceIndex(self, device_index):
+        return openvr.TrackedControllerRole_LeftHand if device_index == 1 else openvr.TrackedControllerRole_RightHand
+
+    def getControllerState(self, device_index):
+        return True, openvr.VRControllerState_t()
+
+
+def make_device_poses(num_devices: int):
+    device_poses = (openvr.TrackedDevicePose_t * openvr.k_unMaxTrackedDeviceCount)()
+    rotations = Rotation.random(num_devices, random_state=0).as_matrix()
+    for device_index, rotation in enumerate(rotations):
+        device_poses[device_index].bDeviceIsConnected = True
+        matrix = device_poses[device_index].mDeviceToAbsoluteTracking.m
+        for row in range(3):
+            for col in range(3):
+                matrix[row][col] = rotation[row, col]
+            matrix[row][3] = float(row)
+    return device_poses
+
+
+def legacy_update_data_holder(recorder: TrackingRecorder, holder: VRDeviceTrackingDataHolder, device_poses) -> None:
+    """The per-device implementation before batching."""
+    for device_index in range(openvr.k_unMaxTrackedDeviceCount):
+        device_class = recorder.vrsystem.getTrackedDeviceClass(device_index)
+        device_pose = device_poses[device_index]
+
+        if device_pose.bDeviceIsConnected:
+            pose_matrix = np.zeros((3, 4), dtype=float)
+            pose_matrix[:] = [list(row) for row in device_pose.mDeviceToAbsoluteTracking.m]
+            position = pose_matrix[:3, 3]
+            quaternion = Rotation.from_matrix(pose_matrix[:3, :3]).as_quat()
+
+            if device_class == openvr.TrackedDeviceClass_HMD:
+                holder.hmd.position = Position(position[0], position[1], position[2])
+                holder.hmd.orientation = Orientation(*quaternion)
+            elif device_class == openvr.TrackedDeviceClass_Controller:
+                recorder.vrsystem.getControllerRoleForTrackedDeviceIndex(device_index)
+                state = recorder.vrsystem.getControllerState(device_index)[1]
+                holder.controller.left.position = Position(position[0], position[1], position[2])
+                holder.controller.left.orientation = Orientation(*quaternion)
+                holder.controller.left.thumb_stick = Axis(state.rAxis[0].x, state.rAxis[0].y)
+
+
+def main():
+    recorder = TrackingRecorder("unused.bin", FakeVRSystem())
+    holder = create_empty_data_holder()
+    print(f"{'devices':>8} {'legacy [us/frame]':>18} {'batched [us/frame]':>19} {'speedup':>8}")
+    for num_devices in NUM_DEVICES:
+        device_poses = make_device_poses(num_devices)
+        legacy = timeit.timeit(lambda: legacy_update_data_holder(recorder, holder, device_poses), number=NUM_FRAMES)
+        batched = timeit.timeit(lambda: recorder._update_frame(device_poses), number=NUM_FRAMES)
+        legacy_us = legacy / NUM_FRAMES * 1e6
+        batched_us = batched / NUM_FRAMES * 1e6
+        print(f"{num_devices:>8} {legacy_us:>18.1f} {batched_us:>19.1f} {legacy_us / batched_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""This benchmark measures reading a V0 tracking file with `TrackingReader`.
+
+The per-frame API (`read` in a loop, which creates a `VRDeviceTrackingDataHolder` per frame) is compared with
+lazy `FrameView`s of `iter_views`, `read_batch` and `as_array` at 10k and 1M frames. The files are written to a
+temporary directory.
+
+Usage:
+    ```
+    python benchmarks/tracking_reader_batch.py
+    ```
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from vrchat_recorder.vr.binary_converter import binary_dtype, binary_format
+from vrchat_recorder.vr.tracking_reader import TrackingReader
+from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
+
+NUM_FRAMES = [10_000, 1_000_000]
+BATCH_SIZE = 4096
+
+
+def write_tracking_file(path: str, num_frames: int) -> None:
+    rng = np.random.default_rng(0)
+    records = np.zeros(num_frames, dtype=binary_dtype(binary_format))
+    for name in records.dtype.names:
+        records[name] = rng.uniform(-1, 1, num_frames)
+    records[records.dtype.names[0]] = 1.7e9 + np.arange(num_frames) / 72
+
+    with open(path, "wb") as f:
+        TrackingRecorder._write_header(f)
+        f.write(records.tobytes())
+
+
+def read_per_frame(reader: TrackingReader) -> float:
+    total = 0.0
+    while (holder := reader.read()) is not None:
+        total += holder.hmd.position.x
+    return total
+
+
+def read_iter(reader: TrackingReader) -> float:
+    return sum(holder.hmd.position.x for holder in reader)
+
+
+def read_views(reader: TrackingReader) -> float:
+    return sum(view.hmd.position.x for view in reader.iter_views())
+
+
+def read_batches(reader: TrackingReader) -> float:
+    total = 0.0
+    while (batch := reader.read_batch(BATCH_SIZE)) is not None:
+        total += float(batch["hmd.position.x"].sum(dtype=float))
+    return total
+
+
+def read_array(reader: TrackingReader) -> float:
+    return float(reader.as_array()["hmd.position.x"].sum(dtype=float))
+
+
+def main():
+    methods = {
+        "read": read_per_frame,
+        "iter": read_iter,
+        "iter_views": read_views,
+        f"read_batch({BATCH_SIZE})": read_batches,
+        "as_array": read_array,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'frames':>10} {'method':>18} {'time [s]':>10} {'frames/s':>14}")
+        for num_frames in NUM_FRAMES:
+            path = os.path.join(tmp_dir, f"{num_frames}.tracking.bin")
+            write_tracking_file(path, num_frames)
+
+            for name, method in methods.items():
+                with TrackingReader(path) as reader:
+                    start = time.perf_counter()
+                    method(reader)
+                    elapsed = time.perf_counter() - start
+                print(f"{num_frames:>10} {name:>18} {elapsed:>10.3f} {num_frames / elapsed:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
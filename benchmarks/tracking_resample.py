@@ -0,0 +1,120 @@
+"""This benchmark measures resampling a V0 tracking file with jittered timestamps to a uniform 90 Hz grid.
+
+The per-frame baseline reads `VRDeviceTrackingDataHolder`s by `TrackingReader.read` and interpolates each grid point
+in Python (linear interpolation of the positions and axes, slerp of the orientations), which is what the ad-hoc
+scripts do. It is compared with `resample_reader`, which interpolates whole batches with NumPy. The baseline is run
+only at the smaller size.
+
+Usage:
+    ```
+    python benchmarks/tracking_resample.py
+    ```
+"""
+
+import math
+import os
+import tempfile
+import time
+from operator import attrgetter
+
+import numpy as np
+
+from vrchat_recorder.vr.binary_converter import (
+    axes_field_names,
+    binary_dtype,
+    binary_field_names,
+    binary_format,
+)
+from vrchat_recorder.vr.resample import resample_reader
+from vrchat_recorder.vr.tracking_reader import TrackingReader
+from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
+
+NUM_FRAMES = [10_000, 1_000_000]
+BASELINE_MAX_FRAMES = 10_000
+FRAME_RATE = 90
+BATCH_SIZE = 65536
+
+_devices = ["hmd", "controller.left", "controller.right"]
+
+
+def write_tracking_file(path: str, num_frames: int) -> None:
+    rng = np.random.default_rng(0)
+    records = np.zeros(num_frames, dtype=binary_dtype(binary_format, binary_field_names))
+    for name in records.dtype.names:
+        records[name] = rng.uniform(-1, 1, num_frames)
+    for device in _devices:
+        quaternion = rng.normal(size=(num_frames, 4))
+        quaternion /= np.linalg.norm(quaternion, axis=1)[:, None]
+        for c, column in zip("xyzw", quaternion.T):
+            records[f"{device}.orientation.{c}"] = column
+    # Sleep jitter of the sampling loop.
+    records["timestamp"] = 1.7e9 + np.cumsum(rng.uniform(0.5, 1.5, num_frames)) / FRAME_RATE
+
+    with open(path, "wb") as f:
+        TrackingRecorder._write_header(f, frame_rate=FRAME_RATE)
+        f.write(records.tobytes())
+
+
+def _slerp(q0, q1, alpha):
+    dot = sum(a * b for a, b in zip(q0, q1))
+    if dot < 0:
+        q1, dot = [-b for b in q1], -dot
+    theta = math.acos(min(dot, 1.0))
+    if math.sin(theta) < 1e-6:
+        w0, w1 = 1 - alpha, alpha
+    else:
+        w0, w1 = math.sin((1 - alpha) * theta) / math.sin(theta), math.sin(alpha * theta) / math.sin(theta)
+    q = [w0 * a + w1 * b for a, b in zip(q0, q1)]
+    norm = math.sqrt(sum(c * c for c in q))
+    return [c / norm for c in q]
+
+
+_position_getters = [attrgetter(f"{device}.position.{c}") for device in _devices for c in "xyz"]
+_axes_getters = [attrgetter(f"controller.{side}.{name}") for side in ["left", "right"] for name in axes_field_names]
+_orientation_getters = [[attrgetter(f"{device}.orientation.{c}") for c in "xyzw"] for device in _devices]
+
+
+def resample_per_frame(reader: TrackingReader) -> int:
+    previous = reader.read()
+    current = reader.read()
+    start_time = previous.timestamp
+    grid_index = 0
+    while current is not None:
+        while (grid_time := start_time + grid_index / FRAME_RATE) <= current.timestamp:
+            alpha = (grid_time - previous.timestamp) / (current.timestamp - previous.timestamp)
+            [get(previous) + alpha * (get(current) - get(previous)) for get in _position_getters + _axes_getters]
+            for getters in _orientation_getters:
+                _slerp([get(previous) for get in getters], [get(current) for get in getters], alpha)
+            grid_index += 1
+        previous, current = current, reader.read()
+    return grid_index
+
+
+def resample_vectorized(reader: TrackingReader) -> int:
+    return sum(len(columns["timestamp"]) for columns in resample_reader(reader, FRAME_RATE, batch_size=BATCH_SIZE))
+
+
+def main():
+    methods = {"per frame": resample_per_frame, "resample_reader": resample_vectorized}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'frames':>10} {'method':>16} {'time [s]':>10} {'frames/s':>14} {'speedup':>8}")
+        for num_frames in NUM_FRAMES:
+            path = os.path.join(tmp_dir, f"{num_frames}.tracking.bin")
+            write_tracking_file(path, num_frames)
+
+            baseline = None
+            for name, method in methods.items():
+                if name == "per frame" and num_frames > BASELINE_MAX_FRAMES:
+                    continue
+                with TrackingReader(path) as reader:
+                    start = time.perf_counter()
+                    method(reader)
+                    elapsed = time.perf_counter() - start
+                baseline = baseline or elapsed
+                speedup = f"{baseline / elapsed:>7.1f}x" if num_frames <= BASELINE_MAX_FRAMES else f"{'-':>8}"
+                print(f"{num_frames:>10} {name:>16} {elapsed:>10.3f} {num_frames / elapsed:>14.0f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
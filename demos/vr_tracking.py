@@ -20,13 +20,14 @@ Controller right first trigger: Axis(x=0.0, y=0.0)
 Controller right second trigger: Axis(x=0.0, y=0.0)
 """
 
-import copy
 import os
 import time
 from pathlib import Path
 
 import openvr
 
+from vrchat_recorder.vr.controller_event_recorder import ControllerEventRecorder
+from vrchat_recorder.vr.device_topology import DeviceTopologyCache
 from vrchat_recorder.vr.tracking_data_holders import VRDeviceTrackingDataHolder
 from vrchat_recorder.vr.tracking_reader import TrackingReader
 from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
@@ -35,9 +36,14 @@ openvr.init(openvr.VRApplication_Background)
 vrsystem = openvr.VRSystem()
 
 output_file_path = Path(__file__).parent / "output" / "demo_vr_tracking.bin"
+event_output_file_path = Path(__file__).parent / "output" / "demo_vr_controller_event.csv"
 
-tr = TrackingRecorder(output_file_path, vrsystem, frame_rate=60)
+# The controller event recorder polls the events that invalidate the shared device topology cache.
+device_topology = DeviceTopologyCache(vrsystem)
+tr = TrackingRecorder(output_file_path, vrsystem, frame_rate=60, device_topology=device_topology)
+cer = ControllerEventRecorder(event_output_file_path, vrsystem, device_topology=device_topology)
 tr.record_background()
+cer.record_background()
 
 
 def make_display_text(holder: VRDeviceTrackingDataHolder) -> str:
@@ -63,7 +69,7 @@ Controller right second trigger: {holder.controller.right.second_trigger}
 
 try:
     while True:
-        holder = copy.deepcopy(tr._holder)
+        holder = tr.holder
 
         text = make_display_text(holder)
         text = f"Recording... Press Ctrl+C to quit.\n{text}"
@@ -74,6 +80,7 @@ except KeyboardInterrupt:
     pass
 
 tr.shutdown()
+cer.shutdown()
 time.sleep(0.5)
 
 reader = TrackingReader(output_file_path)
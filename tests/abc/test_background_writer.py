@@ -0,0 +1,155 @@
+import io
+import threading
+import time
+
+import pytest
+
+from vrchat_recorder.abc.background_writer import (
+    BackgroundFrameWriter,
+    BackpressurePolicy,
+)
+
+
+class SlowFile(io.BytesIO):
+    """In-memory file whose writes block until `release` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.write_sizes = []
+
+    def write(self, data):
+        self.release.wait()
+        self.write_sizes.append(len(data))
+        return super().write(data)
+
+
+def make_frame(index: int, frame_size: int = 4) -> bytes:
+    return index.to_bytes(frame_size, "little")
+
+
+def test_init_invalid_policy():
+    with pytest.raises(ValueError):
+        BackgroundFrameWriter(io.BytesIO(), 4, backpressure_policy="unknown")
+
+
+def test_write_frames_in_order():
+    outfile = io.BytesIO()
+    writer = BackgroundFrameWriter(outfile, 4, capacity=16, frames_per_write=4)
+    writer.start()
+    for index in range(100):
+        assert writer.push(make_frame(index))
+    writer.close()
+
+    assert outfile.getvalue() == b"".join(make_frame(index) for index in range(100))
+    assert writer.written_frames == 100
+    assert writer.queued_frames == 0
+    assert writer.dropped_frames == 0
+    assert 0 < writer.high_water_mark <= 16
+
+
+def test_contiguous_writes():
+    outfile = SlowFile()
+    writer = BackgroundFrameWriter(outfile, 4, capacity=64, frames_per_write=64)
+    writer.start()
+    for index in range(32):
+        writer.push(make_frame(index))
+    outfile.release.set()
+    writer.close()
+
+    # Queued frames are written at once instead of frame by frame.
+    assert outfile.write_sizes == [32 * 4]
+
+
+def test_block_policy():
+    outfile = SlowFile()
+    writer = BackgroundFrameWriter(outfile, 4, capacity=4, frames_per_write=1)
+    writer.start()
+    for index in range(4):
+        writer.push(make_frame(index))
+
+    pusher = threading.Thread(target=writer.push, args=(make_frame(4),))
+    pusher.start()
+    pusher.join(0.05)
+    assert pusher.is_alive()  # Blocked because the buffer is full.
+
+    outfile.release.set()
+    pusher.join(1.0)
+    assert not pusher.is_alive()
+    writer.close()
+
+    assert outfile.getvalue() == b"".join(make_frame(index) for index in range(5))
+    assert writer.high_water_mark == 4
+    assert writer.dropped_frames == 0
+
+
+def test_drop_policy():
+    outfile = SlowFile()
+    writer = BackgroundFrameWriter(outfile, 4, capacity=4, backpressure_policy=BackpressurePolicy.DROP)
+    writer.start()
+    results = [writer.push(make_frame(index)) for index in range(6)]
+    outfile.release.set()
+    writer.close()
+
+    assert results == [True] * 4 + [False] * 2
+    assert writer.dropped_frames == 2
+    assert outfile.getvalue() == b"".join(make_frame(index) for index in range(4))
+
+
+def test_flush(mocker):
+    outfile = io.BytesIO()
+    flush = mocker.spy(outfile, "flush")
+    writer = BackgroundFrameWriter(outfile, 4, capacity=8, num_frames_per_flush=4, frames_per_write=4)
+    writer.start()
+    for index in range(8):
+        writer.push(make_frame(index))
+    writer.close()
+
+    assert flush.call_count >= 2
+
+
+def test_push_after_writer_error():
+    class BrokenFile(io.BytesIO):
+        def write(self, data):
+            raise OSError("disk error")
+
+    writer = BackgroundFrameWriter(BrokenFile(), 4, capacity=4, frames_per_write=1)
+    writer.start()
+    writer.push(make_frame(0))
+    writer._thread.join(1.0)
+
+    with pytest.raises(RuntimeError):
+        writer.push(make_frame(1))
+    writer.close()
+
+
+def test_push_after_close():
+    writer = BackgroundFrameWriter(io.BytesIO(), 4)
+    writer.start()
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.push(make_frame(0))
+
+
+def test_summary():
+    writer = BackgroundFrameWriter(io.BytesIO(), 4, capacity=8)
+    writer.start()
+    writer.push(make_frame(0))
+    writer.close()
+    assert writer.summary() == "1 frames written, high-water mark 1/8 frames, 0 frames dropped."
+
+
+def test_flush_when_drained(tmp_path):
+    path = tmp_path / "frames.bin"
+    with path.open("wb") as outfile:
+        writer = BackgroundFrameWriter(outfile, 4, max_flush_interval=0.02)  # with the default frames per flush.
+        writer.start()
+        writer.push(make_frame(1))
+        start = time.perf_counter()
+        while path.stat().st_size < 4 and time.perf_counter() - start < 1.0:
+            time.sleep(0.001)
+        latency = time.perf_counter() - start
+        writer.close()
+
+    assert path.read_bytes() == make_frame(1)
+    assert latency < 0.1
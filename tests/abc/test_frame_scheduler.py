@@ -0,0 +1,142 @@
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+from vrchat_recorder.abc.frame_scheduler import FrameScheduler, MissedDeadlinePolicy
+
+
+class FakeClock:
+    """Clock whose `sleep` advances `perf_counter_ns` exactly, plus an optional oversleep."""
+
+    def __init__(self, oversleep_ns: int = 0):
+        self.now = 0
+        self.oversleep_ns = oversleep_ns
+
+    def perf_counter_ns(self):
+        self.now += 1000  # Each clock read costs 1 us.
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += round(seconds * 1e9) + self.oversleep_ns
+
+
+@pytest.fixture
+def fake_clock(mocker: MockerFixture):
+    clock = FakeClock()
+    mocker.patch("time.perf_counter_ns", side_effect=clock.perf_counter_ns)
+    mocker.patch("time.sleep", side_effect=clock.sleep)
+    return clock
+
+
+def test_init():
+    scheduler = FrameScheduler(100.0)
+    assert scheduler.frame_rate == 100.0
+    assert scheduler.missed_deadline_policy == MissedDeadlinePolicy.SKIP
+    assert scheduler.num_frames == 0
+    assert scheduler.achieved_frame_rate == 0.0
+
+
+def test_init_invalid_policy():
+    with pytest.raises(ValueError):
+        FrameScheduler(100.0, missed_deadline_policy="unknown")
+
+
+@pytest.mark.parametrize("jitter_bin_width", [0.0, 1e-10, -0.0001])
+def test_init_invalid_jitter_bin_width(jitter_bin_width):
+    with pytest.raises(ValueError):
+        FrameScheduler(100.0, jitter_bin_width=jitter_bin_width)
+
+
+def test_wait_does_not_drift(fake_clock: FakeClock):
+    fake_clock.oversleep_ns = 1_500_000  # Every sleep overshoots by 1.5 ms.
+    scheduler = FrameScheduler(100.0, spin_threshold=0.002)
+    scheduler.start()
+
+    deadlines = []
+    for _ in range(100):
+        scheduler.wait()
+        deadlines.append(fake_clock.now)
+
+    # The wake-up time stays close to the absolute deadline instead of accumulating the oversleep.
+    start = deadlines[0]
+    for index, wake_up in enumerate(deadlines):
+        assert abs(wake_up - (start + index * 10_000_000)) < 100_000
+    assert scheduler.achieved_frame_rate == pytest.approx(100.0, rel=1e-3)
+    assert scheduler.num_missed_frames == 0
+
+
+def test_skip_missed_deadlines(fake_clock: FakeClock):
+    scheduler = FrameScheduler(100.0, missed_deadline_policy=MissedDeadlinePolicy.SKIP)
+    scheduler.start()
+    scheduler.wait()
+
+    fake_clock.now += 35_000_000  # Stall for 3.5 frames.
+    scheduler.wait()  # The frames at 10 and 20 ms are dropped, and the one at 30 ms runs late.
+    assert scheduler.num_missed_frames == 2
+
+    before = fake_clock.now
+    scheduler.wait()
+    assert fake_clock.now - before > 1_000_000  # Waits for the next slot instead of running immediately.
+
+
+def test_catch_up_missed_deadlines(fake_clock: FakeClock):
+    scheduler = FrameScheduler(100.0, missed_deadline_policy=MissedDeadlinePolicy.CATCH_UP)
+    scheduler.start()
+    scheduler.wait()
+
+    fake_clock.now += 35_000_000
+    before = fake_clock.now
+    for _ in range(3):
+        scheduler.wait()
+    assert fake_clock.now - before < 1_000_000  # The missed frames run back to back.
+    assert scheduler.num_missed_frames == 0
+    assert scheduler.num_frames == 4
+
+
+def test_jitter_histogram(fake_clock: FakeClock):
+    scheduler = FrameScheduler(100.0, jitter_bin_width=0.001, num_jitter_bins=10)
+    scheduler.start()
+    for _ in range(10):
+        scheduler.wait()
+
+    histogram = scheduler.jitter_histogram
+    assert len(histogram) == 10
+    assert sum(histogram) == 10
+    assert histogram[0] == 10
+    assert 0 < scheduler.jitter_percentile(50) <= 0.001
+    assert scheduler.jitter_percentile(100) == pytest.approx(0.000001, abs=1e-6)
+
+
+def test_jitter_histogram_overflow_bin(fake_clock: FakeClock):
+    scheduler = FrameScheduler(100.0, jitter_bin_width=0.001, num_jitter_bins=3)
+    scheduler.start()
+    scheduler.wait()
+    fake_clock.now += 15_000_000  # 5 ms late.
+    scheduler.wait()
+
+    assert scheduler.jitter_histogram[-1] == 1
+
+
+def test_summary(fake_clock: FakeClock):
+    scheduler = FrameScheduler(72.0)
+    scheduler.start()
+    for _ in range(3):
+        scheduler.wait()
+
+    summary = scheduler.summary()
+    assert "3 frames" in summary
+    assert "target 72.0 fps" in summary
+    assert "p99=" in summary
+
+
+def test_real_clock():
+    scheduler = FrameScheduler(200.0)
+    scheduler.start()
+    start = time.perf_counter()
+    for _ in range(21):
+        scheduler.wait()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed == pytest.approx(0.1, abs=0.02)
+    assert scheduler.achieved_frame_rate == pytest.approx(200.0, rel=0.05)
@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+from vrchat_recorder.abc.stream_sink import (
+    STREAM_MAGIC,
+    StreamMessage,
+    StreamMessageTypes,
+    StreamProtocols,
+    StreamReceiver,
+    StreamSink,
+    batch_header_struct,
+    decode_batch,
+    decode_controller_event,
+    decode_osc_feedback,
+    encode_controller_event,
+    encode_osc_feedback,
+)
+from vrchat_recorder.data_constants import CSVHeaderNames as HN
+
+
+def receive_messages(receiver: StreamReceiver, num_messages: int, timeout: float = 5.0) -> list[StreamMessage]:
+    messages = []
+    deadline = time.monotonic() + timeout
+    while len(messages) < num_messages and time.monotonic() < deadline:
+        messages += receiver.receive()
+    return messages
+
+
+def test_controller_event_payload():
+    event = decode_controller_event(encode_controller_event(1.5, 200, 2, 33, 0.25))
+    assert event == {
+        HN.TIMESTAMP: 1.5,
+        HN.EVENT_TYPE: 200,
+        HN.CONTROLLER_ROLE: 2,
+        HN.BUTTON_ID: 33,
+        HN.AGE_SECONDS: 0.25,
+    }
+
+
+@pytest.mark.parametrize("value", [True, 3, 0.5, "text"])
+def test_osc_feedback_payload(value):
+    feedback = decode_osc_feedback(encode_osc_feedback(1.5, "/avatar/parameters/Voice", value))
+    assert feedback[HN.TIMESTAMP] == 1.5
+    assert feedback[HN.PARAMETER_NAME] == "/avatar/parameters/Voice"
+    assert feedback[HN.VALUE] == value
+    assert type(feedback[HN.VALUE]) is type(value)
+
+
+def test_osc_feedback_payload_unsupported_type():
+    with pytest.raises(ValueError):
+        encode_osc_feedback(0.0, "/a", None)
+
+
+def test_decode_broken_batch():
+    with pytest.raises(ValueError):
+        decode_batch(b"")
+    with pytest.raises(ValueError):
+        decode_batch(batch_header_struct.pack(b"XXXX", 0))
+    with pytest.raises(ValueError):
+        decode_batch(batch_header_struct.pack(STREAM_MAGIC, 1))
+
+
+def test_invalid_protocol():
+    with pytest.raises(ValueError):
+        StreamSink(protocol="http")
+    with pytest.raises(ValueError):
+        StreamReceiver(protocol="http")
+
+
+@pytest.mark.parametrize("protocol", [StreamProtocols.UDP, StreamProtocols.TCP])
+def test_stream(protocol):
+    with StreamReceiver(port=0, protocol=protocol, timeout=0.1) as receiver:
+        sink = StreamSink(port=receiver.port, protocol=protocol, max_batch_size=4096)
+        sink.start()
+        frames = [bytes([i]) * 172 for i in range(100)]
+        for frame in frames:
+            assert sink.send_frame(frame)
+        sink.send_controller_event(1.0, 200, 1, 33, 0.0)
+        sink.send_osc_feedback(2.0, "/avatar/parameters/Voice", 0.5)
+
+        messages = receive_messages(receiver, 102)
+        sink.close()
+
+    assert [message.payload for message in messages[:100]] == frames
+    assert messages[100].message_type == StreamMessageTypes.CONTROLLER_EVENT
+    assert decode_osc_feedback(messages[101].payload)[HN.VALUE] == 0.5
+    assert sink.sent_messages == 102
+    assert 1 < sink.sent_batches < 102  # batched, and split by `max_batch_size`.
+    assert sink.dropped_messages == 0
+
+
+def test_send_drops_when_queue_is_full():
+    sink = StreamSink(capacity=2)  # not started, so nothing is sent.
+    assert sink.send_frame(b"a")
+    assert sink.send_frame(b"b")
+    assert not sink.send_frame(b"c")
+    assert sink.dropped_messages == 1
+
+
+def test_tcp_without_receiver_does_not_block():
+    with StreamReceiver(port=0, protocol=StreamProtocols.TCP) as receiver:
+        port = receiver.port  # the port is closed after this.
+
+    sink = StreamSink(port=port, protocol=StreamProtocols.TCP)
+    sink.start()
+    start = time.perf_counter()
+    for _ in range(1000):
+        sink.send_frame(bytes(172))
+    assert time.perf_counter() - start < 0.5
+    sink.close()
+    assert sink.sent_messages == 0
+    assert sink.dropped_messages == 1000
+    assert "1000 messages dropped" in sink.summary()
+
+
+def test_send_drops_from_many_threads():
+    sink = StreamSink(capacity=1)  # not started, so all but the first message are dropped.
+    threads = [threading.Thread(target=lambda: [sink.send_frame(b"a") for _ in range(1000)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sink.dropped_messages == 8 * 1000 - 1
+
+
+def test_close_timeout(mocker: MockerFixture):
+    sink = StreamSink(close_timeout=0.1)
+    stop = threading.Event()
+    mocker.patch.object(sink, "_send_batch", side_effect=lambda messages: stop.wait())  # e.g. a stalled endpoint.
+    sink.start()
+    sink.send_frame(b"a")
+
+    start = time.perf_counter()
+    sink.close()
+    assert time.perf_counter() - start < 1.0
+    stop.set()
+    sink.close()  # closing again does nothing.
+
+
+def test_tcp_batch_of_many_messages():
+    with StreamReceiver(port=0, protocol=StreamProtocols.TCP, timeout=0.1) as receiver:
+        sink = StreamSink(port=receiver.port, protocol=StreamProtocols.TCP, capacity=70000, max_batch_size=1 << 20)
+        for _ in range(70000):  # queued before the sender starts, so they are sent in one batch.
+            assert sink.send(StreamMessageTypes.TRACKING_FRAME, b"")
+        sink.start()
+        messages = receive_messages(receiver, 70000)
+        sink.close()
+
+    assert len(messages) == 70000
+    assert sink.sent_batches == 1
+    assert sink.dropped_messages == 0
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from vrchat_recorder.alignment import (
+    SampleClock,
+    SessionAlignment,
+    StreamNames,
+    TimeIndex,
+    get_file_start_time,
+    read_csv_timestamps,
+)
+from vrchat_recorder.date_utils import parse_date_str
+from vrchat_recorder.vr.binary_converter import holder_to_binary
+from vrchat_recorder.vr.tracking_data_holders import create_empty_data_holder
+from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
+
+DATE_STR = "2023-04-01-12-30-00-000000"
+
+
+@pytest.fixture
+def start_time():
+    return parse_date_str(DATE_STR)
+
+
+def test_get_file_start_time(start_time):
+    assert get_file_start_time(f"a/{DATE_STR}.mic.wav") == start_time
+    assert get_file_start_time("a/2023-04-01.mic.wav", "%Y-%m-%d") == parse_date_str("2023-04-01", "%Y-%m-%d")
+
+
+def test_time_index():
+    index = TimeIndex(np.array([0.0, 1.0, 1.0, 2.0, 3.0]))
+    assert index.order is None
+    assert len(index) == 5
+    assert index.window(1.0, 3.0) == slice(1, 4)
+    assert index.window(-1.0, 0.5) == slice(0, 1)
+    assert index.window(5.0, 6.0) == slice(5, 5)
+
+
+def test_time_index_unsorted():
+    index = TimeIndex(np.array([0.0, 2.0, 1.0, 3.0]))
+    assert index.window(1.0, 3.0).tolist() == [2, 1]
+    assert index.row_timestamps.tolist() == [0.0, 2.0, 1.0, 3.0]
+
+
+def test_sample_clock():
+    clock = SampleClock(100.0, 10, num_samples=50)
+    assert clock.index_at(np.array([99.0, 100.0, 100.05, 100.15, 110.0])).tolist() == [-10, 0, 0, 1, 100]
+    assert clock.time_at(np.array([0, 5])).tolist() == [100.0, 100.5]
+    assert clock.window(100.05, 100.3) == slice(1, 3)
+    assert clock.window(99.0, 200.0) == slice(0, 50)
+    assert SampleClock(100.0, 10).window(101.0, 102.0) == slice(10, 20)
+
+
+@pytest.fixture
+def session(tmp_path, start_time):
+    session = tmp_path / f"{DATE_STR}.vrcrec"
+    (session / "vr").mkdir(parents=True)
+    (session / "audio").mkdir()
+
+    holder = create_empty_data_holder()
+    with (session / "vr" / f"{DATE_STR}.tracking.bin").open("wb") as f:
+        TrackingRecorder._write_header(f)
+        for i in range(10):
+            holder.timestamp = start_time + 0.5 + i * 0.1
+            f.write(holder_to_binary(holder))
+    with (session / f"{DATE_STR}.oscfb.csv").open("w") as f:
+        f.write("timestamp,parameter_name,data_type,value\n")
+        for i in range(3):
+            f.write(f"{start_time + i},/avatar/parameters/a,int,{i}\n")
+    sf.write(session / "audio" / f"{DATE_STR}.mic.wav", np.zeros(16000 * 3), 16000)
+    (session / f"{DATE_STR}.video.mp4").touch()
+    return session
+
+
+def test_read_csv_timestamps(session, start_time):
+    timestamps = read_csv_timestamps(str(session / f"{DATE_STR}.oscfb.csv"))
+    assert timestamps.tolist() == [start_time, start_time + 1, start_time + 2]
+
+
+def test_session_alignment(session, start_time):
+    alignment = SessionAlignment.load(str(session), video_frame_rate=30)
+    assert set(alignment.streams) == {StreamNames.TRACKING, StreamNames.OSC_FEEDBACK}
+    assert set(alignment.clocks) == {StreamNames.MIC, StreamNames.VIDEO}
+
+    mic_indices = alignment.lookup(StreamNames.TRACKING, StreamNames.MIC)
+    np.testing.assert_allclose(mic_indices, 8000 + np.arange(10) * 1600, atol=1)
+    assert alignment.lookup(StreamNames.TRACKING, StreamNames.MIC) is mic_indices
+    assert alignment.lookup(StreamNames.OSC_FEEDBACK, StreamNames.VIDEO).tolist() == [0, 30, 60]
+
+    window = alignment.window(start_time + 1.0, start_time + 1.25)
+    assert window[StreamNames.TRACKING] == slice(5, 8)
+    assert window[StreamNames.OSC_FEEDBACK] == slice(1, 2)
+    assert window[StreamNames.MIC] == slice(16000, 20000)
+    assert window[StreamNames.VIDEO] == slice(30, 38)
+
+    with pytest.raises(KeyError):
+        alignment.lookup(StreamNames.GAMEPAD, StreamNames.MIC)
+
+
+def test_session_alignment_without_video_frame_rate(session):
+    assert StreamNames.VIDEO not in SessionAlignment.load(str(session)).clocks
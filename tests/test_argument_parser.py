@@ -6,6 +6,7 @@ from vrchat_recorder.argument_parser import (
     get_obs_parser,
     get_osc_feedback_parser,
     get_speaker_parser,
+    get_stream_parser,
     get_type_selection_parser,
     get_vr_parser,
 )
@@ -81,5 +82,24 @@ def test_get_vr_parser():
 
     assert parser.get_default("vr_tracking_fps") == 72.0
     assert parser.get_default("vr_tracking_flush_interval") == 1000
+    assert parser.get_default("vr_tracking_missed_deadline_policy") == "skip"
+    assert parser.get_default("vr_tracking_buffer_capacity") == 4096
+    assert parser.get_default("vr_tracking_backpressure_policy") == "block"
+    assert parser.get_default("vr_tracking_format") == "v0"
+    assert parser.get_default("vr_tracking_frames_per_chunk") == 720
+    assert parser.get_default("vr_tracking_compression") == "none"
+    assert parser.get_default("vr_tracking_record_layout") == "float"
+    assert parser.get_default("vr_tracking_shared_memory_name") is None
+    assert parser.get_default("vr_tracking_shared_memory_capacity") == 1024
     assert parser.get_default("vr_controller_event_poll_interval") == 0.001
     assert parser.get_default("vr_controller_event_flush_interval_seconds") == 10.0
+
+
+def test_get_stream_parser():
+    parser = ArgumentParser()
+    parser = get_stream_parser(parser)
+
+    assert parser.get_default("stream_port") is None
+    assert parser.get_default("stream_host") == "127.0.0.1"
+    assert parser.get_default("stream_protocol") == "udp"
+    assert parser.get_default("stream_capacity") == 4096
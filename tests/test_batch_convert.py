@@ -0,0 +1,144 @@
+import gzip
+import json
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from vrchat_recorder.batch_convert import (
+    ConversionJobs,
+    completion_marker_name,
+    convert_sessions,
+    find_jobs,
+    find_sessions,
+    is_completed,
+    main,
+    run_job,
+    write_completion_marker,
+)
+from vrchat_recorder.vr.binary_converter import holder_to_binary
+from vrchat_recorder.vr.tracking_data_holders import create_empty_data_holder
+from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
+
+
+def create_session(root, name: str, num_frames: int = 10):
+    session = root / "archive" / f"{name}.vrcrec"
+    (session / "vr").mkdir(parents=True)
+    (session / "audio").mkdir()
+
+    holder = create_empty_data_holder()
+    with (session / "vr" / f"{name}.tracking.bin").open("wb") as f:
+        TrackingRecorder._write_header(f)
+        for timestamp in range(num_frames):
+            holder.timestamp = timestamp
+            f.write(holder_to_binary(holder))
+    (session / f"{name}.oscfb.csv").write_text("timestamp,event_type\n0.0,a\n")
+    sf.write(session / "audio" / f"{name}.mic.wav", np.full((1000, 2), 0.5), 16000)
+    return session
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    return [create_session(tmp_path, "2023-03-25"), create_session(tmp_path, "2023-03-26")]
+
+
+def test_find_sessions(tmp_path, sessions):
+    assert find_sessions(str(tmp_path)) == [str(s) for s in sessions]
+    assert find_sessions(str(sessions[0])) == [str(sessions[0])]
+
+
+def test_find_jobs(sessions):
+    session = sessions[0]
+    assert find_jobs(str(session)) == [
+        (ConversionJobs.CSV_COMPACTION, str(session / "2023-03-25.oscfb.csv")),
+        (ConversionJobs.AUDIO_STATS, str(session / "audio" / "2023-03-25.mic.wav")),
+        (ConversionJobs.TRACKING_EXPORT, str(session / "vr" / "2023-03-25.tracking.bin")),
+    ]
+    assert find_jobs(str(session), [ConversionJobs.AUDIO_STATS]) == [
+        (ConversionJobs.AUDIO_STATS, str(session / "audio" / "2023-03-25.mic.wav"))
+    ]
+
+
+def test_run_job(sessions):
+    session = sessions[0]
+    output_path, input_size = run_job(ConversionJobs.CSV_COMPACTION, str(session / "2023-03-25.oscfb.csv"))
+    assert input_size == os.path.getsize(session / "2023-03-25.oscfb.csv")
+    with gzip.open(output_path, "rt") as f:
+        assert f.read() == "timestamp,event_type\n0.0,a\n"
+
+    output_path, _ = run_job(ConversionJobs.AUDIO_STATS, str(session / "audio" / "2023-03-25.mic.wav"))
+    with open(output_path) as f:
+        stats = json.load(f)
+    assert stats["sample_rate"] == 16000
+    assert stats["num_frames"] == 1000
+    assert stats["duration"] == pytest.approx(1000 / 16000)
+    assert stats["peak"] == pytest.approx([0.5, 0.5], abs=1e-4)
+    assert stats["rms"] == pytest.approx([0.5, 0.5], abs=1e-4)
+
+    output_path, _ = run_job(ConversionJobs.TRACKING_EXPORT, str(session / "vr" / "2023-03-25.tracking.bin"), "npz")
+    assert output_path == str(session / "vr" / "2023-03-25.tracking.npz")
+    assert np.load(output_path)["timestamp"].tolist() == list(range(10))
+
+    with pytest.raises(ValueError):
+        run_job("unknown", str(session / "2023-03-25.oscfb.csv"))
+
+
+def test_convert_sessions(tmp_path, sessions):
+    summary = convert_sessions(str(tmp_path), max_workers=2)
+    assert summary == {"sessions": 2, "skipped": 0, "completed": 2, "jobs": 6, "failed": 0, "bytes": summary["bytes"]}
+    for session in sessions:
+        assert is_completed(str(session))
+        assert (session / "vr" / f"{session.stem}.tracking.npz").exists()
+        assert (session / f"{session.stem}.oscfb.csv.gz").exists()
+        assert (session / "audio" / f"{session.stem}.mic.wav.stats.json").exists()
+
+    # Completed sessions are skipped.
+    summary = convert_sessions(str(tmp_path), max_workers=2)
+    assert summary["skipped"] == 2
+    assert summary["jobs"] == 0
+
+    assert convert_sessions(str(tmp_path), max_workers=2, force=True)["jobs"] == 6
+
+
+def test_convert_sessions_resumes_failed_session(tmp_path, sessions):
+    tracking_path = sessions[1] / "vr" / "2023-03-26.tracking.bin"
+    tracking_path.write_bytes(b"broken")
+
+    summary = convert_sessions(str(tmp_path), [ConversionJobs.TRACKING_EXPORT], max_workers=2)
+    assert summary["failed"] == 1
+    assert summary["completed"] == 1
+    assert is_completed(str(sessions[0]), [ConversionJobs.TRACKING_EXPORT])
+    assert not (sessions[1] / completion_marker_name).exists()
+
+    # The marker only covers the jobs that were run.
+    assert not is_completed(str(sessions[0]))
+
+    create_session(tmp_path / "new", "2023-03-26")
+    tracking_path.write_bytes(
+        (tmp_path / "new" / "archive" / "2023-03-26.vrcrec" / "vr" / tracking_path.name).read_bytes()
+    )
+    summary = convert_sessions(str(tmp_path / "archive"), [ConversionJobs.TRACKING_EXPORT], max_workers=2)
+    assert summary["skipped"] == 1
+    assert summary["completed"] == 1
+
+
+def test_write_completion_marker_merges_jobs(sessions):
+    session = str(sessions[0])
+    write_completion_marker(session, [ConversionJobs.TRACKING_EXPORT])
+    write_completion_marker(session, [ConversionJobs.AUDIO_STATS])
+    assert is_completed(session, [ConversionJobs.TRACKING_EXPORT, ConversionJobs.AUDIO_STATS])
+    assert not is_completed(session)
+
+    (sessions[0] / completion_marker_name).write_text("broken")
+    write_completion_marker(session, [ConversionJobs.CSV_COMPACTION])
+    assert is_completed(session, [ConversionJobs.CSV_COMPACTION])
+
+
+def test_main(tmp_path, sessions):
+    main([str(tmp_path), "--jobs", ConversionJobs.CSV_COMPACTION, "--max_workers", "1"])
+    assert is_completed(str(sessions[0]), [ConversionJobs.CSV_COMPACTION])
+
+    (sessions[0] / "vr" / "2023-03-25.tracking.bin").write_bytes(b"broken")
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), "--jobs", ConversionJobs.TRACKING_EXPORT, "--max_workers", "1"])
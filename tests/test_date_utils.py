@@ -16,3 +16,10 @@ def test_get_now_str(format: str, expected_output: str) -> None:
     with freeze_time("2023-04-01 12:30:00"):
         result = mod.get_now_str(format)
         assert result == expected_output
+
+
+def test_parse_date_str() -> None:
+    with freeze_time("2023-04-01 12:30:00.250000"):
+        now_str = mod.get_now_str()
+        assert mod.parse_date_str(now_str) == mod.datetime.now().timestamp()
+    assert mod.parse_date_str("2023-04-01", "%Y-%m-%d") == mod.datetime(2023, 4, 1).timestamp()
@@ -76,3 +76,13 @@ def test_osc_feedback_recorder_osc_callback(osc_feedback_recorder_with_mocked_me
         assert float(row[HN.VALUE]) == value
 
     output_file_path.unlink()
+
+
+def test_osc_feedback_recorder_osc_callback_stream(tmp_path: Path, mocker: MockerFixture):
+    mocker.patch("time.time", return_value=0.0)
+    stream_sink = mocker.Mock()
+    ofr = OSCFeedbackRecorder(tmp_path / "osc.csv", "localhost", 9001, "/avatar/parameters/*", stream_sink=stream_sink)
+    ofr.csv_writer = mocker.Mock()
+
+    ofr._osc_callback("/avatar/parameters/Voice", 1.0)
+    stream_sink.send_osc_feedback.assert_called_once_with(0.0, "/avatar/parameters/Voice", 1.0)
@@ -1,12 +1,25 @@
 import struct
 
+import numpy as np
+import pytest
 from pytest import approx
 
 from vrchat_recorder.vr.binary_converter import (
+    binary_dtype,
     binary_format,
+    binary_struct,
     binary_to_holder,
+    decode_chunk,
+    encode_chunk,
+    extended_binary_format,
+    extended_binary_struct,
+    extended_field_names,
+    hmd_state_offset,
     holder_to_binary,
+    left_controller_state_offset,
+    right_controller_state_offset,
 )
+from vrchat_recorder.vr.constants import Compressions
 from vrchat_recorder.vr.tracking_data_holders import (
     VRDeviceTrackingDataHolder,
     create_empty_data_holder,
@@ -240,3 +253,80 @@ def test_binary_to_holder():
 
     assert holder.controller.right.fourth_trigger.x == approx(-1.3)
     assert holder.controller.right.fourth_trigger.y == approx(-1.4)
+
+
+@pytest.mark.parametrize("fmt", [binary_format, "f d", "<q 3i 2x h", ">H 4s f", "=I ? e"])
+def test_binary_dtype(fmt):
+    dtype = binary_dtype(fmt)
+    assert dtype.itemsize == struct.calcsize(fmt)
+
+    values = struct.unpack(fmt, bytes(range(dtype.itemsize)))
+    record = np.frombuffer(bytes(range(dtype.itemsize)), dtype=dtype)[0]
+    assert [v == r or (v != v and r != r) for v, r in zip(values, record.tolist())] == [True] * len(values)
+
+
+def test_binary_dtype_names():
+    assert binary_dtype("d f", names=["timestamp", "value"]).names == ("timestamp", "value")
+
+
+def test_extended_binary_format():
+    dtype = binary_dtype(extended_binary_format, extended_field_names)
+    assert dtype.itemsize == extended_binary_struct.size
+    assert dtype.fields["hmd.velocity.x"][1] == hmd_state_offset
+    assert dtype.fields["controller.left.velocity.x"][1] == left_controller_state_offset
+    assert dtype.fields["controller.right.velocity.x"][1] == right_controller_state_offset
+    assert extended_field_names[: len(binary_dtype(binary_format).names)] == list(
+        binary_dtype(binary_format, extended_field_names[:42]).names
+    )
+
+
+def test_encode_decode_extended_chunk():
+    records = np.zeros(100, dtype=binary_dtype(extended_binary_format, extended_field_names))
+    records["timestamp"] = 1.7e9 + np.arange(100) / 72
+    records["hmd.velocity.x"] = np.sin(np.arange(100) * 0.1)
+    records["controller.left.tracking_result"] = 200
+    records["controller.right.pose_is_valid"] = True
+    payload = records.tobytes()
+    assert decode_chunk(encode_chunk(payload, extended_binary_format), extended_binary_format) == payload
+
+
+def make_motion_payload(num_frames: int) -> bytes:
+    t = np.arange(num_frames) / 72
+    records = np.zeros(num_frames, dtype=binary_dtype(binary_format))
+    records["f0"] = 1.7e9 + t
+    for i, name in enumerate(records.dtype.names[1:]):
+        records[name] = np.sin(t * (i + 1) * 0.1) * (i % 3)
+    return records.tobytes()
+
+
+@pytest.mark.parametrize("compression", [Compressions.NONE, Compressions.ZLIB, Compressions.LZMA])
+def test_encode_decode_chunk(compression):
+    payload = make_motion_payload(720)
+    encoded = encode_chunk(payload, binary_format, compression)
+    assert decode_chunk(encoded, binary_format, compression) == payload
+    if compression != Compressions.NONE:
+        assert len(encoded) < len(payload) / 2
+
+
+def test_encode_decode_single_frame_chunk():
+    payload = make_motion_payload(1)
+    assert decode_chunk(encode_chunk(payload)) == payload
+
+
+def test_encode_decode_chunk_integers():
+    payload = np.arange(300, dtype="<i4").tobytes()
+    encoded = encode_chunk(payload, "<q i", Compressions.ZLIB)
+    assert decode_chunk(encoded, "<q i", Compressions.ZLIB) == payload
+
+
+def test_decode_corrupt_chunk():
+    encoded = encode_chunk(bytes(binary_struct.size * 10), binary_format, Compressions.ZLIB)
+    with pytest.raises(ValueError):
+        decode_chunk(encoded[:-5], binary_format, Compressions.ZLIB)
+    with pytest.raises(ValueError):
+        decode_chunk(encoded, "d d", Compressions.ZLIB)
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        encode_chunk(bytes(binary_struct.size), binary_format, "zip")
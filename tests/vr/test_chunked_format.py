@@ -0,0 +1,178 @@
+import io
+import threading
+
+import pytest
+
+from vrchat_recorder.vr.binary_converter import binary_struct
+from vrchat_recorder.vr.chunked_format import (
+    ChunkedFrameEncoder,
+    ChunkedFrameReader,
+    ChunkInfo,
+    chunk_header_struct,
+    trailer_struct,
+)
+from vrchat_recorder.vr.tracking_frame import TrackingFrame
+
+FRAME_SIZE = binary_struct.size
+
+
+def make_frames(num_frames: int, start: int = 0) -> bytes:
+    frame = TrackingFrame()
+    frames = []
+    for timestamp in range(start, start + num_frames):
+        frame.set_timestamp(float(timestamp))
+        frames.append(bytes(frame.buffer))
+    return b"".join(frames)
+
+
+def write_chunked_file(path, num_frames: int, frames_per_chunk: int = 4, close: bool = True) -> ChunkedFrameEncoder:
+    with open(path, "wb") as f:
+        f.write(b"HEADER")
+        encoder = ChunkedFrameEncoder(f, FRAME_SIZE, frames_per_chunk)
+        encoder.write(make_frames(num_frames)[: 3 * FRAME_SIZE])
+        encoder.write(make_frames(num_frames)[3 * FRAME_SIZE :])
+        if close:
+            encoder.close()
+        else:
+            encoder.flush()
+    return encoder
+
+
+@pytest.fixture
+def chunked_file(tmp_path):
+    path = tmp_path / "chunked.bin"
+    write_chunked_file(path, 10)
+    return path
+
+
+def test_encoder_chunks(tmp_path):
+    encoder = write_chunked_file(tmp_path / "chunked.bin", 10)
+    assert [chunk.num_frames for chunk in encoder.chunks] == [4, 4, 2]
+    assert encoder.chunks[0] == ChunkInfo(6, 0.0, 3.0, 4)
+    assert encoder.chunks[1].offset == 6 + chunk_header_struct.size + 4 * FRAME_SIZE
+    assert encoder.chunks[2].first_timestamp == 8.0
+    assert encoder.chunks[2].last_timestamp == 9.0
+
+
+def test_read_footer(chunked_file):
+    with chunked_file.open("rb") as f:
+        reader = ChunkedFrameReader(f, 6, FRAME_SIZE)
+        assert len(reader.chunks) == 3
+        assert reader.num_frames == 10
+        assert reader.read_chunk(2) == make_frames(2, start=8)
+        assert reader.read_chunk(0) == make_frames(4)
+        assert reader.num_corrupt_chunks == 0
+
+
+def test_scan_without_footer(tmp_path):
+    path = tmp_path / "chunked.bin"
+    write_chunked_file(path, 10, close=False)  # the last two frames are not written.
+
+    with path.open("rb") as f:
+        reader = ChunkedFrameReader(f, 6, FRAME_SIZE)
+        assert [chunk.num_frames for chunk in reader.chunks] == [4, 4]
+        assert reader.read_chunk(1) == make_frames(4, start=4)
+
+
+def test_truncated_bytes(tmp_path, chunked_file):
+    with chunked_file.open("rb") as f:
+        reader = ChunkedFrameReader(f, 6, FRAME_SIZE)
+        assert reader.has_footer
+        assert reader.truncated_bytes == 0
+
+    path = tmp_path / "truncated.bin"
+    write_chunked_file(path, 10, close=False)
+    with path.open("ab") as f:
+        f.write(b"\x00" * 5)  # a chunk cut off by a crash.
+    with path.open("rb") as f:
+        reader = ChunkedFrameReader(f, 6, FRAME_SIZE)
+        assert not reader.has_footer
+        assert reader.truncated_bytes == 5
+
+
+def test_scan_with_broken_footer(chunked_file):
+    data = bytearray(chunked_file.read_bytes())
+    data[-trailer_struct.size - 1] ^= 0xFF
+    chunked_file.write_bytes(data)
+
+    with chunked_file.open("rb") as f:
+        reader = ChunkedFrameReader(f, 6, FRAME_SIZE)
+        assert [chunk.num_frames for chunk in reader.chunks] == [4, 4, 2]
+
+
+def test_scan_skips_broken_chunk_header(chunked_file):
+    data = bytearray(chunked_file.read_bytes())
+    data[6] ^= 0xFF  # magic of the first chunk.
+    data[-1] ^= 0xFF  # trailer magic.
+    chunked_file.write_bytes(data)
+
+    with chunked_file.open("rb") as f:
+        reader = ChunkedFrameReader(f, 6, FRAME_SIZE)
+        assert [chunk.first_timestamp for chunk in reader.chunks] == [4.0, 8.0]
+
+
+def test_read_corrupt_chunk(chunked_file):
+    data = bytearray(chunked_file.read_bytes())
+    data[6 + chunk_header_struct.size + 10] ^= 0xFF  # payload of the first chunk.
+    chunked_file.write_bytes(data)
+
+    with chunked_file.open("rb") as f:
+        reader = ChunkedFrameReader(f, 6, FRAME_SIZE)
+        assert reader.read_chunk(0) is None
+        assert reader.read_chunk(1) == make_frames(4, start=4)
+        assert reader.num_corrupt_chunks == 1
+        assert reader.read_chunk(0) is None  # read again, e.g. after a seek.
+        assert reader.num_corrupt_chunks == 1
+        assert reader.corrupt_chunk_indices == {0}
+
+
+def test_read_chunk_decodes_without_io_lock(chunked_file):
+    io_lock = threading.Lock()
+
+    def decode_payload(payload: bytes) -> bytes:
+        assert not io_lock.locked()
+        return payload
+
+    with chunked_file.open("rb") as f:
+        reader = ChunkedFrameReader(f, 6, FRAME_SIZE, decode_payload, io_lock)
+        assert reader.read_chunk(1) == make_frames(4, start=4)
+    assert not io_lock.locked()
+
+
+def test_close_twice():
+    outfile = io.BytesIO()
+    encoder = ChunkedFrameEncoder(outfile, FRAME_SIZE, 4)
+    encoder.write(make_frames(1))
+    encoder.close()
+    size = len(outfile.getvalue())
+    encoder.close()
+    assert len(outfile.getvalue()) == size
+
+
+def test_refresh(tmp_path):
+    path = tmp_path / "chunked.bin"
+    with open(path, "wb") as f:
+        f.write(b"HEADER")
+        encoder = ChunkedFrameEncoder(f, FRAME_SIZE, frames_per_chunk=2)
+        encoder.write(make_frames(2))
+        encoder.flush()
+
+        with path.open("rb") as infile:
+            reader = ChunkedFrameReader(infile, 6, FRAME_SIZE)
+            assert len(reader.chunks) == 1
+
+            encoder.write(make_frames(3, start=2))
+            f.write(chunk_header_struct.pack(b"VRCK", 0.0, 0.0, 2, 2 * FRAME_SIZE, 0))  # partial chunk.
+            f.flush()
+            new_chunks = reader.refresh()
+            assert [chunk.num_frames for chunk in new_chunks] == [2]
+            assert len(reader.chunks) == 2
+            assert reader.read_chunk(1) == make_frames(2, start=2)
+            assert reader.refresh() == []
+
+
+def test_refresh_closed_file(chunked_file):
+    with chunked_file.open("rb") as f:
+        reader = ChunkedFrameReader(f, 6, FRAME_SIZE)
+        assert reader.refresh() == []
+        assert len(reader.chunks) == 3
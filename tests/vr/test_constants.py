@@ -1,10 +1,109 @@
+import pytest
+
 from vrchat_recorder.vr import constants as mod
 
 
 def test_header_versions():
     assert mod.HeaderVersions.V0 == "v0"
+    assert mod.HeaderVersions.V1 == "v1"
+    assert mod.HeaderVersions.V2 == "v2"
 
 
 def test_header_names():
     assert mod.HeaderNames.VERSION == "version"
     assert mod.HeaderNames.BINARY_FORMAT == "binary_format"
+    assert mod.HeaderNames.DEVICE_FORMAT == "device_format"
+    assert mod.HeaderNames.CONTROLLER_FORMAT == "controller_format"
+    assert mod.HeaderNames.FRAMES_PER_CHUNK == "frames_per_chunk"
+    assert mod.HeaderNames.COMPRESSION == "compression"
+    assert mod.HeaderNames.RECORD_LAYOUT == "record_layout"
+    assert mod.HeaderNames.FRAME_RATE == "frame_rate"
+    assert mod.HeaderNames.CLOCK == "clock"
+    assert mod.HeaderNames.DEVICE_REGISTRY == "device_registry"
+
+
+def test_clocks():
+    assert mod.Clocks.UNIX_TIME == "unix_time"
+
+
+def test_device_registries():
+    assert mod.DeviceRegistries.FIXED == "fixed"
+    assert mod.DeviceRegistries.INLINE == "inline"
+
+
+def test_record_layouts():
+    assert mod.RecordLayouts.FLOAT == "float"
+    assert mod.RecordLayouts.QUANTIZED == "quantized"
+    assert mod.RecordLayouts.EXTENDED == "extended"
+
+
+def test_compressions():
+    assert mod.Compressions.NONE == "none"
+    assert mod.Compressions.ZLIB == "zlib"
+    assert mod.Compressions.LZMA == "lzma"
+
+
+def test_block_types():
+    assert mod.BlockTypes.FRAME == b"F"
+    assert mod.BlockTypes.REGISTRY == b"R"
+
+
+def test_registry_names():
+    assert mod.RegistryNames.INDEX == "index"
+    assert mod.RegistryNames.SERIAL == "serial"
+    assert mod.RegistryNames.DEVICE_CLASS == "device_class"
+    assert mod.RegistryNames.CONTROLLER_ROLE == "controller_role"
+
+
+def test_header_schemas():
+    assert set(mod.header_schemas) == {mod.HeaderVersions.V0, mod.HeaderVersions.V1, mod.HeaderVersions.V2}
+    for version, schema in mod.header_schemas.items():
+        assert schema.version == version
+
+
+def test_validate_header_defaults():
+    header = mod.validate_header({mod.HeaderNames.VERSION: mod.HeaderVersions.V0, mod.HeaderNames.BINARY_FORMAT: "d"})
+    assert header[mod.HeaderNames.RECORD_LAYOUT] == mod.RecordLayouts.FLOAT
+    assert header[mod.HeaderNames.FRAME_RATE] is None
+    assert header[mod.HeaderNames.CLOCK] == mod.Clocks.UNIX_TIME
+    assert header[mod.HeaderNames.DEVICE_REGISTRY] == mod.DeviceRegistries.FIXED
+
+    header = mod.validate_header({mod.HeaderNames.VERSION: mod.HeaderVersions.V2, mod.HeaderNames.BINARY_FORMAT: "d"})
+    assert header[mod.HeaderNames.COMPRESSION] == mod.Compressions.NONE
+
+
+def test_validate_header_keeps_unknown_keys():
+    header = {mod.HeaderNames.VERSION: mod.HeaderVersions.V0, mod.HeaderNames.BINARY_FORMAT: "d", "future_key": 1}
+    assert mod.validate_header(header)["future_key"] == 1
+
+
+def test_validate_header_keeps_unknown_values(caplog):
+    header = {
+        mod.HeaderNames.VERSION: mod.HeaderVersions.V0,
+        mod.HeaderNames.BINARY_FORMAT: "d",
+        mod.HeaderNames.CLOCK: "monotonic",
+        mod.HeaderNames.DEVICE_REGISTRY: "external",
+    }
+    with caplog.at_level("WARNING"):
+        header = mod.validate_header(header)
+    assert header[mod.HeaderNames.CLOCK] == "monotonic"
+    assert header[mod.HeaderNames.DEVICE_REGISTRY] == "external"
+    assert "Unknown clock" in caplog.text
+    assert "Unknown device_registry" in caplog.text
+
+
+def test_validate_header_errors():
+    with pytest.raises(ValueError, match="Unsupported header version"):
+        mod.validate_header({mod.HeaderNames.VERSION: "v99"})
+    with pytest.raises(ValueError):
+        mod.validate_header({mod.HeaderNames.VERSION: mod.HeaderVersions.V0})
+    with pytest.raises(ValueError):
+        mod.validate_header(
+            {
+                mod.HeaderNames.VERSION: mod.HeaderVersions.V1,
+                mod.HeaderNames.BINARY_FORMAT: "d Q",
+                mod.HeaderNames.DEVICE_FORMAT: "fff ffff",
+                mod.HeaderNames.CONTROLLER_FORMAT: "ff ff ff ff ff",
+                mod.HeaderNames.RECORD_LAYOUT: mod.RecordLayouts.QUANTIZED,
+            }
+        )
@@ -24,6 +24,13 @@ def test_init(mocker: MockerFixture, tmp_path: Path):
     assert recorder.flush_interval == flush_interval
 
 
+@pytest.mark.parametrize("poll_interval", [0.0, -0.001])
+def test_init_invalid_poll_interval(mocker: MockerFixture, tmp_path: Path, poll_interval):
+    vrsystem_mock = mocker.MagicMock(spec=openvr.IVRSystem)
+    with pytest.raises(ValueError, match="poll_interval"):
+        ControllerEventRecorder(tmp_path / "test_init.csv", vrsystem_mock, poll_interval)
+
+
 def test_record(mocker: MockerFixture, tmp_path: Path, caplog: pytest.LogCaptureFixture):
     vrsystem_mock = mocker.MagicMock(spec=openvr.IVRSystem)
     output_file_path = tmp_path / "test_record.csv"
@@ -71,6 +78,63 @@ def test_is_controller_event(mocker: MockerFixture, tmp_path: Path):
     assert not recorder._is_controller_event(event_mock)
 
 
+def test_record_controller_events_uses_topology_cache(mocker: MockerFixture, tmp_path: Path):
+    vrsystem_mock = mocker.Mock(spec=openvr.IVRSystem)
+    vrsystem_mock.getTrackedDeviceClass.return_value = openvr.TrackedDeviceClass_Controller
+    vrsystem_mock.getControllerRoleForTrackedDeviceIndex.return_value = openvr.TrackedControllerRole_LeftHand
+
+    event_types = [
+        openvr.VREvent_ButtonPress,
+        openvr.VREvent_ButtonUnpress,
+        openvr.VREvent_TrackedDeviceRoleChanged,
+        openvr.VREvent_ButtonPress,
+    ]
+
+    def poll_next_event(event):
+        if not event_types:
+            return False
+        event.eventType = event_types.pop(0)
+        event.trackedDeviceIndex = 1
+        return True
+
+    vrsystem_mock.pollNextEvent.side_effect = poll_next_event
+
+    recorder = ControllerEventRecorder(tmp_path / "test_topology_cache.csv", vrsystem_mock)
+    writer = mocker.Mock()
+    recorder._record_controller_events(writer)
+
+    assert writer.writerow.call_count == 3
+    # One lookup before and one after the role change.
+    assert vrsystem_mock.getTrackedDeviceClass.call_count == 2
+    assert vrsystem_mock.getControllerRoleForTrackedDeviceIndex.call_count == 2
+    assert recorder.device_topology.generation == 1
+
+
+def test_record_controller_events_stream(mocker: MockerFixture, tmp_path: Path):
+    vrsystem_mock = mocker.Mock(spec=openvr.IVRSystem)
+    vrsystem_mock.getTrackedDeviceClass.return_value = openvr.TrackedDeviceClass_Controller
+    vrsystem_mock.getControllerRoleForTrackedDeviceIndex.return_value = openvr.TrackedControllerRole_RightHand
+    event_types = [openvr.VREvent_ButtonPress]
+
+    def poll_next_event(event):
+        if not event_types:
+            return False
+        event.eventType = event_types.pop(0)
+        event.data.controller.button = openvr.k_EButton_SteamVR_Trigger
+        return True
+
+    vrsystem_mock.pollNextEvent.side_effect = poll_next_event
+    stream_sink = mocker.Mock()
+    recorder = ControllerEventRecorder(tmp_path / "test_stream.csv", vrsystem_mock, stream_sink=stream_sink)
+    recorder._record_controller_events(mocker.Mock())
+
+    stream_sink.send_controller_event.assert_called_once()
+    _, event_type, controller_role, button_id, _ = stream_sink.send_controller_event.call_args.args
+    assert event_type == openvr.VREvent_ButtonPress
+    assert controller_role == openvr.TrackedControllerRole_RightHand
+    assert button_id == openvr.k_EButton_SteamVR_Trigger
+
+
 def test_extract_event_data(mocker: MockerFixture, tmp_path: Path):
     vrsystem_mock = mocker.Mock()
     event_mock = mocker.Mock()
@@ -0,0 +1,119 @@
+import openvr
+import pytest
+from pytest_mock import MockerFixture
+
+from vrchat_recorder.vr.device_topology import DeviceTopologyCache
+
+
+@pytest.fixture
+def topology(mock_vrsystem):
+    mock_vrsystem.getTrackedDeviceClass.return_value = openvr.TrackedDeviceClass_Controller
+    mock_vrsystem.getControllerRoleForTrackedDeviceIndex.return_value = openvr.TrackedControllerRole_LeftHand
+    return DeviceTopologyCache(mock_vrsystem)
+
+
+def make_event(mocker: MockerFixture, event_type: int, device_index: int = 1):
+    event = mocker.Mock()
+    event.eventType = event_type
+    event.trackedDeviceIndex = device_index
+    return event
+
+
+def test_get_device_class(topology: DeviceTopologyCache, mock_vrsystem):
+    assert topology.get_device_class(1) == openvr.TrackedDeviceClass_Controller
+    assert topology.get_device_class(1) == openvr.TrackedDeviceClass_Controller
+
+    mock_vrsystem.getTrackedDeviceClass.assert_called_once_with(1)
+    assert topology.misses == 1
+    assert topology.hits == 1
+
+
+def test_get_controller_role(topology: DeviceTopologyCache, mock_vrsystem):
+    for _ in range(3):
+        assert topology.get_controller_role(2) == openvr.TrackedControllerRole_LeftHand
+
+    mock_vrsystem.getControllerRoleForTrackedDeviceIndex.assert_called_once_with(2)
+    assert topology.misses == 1
+    assert topology.hits == 2
+
+
+def test_invalidate(topology: DeviceTopologyCache, mock_vrsystem):
+    topology.get_device_class(1)
+    topology.get_device_class(2)
+
+    topology.invalidate(1)
+    assert topology.generation == 1
+    topology.get_device_class(1)
+    topology.get_device_class(2)
+    assert mock_vrsystem.getTrackedDeviceClass.call_count == 3
+
+    topology.invalidate()
+    assert topology.generation == 2
+    topology.get_device_class(2)
+    assert mock_vrsystem.getTrackedDeviceClass.call_count == 4
+
+
+@pytest.mark.parametrize(
+    "event_type",
+    [openvr.VREvent_TrackedDeviceActivated, openvr.VREvent_TrackedDeviceDeactivated],
+)
+def test_handle_device_event(mocker: MockerFixture, topology: DeviceTopologyCache, event_type):
+    topology.get_device_class(1)
+    topology.get_device_class(2)
+
+    assert topology.handle_event(make_event(mocker, event_type, device_index=1))
+    topology.get_device_class(1)
+    topology.get_device_class(2)
+    assert topology.misses == 3
+
+
+def test_handle_role_changed_event(mocker: MockerFixture, topology: DeviceTopologyCache):
+    topology.get_controller_role(1)
+    topology.get_controller_role(2)
+
+    assert topology.handle_event(make_event(mocker, openvr.VREvent_TrackedDeviceRoleChanged, device_index=0))
+    topology.get_controller_role(1)
+    topology.get_controller_role(2)
+    assert topology.misses == 4
+
+
+def test_handle_other_event(mocker: MockerFixture, topology: DeviceTopologyCache):
+    topology.get_device_class(1)
+    assert not topology.handle_event(make_event(mocker, openvr.VREvent_ButtonPress))
+    assert topology.generation == 0
+    topology.get_device_class(1)
+    assert topology.hits == 1
+
+
+def test_repr(topology: DeviceTopologyCache):
+    assert repr(topology) == "DeviceTopologyCache(hits=0, misses=0, generation=0)"
+
+
+def test_get_serial(topology: DeviceTopologyCache, mock_vrsystem):
+    mock_vrsystem.getStringTrackedDeviceProperty.return_value = "LHR-12345678"
+    assert topology.get_serial(3) == "LHR-12345678"
+    assert topology.get_serial(3) == "LHR-12345678"
+    mock_vrsystem.getStringTrackedDeviceProperty.assert_called_once_with(3, openvr.Prop_SerialNumber_String)
+
+    topology.invalidate(3)
+    topology.get_serial(3)
+    assert mock_vrsystem.getStringTrackedDeviceProperty.call_count == 2
+
+
+def test_get_serial_unknown_property(topology: DeviceTopologyCache, mock_vrsystem):
+    mock_vrsystem.getStringTrackedDeviceProperty.side_effect = openvr.error_code.TrackedProp_UnknownProperty(
+        openvr.TrackedProp_UnknownProperty
+    )
+    assert topology.get_serial(3) == ""
+
+
+def test_invalidate_during_query_is_not_cached(topology: DeviceTopologyCache, mock_vrsystem):
+    def query(device_index):
+        topology.invalidate()  # e.g. by the event thread while OpenVR is queried.
+        return openvr.TrackedDeviceClass_Controller
+
+    mock_vrsystem.getTrackedDeviceClass.side_effect = query
+    assert topology.get_device_class(1) == openvr.TrackedDeviceClass_Controller
+    assert topology.get_device_class(1) == openvr.TrackedDeviceClass_Controller
+    assert mock_vrsystem.getTrackedDeviceClass.call_count == 2
+    assert topology.misses == 2
@@ -0,0 +1,170 @@
+import csv
+
+import numpy as np
+import openvr
+import pytest
+from pytest_mock import MockerFixture
+
+from vrchat_recorder.vr.binary_converter import (
+    binary_field_names,
+    binary_struct,
+    holder_to_binary,
+)
+from vrchat_recorder.vr.chunked_format import ChunkedFrameEncoder
+from vrchat_recorder.vr.constants import Compressions, HeaderVersions, RecordLayouts
+from vrchat_recorder.vr.export import (
+    ExportFormats,
+    export_tracking,
+    get_export_path,
+    main,
+)
+from vrchat_recorder.vr.quantization import QuantizingSink
+from vrchat_recorder.vr.tracking_data_holders import create_empty_data_holder
+from vrchat_recorder.vr.tracking_reader import TrackingReader
+from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
+from vrchat_recorder.vr.variable_device_format import (
+    DeviceFrame,
+    VariableDeviceEncoder,
+    max_devices,
+)
+
+
+def write_tracking_file(path, num_frames: int, header_version=HeaderVersions.V0, record_layout=RecordLayouts.FLOAT):
+    holder = create_empty_data_holder()
+    with path.open("wb") as f:
+        TrackingRecorder._write_header(f, header_version, 4, Compressions.NONE, record_layout)
+        outfile = ChunkedFrameEncoder(f, binary_struct.size, 4) if header_version == HeaderVersions.V2 else f
+        if record_layout == RecordLayouts.QUANTIZED:
+            outfile = QuantizingSink(outfile)
+        for timestamp in range(num_frames):
+            holder.timestamp = 1700000000 + timestamp / 90
+            holder.hmd.position.x = timestamp * 0.1
+            holder.controller.left.thumb_stick.y = -0.25
+            outfile.write(holder_to_binary(holder))
+        if header_version == HeaderVersions.V2:
+            outfile.close()
+
+
+@pytest.mark.parametrize("header_version", [HeaderVersions.V0, HeaderVersions.V2])
+@pytest.mark.parametrize("export_format", [ExportFormats.CSV, ExportFormats.NPZ])
+def test_export_tracking(tmp_path, header_version, export_format):
+    input_path = tmp_path / "session.tracking.bin"
+    write_tracking_file(input_path, 10, header_version)
+    expected = TrackingReader(str(input_path)).read_all()
+
+    assert export_tracking(str(input_path), export_format=export_format, batch_size=3) == 10
+
+    output_path = tmp_path / f"session.tracking.{export_format}"
+    if export_format == ExportFormats.CSV:
+        with output_path.open() as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == list(expected.keys())
+        assert len(rows) == 11
+        columns = {name: np.array([float(row[i]) for row in rows[1:]]) for i, name in enumerate(rows[0])}
+    else:
+        columns = dict(np.load(output_path))
+        assert list(columns.keys()) == list(expected.keys())
+    for name, column in expected.items():
+        # floats are written with enough digits to be read back exactly.
+        np.testing.assert_array_equal(columns[name].astype(column.dtype), column)
+
+
+def test_export_tracking_quantized(tmp_path):
+    input_path = tmp_path / "quantized.bin"
+    write_tracking_file(input_path, 5, record_layout=RecordLayouts.QUANTIZED)
+    output_path = tmp_path / "quantized.npz"
+
+    assert export_tracking(str(input_path), str(output_path), ExportFormats.NPZ) == 5
+    columns = np.load(output_path)
+    assert columns["hmd.position.x"] == pytest.approx(np.arange(5) * 0.1, abs=1e-6)
+    assert "orientation_indices" not in columns
+
+
+def test_export_tracking_v1(tmp_path):
+    input_path = tmp_path / "v1.bin"
+    with input_path.open("wb") as f:
+        TrackingRecorder._write_header(f, HeaderVersions.V1)
+        encoder = VariableDeviceEncoder(f)
+        for timestamp in range(5):
+            frame = DeviceFrame()
+            frame.set_timestamp(timestamp)
+            connected = np.zeros(max_devices, dtype=bool)
+            connected[0] = True
+            frame.set_connected(connected)
+            frame.set_device(0, openvr.TrackedDeviceClass_HMD, 0, [timestamp] * 7)
+            encoder.write(frame.buffer)
+    output_path = tmp_path / "v1.npz"
+
+    assert export_tracking(str(input_path), str(output_path), ExportFormats.NPZ, batch_size=2) == 5
+    columns = np.load(output_path)
+    assert list(columns.keys()) == binary_field_names
+    assert columns["timestamp"].tolist() == [0, 1, 2, 3, 4]
+    assert columns["hmd.position.x"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_export_tracking_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    input_path = tmp_path / "session.tracking.bin"
+    write_tracking_file(input_path, 10)
+
+    assert export_tracking(str(input_path), export_format=ExportFormats.PARQUET, batch_size=4) == 10
+    parquet_file = pq.ParquetFile(tmp_path / "session.tracking.parquet")
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column("hmd.position.x").to_pylist() == pytest.approx(np.arange(10) * 0.1)
+
+
+class CountingLock:
+    def __init__(self) -> None:
+        self.held = False
+        self.num_acquired = 0
+
+    def __enter__(self):
+        self.held = True
+        self.num_acquired += 1
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.held = False
+
+
+@pytest.mark.parametrize("header_version", [HeaderVersions.V0, HeaderVersions.V2])
+def test_export_tracking_io_lock(tmp_path, mocker: MockerFixture, header_version):
+    input_path = tmp_path / "session.tracking.bin"
+    write_tracking_file(input_path, 10, header_version)
+    io_lock = CountingLock()
+    held_while_writing = []
+    mocker.patch(
+        "vrchat_recorder.vr.export._NPZWriter.write",
+        side_effect=lambda columns: held_while_writing.append(io_lock.held),
+    )
+
+    assert export_tracking(str(input_path), export_format=ExportFormats.NPZ, batch_size=4, io_lock=io_lock) == 10
+    assert io_lock.num_acquired >= 3
+    assert held_while_writing == [False, False, False]
+    assert not io_lock.held
+
+
+def test_export_tracking_unknown_format(tmp_path):
+    input_path = tmp_path / "session.tracking.bin"
+    write_tracking_file(input_path, 1)
+    with pytest.raises(ValueError):
+        export_tracking(str(input_path), export_format="xlsx")
+
+
+def test_get_export_path():
+    assert get_export_path("a/2023.tracking.bin", ExportFormats.NPZ) == "a/2023.tracking.npz"
+    assert get_export_path("a/tracking", ExportFormats.CSV) == "a/tracking.csv"
+
+
+def test_main(tmp_path, capsys):
+    input_paths = [tmp_path / "a.tracking.bin", tmp_path / "b.tracking.bin"]
+    for input_path in input_paths:
+        write_tracking_file(input_path, 3)
+
+    main([str(p) for p in input_paths] + ["--format", "npz"])
+    assert np.load(tmp_path / "a.tracking.npz")["timestamp"].shape == (3,)
+    assert np.load(tmp_path / "b.tracking.npz")["timestamp"].shape == (3,)
+    assert "3 frames" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        main([str(p) for p in input_paths] + ["-o", str(tmp_path / "out.csv")])
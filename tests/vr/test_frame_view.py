@@ -0,0 +1,61 @@
+import functools
+
+import numpy as np
+import pytest
+
+from vrchat_recorder.vr.binary_converter import (
+    binary_dtype,
+    binary_field_names,
+    binary_format,
+    binary_struct,
+    binary_to_holder,
+    extended_binary_struct,
+)
+from vrchat_recorder.vr.frame_view import FrameView
+
+
+@pytest.fixture
+def records() -> bytes:
+    records = np.zeros(3, dtype=binary_dtype(binary_format, binary_field_names))
+    for i, name in enumerate(binary_field_names):
+        records[name] = np.arange(3) * 100 + i * 0.25
+    return records.tobytes()
+
+
+def get_attribute(obj, path: str):
+    return functools.reduce(getattr, path.split("."), obj)
+
+
+@pytest.mark.parametrize("frame_index", [0, 2])
+def test_attribute_paths(records, frame_index):
+    view = FrameView(records, frame_index * binary_struct.size)
+    holder = binary_to_holder(records[frame_index * binary_struct.size : (frame_index + 1) * binary_struct.size])
+    for name in binary_field_names:
+        assert get_attribute(view, name) == get_attribute(holder, name), name
+
+
+def test_memoryview(records):
+    buffer = bytearray(records)
+    view = FrameView(memoryview(buffer))
+    assert view.hmd.position.x == 0.25
+
+    buffer[:] = bytes(len(buffer))
+    assert view.hmd.position.x == 0.0
+
+
+def test_extended_record():
+    buffer = bytearray(extended_binary_struct.size)
+    buffer[: binary_struct.size] = binary_struct.pack(*range(len(binary_field_names)))
+    assert FrameView(buffer).controller.right.fourth_trigger.y == len(binary_field_names) - 1
+
+
+def test_to_holder(records):
+    view = FrameView(records, binary_struct.size)
+    assert view.to_holder() == binary_to_holder(records[binary_struct.size : 2 * binary_struct.size])
+
+
+def test_repr(records):
+    view = FrameView(records)
+    assert repr(view.hmd.position) == "PositionView(x=0.25, y=0.5, z=0.75)"
+    assert repr(view.controller.left.thumb_stick).startswith("AxisView(x=")
+    assert repr(view).startswith("FrameView(timestamp=0.0, hmd=TrackingDataView(position=PositionView(")
@@ -0,0 +1,136 @@
+import io
+
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+from vrchat_recorder.vr.binary_converter import (
+    axes_field_names,
+    binary_struct,
+    binary_to_holder,
+)
+from vrchat_recorder.vr.quantization import (
+    QuantizingSink,
+    axis_error_bound,
+    dequantize_records,
+    float_dtype,
+    get_quantized_timestamp,
+    orientation_error_bound,
+    position_error_bound,
+    quantize_records,
+    quantized_struct,
+    timestamp_error_bound,
+)
+
+DEVICES = ["hmd", "controller.left", "controller.right"]
+NUM_FRAMES = 20000
+
+
+@pytest.fixture
+def records():
+    rng = np.random.default_rng(0)
+    records = np.zeros(NUM_FRAMES, dtype=float_dtype)
+    records["timestamp"] = 1.7e9 + np.sort(rng.uniform(0, 86400, NUM_FRAMES))
+    for device_index, device in enumerate(DEVICES):
+        for c in "xyz":
+            records[f"{device}.position.{c}"] = rng.uniform(-8, 8, NUM_FRAMES)
+        quaternion = Rotation.random(NUM_FRAMES, random_state=device_index).as_quat()
+        for c, column in zip("xyzw", quaternion.T):
+            records[f"{device}.orientation.{c}"] = column
+        if device != "hmd":
+            for name in axes_field_names:
+                records[f"{device}.{name}"] = rng.uniform(-1, 1, NUM_FRAMES)
+    return records
+
+
+def round_trip(records: np.ndarray) -> np.ndarray:
+    return np.frombuffer(dequantize_records(quantize_records(records.tobytes())), dtype=float_dtype)
+
+
+def test_record_size():
+    assert quantized_struct.size == 83
+    assert quantized_struct.size <= binary_struct.size * 0.5
+
+
+def test_timestamp_error(records):
+    decoded = round_trip(records)
+    assert np.max(np.abs(decoded["timestamp"] - records["timestamp"])) <= timestamp_error_bound
+
+
+def test_position_error(records):
+    decoded = round_trip(records)
+    for device in DEVICES:
+        for c in "xyz":
+            name = f"{device}.position.{c}"
+            assert np.max(np.abs(decoded[name] - records[name])) <= position_error_bound
+
+
+def test_orientation_error(records):
+    decoded = round_trip(records)
+    for device in DEVICES:
+        original = np.stack([records[f"{device}.orientation.{c}"] for c in "xyzw"], axis=1).astype(float)
+        original /= np.linalg.norm(original, axis=1, keepdims=True)
+        restored = np.stack([decoded[f"{device}.orientation.{c}"] for c in "xyzw"], axis=1).astype(float)
+
+        # q and -q are the same rotation.
+        sign = np.where(np.sum(original * restored, axis=1) < 0, -1.0, 1.0)
+        assert np.max(np.abs(original - restored * sign[:, None])) <= orientation_error_bound
+
+        angle = (Rotation.from_quat(original).inv() * Rotation.from_quat(restored)).magnitude()
+        assert np.degrees(np.max(angle)) < 0.01
+
+
+def test_axis_error(records):
+    decoded = round_trip(records)
+    for device in DEVICES[1:]:
+        for name in axes_field_names:
+            name = f"{device}.{name}"
+            assert np.max(np.abs(decoded[name] - records[name])) <= axis_error_bound
+
+
+def test_out_of_range_axes_are_clipped():
+    records = np.zeros(1, dtype=float_dtype)
+    records["controller.left.thumb_stick.x"] = 2.0
+    records["controller.left.thumb_stick.y"] = -3.0
+    decoded = round_trip(records)
+    assert decoded["controller.left.thumb_stick.x"][0] == 1.0
+    assert decoded["controller.left.thumb_stick.y"][0] == -1.0
+
+
+def test_non_finite_values():
+    records = np.zeros(4, dtype=float_dtype)
+    records["timestamp"] = [np.nan, np.inf, -np.inf, 1.0]
+    records["hmd.position.x"] = [np.nan, np.inf, -np.inf, 1.0]
+    records["controller.left.thumb_stick.x"] = [np.nan, np.inf, -np.inf, 0.5]
+    records["controller.right.orientation.w"] = [np.nan, np.inf, 1.0, 1.0]
+    records["controller.right.orientation.x"] = [0.0, 0.0, -np.inf, 0.0]
+
+    with np.errstate(all="raise"):  # no invalid casts.
+        decoded = round_trip(records)
+
+    assert decoded["timestamp"][[0, 3]] == pytest.approx([0.0, 1.0])
+    assert decoded["timestamp"][1] > 9e9 and decoded["timestamp"][2] < -9e9
+    assert decoded["hmd.position.x"] == pytest.approx([0.0, 2147.483647, -2147.483648, 1.0])
+    assert decoded["controller.left.thumb_stick.x"] == pytest.approx([0.0, 1.0, -1.0, 0.5], abs=axis_error_bound)
+    # Quaternions with a non-finite component are stored as zero quaternions.
+    assert decoded["controller.right.orientation.w"] == pytest.approx([0.0, 0.0, 0.0, 1.0])
+    assert decoded["controller.right.orientation.x"] == pytest.approx([0.0, 0.0, 0.0, 0.0])
+
+
+def test_zero_quaternion():
+    holder = binary_to_holder(dequantize_records(quantize_records(bytes(binary_struct.size))))
+    assert holder.hmd.orientation.w == 0.0
+    assert holder.controller.right.orientation.x == 0.0
+
+
+def test_get_quantized_timestamp(records):
+    binary = quantize_records(records[:1].tobytes())
+    assert abs(get_quantized_timestamp(binary) - records["timestamp"][0]) <= timestamp_error_bound
+
+
+def test_quantizing_sink(records):
+    outfile = io.BytesIO()
+    sink = QuantizingSink(outfile)
+    sink.write(records[:10].tobytes())
+    sink.flush()
+    assert outfile.getvalue() == quantize_records(records[:10].tobytes())
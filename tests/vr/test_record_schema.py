@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+
+from vrchat_recorder.vr.record_schema import (
+    QuantizationKinds,
+    RecordSchema,
+    SchemaField,
+)
+
+
+def create_holder():
+    return SimpleNamespace(timestamp=0.0, hmd=SimpleNamespace(position=SimpleNamespace(x=0.0, y=0.0)), valid=False)
+
+
+@pytest.fixture
+def schema():
+    return RecordSchema(
+        [
+            SchemaField("timestamp", "d", QuantizationKinds.TIMESTAMP),
+            SchemaField("hmd.position.x", "f", QuantizationKinds.POSITION),
+            SchemaField("hmd.position.y", "f", QuantizationKinds.POSITION),
+            SchemaField("valid", "?"),
+        ],
+        create_holder=create_holder,
+    )
+
+
+def test_format(schema):
+    assert schema.format == "d ff ?"
+    assert schema.struct.size == 17
+    assert schema.field_names == ["timestamp", "hmd.position.x", "hmd.position.y", "valid"]
+    assert schema.dtype.names == tuple(schema.field_names)
+    assert schema.dtype.itemsize == schema.struct.size
+
+
+def test_encode_decode(schema):
+    holder = create_holder()
+    holder.timestamp = 1.5
+    holder.hmd.position.y = -2.0
+    holder.valid = True
+
+    binary = schema.encode(holder)
+    assert binary == schema.struct.pack(1.5, 0.0, -2.0, True)
+    assert schema.decode(binary) == holder
+
+    dst = create_holder()
+    assert schema.decode(binary, dst) is dst
+    assert dst.hmd.position.y == -2.0
+
+
+def test_paths(schema):
+    assert schema.paths(QuantizationKinds.POSITION) == ["hmd.position.x", "hmd.position.y"]
+    assert schema.paths(QuantizationKinds.AXIS) == []
+
+
+def test_without_codec():
+    schema = RecordSchema([SchemaField("a.velocity.x", "f"), SchemaField("a.tracking_result", "H")])
+    assert schema.format == "f H"
+    assert not hasattr(schema, "encode")
+
+
+def test_duplicate_paths():
+    with pytest.raises(ValueError):
+        RecordSchema([SchemaField("timestamp", "d"), SchemaField("timestamp", "d")])
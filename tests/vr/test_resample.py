@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from vrchat_recorder.vr.binary_converter import (
+    binary_dtype,
+    binary_field_names,
+    binary_format,
+)
+from vrchat_recorder.vr.resample import (
+    StreamingResampler,
+    resample_columns,
+    resample_reader,
+    slerp,
+)
+from vrchat_recorder.vr.tracking_reader import TrackingReader
+from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
+
+
+def rotation_z(angle):
+    angle = np.asarray(angle, dtype=float)
+    return np.stack([np.zeros_like(angle), np.zeros_like(angle), np.sin(angle / 2), np.cos(angle / 2)], axis=-1)
+
+
+def test_slerp():
+    q0 = rotation_z([0.0, 0.0, 0.0])
+    q1 = rotation_z([np.pi / 2, np.pi / 2, np.pi / 2])
+    alpha = np.array([0.0, 0.5, 1.0])
+    np.testing.assert_allclose(slerp(q0, q1, alpha), rotation_z([0.0, np.pi / 4, np.pi / 2]), atol=1e-12)
+
+
+def test_slerp_hemisphere_correction():
+    q0 = rotation_z([0.1])
+    q1 = -rotation_z([0.3])  # the same rotation as rotation_z(0.3).
+    q = slerp(q0, q1, np.array([0.5]))
+    np.testing.assert_allclose(np.abs(q), np.abs(rotation_z([0.2])), atol=1e-12)
+
+
+def test_slerp_close_and_zero_quaternions():
+    q0 = np.array([[0.0, 0.0, 0.0, 1.0], [0.0, 0.0, 0.0, 0.0]])
+    q1 = np.array([[0.0, 0.0, 1e-9, 1.0], [0.0, 0.0, 0.0, 1.0]])
+    q = slerp(q0, q1, np.array([0.5, 0.5]))
+    np.testing.assert_allclose(q[0], [0.0, 0.0, 5e-10, 1.0], atol=1e-12)
+    np.testing.assert_array_equal(q[1], [0.0, 0.0, 0.0, 0.0])
+
+
+def create_columns(timestamps):
+    timestamps = np.asarray(timestamps, dtype=float)
+    quaternion = rotation_z(timestamps)
+    return {
+        "timestamp": timestamps,
+        "hmd.position.x": (timestamps * 2).astype(np.float32),
+        "hmd.orientation.x": quaternion[:, 0].astype(np.float32),
+        "hmd.orientation.y": quaternion[:, 1].astype(np.float32),
+        "hmd.orientation.z": quaternion[:, 2].astype(np.float32),
+        "hmd.orientation.w": quaternion[:, 3].astype(np.float32),
+        "hmd.pose_is_valid": timestamps > 0.5,
+    }
+
+
+def test_resample_columns():
+    columns = create_columns([0.0, 0.3, 0.35, 1.0])
+    resampled = resample_columns(columns, np.array([0.0, 0.25, 0.5, 0.75, 1.0]))
+
+    assert list(resampled.keys()) == list(columns.keys())
+    assert resampled["timestamp"].tolist() == [0.0, 0.25, 0.5, 0.75, 1.0]
+    np.testing.assert_allclose(resampled["hmd.position.x"], [0.0, 0.5, 1.0, 1.5, 2.0], atol=1e-6)
+    assert resampled["hmd.position.x"].dtype == np.float32
+    quaternion = np.stack([resampled[f"hmd.orientation.{c}"] for c in "xyzw"], axis=1)
+    np.testing.assert_allclose(quaternion, rotation_z([0.0, 0.25, 0.5, 0.75, 1.0]), atol=1e-6)
+    assert resampled["hmd.pose_is_valid"].tolist() == [False, False, False, False, True]
+
+
+def test_resample_columns_out_of_range():
+    resampled = resample_columns(create_columns([1.0]), np.array([0.0, 2.0]))
+    assert resampled["hmd.position.x"].tolist() == [2.0, 2.0]
+
+    with pytest.raises(ValueError):
+        resample_columns(create_columns([]), np.array([0.0]))
+
+
+def test_streaming_resampler():
+    rng = np.random.default_rng(0)
+    timestamps = 100.0 + np.cumsum(rng.uniform(0.005, 0.02, 1000))
+    columns = create_columns(timestamps)
+
+    resampler = StreamingResampler(90)
+    batches = [
+        resampler.resample({name: column[start : start + 64] for name, column in columns.items()})
+        for start in range(0, 1000, 64)
+    ]
+    streamed = {name: np.concatenate([b[name] for b in batches]) for name in columns}
+
+    times = timestamps[0] + np.arange(int((timestamps[-1] - timestamps[0]) * 90) + 1) / 90
+    expected = resample_columns(columns, times)
+    for name in columns:
+        np.testing.assert_array_equal(streamed[name], expected[name])
+
+
+def test_streaming_resampler_start_time():
+    resampler = StreamingResampler(10, start_time=0.0)
+    resampled = resampler.resample(create_columns([0.25, 0.5]))
+    np.testing.assert_allclose(resampled["timestamp"], [0.3, 0.4, 0.5])
+    assert len(resampler.resample(create_columns([0.55]))["timestamp"]) == 0
+    np.testing.assert_allclose(resampler.resample(create_columns([0.6]))["timestamp"], [0.6])
+
+    with pytest.raises(ValueError):
+        StreamingResampler(0)
+
+
+def test_resample_reader(tmp_path):
+    records = np.zeros(100, dtype=binary_dtype(binary_format, binary_field_names))
+    records["timestamp"] = 1.7e9 + np.arange(100) / 120
+    records["hmd.position.x"] = np.arange(100)
+    records["hmd.orientation.w"] = 1.0
+    path = tmp_path / "test.tracking.bin"
+    with path.open("wb") as f:
+        TrackingRecorder._write_header(f, frame_rate=60)
+        f.write(records.tobytes())
+
+    with TrackingReader(str(path)) as reader:
+        batches = list(resample_reader(reader, batch_size=16))
+    position = np.concatenate([b["hmd.position.x"] for b in batches])
+    np.testing.assert_allclose(position, np.arange(0, 100, 2), atol=1e-3)
+    assert np.concatenate([b["hmd.orientation.w"] for b in batches]) == pytest.approx(1.0)
+
+    with TrackingReader(str(path)) as reader:
+        reader.header["frame_rate"] = None
+        with pytest.raises(ValueError):
+            next(resample_reader(reader))
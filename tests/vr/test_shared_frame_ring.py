@@ -0,0 +1,94 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from vrchat_recorder.vr.binary_converter import binary_format, binary_struct
+from vrchat_recorder.vr.shared_frame_ring import (
+    SharedFramePublisher,
+    SharedFrameSubscriber,
+    get_slot_size,
+    ring_header_struct,
+)
+from vrchat_recorder.vr.tracking_frame import TrackingFrame
+
+
+@pytest.fixture
+def publisher():
+    publisher = SharedFramePublisher(None, binary_struct.size, binary_format, capacity=8)
+    yield publisher
+    publisher.close()
+
+
+def publish_frames(publisher: SharedFramePublisher, timestamps) -> None:
+    frame = TrackingFrame()
+    for timestamp in timestamps:
+        frame.set_timestamp(timestamp)
+        publisher.publish(frame.buffer)
+
+
+def test_layout():
+    assert ring_header_struct.size == 256
+    assert get_slot_size(172) == 8 + 176
+    assert get_slot_size(8) == 16
+
+
+def test_read_latest(publisher: SharedFramePublisher):
+    with SharedFrameSubscriber(publisher.name) as subscriber:
+        assert subscriber.capacity == 8
+        assert subscriber.frame_size == binary_struct.size
+        assert subscriber.binary_format == binary_format
+        assert len(subscriber.read_latest(4)) == 0
+
+        publish_frames(publisher, range(3))
+        assert subscriber.num_published == 3
+        assert list(subscriber.read_latest(4)["timestamp"]) == [0, 1, 2]
+        assert list(subscriber.read_latest()["timestamp"]) == [2]
+
+        publish_frames(publisher, range(3, 20))
+        assert list(subscriber.read_latest(100)["timestamp"]) == list(range(12, 20))
+
+
+def test_read_since(publisher: SharedFramePublisher):
+    with SharedFrameSubscriber(publisher.name) as subscriber:
+        publish_frames(publisher, range(5))
+        records, count = subscriber.read_since(0)
+        assert list(records["timestamp"]) == [0, 1, 2, 3, 4]
+        assert count == 5
+
+        publish_frames(publisher, range(5, 7))
+        records, count = subscriber.read_since(count)
+        assert list(records["timestamp"]) == [5, 6]
+        assert count == 7
+
+        publish_frames(publisher, range(7, 30))  # frames that are no longer in the ring are left out.
+        records, count = subscriber.read_since(count)
+        assert list(records["timestamp"]) == list(range(22, 30))
+
+
+def test_torn_frame_is_dropped(publisher: SharedFramePublisher):
+    with SharedFrameSubscriber(publisher.name) as subscriber:
+        publish_frames(publisher, range(3))
+        subscriber._sequences[1] += 1  # the publisher is writing the slot.
+        assert list(subscriber.read_latest(3)["timestamp"]) == [0, 2]
+
+
+def test_frames_without_format():
+    with SharedFramePublisher(None, 10) as publisher:
+        publisher.publish(bytes(range(10)))
+        with SharedFrameSubscriber(publisher.name) as subscriber:
+            records = subscriber.read_latest()
+            assert records.dtype == np.dtype("V10")
+            assert records[0].tobytes() == bytes(range(10))
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SharedFramePublisher(None, 10, binary_format)
+    with pytest.raises(FileNotFoundError):
+        SharedFrameSubscriber(f"vrchat_recorder_test_{uuid.uuid4().hex[:8]}")
+
+
+def test_close_twice(publisher: SharedFramePublisher):
+    publisher.close()
+    publisher.close()
@@ -167,3 +167,17 @@ def test_create_empty_data_holder():
     assert empty_data_holder.controller.right.third_trigger.y == 0.0
     assert empty_data_holder.controller.right.fourth_trigger.x == 0.0
     assert empty_data_holder.controller.right.fourth_trigger.y == 0.0
+
+
+def test_holders_are_slotted():
+    holder = create_empty_data_holder()
+    for obj in [holder, holder.hmd, holder.hmd.position, holder.controller, holder.controller.left.thumb_stick]:
+        assert not hasattr(obj, "__dict__")
+    with pytest.raises(AttributeError):
+        holder.hmd.position.w = 1.0
+
+
+def test_empty_controllers_are_not_shared():
+    holder = create_empty_data_holder()
+    holder.controller.left.position.x = 1.0
+    assert holder.controller.right.position.x == 0.0
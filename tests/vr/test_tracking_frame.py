@@ -0,0 +1,136 @@
+import numpy as np
+import openvr
+from pytest import approx
+
+from vrchat_recorder.vr.binary_converter import (
+    binary_dtype,
+    binary_struct,
+    extended_binary_format,
+    extended_binary_struct,
+    extended_field_names,
+    hmd_offset,
+    holder_to_binary,
+    left_controller_axes_offset,
+    right_controller_offset,
+)
+from vrchat_recorder.vr.tracking_data_holders import (
+    VRDeviceTrackingDataHolder,
+    create_empty_data_holder,
+)
+from vrchat_recorder.vr.tracking_frame import TrackingFrame
+
+
+def test_init():
+    frame = TrackingFrame()
+    assert len(frame.buffer) == binary_struct.size
+    assert bytes(frame.buffer) == holder_to_binary(create_empty_data_holder())
+
+
+def test_set_timestamp():
+    frame = TrackingFrame()
+    frame.set_timestamp(123.456)
+    assert frame.timestamp == 123.456
+    assert frame.to_holder().timestamp == 123.456
+
+
+def test_set_pose():
+    frame = TrackingFrame()
+    frame.set_pose(hmd_offset, [1.0, 2.0, 3.0, 0.1, 0.2, 0.3, 0.4])
+    frame.set_pose(right_controller_offset, [-1.0, -2.0, -3.0, -0.1, -0.2, -0.3, -0.4])
+
+    holder = frame.to_holder()
+    assert holder.hmd.position.z == 3.0
+    assert holder.hmd.orientation.w == approx(0.4)
+    assert holder.controller.right.position.x == -1.0
+    assert holder.controller.right.orientation.y == approx(-0.2)
+    assert holder.controller.left.position.x == 0.0
+
+
+def test_set_controller_axes():
+    state = openvr.VRControllerState_t()
+    for axis_index in range(5):
+        state.rAxis[axis_index].x = axis_index * 0.1
+        state.rAxis[axis_index].y = -axis_index * 0.1
+
+    frame = TrackingFrame()
+    frame.set_controller_axes(left_controller_axes_offset, state.rAxis)
+
+    left = frame.to_holder().controller.left
+    assert left.thumb_stick.x == 0.0
+    assert left.first_trigger.x == approx(0.1)
+    assert left.second_trigger.y == approx(-0.2)
+    assert left.fourth_trigger.x == approx(0.4)
+    assert frame.to_holder().controller.right.fourth_trigger.x == 0.0
+
+
+def test_set_device():
+    state = openvr.VRControllerState_t()
+    state.rAxis[0].x = 0.5
+
+    frame = TrackingFrame()
+    frame.set_device(0, openvr.TrackedDeviceClass_HMD, openvr.TrackedControllerRole_Invalid, [1.0] * 7)
+    frame.set_device(
+        1, openvr.TrackedDeviceClass_Controller, openvr.TrackedControllerRole_RightHand, [2.0] * 7, state.rAxis
+    )
+    frame.set_device(2, openvr.TrackedDeviceClass_GenericTracker, openvr.TrackedControllerRole_Invalid, [3.0] * 7)
+
+    holder = frame.to_holder()
+    assert holder.hmd.position.x == 1.0
+    assert holder.controller.right.position.x == 2.0
+    assert holder.controller.right.thumb_stick.x == 0.5
+    assert holder.controller.left.position.x == 0.0
+    assert holder.devices == []
+
+
+def test_set_device_extended():
+    frame = TrackingFrame(extended=True)
+    assert len(frame.buffer) == extended_binary_struct.size
+
+    state = openvr.VRControllerState_t()
+    frame.set_device(
+        0, openvr.TrackedDeviceClass_HMD, openvr.TrackedControllerRole_Invalid, [1.0] * 7, state=[0.5] * 6 + [200, True]
+    )
+    frame.set_device(
+        1,
+        openvr.TrackedDeviceClass_Controller,
+        openvr.TrackedControllerRole_LeftHand,
+        [2.0] * 7,
+        state.rAxis,
+        [-1.0] * 6 + [101, False],
+    )
+
+    record = np.frombuffer(frame.buffer, dtype=binary_dtype(extended_binary_format, extended_field_names))[0]
+    assert record["hmd.velocity.x"] == 0.5
+    assert record["hmd.angular_velocity.z"] == 0.5
+    assert record["hmd.tracking_result"] == 200
+    assert record["hmd.pose_is_valid"]
+    assert record["controller.left.velocity.y"] == -1.0
+    assert record["controller.left.tracking_result"] == 101
+    assert not record["controller.left.pose_is_valid"]
+    assert record["controller.right.tracking_result"] == 0
+    assert frame.to_holder().controller.left.position.x == 2.0
+
+    # Pose states are not written to normal frames.
+    frame = TrackingFrame()
+    frame.set_device(
+        0, openvr.TrackedDeviceClass_HMD, openvr.TrackedControllerRole_Invalid, [1.0] * 7, state=[0.5] * 6 + [200, True]
+    )
+    assert len(frame.buffer) == binary_struct.size
+
+
+def test_clear():
+    frame = TrackingFrame()
+    frame.set_timestamp(1.0)
+    frame.set_pose(hmd_offset, [1.0] * 7)
+    frame.clear()
+    assert frame.to_holder() == create_empty_data_holder()
+
+
+def test_to_holder_dst():
+    frame = TrackingFrame()
+    frame.set_timestamp(2.0)
+    dst = create_empty_data_holder()
+    holder = frame.to_holder(dst)
+    assert holder is dst
+    assert isinstance(holder, VRDeviceTrackingDataHolder)
+    assert dst.timestamp == 2.0
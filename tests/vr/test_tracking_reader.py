@@ -1,13 +1,38 @@
+import asyncio
+import functools
+import json
+
+import numpy as np
+import openvr
 import pytest
 from pytest_mock import MockerFixture
 
-from vrchat_recorder.vr.binary_converter import holder_to_binary
+from vrchat_recorder.vr.binary_converter import (
+    binary_format,
+    binary_struct,
+    encode_chunk,
+    holder_to_binary,
+)
+from vrchat_recorder.vr.chunked_format import ChunkedFrameEncoder, chunk_header_struct
+from vrchat_recorder.vr.constants import (
+    Compressions,
+    HeaderNames,
+    HeaderVersions,
+    RecordLayouts,
+)
+from vrchat_recorder.vr.quantization import QuantizingSink, axis_error_bound
 from vrchat_recorder.vr.tracking_data_holders import (
     VRDeviceTrackingDataHolder,
     create_empty_data_holder,
 )
+from vrchat_recorder.vr.tracking_frame import TrackingFrame
 from vrchat_recorder.vr.tracking_reader import TrackingReader
 from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
+from vrchat_recorder.vr.variable_device_format import (
+    DeviceFrame,
+    VariableDeviceEncoder,
+    max_devices,
+)
 
 
 @pytest.fixture
@@ -41,6 +66,45 @@ def test_get_header(tracking_reader: TrackingReader):
     assert isinstance(header, dict)
 
 
+def write_header_dict(f, header: dict) -> None:
+    header = json.dumps(header).encode("utf-8")
+    f.write(len(header).to_bytes(4, byteorder="little"))
+    f.write(header)
+
+
+def test_header_defaults(tracking_reader: TrackingReader):
+    assert tracking_reader.header[HeaderNames.VERSION] == HeaderVersions.V0
+    assert tracking_reader.header[HeaderNames.RECORD_LAYOUT] == RecordLayouts.FLOAT
+    assert tracking_reader.frame_rate is None
+
+
+def test_read_header_of_older_recorder(tmp_path):
+    test_file = tmp_path / "old.bin"
+    with test_file.open("wb") as f:
+        write_header_dict(f, {HeaderNames.VERSION: HeaderVersions.V0, HeaderNames.BINARY_FORMAT: binary_format})
+        f.write(holder_to_binary(create_empty_data_holder()))
+
+    reader = TrackingReader(str(test_file))
+    assert reader.num_frames == 1
+    assert reader.read() is not None
+
+
+def test_frame_rate(tmp_path):
+    test_file = tmp_path / "frame_rate.bin"
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f, frame_rate=90)
+    assert TrackingReader(str(test_file)).frame_rate == 90
+
+
+def test_unsupported_header_version(tmp_path):
+    test_file = tmp_path / "future.bin"
+    with test_file.open("wb") as f:
+        write_header_dict(f, {HeaderNames.VERSION: "v99", HeaderNames.BINARY_FORMAT: binary_format})
+
+    with pytest.raises(ValueError, match="Unsupported header version"):
+        TrackingReader(str(test_file))
+
+
 def test_reset(tracking_reader: TrackingReader):
     tracking_reader._file.seek(10)
     tracking_reader.reset()
@@ -71,3 +135,565 @@ def test_del(tracking_reader: TrackingReader, mocker: MockerFixture):
     mock_close = mocker.patch.object(TrackingReader, "close")
     tracking_reader.__del__()
     mock_close.assert_called_once()
+
+
+@pytest.fixture
+def v1_test_file(tmp_path):
+    test_file = tmp_path / "test_input_v1.bin"
+
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f, HeaderVersions.V1)
+        encoder = VariableDeviceEncoder(f)
+        for timestamp in range(3):
+            frame = DeviceFrame()
+            frame.set_timestamp(timestamp)
+            connected = np.zeros(max_devices, dtype=bool)
+            connected[[0, 5]] = True
+            frame.set_connected(connected)
+            frame.set_device(0, openvr.TrackedDeviceClass_HMD, 0, [timestamp] * 7)
+            frame.set_device(5, openvr.TrackedDeviceClass_GenericTracker, 0, [-timestamp] * 7)
+            encoder.write(frame.buffer)
+        f.write(b"F")  # truncated frame.
+
+    return test_file
+
+
+def test_read_v1(v1_test_file):
+    tracking_reader = TrackingReader(str(v1_test_file))
+    assert tracking_reader.num_frames == 3
+
+    for timestamp in range(3):
+        data_holder = tracking_reader.read()
+        assert data_holder.timestamp == timestamp
+        assert data_holder.hmd.position.x == timestamp
+        assert data_holder.devices[1].position.x == -timestamp
+        assert data_holder.devices[1].info.device_class == openvr.TrackedDeviceClass_GenericTracker
+    assert tracking_reader.read() is None
+    assert tracking_reader.read_count == 3
+
+    tracking_reader.reset()
+    assert tracking_reader.read().timestamp == 0
+
+
+@pytest.fixture
+def v2_test_file(tmp_path):
+    test_file = tmp_path / "test_input_v2.bin"
+
+    holder = create_empty_data_holder()
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f, HeaderVersions.V2, frames_per_chunk=2)
+        encoder = ChunkedFrameEncoder(f, binary_struct.size, frames_per_chunk=2)
+        for timestamp in range(5):
+            holder.timestamp = timestamp
+            encoder.write(holder_to_binary(holder))
+        encoder.close()
+
+    return test_file
+
+
+def test_read_v2(v2_test_file):
+    tracking_reader = TrackingReader(str(v2_test_file))
+    assert tracking_reader.num_frames == 5
+    assert tracking_reader.num_chunks == 3
+
+    assert [tracking_reader.read().timestamp for _ in range(5)] == [0, 1, 2, 3, 4]
+    assert tracking_reader.read() is None
+
+    tracking_reader.seek_chunk(1)
+    assert tracking_reader.read_count == 2
+    assert tracking_reader.read().timestamp == 2
+
+    tracking_reader.reset()
+    assert tracking_reader.read().timestamp == 0
+
+
+def test_read_v2_skips_corrupt_chunk(v2_test_file):
+    tracking_reader = TrackingReader(str(v2_test_file))
+    first_chunk_offset = tracking_reader._chunks.chunks[1].offset
+    tracking_reader.close()
+
+    data = bytearray(v2_test_file.read_bytes())
+    data[first_chunk_offset + chunk_header_struct.size] ^= 0xFF
+    v2_test_file.write_bytes(data)
+
+    tracking_reader = TrackingReader(str(v2_test_file))
+    assert tracking_reader.read().timestamp == 0
+    assert tracking_reader.read().timestamp == 1
+    assert tracking_reader.read().timestamp == 4
+    assert tracking_reader.read_count == 5
+
+
+def test_read_v2_compressed(tmp_path):
+    test_file = tmp_path / "test_input_v2_zlib.bin"
+
+    holder = create_empty_data_holder()
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f, HeaderVersions.V2, frames_per_chunk=2, compression=Compressions.ZLIB)
+        encoder = ChunkedFrameEncoder(
+            f, binary_struct.size, frames_per_chunk=2, encode_payload=functools.partial(encode_chunk)
+        )
+        for timestamp in range(5):
+            holder.timestamp = timestamp
+            holder.hmd.position.x = timestamp * 0.5
+            encoder.write(holder_to_binary(holder))
+        encoder.close()
+
+    tracking_reader = TrackingReader(str(test_file))
+    assert tracking_reader.num_frames == 5
+    assert [tracking_reader.read().hmd.position.x for _ in range(5)] == [0.0, 0.5, 1.0, 1.5, 2.0]
+
+
+def test_seek_chunk_without_chunks(tracking_reader: TrackingReader):
+    assert tracking_reader.num_chunks == 1
+    with pytest.raises(ValueError):
+        tracking_reader.seek_chunk(0)
+
+
+@pytest.mark.parametrize("header_version", [HeaderVersions.V0, HeaderVersions.V2])
+def test_read_pose_states(tmp_path, header_version):
+    test_file = tmp_path / "test_input_extended.bin"
+
+    frame = TrackingFrame(extended=True)
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f, header_version, 2, Compressions.NONE, RecordLayouts.EXTENDED)
+        outfile = ChunkedFrameEncoder(f, len(frame.buffer), 2) if header_version == HeaderVersions.V2 else f
+        for timestamp in range(3):
+            frame.set_timestamp(timestamp)
+            frame.set_device(
+                0,
+                openvr.TrackedDeviceClass_HMD,
+                openvr.TrackedControllerRole_Invalid,
+                [timestamp] * 7,
+                state=[timestamp, 0, 0, 0, 0, -timestamp, 200, timestamp != 1],
+            )
+            outfile.write(frame.buffer)
+        if header_version == HeaderVersions.V2:
+            outfile.close()
+
+    tracking_reader = TrackingReader(str(test_file))
+    assert tracking_reader.num_frames == 3
+    assert tracking_reader.read().hmd.position.x == 0.0
+
+    pose_states = tracking_reader.read_pose_states()
+    assert pose_states["hmd.velocity"].shape == (3, 3)
+    assert pose_states["hmd.velocity"][:, 0].tolist() == [0.0, 1.0, 2.0]
+    assert pose_states["hmd.angular_velocity"][:, 2].tolist() == [0.0, -1.0, -2.0]
+    assert pose_states["hmd.tracking_result"].tolist() == [200, 200, 200]
+    assert pose_states["hmd.pose_is_valid"].tolist() == [True, False, True]
+    assert pose_states["controller.left.pose_is_valid"].tolist() == [False] * 3
+
+    # The read position is kept.
+    assert tracking_reader.read().hmd.position.x == 1.0
+
+
+def test_read_pose_states_without_extended_layout(tracking_reader: TrackingReader):
+    with pytest.raises(ValueError):
+        tracking_reader.read_pose_states()
+
+
+def write_v0_file(path, num_frames: int, record_layout: str = RecordLayouts.FLOAT) -> None:
+    holder = create_empty_data_holder()
+    with path.open("wb") as f:
+        TrackingRecorder._write_header(f, HeaderVersions.V0, 720, Compressions.NONE, record_layout)
+        outfile = QuantizingSink(f) if record_layout == RecordLayouts.QUANTIZED else f
+        for timestamp in range(num_frames):
+            holder.timestamp = timestamp
+            holder.hmd.position.x = timestamp * 0.5
+            holder.controller.left.thumb_stick.y = -0.25
+            outfile.write(holder_to_binary(holder))
+        f.write(b"\x00" * 10)  # truncated frame.
+
+
+def test_truncated_bytes(tmp_path, v1_test_file, v2_test_file):
+    test_file = tmp_path / "test_input_truncated.bin"
+    write_v0_file(test_file, 3)
+    assert TrackingReader(str(test_file)).truncated_bytes == 10
+    assert TrackingReader(str(v1_test_file)).truncated_bytes == 1
+    assert TrackingReader(str(v2_test_file)).truncated_bytes == 0
+    assert TrackingReader(str(v2_test_file)).num_corrupt_chunks == 0
+
+
+def test_as_array(tmp_path):
+    test_file = tmp_path / "test_input_array.bin"
+    write_v0_file(test_file, 100)
+
+    tracking_reader = TrackingReader(str(test_file))
+    tracking_reader.read()
+    records = tracking_reader.as_array()
+    assert isinstance(records, np.memmap)
+    assert not records.flags.writeable
+    assert records.shape == (100,)
+    assert records["timestamp"].tolist() == list(range(100))
+    assert records["hmd.position.x"][3] == 1.5
+    assert records["controller.left.thumb_stick.y"][99] == -0.25
+
+    # The read position is kept.
+    assert tracking_reader.read().timestamp == 1
+
+
+def test_as_array_quantized(tmp_path):
+    test_file = tmp_path / "test_input_array_quantized.bin"
+    write_v0_file(test_file, 10, RecordLayouts.QUANTIZED)
+
+    records = TrackingReader(str(test_file)).as_array()
+    assert records["timestamp"].tolist() == list(range(10))
+    assert records["hmd.position.x"][3] == pytest.approx(1.5)
+    assert records["controller.left.thumb_stick.y"][9] == pytest.approx(-0.25, abs=axis_error_bound)
+
+
+def test_as_array_v2(v2_test_file):
+    records = TrackingReader(str(v2_test_file)).as_array()
+    assert records["timestamp"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_as_array_v1(v1_test_file):
+    with pytest.raises(ValueError):
+        TrackingReader(str(v1_test_file)).as_array()
+
+
+def test_as_array_empty(tmp_path):
+    test_file = tmp_path / "test_input_empty.bin"
+    write_v0_file(test_file, 0)
+    assert TrackingReader(str(test_file)).as_array().shape == (0,)
+
+
+def test_read_all(tmp_path):
+    test_file = tmp_path / "test_input_array.bin"
+    write_v0_file(test_file, 5)
+
+    columns = TrackingReader(str(test_file)).read_all()
+    assert len(columns) == 42
+    assert columns["timestamp"].tolist() == [0, 1, 2, 3, 4]
+    assert columns["hmd.position.x"].tolist() == [0.0, 0.5, 1.0, 1.5, 2.0]
+
+
+def test_seek(tmp_path):
+    test_file = tmp_path / "test_input_seek.bin"
+    write_v0_file(test_file, 10)
+
+    tracking_reader = TrackingReader(str(test_file))
+    tracking_reader.seek(7)
+    assert tracking_reader.read_count == 7
+    assert tracking_reader.read().timestamp == 7
+    tracking_reader.seek(2)
+    assert tracking_reader.read().timestamp == 2
+    tracking_reader.seek(10)
+    assert tracking_reader.read_count == 10
+    with pytest.raises(ValueError):
+        tracking_reader.seek(11)
+    with pytest.raises(ValueError):
+        tracking_reader.seek(-1)
+
+
+def test_seek_v1(v1_test_file):
+    tracking_reader = TrackingReader(str(v1_test_file))
+    tracking_reader.seek(2)
+    assert tracking_reader.read_count == 2
+    assert tracking_reader.read().timestamp == 2
+    assert tracking_reader.read() is None
+
+
+def test_seek_v2(v2_test_file):
+    tracking_reader = TrackingReader(str(v2_test_file))
+    tracking_reader.seek(3)
+    assert tracking_reader.read_count == 3
+    assert [tracking_reader.read().timestamp for _ in range(2)] == [3, 4]
+    assert tracking_reader.read() is None
+
+    tracking_reader.seek(2)
+    assert tracking_reader.read().timestamp == 2
+    tracking_reader.seek(5)
+    assert tracking_reader.read() is None
+
+
+@pytest.fixture
+def v2_corrupt_test_file(tmp_path):
+    """3 chunks of 10 frames. The chunk 1 (frames 10 to 19) is corrupt."""
+    test_file = tmp_path / "test_input_v2_corrupt.bin"
+
+    holder = create_empty_data_holder()
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f, HeaderVersions.V2, frames_per_chunk=10)
+        encoder = ChunkedFrameEncoder(f, binary_struct.size, frames_per_chunk=10)
+        for timestamp in range(30):
+            holder.timestamp = timestamp
+            encoder.write(holder_to_binary(holder))
+        encoder.close()
+
+    with TrackingReader(str(test_file)) as tracking_reader:
+        chunk_offset = tracking_reader._chunks.chunks[1].offset
+    data = bytearray(test_file.read_bytes())
+    data[chunk_offset + chunk_header_struct.size] ^= 0xFF
+    test_file.write_bytes(data)
+    return test_file
+
+
+def test_seek_into_corrupt_chunk(v2_corrupt_test_file):
+    tracking_reader = TrackingReader(str(v2_corrupt_test_file))
+    tracking_reader.seek(15)
+    assert tracking_reader.read_count == 20
+    assert [tracking_reader.read().timestamp for _ in range(10)] == list(range(20, 30))
+    assert tracking_reader.read() is None
+
+
+def test_num_corrupt_chunks_after_reading_again(v2_corrupt_test_file):
+    tracking_reader = TrackingReader(str(v2_corrupt_test_file))
+    assert len(tracking_reader.read_all()["timestamp"]) == 20
+    tracking_reader.seek(15)
+    tracking_reader.reset()
+    while tracking_reader.read() is not None:
+        pass
+    assert tracking_reader.num_corrupt_chunks == 1
+
+
+def test_read_batch_after_seek_into_corrupt_chunk(v2_corrupt_test_file):
+    tracking_reader = TrackingReader(str(v2_corrupt_test_file))
+    tracking_reader.seek(15)
+    assert tracking_reader.read_batch(100)["timestamp"].tolist() == list(range(20, 30))
+    assert tracking_reader.read_batch(100) is None
+
+
+def test_iter_views_after_seek_into_corrupt_chunk(v2_corrupt_test_file):
+    tracking_reader = TrackingReader(str(v2_corrupt_test_file))
+    tracking_reader.seek(15)
+    assert [view.timestamp for view in tracking_reader.iter_views(batch_size=4)] == list(range(20, 30))
+
+
+def test_read_range_leaves_out_corrupt_chunk(v2_corrupt_test_file):
+    tracking_reader = TrackingReader(str(v2_corrupt_test_file))
+    assert tracking_reader.read_range(5, 25)["timestamp"].tolist() == list(range(5, 10)) + list(range(20, 25))
+
+
+def test_find_time(tmp_path, mocker: MockerFixture):
+    test_file = tmp_path / "test_input_find_time.bin"
+    write_v0_file(test_file, 1000)
+
+    tracking_reader = TrackingReader(str(test_file))
+    tracking_reader.read()
+    read_timestamp = mocker.spy(tracking_reader, "_read_timestamp")
+    assert tracking_reader.find_time(499.5) == 500
+    assert read_timestamp.call_count <= 10
+    assert tracking_reader.find_time(500) == 500
+    assert tracking_reader.find_time(-1) == 0
+    assert tracking_reader.find_time(1000) == 1000
+
+    # The read position is kept.
+    assert tracking_reader.read().timestamp == 1
+
+
+def test_find_time_quantized(tmp_path):
+    test_file = tmp_path / "test_input_find_time_quantized.bin"
+    write_v0_file(test_file, 10, RecordLayouts.QUANTIZED)
+    assert TrackingReader(str(test_file)).find_time(3.5) == 4
+
+
+def test_find_time_v2(v2_test_file):
+    tracking_reader = TrackingReader(str(v2_test_file))
+    assert tracking_reader.find_time(2.5) == 3
+    assert tracking_reader.find_time(2) == 2
+    assert tracking_reader.find_time(0) == 0
+    assert tracking_reader.find_time(4.5) == 5
+
+    tracking_reader.seek(tracking_reader.find_time(3))
+    assert tracking_reader.read().timestamp == 3
+
+
+def test_find_time_v1(v1_test_file):
+    with pytest.raises(ValueError):
+        TrackingReader(str(v1_test_file)).find_time(1)
+
+
+def test_read_range(tmp_path):
+    test_file = tmp_path / "test_input_range.bin"
+    write_v0_file(test_file, 10)
+
+    tracking_reader = TrackingReader(str(test_file))
+    assert tracking_reader.read_range(3, 6)["timestamp"].tolist() == [3, 4, 5]
+    assert tracking_reader.read_range(8, 20)["timestamp"].tolist() == [8, 9]
+    assert tracking_reader.read_range(4, 4).shape == (0,)
+    with pytest.raises(ValueError):
+        tracking_reader.read_range(6, 3)
+
+
+def test_read_range_v2(v2_test_file):
+    tracking_reader = TrackingReader(str(v2_test_file))
+    assert tracking_reader.read_range(1, 4)["timestamp"].tolist() == [1, 2, 3]
+    assert tracking_reader.read_range(4, 5)["timestamp"].tolist() == [4]
+    assert tracking_reader.read_range(0, 5)["timestamp"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_read_range_quantized(tmp_path):
+    test_file = tmp_path / "test_input_range_quantized.bin"
+    write_v0_file(test_file, 10, RecordLayouts.QUANTIZED)
+    records = TrackingReader(str(test_file)).read_range(2, 4)
+    assert records["timestamp"].tolist() == [2, 3]
+    assert records["hmd.position.x"].tolist() == pytest.approx([1.0, 1.5])
+
+
+def test_iter(tmp_path):
+    test_file = tmp_path / "test_input_iter.bin"
+    write_v0_file(test_file, 5)
+
+    with TrackingReader(str(test_file)) as tracking_reader:
+        assert [data_holder.timestamp for data_holder in tracking_reader] == [0, 1, 2, 3, 4]
+        assert tracking_reader.read_count == 5
+        tracking_reader.seek(3)
+        assert [data_holder.timestamp for data_holder in tracking_reader] == [3, 4]
+    assert tracking_reader._file.closed
+
+
+def test_read_batch(tmp_path):
+    test_file = tmp_path / "test_input_batch.bin"
+    write_v0_file(test_file, 10)
+
+    tracking_reader = TrackingReader(str(test_file))
+    batch = tracking_reader.read_batch(4)
+    assert batch["timestamp"].tolist() == [0, 1, 2, 3]
+    assert batch["hmd.position.x"].tolist() == [0.0, 0.5, 1.0, 1.5]
+    assert tracking_reader.read_count == 4
+    assert tracking_reader.read().timestamp == 4
+    assert tracking_reader.read_batch(100)["timestamp"].tolist() == [5, 6, 7, 8, 9]  # without the truncated frame.
+    assert tracking_reader.read_batch(100) is None
+    assert tracking_reader.read_count == 10
+
+
+def test_read_batch_v2(v2_test_file):
+    tracking_reader = TrackingReader(str(v2_test_file))
+    tracking_reader.read()
+    assert tracking_reader.read_batch(3)["timestamp"].tolist() == [1, 2, 3]
+    assert tracking_reader.read_batch(3)["timestamp"].tolist() == [4]
+    assert tracking_reader.read_batch(3) is None
+    assert tracking_reader.read_count == 5
+
+
+def test_read_batch_quantized(tmp_path):
+    test_file = tmp_path / "test_input_batch_quantized.bin"
+    write_v0_file(test_file, 3, RecordLayouts.QUANTIZED)
+    batch = TrackingReader(str(test_file)).read_batch(3)
+    assert batch["hmd.position.x"].tolist() == pytest.approx([0.0, 0.5, 1.0])
+
+
+def test_read_batch_v1(v1_test_file):
+    with pytest.raises(ValueError):
+        TrackingReader(str(v1_test_file)).read_batch(3)
+
+
+@pytest.mark.parametrize("record_layout", [RecordLayouts.FLOAT, RecordLayouts.QUANTIZED])
+def test_iter_views(tmp_path, record_layout):
+    test_file = tmp_path / "test_input_views.bin"
+    write_v0_file(test_file, 10, record_layout)
+
+    tracking_reader = TrackingReader(str(test_file))
+    tracking_reader.seek(2)
+    views = list(tracking_reader.iter_views(batch_size=3))
+    assert [view.timestamp for view in views] == list(range(2, 10))
+    assert views[1].hmd.position.x == pytest.approx(1.5)
+    assert views[-1].controller.left.thumb_stick.y == pytest.approx(-0.25, abs=axis_error_bound)
+    assert tracking_reader.read_count == 10
+
+
+def test_iter_views_v2(v2_test_file):
+    tracking_reader = TrackingReader(str(v2_test_file))
+    assert [view.timestamp for view in tracking_reader.iter_views(batch_size=4)] == [0, 1, 2, 3, 4]
+
+
+def append_frames(f, timestamps) -> None:
+    holder = create_empty_data_holder()
+    for timestamp in timestamps:
+        holder.timestamp = timestamp
+        f.write(holder_to_binary(holder))
+    f.flush()
+
+
+def test_follow(tmp_path):
+    test_file = tmp_path / "live.bin"
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f)
+        append_frames(f, [0, 1])
+
+        tracking_reader = TrackingReader(str(test_file))
+        frames = tracking_reader.follow(poll_interval=0.001, idle_timeout=0.05)
+        assert [next(frames).timestamp for _ in range(2)] == [0, 1]
+
+        append_frames(f, [2])
+        f.write(holder_to_binary(create_empty_data_holder())[:10])  # partial trailing record.
+        f.flush()
+        assert [holder.timestamp for holder in frames] == [2]
+        assert tracking_reader.num_frames == 3
+
+        f.write(holder_to_binary(create_empty_data_holder())[10:])
+        f.flush()
+        assert next(tracking_reader.follow(idle_timeout=0.05)).timestamp == 0
+        assert tracking_reader.read_count == 4
+
+
+def test_follow_v2(tmp_path):
+    test_file = tmp_path / "live_v2.bin"
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f, HeaderVersions.V2, frames_per_chunk=2)
+        encoder = ChunkedFrameEncoder(f, binary_struct.size, frames_per_chunk=2)
+        encoder.write(b"".join(holder_to_binary(holder) for holder in [create_empty_data_holder()] * 2))
+        encoder.flush()
+
+        tracking_reader = TrackingReader(str(test_file))
+        assert tracking_reader.num_frames == 2
+        frames = tracking_reader.follow(poll_interval=0.001, idle_timeout=0.05)
+        assert len([next(frames) for _ in range(2)]) == 2
+
+        holder = create_empty_data_holder()
+        for timestamp in [2, 3, 4]:
+            holder.timestamp = timestamp
+            encoder.write(holder_to_binary(holder))
+        encoder.flush()
+        assert [holder.timestamp for holder in frames] == [2, 3]  # the last chunk is not written yet.
+
+        encoder.close()
+        assert tracking_reader.refresh() == 1
+        assert tracking_reader.read().timestamp == 4
+        assert tracking_reader.refresh() == 0
+
+
+def test_follow_v1(tmp_path):
+    test_file = tmp_path / "live_v1.bin"
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f, HeaderVersions.V1)
+        encoder = VariableDeviceEncoder(f)
+        frame = DeviceFrame()
+        connected = np.zeros(max_devices, dtype=bool)
+        connected[0] = True
+        frame.set_connected(connected)
+        frame.set_device(0, openvr.TrackedDeviceClass_HMD, 0, [0] * 7)
+
+        def write_frame(timestamp):
+            frame.set_timestamp(timestamp)
+            encoder.write(frame.buffer)
+            f.flush()
+
+        write_frame(0)
+        tracking_reader = TrackingReader(str(test_file))
+        frames = tracking_reader.follow(poll_interval=0.001, idle_timeout=0.05)
+        assert next(frames).timestamp == 0
+
+        write_frame(1)
+        f.write(b"F")  # truncated frame.
+        f.flush()
+        assert [holder.timestamp for holder in frames] == [1]
+        assert tracking_reader.num_frames == 2
+
+
+def test_follow_async(tmp_path):
+    test_file = tmp_path / "live_async.bin"
+    with test_file.open("wb") as f:
+        TrackingRecorder._write_header(f)
+        append_frames(f, [0, 1])
+
+        async def collect():
+            tracking_reader = TrackingReader(str(test_file))
+            timestamps = []
+            async for holder in tracking_reader.follow_async(poll_interval=0.001, idle_timeout=0.05):
+                timestamps.append(holder.timestamp)
+                if holder.timestamp == 1:
+                    append_frames(f, [2])
+            return timestamps
+
+        assert asyncio.run(collect()) == [0, 1, 2]
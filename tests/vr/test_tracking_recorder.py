@@ -1,20 +1,42 @@
+import gc
 import json
+import threading
 import time
+import tracemalloc
+import uuid
 from unittest.mock import MagicMock
 
 import numpy as np
 import openvr
 import pytest
 from pytest_mock import MockerFixture
+from scipy.spatial.transform import Rotation
 
-from vrchat_recorder.vr.binary_converter import holder_to_binary
-from vrchat_recorder.vr.constants import HeaderNames, HeaderVersions
+from vrchat_recorder.abc.background_writer import BackgroundFrameWriter
+from vrchat_recorder.vr.binary_converter import (
+    binary_struct,
+    extended_binary_format,
+    holder_to_binary,
+)
+from vrchat_recorder.vr.constants import (
+    Clocks,
+    Compressions,
+    DeviceRegistries,
+    HeaderNames,
+    HeaderVersions,
+    RecordLayouts,
+    validate_header,
+)
+from vrchat_recorder.vr.quantization import quantized_binary_format, quantized_struct
+from vrchat_recorder.vr.shared_frame_ring import SharedFrameSubscriber
 from vrchat_recorder.vr.tracking_data_holders import (
     Orientation,
     Position,
     create_empty_data_holder,
 )
+from vrchat_recorder.vr.tracking_reader import TrackingReader
 from vrchat_recorder.vr.tracking_recorder import (
+    PoseConverter,
     TrackingRecorder,
     binary_format,
     create_header,
@@ -29,7 +51,7 @@ def tracking_recorder(mock_vrsystem):
 def test_update_timestamp(mocker: MockerFixture, tracking_recorder):
     mocker.patch("time.time", return_value=1234567890.123456)
     tracking_recorder._update_timestamp()
-    assert tracking_recorder._holder.timestamp == 1234567890.123456
+    assert tracking_recorder.holder.timestamp == 1234567890.123456
 
 
 def test_get_device_poses(tracking_recorder, mock_vrsystem):
@@ -41,7 +63,7 @@ def test_get_device_poses(tracking_recorder, mock_vrsystem):
     mock_vrsystem.getDeviceToAbsoluteTrackingPose.assert_called_once()
 
 
-def test_update_data_holder(tracking_recorder, mock_vrsystem):
+def test_update_frame(tracking_recorder, mock_vrsystem):
     mock_device_poses = [MagicMock(spec=openvr.TrackedDevicePose_t) for _ in range(openvr.k_unMaxTrackedDeviceCount)]
     for device_pose in mock_device_poses:
         device_pose.bDeviceIsConnected = True
@@ -50,12 +72,132 @@ def test_update_data_holder(tracking_recorder, mock_vrsystem):
     mock_vrsystem.getTrackedDeviceClass.return_value = openvr.TrackedDeviceClass_HMD
     mock_vrsystem.getControllerRoleForTrackedDeviceIndex.return_value = openvr.TrackedControllerRole_LeftHand
 
-    holder = create_empty_data_holder()
-    tracking_recorder._holder = holder
-    tracking_recorder._update_data_holder(mock_device_poses)
+    tracking_recorder._update_frame(mock_device_poses)
+
+    assert tracking_recorder.holder.hmd.position == Position(1.0, 1.0, 1.0)
+    assert isinstance(tracking_recorder.holder.hmd.orientation, Orientation)
+
+
+def test_update_frame_matches_per_device_conversion(tracking_recorder, mock_vrsystem):
+    device_poses = (openvr.TrackedDevicePose_t * openvr.k_unMaxTrackedDeviceCount)()
+    rotations = Rotation.random(2, random_state=0).as_matrix()
+    for device_index, rotation in zip([1, 5], rotations):
+        device_poses[device_index].bDeviceIsConnected = True
+        for row in range(3):
+            for col in range(3):
+                device_poses[device_index].mDeviceToAbsoluteTracking.m[row][col] = rotation[row, col]
+            device_poses[device_index].mDeviceToAbsoluteTracking.m[row][3] = row + 0.25
+
+    mock_vrsystem.getTrackedDeviceClass.side_effect = lambda i: {
+        1: openvr.TrackedDeviceClass_HMD,
+        5: openvr.TrackedDeviceClass_Controller,
+    }.get(i, openvr.TrackedDeviceClass_Invalid)
+    mock_vrsystem.getControllerRoleForTrackedDeviceIndex.return_value = openvr.TrackedControllerRole_RightHand
+    controller_state = openvr.VRControllerState_t()
+    controller_state.rAxis[0].x = 0.5
+    controller_state.rAxis[4].y = -0.25
+    mock_vrsystem.getControllerState.return_value = (True, controller_state)
+
+    tracking_recorder._update_frame(device_poses)
+
+    expected = create_empty_data_holder()
+    for device_index, tracking_data in [(1, expected.hmd), (5, expected.controller.right)]:
+        pose_matrix = np.zeros((3, 4), dtype=float)
+        pose_matrix[:] = [list(row) for row in device_poses[device_index].mDeviceToAbsoluteTracking.m]
+        quaternion = Rotation.from_matrix(pose_matrix[:3, :3]).as_quat()
+        tracking_data.position = Position(*pose_matrix[:3, 3])
+        tracking_data.orientation = Orientation(*quaternion)
+    expected.controller.right.thumb_stick.x = 0.5
+    expected.controller.right.fourth_trigger.y = -0.25
+
+    assert bytes(tracking_recorder._frame.buffer) == holder_to_binary(expected)
+
+    mock_vrsystem.getTrackedDeviceClass.assert_any_call(1)
+    assert mock_vrsystem.getTrackedDeviceClass.call_count == 2
+
+    # Device classes and roles are cached, so the next frame does not query them again.
+    tracking_recorder._update_frame(device_poses)
+    assert mock_vrsystem.getTrackedDeviceClass.call_count == 2
+    assert mock_vrsystem.getControllerRoleForTrackedDeviceIndex.call_count == 1
+    assert tracking_recorder.device_topology.misses == 3
+    assert tracking_recorder.device_topology.hits == 3
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_pose_converter_matches_scipy(dtype):
+    rotations = Rotation.random(2000, random_state=0).as_matrix().astype(dtype)
+    rotations[:4] = [np.eye(3), np.diag([1, -1, -1]), np.diag([-1, 1, -1]), np.diag([-1, -1, 1])]  # 0 and 180 deg.
+    rotations[4:8] += np.random.default_rng(0).normal(scale=1e-3, size=(4, 3, 3))  # not orthogonal.
+    converter = PoseConverter(len(rotations))
+    converter.matrices[:, :, :3] = rotations
+    converter.matrices[:, :, 3] = np.arange(len(rotations) * 3).reshape(-1, 3)
+
+    converter.convert()
+
+    assert np.array_equal(converter.poses[:, :3], converter.matrices[:, :, 3])
+    expected = np.array([Rotation.from_matrix(rotation).as_quat() for rotation in rotations])  # per device.
+    assert np.array_equal(converter.poses[:, 3:], expected)
+
+
+class FakeVRSystem:
+    """VR system without call recording, so that it does not allocate by itself."""
 
-    assert isinstance(tracking_recorder._holder.hmd.position, Position)
-    assert isinstance(tracking_recorder._holder.hmd.orientation, Orientation)
+    def __init__(self):
+        self.controller_state = (True, openvr.VRControllerState_t())
+
+    def getTrackedDeviceClass(self, device_index):
+        return openvr.TrackedDeviceClass_HMD if device_index == 0 else openvr.TrackedDeviceClass_Controller
+
+    def getControllerRoleForTrackedDeviceIndex(self, device_index):
+        return device_index
+
+    def getControllerState(self, device_index):
+        return self.controller_state
+
+    def getStringTrackedDeviceProperty(self, device_index, prop):
+        return f"LHR-{device_index:08d}"
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"record_layout": RecordLayouts.EXTENDED},
+        {"header_version": HeaderVersions.V1},
+    ],
+)
+def test_update_frame_does_not_allocate(options):
+    tracking_recorder = TrackingRecorder("test_output.bin", FakeVRSystem(), **options)
+    device_poses = tracking_recorder._device_poses  # the array filled by `_get_device_poses`.
+    for device_index in range(3):
+        device_poses[device_index].bDeviceIsConnected = True
+        for axis in range(3):
+            device_poses[device_index].mDeviceToAbsoluteTracking.m[axis][axis] = 1.0
+
+    def run_frames(num_frames):
+        for _ in range(num_frames):
+            tracking_recorder._update_timestamp()
+            tracking_recorder._update_frame(device_poses)
+
+    gc.collect()  # so that garbage of other tests is not freed (and finalized) while tracing.
+    tracemalloc.start()
+    try:
+        run_frames(100)  # warm up caches.
+        before = tracemalloc.take_snapshot()
+        before_size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run_frames(1000)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # No block allocated by the recorder is kept over the frames.
+    package_filter = [tracemalloc.Filter(True, "*vrchat_recorder*")]
+    differences = after.filter_traces(package_filter).compare_to(before.filter_traces(package_filter), "lineno")
+    assert [difference for difference in differences if difference.count_diff > 0] == []
+    # Arrays are not allocated per frame, only the small scratch of NumPy iterators and Python scalars.
+    assert peak - before_size < 8 * 1024
 
 
 def test_write_header(tracking_recorder: TrackingRecorder, tmp_path):
@@ -77,10 +219,12 @@ def test_write_binary_data(tracking_recorder: TrackingRecorder, tmp_path):
     tracking_recorder.output_file_path = str(test_file)
 
     with test_file.open("wb") as outfile:
-        frame_count = 0
-        frame_count = tracking_recorder._write_binary_data(outfile, frame_count)
+        writer = BackgroundFrameWriter(outfile, binary_struct.size)
+        writer.start()
+        tracking_recorder._write_binary_data(writer)
+        writer.close()
 
-    assert frame_count == 1
+    assert writer.written_frames == 1
     assert test_file.exists()
     assert test_file.stat().st_size == len(holder_to_binary(create_empty_data_holder()))
 
@@ -92,7 +236,7 @@ def test_record(caplog: pytest.LogCaptureFixture, tracking_recorder: TrackingRec
     tracking_recorder._write_header = mocker.spy(tracking_recorder, "_write_header")
     tracking_recorder._update_timestamp = mocker.spy(tracking_recorder, "_update_timestamp")
     tracking_recorder._get_device_poses = mocker.spy(tracking_recorder, "_get_device_poses")
-    tracking_recorder._update_data_holder = mocker.spy(tracking_recorder, "_update_data_holder")
+    tracking_recorder._update_frame = mocker.spy(tracking_recorder, "_update_frame")
     tracking_recorder._write_binary_data = mocker.spy(tracking_recorder, "_write_binary_data")
 
     with caplog.at_level("DEBUG"):
@@ -104,12 +248,17 @@ def test_record(caplog: pytest.LogCaptureFixture, tracking_recorder: TrackingRec
     tracking_recorder._write_header.assert_called_once()
     tracking_recorder._update_timestamp.assert_called()
     tracking_recorder._get_device_poses.assert_called()
-    tracking_recorder._update_data_holder.assert_called()
+    tracking_recorder._update_frame.assert_called()
     tracking_recorder._write_binary_data.assert_called()
 
     assert f"VR Tracking Recorder started. Output to {tracking_recorder.output_file_path}" in caplog.messages
     assert "VR Tracking Recorder stopped." in caplog.messages
 
+    header_size = len(create_header(frame_rate=tracking_recorder.frame_rate))
+    num_frames = (test_file.stat().st_size - 4 - header_size) / binary_struct.size
+    assert num_frames == tracking_recorder.writer.written_frames
+    assert num_frames > 0
+
 
 def test_create_header():
     header = create_header()
@@ -119,3 +268,262 @@ def test_create_header():
     header_dict = json.loads(header.decode("utf-8"))
     assert header_dict[HeaderNames.VERSION] == HeaderVersions.V0
     assert header_dict[HeaderNames.BINARY_FORMAT] == binary_format
+    assert header_dict[HeaderNames.CLOCK] == Clocks.UNIX_TIME
+    assert header_dict[HeaderNames.DEVICE_REGISTRY] == DeviceRegistries.FIXED
+    assert HeaderNames.FRAME_RATE not in header_dict
+    assert validate_header(header_dict)[HeaderNames.FRAME_RATE] is None
+
+
+def test_create_header_frame_rate():
+    header_dict = json.loads(create_header(frame_rate=90).decode("utf-8"))
+    assert header_dict[HeaderNames.FRAME_RATE] == 90
+
+
+def test_create_header_v2():
+    header_dict = json.loads(create_header(HeaderVersions.V2, frames_per_chunk=100).decode("utf-8"))
+    assert header_dict[HeaderNames.VERSION] == HeaderVersions.V2
+    assert header_dict[HeaderNames.BINARY_FORMAT] == binary_format
+    assert header_dict[HeaderNames.FRAMES_PER_CHUNK] == 100
+    assert header_dict[HeaderNames.COMPRESSION] == Compressions.NONE
+
+
+def test_create_header_quantized():
+    header_dict = json.loads(create_header(record_layout=RecordLayouts.QUANTIZED).decode("utf-8"))
+    assert header_dict[HeaderNames.VERSION] == HeaderVersions.V0
+    assert header_dict[HeaderNames.BINARY_FORMAT] == quantized_binary_format
+    assert header_dict[HeaderNames.RECORD_LAYOUT] == RecordLayouts.QUANTIZED
+
+
+def test_record_quantized(tmp_path):
+    test_file = tmp_path / "test_output_quantized.bin"
+    tracking_recorder = TrackingRecorder(str(test_file), FakeVRSystem(), record_layout=RecordLayouts.QUANTIZED)
+    tracking_recorder._get_device_poses = lambda: []
+
+    tracking_recorder.record_background()
+    time.sleep(0.1)
+    tracking_recorder.shutdown()
+
+    header_size = len(create_header(record_layout=RecordLayouts.QUANTIZED, frame_rate=tracking_recorder.frame_rate))
+    assert test_file.stat().st_size - 4 - header_size == tracking_recorder.writer.written_frames * quantized_struct.size
+    reader = TrackingReader(str(test_file))
+    assert reader.num_frames == tracking_recorder.writer.written_frames
+    assert abs(reader.read().timestamp - time.time()) < 10
+
+
+def test_create_header_extended():
+    header_dict = json.loads(create_header(HeaderVersions.V2, record_layout=RecordLayouts.EXTENDED).decode("utf-8"))
+    assert header_dict[HeaderNames.VERSION] == HeaderVersions.V2
+    assert header_dict[HeaderNames.BINARY_FORMAT] == extended_binary_format
+    assert header_dict[HeaderNames.RECORD_LAYOUT] == RecordLayouts.EXTENDED
+
+
+def test_record_follow_latency(tmp_path):
+    test_file = tmp_path / "test_output_follow.bin"
+    tracking_recorder = TrackingRecorder(str(test_file), FakeVRSystem())  # default settings.
+    tracking_recorder._get_device_poses = lambda: []
+
+    tracking_recorder.record_background()
+    try:
+        start = time.monotonic()
+        while (not test_file.exists() or test_file.stat().st_size == 0) and time.monotonic() - start < 1.0:
+            time.sleep(0.001)
+        latencies = []
+        with TrackingReader(str(test_file)) as reader:
+            for holder in reader.follow(idle_timeout=1.0):
+                latencies.append(time.time() - holder.timestamp)  # from sampling to visible in the file.
+                if time.monotonic() - start > 0.5:
+                    break
+    finally:
+        tracking_recorder.shutdown()
+
+    assert len(latencies) > 10
+    assert max(latencies) < 0.2  # `max_flush_interval` plus the polling and sampling intervals, with margin.
+
+
+def test_record_shared_memory(tmp_path):
+    test_file = tmp_path / "test_output_shared_memory.bin"
+    name = f"vrchat_recorder_test_{uuid.uuid4().hex[:8]}"
+    tracking_recorder = TrackingRecorder(str(test_file), FakeVRSystem(), shared_memory_name=name)
+    tracking_recorder._get_device_poses = lambda: []
+
+    tracking_recorder.record_background()
+    time.sleep(0.1)
+    with SharedFrameSubscriber(name) as subscriber:
+        assert subscriber.binary_format == binary_format
+        records = subscriber.read_latest(4)
+        tracking_recorder.shutdown()
+
+    assert len(records) == 4
+    assert np.all(np.diff(records["timestamp"]) > 0)
+    assert abs(records["timestamp"][-1] - time.time()) < 10
+    with pytest.raises(FileNotFoundError):  # removed when the recording stops.
+        SharedFrameSubscriber(name)
+
+
+def test_record_shared_memory_error(tmp_path, mocker: MockerFixture):
+    test_file = tmp_path / "test_output_shared_memory_error.bin"
+    tracking_recorder = TrackingRecorder(str(test_file), FakeVRSystem(), shared_memory_name="unused")
+    mocker.patch.object(tracking_recorder, "_create_publisher", side_effect=FileExistsError)
+    start = mocker.spy(BackgroundFrameWriter, "start")
+
+    with pytest.raises(FileExistsError):
+        tracking_recorder.record()
+    start.assert_not_called()  # no writer thread is left running.
+
+
+def test_record_stream_sink(tmp_path, mocker: MockerFixture):
+    test_file = tmp_path / "test_output_stream.bin"
+    stream_sink = mocker.Mock()
+    tracking_recorder = TrackingRecorder(str(test_file), FakeVRSystem(), stream_sink=stream_sink)
+    tracking_recorder._get_device_poses = lambda: []
+
+    tracking_recorder.record_background()
+    time.sleep(0.1)
+    tracking_recorder.shutdown()
+
+    assert stream_sink.send_frame.call_count == tracking_recorder.writer.written_frames
+    stream_sink.close.assert_not_called()  # the sink is closed by the caller.
+
+
+@pytest.mark.parametrize("header_version", [HeaderVersions.V0, HeaderVersions.V2])
+def test_record_extended(tmp_path, header_version):
+    test_file = tmp_path / "test_output_extended.bin"
+    vrsystem = FakeVRSystem()
+
+    def get_device_poses(universe, seconds, device_poses):
+        for device_index in (0, 1, 2):
+            device_poses[device_index].bDeviceIsConnected = True
+            device_poses[device_index].bPoseIsValid = device_index != 2
+            device_poses[device_index].eTrackingResult = openvr.TrackingResult_Running_OK
+            device_poses[device_index].vVelocity.v[0] = device_index + 0.5
+            device_poses[device_index].vAngularVelocity.v[2] = -device_index
+            for axis in range(3):
+                device_poses[device_index].mDeviceToAbsoluteTracking.m[axis][axis] = 1.0
+
+    vrsystem.getDeviceToAbsoluteTrackingPose = get_device_poses
+    tracking_recorder = TrackingRecorder(
+        str(test_file),
+        vrsystem,
+        header_version=header_version,
+        compression=Compressions.ZLIB if header_version == HeaderVersions.V2 else Compressions.NONE,
+        record_layout=RecordLayouts.EXTENDED,
+    )
+
+    tracking_recorder.record_background()
+    time.sleep(0.1)
+    tracking_recorder.shutdown()
+
+    reader = TrackingReader(str(test_file))
+    assert reader.num_frames == tracking_recorder.writer.written_frames
+    assert reader.read().hmd.orientation.w == 1.0
+
+    pose_states = reader.read_pose_states()
+    num_frames = reader.num_frames
+    assert pose_states["hmd.velocity"][:, 0].tolist() == [0.5] * num_frames
+    assert pose_states["controller.left.velocity"][:, 0].tolist() == [1.5] * num_frames
+    assert pose_states["controller.right.angular_velocity"][:, 2].tolist() == [-2.0] * num_frames
+    assert pose_states["controller.left.tracking_result"].tolist() == [openvr.TrackingResult_Running_OK] * num_frames
+    assert pose_states["hmd.pose_is_valid"].all()
+    assert not pose_states["controller.right.pose_is_valid"].any()
+
+
+def test_create_header_v1():
+    header_dict = json.loads(create_header(HeaderVersions.V1).decode("utf-8"))
+    assert header_dict[HeaderNames.VERSION] == HeaderVersions.V1
+    assert header_dict[HeaderNames.BINARY_FORMAT] == "d Q"
+    assert header_dict[HeaderNames.DEVICE_FORMAT] == "fff ffff"
+    assert header_dict[HeaderNames.CONTROLLER_FORMAT] == "ff ff ff ff ff"
+    assert header_dict[HeaderNames.DEVICE_REGISTRY] == DeviceRegistries.INLINE
+
+
+def test_invalid_header_version(mock_vrsystem):
+    with pytest.raises(ValueError):
+        TrackingRecorder("test_output.bin", mock_vrsystem, header_version="v999")
+
+
+def test_invalid_record_layout(mock_vrsystem):
+    with pytest.raises(ValueError):
+        TrackingRecorder("test_output.bin", mock_vrsystem, record_layout="half")
+    with pytest.raises(ValueError):
+        TrackingRecorder(
+            "test_output.bin", mock_vrsystem, header_version=HeaderVersions.V1, record_layout=RecordLayouts.QUANTIZED
+        )
+    with pytest.raises(ValueError):
+        TrackingRecorder(
+            "test_output.bin", mock_vrsystem, header_version=HeaderVersions.V1, record_layout=RecordLayouts.EXTENDED
+        )
+
+
+def test_invalid_compression(mock_vrsystem):
+    with pytest.raises(ValueError):
+        TrackingRecorder("test_output.bin", mock_vrsystem, header_version=HeaderVersions.V2, compression="zip")
+    with pytest.raises(ValueError):
+        TrackingRecorder("test_output.bin", mock_vrsystem, compression=Compressions.ZLIB)
+
+
+def test_record_v1(tmp_path):
+    test_file = tmp_path / "test_output_v1.bin"
+    vrsystem = FakeVRSystem()
+    serial_threads = []
+
+    def get_serial(device_index, prop):
+        serial_threads.append(threading.current_thread())
+        return f"SERIAL-{device_index}"
+
+    vrsystem.getStringTrackedDeviceProperty = get_serial
+
+    def get_device_poses(universe, seconds, device_poses):
+        for device_index in (0, 1, 4):
+            device_poses[device_index].bDeviceIsConnected = True
+            for axis in range(3):
+                device_poses[device_index].mDeviceToAbsoluteTracking.m[axis][axis] = 1.0
+            device_poses[device_index].mDeviceToAbsoluteTracking.m[0][3] = device_index
+
+    vrsystem.getDeviceToAbsoluteTrackingPose = get_device_poses
+    tracking_recorder = TrackingRecorder(str(test_file), vrsystem, header_version=HeaderVersions.V1)
+
+    tracking_recorder.record_background()
+    time.sleep(0.1)
+    tracking_recorder.shutdown()
+
+    reader = TrackingReader(str(test_file))
+    assert reader.num_frames == tracking_recorder.writer.written_frames
+    holder = reader.read()
+    assert [device.info.index for device in holder.devices] == [0, 1, 4]
+    assert [device.info.serial for device in holder.devices] == ["SERIAL-0", "SERIAL-1", "SERIAL-4"]
+    assert [device.position.x for device in holder.devices] == [0.0, 1.0, 4.0]
+    assert holder.controller.left.position.x == 1.0
+    assert len(holder.devices[1].axes) == 5
+    # Serial numbers are queried once per device on the sampling thread, not on the writer thread.
+    assert serial_threads == [tracking_recorder.backgroud_thread] * 3
+
+
+@pytest.mark.parametrize(
+    "compression, record_layout",
+    [
+        (Compressions.NONE, RecordLayouts.FLOAT),
+        (Compressions.LZMA, RecordLayouts.FLOAT),
+        (Compressions.ZLIB, RecordLayouts.QUANTIZED),
+    ],
+)
+def test_record_v2(tmp_path, compression, record_layout):
+    test_file = tmp_path / "test_output_v2.bin"
+    tracking_recorder = TrackingRecorder(
+        str(test_file),
+        FakeVRSystem(),
+        header_version=HeaderVersions.V2,
+        frames_per_chunk=3,
+        compression=compression,
+        record_layout=record_layout,
+    )
+    tracking_recorder._get_device_poses = lambda: []
+
+    tracking_recorder.record_background()
+    time.sleep(0.1)
+    tracking_recorder.shutdown()
+
+    reader = TrackingReader(str(test_file))
+    assert reader.num_frames == tracking_recorder.writer.written_frames
+    assert reader.num_chunks == -(-reader.num_frames // 3)
+    timestamps = [reader.read().timestamp for _ in range(reader.num_frames)]
+    assert timestamps == sorted(timestamps)
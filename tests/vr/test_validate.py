@@ -0,0 +1,145 @@
+import json
+
+import numpy as np
+import pytest
+
+from vrchat_recorder.vr.binary_converter import (
+    binary_dtype,
+    binary_field_names,
+    binary_format,
+    binary_struct,
+)
+from vrchat_recorder.vr.chunked_format import ChunkedFrameEncoder
+from vrchat_recorder.vr.constants import HeaderVersions
+from vrchat_recorder.vr.tracking_recorder import TrackingRecorder
+from vrchat_recorder.vr.validate import (
+    ValidationReport,
+    find_tracking_files,
+    main,
+    validate_files,
+    validate_tracking_file,
+)
+
+
+def create_records(num_frames: int, frame_rate: float = 90) -> np.ndarray:
+    records = np.zeros(num_frames, dtype=binary_dtype(binary_format, binary_field_names))
+    records["timestamp"] = 1.7e9 + np.arange(num_frames) / frame_rate
+    for device in ["hmd", "controller.left", "controller.right"]:
+        records[f"{device}.orientation.w"] = 1.0
+    return records
+
+
+def write_tracking_file(path, records: np.ndarray, header_version=HeaderVersions.V0, frame_rate=90) -> None:
+    with path.open("wb") as f:
+        TrackingRecorder._write_header(f, header_version, 4, frame_rate=frame_rate)
+        if header_version == HeaderVersions.V2:
+            encoder = ChunkedFrameEncoder(f, binary_struct.size, 4)
+            encoder.write(records.tobytes())
+            encoder.close()
+        else:
+            f.write(records.tobytes())
+
+
+@pytest.mark.parametrize("header_version", [HeaderVersions.V0, HeaderVersions.V2])
+def test_validate_intact_file(tmp_path, header_version):
+    path = tmp_path / "a.tracking.bin"
+    write_tracking_file(path, create_records(100), header_version)
+
+    report = validate_tracking_file(str(path), batch_size=16)
+    assert report.ok
+    assert report.header_version == header_version
+    assert report.num_frames == 100
+    assert report.duration == pytest.approx(99 / 90)
+    assert report.achieved_frame_rate == pytest.approx(90)
+    assert report.gap_histogram["1"] == 99
+    assert report.num_dropped_frames == 0
+    assert report.num_zero_quaternions == {"hmd": 0, "controller.left": 0, "controller.right": 0}
+
+
+def test_validate_broken_file(tmp_path):
+    records = create_records(100)
+    records = np.delete(records, [10, 20, 21, 50, 51, 52, 53, 54])  # 1 + 2 + 5 dropped frames.
+    records["timestamp"][30] = records["timestamp"][29]  # duplicate.
+    records["timestamp"][[60, 61]] = records["timestamp"][[61, 60]]  # goes back, with a gap before and after.
+    records["hmd.position.x"][3] = np.nan
+    records["controller.left.orientation.w"][5] = 0.5
+    records["controller.right.orientation.w"][7] = 0.0
+    path = tmp_path / "a.tracking.bin"
+    write_tracking_file(path, records)
+    with path.open("ab") as f:
+        f.write(b"\x00" * 7)
+
+    report = validate_tracking_file(str(path), batch_size=16)
+    assert not report.ok
+    assert report.num_frames == 92
+    assert report.num_dropped_frames == 11  # the duplicate and the swap leave gaps of 2 periods too.
+    assert report.gap_histogram["2"] == 4
+    assert report.gap_histogram["3"] == 1
+    assert report.gap_histogram["6-10"] == 1
+    assert report.num_duplicate_timestamps == 1
+    assert report.num_non_monotonic == 1
+    assert report.num_non_finite_values == 1
+    assert report.num_non_unit_quaternions == {"hmd": 0, "controller.left": 1, "controller.right": 0}
+    assert report.num_zero_quaternions == {"hmd": 0, "controller.left": 0, "controller.right": 1}
+    assert report.truncated_bytes == 7
+
+
+def test_validate_without_frame_rate(tmp_path):
+    records = np.delete(create_records(50, frame_rate=60), [10])
+    path = tmp_path / "a.tracking.bin"
+    write_tracking_file(path, records, frame_rate=None)
+
+    report = validate_tracking_file(str(path))
+    assert report.header_frame_rate is None
+    assert report.num_dropped_frames == 1
+
+
+def test_validate_unreadable_file(tmp_path):
+    path = tmp_path / "a.tracking.bin"
+    path.write_bytes(b"\x04\x00\x00\x00nope")
+    report = validate_tracking_file(str(path))
+    assert not report.ok
+    assert report.error.startswith("JSONDecodeError")
+    assert report.summary().startswith("NG")
+
+
+def test_validate_empty_file(tmp_path):
+    path = tmp_path / "a.tracking.bin"
+    write_tracking_file(path, create_records(0))
+    report = validate_tracking_file(str(path))
+    assert report.ok
+    assert report.num_frames == 0
+    assert report.achieved_frame_rate is None
+
+
+def test_find_tracking_files(tmp_path):
+    (tmp_path / "a.vrcrec" / "vr").mkdir(parents=True)
+    (tmp_path / "a.vrcrec" / "vr" / "a.tracking.bin").touch()
+    (tmp_path / "a.vrcrec" / "vr" / "a.event.ctrlr.csv").touch()
+    (tmp_path / "b.bin").touch()
+    assert find_tracking_files([str(tmp_path / "a.vrcrec"), str(tmp_path / "b.bin")]) == [
+        str(tmp_path / "a.vrcrec" / "vr" / "a.tracking.bin"),
+        str(tmp_path / "b.bin"),
+    ]
+
+
+def test_validate_files(tmp_path):
+    paths = [tmp_path / f"{i}.tracking.bin" for i in range(3)]
+    for path in paths:
+        write_tracking_file(path, create_records(10))
+    reports = validate_files([str(p) for p in paths], max_workers=2)
+    assert [r.file_path for r in reports] == [str(p) for p in paths]
+    assert all(isinstance(r, ValidationReport) and r.ok for r in reports)
+
+
+def test_main(tmp_path, capsys):
+    write_tracking_file(tmp_path / "a.tracking.bin", create_records(10))
+    main([str(tmp_path), "--max_workers", "1", "--json"])
+    report = json.loads(capsys.readouterr().out)
+    assert report["ok"]
+    assert report["num_frames"] == 10
+
+    (tmp_path / "b.tracking.bin").write_bytes(b"")
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), "--max_workers", "1"])
+    assert capsys.readouterr().out.splitlines()[0].startswith("OK")
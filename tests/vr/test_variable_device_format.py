@@ -0,0 +1,231 @@
+import io
+import json
+
+import numpy as np
+import openvr
+import pytest
+from pytest import approx
+
+from vrchat_recorder.vr.constants import BlockTypes, RegistryNames
+from vrchat_recorder.vr.variable_device_format import (
+    DeviceFrame,
+    VariableDeviceDecoder,
+    VariableDeviceEncoder,
+    device_frame_size,
+    encode_frame,
+    frame_struct,
+    get_generation,
+    max_devices,
+    registry_size_struct,
+)
+
+HMD = openvr.TrackedDeviceClass_HMD
+CONTROLLER = openvr.TrackedDeviceClass_Controller
+TRACKER = openvr.TrackedDeviceClass_GenericTracker
+NO_ROLE = openvr.TrackedControllerRole_Invalid
+LEFT = openvr.TrackedControllerRole_LeftHand
+
+
+def make_axes(value: float):
+    state = openvr.VRControllerState_t()
+    for axis_index in range(5):
+        state.rAxis[axis_index].x = value
+        state.rAxis[axis_index].y = -value
+    return state.rAxis
+
+
+def make_frame(timestamp: float, devices: dict) -> DeviceFrame:
+    """devices: {device_index: (device_class, controller_role, pose_value)}"""
+    frame = DeviceFrame()
+    frame.set_timestamp(timestamp)
+    connected = np.zeros(max_devices, dtype=bool)
+    connected[list(devices)] = True
+    frame.set_connected(connected)
+    for device_index, (device_class, controller_role, value) in devices.items():
+        axes = make_axes(value / 10) if device_class == CONTROLLER else None
+        frame.set_device(device_index, device_class, controller_role, [value] * 7, axes)
+    frame.set_serials({device_index: f"SERIAL-{device_index}" for device_index in devices})
+    return frame
+
+
+def encode(*frames: DeviceFrame) -> io.BytesIO:
+    outfile = io.BytesIO()
+    # The frames are made separately, so their serial numbers are given as the table of generation 0.
+    encoder = VariableDeviceEncoder(outfile, {0: {index: f"SERIAL-{index}" for index in range(max_devices)}})
+    encoder.write(b"".join(frame.buffer for frame in frames))
+    encoder.flush()
+    outfile.seek(0)
+    return outfile
+
+
+def test_device_frame():
+    frame = make_frame(1.5, {0: (HMD, NO_ROLE, 1.0), 3: (TRACKER, NO_ROLE, 2.0)})
+    assert len(frame.buffer) == device_frame_size
+    assert frame.timestamp == 1.5
+
+    holder = frame.to_holder()
+    assert holder.timestamp == 1.5
+    assert holder.hmd.position.x == 1.0
+    assert [device.info.index for device in holder.devices] == [0, 3]
+    assert holder.devices[1].info.device_class == TRACKER
+    assert holder.devices[1].axes == []
+
+    frame.clear()
+    assert frame.to_holder().devices == []
+
+
+def test_set_connected_resets_disconnected_devices():
+    frame = make_frame(0.0, {1: (CONTROLLER, LEFT, 1.0)})
+    frame.set_connected(np.zeros(max_devices, dtype=bool))
+    assert bytes(frame.buffer[frame_struct.size - 8 : frame_struct.size + 2 * max_devices]) == bytes(
+        8 + 2 * max_devices
+    )
+
+
+def test_set_serials():
+    frame = make_frame(0.0, {2: (TRACKER, NO_ROLE, 1.0)})
+    assert frame.serials == {0: {2: "SERIAL-2"}}
+    assert frame.to_holder().devices[0].info.serial == "SERIAL-2"
+    assert b"SERIAL" not in frame.buffer  # kept out of the frame.
+
+    frame.update_topology()
+    assert frame.to_holder().devices[0].info.serial == ""  # not set for the new generation yet.
+    frame.set_serials({2: "LHR-" + "0" * 100})
+    assert frame.to_holder().devices[0].info.serial == "LHR-" + "0" * 100
+
+
+def test_update_topology():
+    frame = make_frame(0.0, {0: (HMD, NO_ROLE, 1.0)})
+    assert frame.generation == 0
+    assert frame.update_topology()
+    assert frame.generation == 1
+    assert get_generation(frame.buffer) == 1
+    assert not frame.update_topology()
+
+    frame.set_device(0, HMD, NO_ROLE, [2.0] * 7)  # poses are not a part of the topology.
+    assert not frame.update_topology()
+    frame.set_device(1, CONTROLLER, LEFT, [2.0] * 7)
+    assert frame.update_topology()
+    assert frame.generation == 2
+
+    frame.clear()
+    assert frame.generation == 0
+    assert frame.serials == {}
+    assert not frame.update_topology()
+    frame.set_device(1, CONTROLLER, LEFT, [2.0] * 7)
+    assert frame.update_topology()  # a recording after `clear` sets the serial numbers again.
+
+
+def test_device_frame_size():
+    # timestamp and mask, classes, roles, generation, poses and controller axes.
+    assert device_frame_size == 16 + 64 + 64 + 8 + 64 * 28 + 64 * 40
+
+
+def test_registry_serials_by_generation():
+    frame = DeviceFrame()
+    outfile = io.BytesIO()
+    encoder = VariableDeviceEncoder(outfile, frame.serials)
+    connected = np.zeros(max_devices, dtype=bool)
+    frames = b""
+    for serial in ["A", "B"]:
+        connected[0] = not connected[0]
+        connected[1] = True
+        frame.set_connected(connected)
+        frame.set_device(1, TRACKER, NO_ROLE, [1.0] * 7)
+        if connected[0]:
+            frame.set_device(0, HMD, NO_ROLE, [1.0] * 7)
+        assert frame.update_topology()
+        frame.set_serials({1: serial})
+        frames += frame.buffer  # queued in the ring buffer before being written.
+    encoder.write(frames)
+    outfile.seek(0)
+
+    decoder = VariableDeviceDecoder()
+    assert [device.info.serial for device in decoder.read(outfile).devices] == ["", "A"]
+    assert [device.info.serial for device in decoder.read(outfile).devices] == ["B"]
+    assert list(frame.serials) == [2]  # older generations are removed.
+
+
+def test_encode_frame_size():
+    frame = make_frame(0.0, {0: (HMD, NO_ROLE, 1.0), 1: (CONTROLLER, LEFT, 2.0), 7: (TRACKER, NO_ROLE, 3.0)})
+    # timestamp and mask, three poses and one set of controller axes.
+    assert len(encode_frame(frame.buffer)) == 16 + 3 * 28 + 40
+
+
+def test_registry_written_on_topology_change():
+    frames = [
+        make_frame(0.0, {0: (HMD, NO_ROLE, 1.0)}),
+        make_frame(1.0, {0: (HMD, NO_ROLE, 2.0)}),
+        make_frame(2.0, {0: (HMD, NO_ROLE, 3.0), 4: (TRACKER, NO_ROLE, 4.0)}),
+    ]
+    infile = encode(*frames)
+
+    block_types = []
+    while block_type := infile.read(1):
+        block_types.append(block_type)
+        if block_type == BlockTypes.REGISTRY:
+            (size,) = registry_size_struct.unpack(infile.read(registry_size_struct.size))
+            registry = json.loads(infile.read(size))
+        else:
+            head = infile.read(frame_struct.size)
+            infile.read(bin(frame_struct.unpack(head)[1]).count("1") * 28)
+
+    R, F = BlockTypes.REGISTRY, BlockTypes.FRAME
+    assert block_types == [R, F, F, R, F]
+    assert registry == [
+        {
+            RegistryNames.INDEX: 0,
+            RegistryNames.SERIAL: "SERIAL-0",
+            RegistryNames.DEVICE_CLASS: HMD,
+            RegistryNames.CONTROLLER_ROLE: NO_ROLE,
+        },
+        {
+            RegistryNames.INDEX: 4,
+            RegistryNames.SERIAL: "SERIAL-4",
+            RegistryNames.DEVICE_CLASS: TRACKER,
+            RegistryNames.CONTROLLER_ROLE: NO_ROLE,
+        },
+    ]
+
+
+def test_round_trip():
+    frames = [
+        make_frame(0.0, {0: (HMD, NO_ROLE, 1.0), 1: (CONTROLLER, LEFT, 2.0)}),
+        make_frame(1.0, {0: (HMD, NO_ROLE, 3.0), 1: (CONTROLLER, LEFT, 4.0), 9: (TRACKER, NO_ROLE, 5.0)}),
+        make_frame(2.0, {9: (TRACKER, NO_ROLE, 6.0)}),
+    ]
+    infile = encode(*frames)
+    decoder = VariableDeviceDecoder()
+
+    holder = decoder.read(infile)
+    assert holder.timestamp == 0.0
+    assert holder.hmd.position.x == 1.0
+    assert holder.controller.left.position.y == 2.0
+    assert holder.controller.left.thumb_stick.x == approx(0.2)
+    assert holder.controller.left.fourth_trigger.y == approx(-0.2)
+    assert holder.devices[1].axes[2].x == approx(0.2)
+
+    holder = decoder.read(infile)
+    assert [device.info.index for device in holder.devices] == [0, 1, 9]
+    assert holder.devices[2].info.serial == "SERIAL-9"
+    assert holder.devices[2].position.z == 5.0
+
+    holder = decoder.read(infile)
+    assert holder.timestamp == 2.0
+    assert [device.info.index for device in holder.devices] == [9]
+    assert holder.hmd.position.x == 0.0
+
+    assert decoder.read(infile) is None
+
+
+def test_truncated_frame():
+    binary = encode(make_frame(0.0, {0: (HMD, NO_ROLE, 1.0)}), make_frame(1.0, {0: (HMD, NO_ROLE, 1.0)})).getvalue()
+    infile = io.BytesIO(binary[:-1])
+    decoder = VariableDeviceDecoder()
+    assert decoder.read(infile) is not None
+    assert decoder.read(infile) is None
+
+
+def test_unknown_block_type():
+    with pytest.raises(ValueError):
+        VariableDeviceDecoder().read(io.BytesIO(b"X"))
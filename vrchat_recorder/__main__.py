@@ -11,13 +11,14 @@ import soundcard as sc
 
 from . import confirm_preparation as confirm
 from . import name_utils
+from .abc.stream_sink import StreamSink
 from .argument_parser import get_parser
 from .audio import MicRecorder, SpeakerRecorder
 from .date_utils import get_now_str
 from .gamepad_recorder import GamepadRecorder
 from .obs_video_recorder import OBSVideoRecorder
 from .osc_feedback_recorder import OSCFeedbackRecorder
-from .vr import ControllerEventRecorder, TrackingRecorder
+from .vr import ControllerEventRecorder, DeviceTopologyCache, TrackingRecorder
 
 root_logger = logging.getLogger()
 stream_hdlr = logging.StreamHandler(sys.stdout)
@@ -70,9 +71,23 @@ def main(arg_list=None):
 
     vr_tracking_fps = args.vr_tracking_fps
     vr_tracking_flush_interval = args.vr_tracking_flush_interval
+    vr_tracking_missed_deadline_policy = args.vr_tracking_missed_deadline_policy
+    vr_tracking_buffer_capacity = args.vr_tracking_buffer_capacity
+    vr_tracking_backpressure_policy = args.vr_tracking_backpressure_policy
+    vr_tracking_format = args.vr_tracking_format
+    vr_tracking_frames_per_chunk = args.vr_tracking_frames_per_chunk
+    vr_tracking_compression = args.vr_tracking_compression
+    vr_tracking_record_layout = args.vr_tracking_record_layout
+    vr_tracking_shared_memory_name = args.vr_tracking_shared_memory_name
+    vr_tracking_shared_memory_capacity = args.vr_tracking_shared_memory_capacity
     vr_controller_event_poll_interval = args.vr_controller_event_poll_interval
     vr_controller_event_flush_interval_seconds = args.vr_controller_event_flush_interval_seconds
 
+    stream_port = args.stream_port
+    stream_host = args.stream_host
+    stream_protocol = args.stream_protocol
+    stream_capacity = args.stream_capacity
+
     no_osc_feedback = args.no_osc_feedback
     no_gamepad = args.no_gamepad
     no_obs = args.no_obs
@@ -106,6 +121,12 @@ def main(arg_list=None):
 
     background_recorders = []
 
+    stream_sink = None
+    if stream_port is not None:
+        stream_sink = StreamSink(stream_host, stream_port, stream_protocol, capacity=stream_capacity)
+        stream_sink.start()
+        logger.info(f"Start Streaming: {stream_sink}")
+
     if not no_gamepad:
         if inputs.devices.gamepads == []:
             raise RuntimeError("No gamepad found.")
@@ -122,7 +143,12 @@ def main(arg_list=None):
         osc_feedback_log_file_name = name_utils.get_osc_feedback_log_file_name(get_now_str(date_format))
         osc_feedback_log_file_path = os.path.join(vrcrec_dir_path, osc_feedback_log_file_name)
         osc_feedback_recorder = OSCFeedbackRecorder(
-            osc_feedback_log_file_path, vrchat_osc_ip, vrchat_osc_port, vrchat_osc_address, vrchat_osc_server_timeout
+            osc_feedback_log_file_path,
+            vrchat_osc_ip,
+            vrchat_osc_port,
+            vrchat_osc_address,
+            vrchat_osc_server_timeout,
+            stream_sink=stream_sink,
         )
 
         osc_feedback_recorder.record_background()
@@ -186,6 +212,7 @@ def main(arg_list=None):
         vr_dir_path = os.path.join(vrcrec_dir_path, "vr")
         os.makedirs(vr_dir_path, exist_ok=True)
         vrsystem = openvr.init(openvr.VRApplication_Background)
+        device_topology = DeviceTopologyCache(vrsystem)  # Shared so that polled events invalidate it.
 
         vr_tracking_file_name = name_utils.get_vr_tracking_log_file_name(get_now_str(date_format))
         vr_tracking_output_path = os.path.join(vr_dir_path, vr_tracking_file_name)
@@ -194,6 +221,17 @@ def main(arg_list=None):
             vrsystem,
             vr_tracking_fps,
             vr_tracking_flush_interval,
+            device_topology=device_topology,
+            missed_deadline_policy=vr_tracking_missed_deadline_policy,
+            buffer_capacity=vr_tracking_buffer_capacity,
+            backpressure_policy=vr_tracking_backpressure_policy,
+            header_version=vr_tracking_format,
+            frames_per_chunk=vr_tracking_frames_per_chunk,
+            compression=vr_tracking_compression,
+            record_layout=vr_tracking_record_layout,
+            shared_memory_name=vr_tracking_shared_memory_name,
+            shared_memory_capacity=vr_tracking_shared_memory_capacity,
+            stream_sink=stream_sink,
         )
 
         vr_controller_event_file_name = name_utils.get_vr_controller_event_log_file_name(get_now_str(date_format))
@@ -203,6 +241,8 @@ def main(arg_list=None):
             vrsystem,
             vr_controller_event_poll_interval,
             vr_controller_event_flush_interval_seconds,
+            device_topology=device_topology,
+            stream_sink=stream_sink,
         )
 
         logger.info(f"Start VR Device Recording: {vr_dir_path}")
@@ -223,6 +263,10 @@ def main(arg_list=None):
         logger.info(f"Shutting down...: {recorder}")
         recorder.shutdown()
 
+    if stream_sink is not None:
+        stream_sink.close()
+        logger.info(f"Streaming: {stream_sink.summary()}")
+
     logging.warning("If freezing, Press any controller button and play vrchat for a while.")
 
 
@@ -0,0 +1,217 @@
+"""This file contains BackgroundFrameWriter class that writes fixed-size frames to a file in a background thread."""
+
+import logging
+import threading
+from typing import BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackpressurePolicy:
+    """This class contains policies for pushing a frame when the ring buffer is full.
+
+    - BLOCK: Wait until the writer thread frees a slot.
+    - DROP: Drop the pushed frame and count it in `dropped_frames`.
+    """
+
+    BLOCK: str = "block"
+    DROP: str = "drop"
+
+
+class BackgroundFrameWriter:
+    """This class separates sampling from file I/O.
+
+    Frames are copied into a bounded ring buffer preallocated at `capacity` frames, and a dedicated writer thread
+    drains it in contiguous writes of up to the whole buffer. `push` never touches the file, so a slow write or flush
+    does not stall the sampling loop until the buffer is full.
+
+    The writer thread wakes at least every `max_flush_interval` seconds, and flushes the file whenever it has written
+    all queued frames, so frames reach the file within about `max_flush_interval` seconds after they are pushed and
+    readers that follow it (`TrackingReader.follow`) see them with low latency. Under load, the file is flushed every
+    `num_frames_per_flush` frames instead.
+
+    Usage:
+        ```python
+        from vrchat_recorder.abc.background_writer import BackgroundFrameWriter
+
+        with open("path/to/file.bin", "wb") as f:
+            writer = BackgroundFrameWriter(f, frame_size=172)
+            writer.start()
+            writer.push(frame)  # from the sampling loop.
+            writer.close()  # writes the remaining frames.
+        ```
+
+    `push` must be called from a single thread. The output file only needs `write` and `flush` methods.
+    """
+
+    def __init__(
+        self,
+        outfile: BinaryIO,
+        frame_size: int,
+        capacity: int = 4096,
+        backpressure_policy: str = BackpressurePolicy.BLOCK,
+        num_frames_per_flush: int = 1000,
+        frames_per_write: int = 64,
+        max_write_delay: float = 0.5,
+        max_flush_interval: float = 0.05,
+    ) -> None:
+        """Initialize BackgroundFrameWriter.
+
+        Args:
+            outfile (BinaryIO): The output file.
+            frame_size (int): Size of a frame. (bytes)
+            capacity (int): Number of frames the ring buffer holds.
+            backpressure_policy (str): What to do when the ring buffer is full. See `BackpressurePolicy`.
+            num_frames_per_flush (int): Number of frames to write before flushing the file.
+            frames_per_write (int): Number of queued frames that wakes the writer thread.
+            max_write_delay (float): The writer thread also wakes after this time with fewer frames queued. (seconds)
+            max_flush_interval (float): Maximum time a pushed frame waits before it is written and flushed, unless
+                the writer thread is behind. (seconds)
+
+        Raises:
+            ValueError: Unknown backpressure policy.
+        """
+        if backpressure_policy not in (BackpressurePolicy.BLOCK, BackpressurePolicy.DROP):
+            raise ValueError(f"Unknown backpressure policy: {backpressure_policy}")
+
+        self.outfile = outfile
+        self.frame_size = frame_size
+        self.capacity = capacity
+        self.backpressure_policy = backpressure_policy
+        self.num_frames_per_flush = num_frames_per_flush
+        self.frames_per_write = min(frames_per_write, capacity)
+        self.max_write_delay = max_write_delay
+        self.max_flush_interval = max_flush_interval
+
+        self._buffer = bytearray(frame_size * capacity)
+        self._view = memoryview(self._buffer)
+        self._condition = threading.Condition()
+        # Total numbers of frames pushed and written. Slot of the n-th frame is `n % capacity`.
+        self._head = 0
+        self._tail = 0
+        self._closing = False
+        self._error: Optional[BaseException] = None
+        self._high_water_mark = 0
+        self._dropped_frames = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def high_water_mark(self) -> int:
+        """Returns the maximum number of frames queued at once."""
+        return self._high_water_mark
+
+    @property
+    def dropped_frames(self) -> int:
+        """Returns the number of frames dropped by `BackpressurePolicy.DROP`."""
+        return self._dropped_frames
+
+    @property
+    def written_frames(self) -> int:
+        """Returns the number of frames written to the file."""
+        return self._tail
+
+    @property
+    def queued_frames(self) -> int:
+        """Returns the number of frames waiting to be written."""
+        return self._head - self._tail
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def push(self, frame) -> bool:
+        """Copy a frame into the ring buffer.
+
+        Args:
+            frame: Bytes-like object of `frame_size` bytes.
+
+        Returns:
+            bool: False if the frame is dropped.
+
+        Raises:
+            RuntimeError: The writer thread has stopped by an error, or the writer is closed.
+        """
+        with self._condition:
+            self._check_running()
+            while self._head - self._tail >= self.capacity:
+                if self.backpressure_policy == BackpressurePolicy.DROP:
+                    self._dropped_frames += 1
+                    return False
+                self._condition.wait()
+                self._check_running()
+
+        # Only this thread writes the slot at `_head`, and the writer thread does not read it until `_head` advances.
+        offset = (self._head % self.capacity) * self.frame_size
+        self._view[offset : offset + self.frame_size] = frame
+
+        with self._condition:
+            self._head += 1
+            queued = self._head - self._tail
+            if queued > self._high_water_mark:
+                self._high_water_mark = queued
+            if queued >= self.frames_per_write:
+                self._condition.notify_all()
+        return True
+
+    def _check_running(self) -> None:
+        """Raise if frames can no longer be written. Call it with `_condition` held."""
+        if self._error is not None:
+            raise RuntimeError("Background writer thread has stopped.") from self._error
+        if self._closing:
+            raise RuntimeError("Background writer is closed.")
+
+    def _run(self) -> None:
+        """Write queued frames until closed."""
+        frames_since_flush = 0
+        wait_timeout = min(self.max_write_delay, self.max_flush_interval)
+        try:
+            while True:
+                with self._condition:
+                    if self._head - self._tail < self.frames_per_write and not self._closing:
+                        self._condition.wait(wait_timeout)
+                    start, end = self._tail, self._head
+                    if start == end:
+                        if self._closing:
+                            break
+                        continue
+
+                # Write up to the end of the buffer at once. The rest is written in the next iteration.
+                start_slot = start % self.capacity
+                end = min(end, start + self.capacity - start_slot)
+                self.outfile.write(
+                    self._view[start_slot * self.frame_size : (start_slot + end - start) * self.frame_size]
+                )
+
+                with self._condition:
+                    self._tail = end
+                    drained = self._tail == self._head
+                    self._condition.notify_all()
+
+                frames_since_flush += end - start
+                if drained or frames_since_flush >= self.num_frames_per_flush:
+                    self.outfile.flush()
+                    frames_since_flush = 0
+
+            self.outfile.flush()
+        except BaseException as e:
+            logger.exception(e)
+            with self._condition:
+                self._error = e
+                self._condition.notify_all()
+
+    def close(self) -> None:
+        """Write all queued frames, flush the file and stop the writer thread. The file itself is not closed."""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def summary(self) -> str:
+        """Returns a summary of the counters for logging."""
+        return (
+            f"{self.written_frames} frames written, high-water mark {self._high_water_mark}/{self.capacity} frames, "
+            f"{self._dropped_frames} frames dropped."
+        )
@@ -0,0 +1,180 @@
+"""This file contains FrameScheduler class for running a loop at a fixed frame rate."""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MissedDeadlinePolicy:
+    """This class contains policies for frames whose deadline has already passed.
+
+    - SKIP: Drop the missed frames and continue from the next future deadline.
+    - CATCH_UP: Run the missed frames back to back until the schedule is caught up.
+    """
+
+    SKIP: str = "skip"
+    CATCH_UP: str = "catch_up"
+
+
+class FrameScheduler:
+    """This class paces a loop at a fixed frame rate without drift.
+
+    Deadlines are absolute (`start + n * period` on `time.perf_counter_ns`), so oversleeping in one frame does not
+    delay the following ones. `wait` sleeps until `spin_threshold` before the deadline and then busy-waits for the rest,
+    which gives sub-millisecond accuracy even when `time.sleep` is coarse.
+
+    Usage:
+        ```python
+        from vrchat_recorder.abc.frame_scheduler import FrameScheduler
+
+        scheduler = FrameScheduler(72.0)
+        scheduler.start()
+        while True:
+            scheduler.wait()
+            ...  # sample a frame.
+        print(scheduler.summary())
+        ```
+
+    The lateness of each frame (wake-up time minus deadline) is counted in a histogram of `num_jitter_bins` bins of
+    `jitter_bin_width` seconds. The last bin also counts all larger values.
+    """
+
+    def __init__(
+        self,
+        frame_rate: float,
+        spin_threshold: float = 0.002,
+        missed_deadline_policy: str = MissedDeadlinePolicy.SKIP,
+        jitter_bin_width: float = 0.0001,
+        num_jitter_bins: int = 200,
+    ) -> None:
+        """Initialize FrameScheduler.
+
+        Args:
+            frame_rate (float): Target frame rate. (frames per second)
+            spin_threshold (float): Time before the deadline to stop sleeping and start busy-waiting. (seconds)
+                0 disables busy-waiting.
+            missed_deadline_policy (str): What to do when deadlines are missed. See `MissedDeadlinePolicy`.
+            jitter_bin_width (float): Bin width of the jitter histogram. (seconds)
+            num_jitter_bins (int): Number of bins of the jitter histogram.
+
+        Raises:
+            ValueError: Unknown missed deadline policy, or a jitter bin width below 1 ns.
+        """
+        if missed_deadline_policy not in (MissedDeadlinePolicy.SKIP, MissedDeadlinePolicy.CATCH_UP):
+            raise ValueError(f"Unknown missed deadline policy: {missed_deadline_policy}")
+        if round(jitter_bin_width * 1e9) < 1:
+            raise ValueError(f"Jitter bin width must be at least 1 ns: {jitter_bin_width}")
+
+        self.frame_rate = frame_rate
+        self.spin_threshold = spin_threshold
+        self.missed_deadline_policy = missed_deadline_policy
+        self.jitter_bin_width = jitter_bin_width
+        self.num_jitter_bins = num_jitter_bins
+
+        self._period_ns = round(1e9 / frame_rate)
+        self._spin_threshold_ns = round(spin_threshold * 1e9)
+        self._jitter_bin_width_ns = round(jitter_bin_width * 1e9)
+        self.start()
+
+    def start(self) -> None:
+        """(Re)start the schedule. The first deadline is now, and all statistics are reset."""
+        self._next_deadline_ns = time.perf_counter_ns()
+        self._first_frame_ns = None
+        self._last_frame_ns = None
+        self._num_frames = 0
+        self._num_missed_frames = 0
+        self._max_lateness_ns = 0
+        self._jitter_histogram = [0] * self.num_jitter_bins
+
+    @property
+    def num_frames(self) -> int:
+        """Returns the number of frames run."""
+        return self._num_frames
+
+    @property
+    def num_missed_frames(self) -> int:
+        """Returns the number of frames dropped by `MissedDeadlinePolicy.SKIP`."""
+        return self._num_missed_frames
+
+    @property
+    def jitter_histogram(self) -> list[int]:
+        """Returns a copy of the jitter histogram."""
+        return list(self._jitter_histogram)
+
+    @property
+    def achieved_frame_rate(self) -> float:
+        """Returns the average frame rate so far. (frames per second)"""
+        if self._num_frames < 2:
+            return 0.0
+        return (self._num_frames - 1) * 1e9 / (self._last_frame_ns - self._first_frame_ns)
+
+    def wait(self) -> None:
+        """Block until the deadline of the next frame."""
+        now = time.perf_counter_ns()
+        deadline = self._next_deadline_ns
+
+        if now - deadline >= self._period_ns and self.missed_deadline_policy == MissedDeadlinePolicy.SKIP:
+            num_missed = (now - deadline) // self._period_ns
+            self._num_missed_frames += num_missed
+            deadline += num_missed * self._period_ns
+
+        remaining = deadline - now
+        if remaining > self._spin_threshold_ns:
+            time.sleep((remaining - self._spin_threshold_ns) / 1e9)
+        while now < deadline:
+            now = time.perf_counter_ns()
+
+        self._record_frame(now, now - deadline)
+        self._next_deadline_ns = deadline + self._period_ns
+
+    def _record_frame(self, now: int, lateness: int) -> None:
+        """Update the statistics with a frame.
+
+        Args:
+            now (int): Wake-up time. (nanoseconds)
+            lateness (int): Wake-up time minus deadline. (nanoseconds)
+        """
+        if self._first_frame_ns is None:
+            self._first_frame_ns = now
+        self._last_frame_ns = now
+        self._num_frames += 1
+
+        if lateness > self._max_lateness_ns:
+            self._max_lateness_ns = lateness
+        bin_index = min(lateness // self._jitter_bin_width_ns, self.num_jitter_bins - 1)
+        self._jitter_histogram[bin_index] += 1
+
+    def jitter_percentile(self, percentile: float) -> float:
+        """Get a percentile of the lateness from the histogram.
+
+        The upper edge of the bin containing the percentile is returned, so the value is rounded up to the bin width.
+        The maximum lateness is returned for 100.
+
+        Args:
+            percentile (float): Percentile in [0, 100].
+
+        Returns:
+            float: Lateness. (seconds)
+        """
+        if self._num_frames == 0:
+            return 0.0
+        if percentile >= 100:
+            return self._max_lateness_ns / 1e9
+
+        rank = percentile / 100 * self._num_frames
+        cumulative = 0
+        for bin_index, count in enumerate(self._jitter_histogram):
+            cumulative += count
+            if cumulative > rank:
+                break
+        return min((bin_index + 1) * self._jitter_bin_width_ns, self._max_lateness_ns) / 1e9
+
+    def summary(self) -> str:
+        """Returns a summary of the achieved frame rate and jitter for logging."""
+        p50, p90, p99, p100 = (self.jitter_percentile(p) * 1e3 for p in (50, 90, 99, 100))
+        return (
+            f"{self._num_frames} frames at {self.achieved_frame_rate:.2f} fps (target {self.frame_rate} fps), "
+            f"jitter p50={p50:.3f}ms p90={p90:.3f}ms p99={p99:.3f}ms max={p100:.3f}ms, "
+            f"missed {self._num_missed_frames} frames."
+        )
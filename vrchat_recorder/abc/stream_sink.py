@@ -0,0 +1,532 @@
+"""This file contains StreamSink class that streams recorded data to a local endpoint, and its receiver.
+
+Recorders give each tracking frame, controller event and OSC feedback to `StreamSink` besides writing them to the
+files, and a live-inference pipeline in another process receives them by `StreamReceiver` with low latency.
+
+Messages are sent in batches:
+    - Batch: `batch_header_format` (magic and number of messages) followed by the messages. Over TCP, each batch is
+      prefixed with its size in `tcp_size_format`. Over UDP, a batch is a datagram.
+    - Message: `message_header_format` (message type and payload size) followed by the payload. See
+      `StreamMessageTypes` for the payloads.
+
+Usage:
+    ```python
+    # recording process
+    sink = StreamSink("127.0.0.1", 9100)
+    sink.start()
+    sink.send_frame(frame.buffer)  # never blocks.
+    sink.close()
+
+    # other process
+    with StreamReceiver("127.0.0.1", 9100) as receiver:
+        for message in receiver:
+            if message.message_type == StreamMessageTypes.TRACKING_FRAME:
+                holder = binary_to_holder(message.payload)
+    ```
+"""
+
+import logging
+import queue
+import socket
+import struct
+import threading
+import time
+from typing import Any, Iterator, NamedTuple, Optional
+
+from ..data_constants import CSVHeaderNames as HN
+from ..data_constants import DataTypeNames, get_data_type_name
+
+logger = logging.getLogger(__name__)
+
+
+class StreamProtocols:
+    """This class contains the transport protocols of the stream.
+
+    - UDP: Each batch is a datagram. Batches are lost if no receiver is running.
+    - TCP: Batches are sent over a connection, which is reconnected when it is lost.
+    """
+
+    UDP: str = "udp"
+    TCP: str = "tcp"
+
+
+class StreamMessageTypes:
+    """This class contains the types of the stream messages and their payloads.
+
+    - TRACKING_FRAME: The frame buffer of `TrackingRecorder`, e.g. a record of `binary_format`.
+    - CONTROLLER_EVENT: `controller_event_format` (timestamp, event type, controller role, button id and age).
+    - OSC_FEEDBACK: `osc_feedback_header_format` (timestamp and address size), the address in UTF-8, the value type
+      code (see `osc_value_codes`) and the value. Strings are prefixed with their size in `osc_string_size_format`.
+    """
+
+    TRACKING_FRAME: int = 1
+    CONTROLLER_EVENT: int = 2
+    OSC_FEEDBACK: int = 3
+
+
+STREAM_MAGIC = b"VRST"
+
+batch_header_format = "<4s I"  # magic, number of messages
+message_header_format = "<B I"  # message type, payload size
+tcp_size_format = "<I"  # batch size
+controller_event_format = "<d I i I f"  # timestamp, event type, controller role, button id, age seconds
+osc_feedback_header_format = "<d H"  # timestamp, address size
+osc_string_size_format = "<H"
+
+batch_header_struct = struct.Struct(batch_header_format)
+message_header_struct = struct.Struct(message_header_format)
+tcp_size_struct = struct.Struct(tcp_size_format)
+controller_event_struct = struct.Struct(controller_event_format)
+osc_feedback_header_struct = struct.Struct(osc_feedback_header_format)
+osc_string_size_struct = struct.Struct(osc_string_size_format)
+
+osc_value_codes = {DataTypeNames.FLOAT: b"f", DataTypeNames.INT: b"i", DataTypeNames.BOOL: b"?"}
+_osc_value_structs = {code: struct.Struct(f"<{code.decode()}") for code in osc_value_codes.values()}
+_osc_string_code = b"s"
+
+max_datagram_size = 65507
+
+
+class StreamMessage(NamedTuple):
+    """Message received by `StreamReceiver`."""
+
+    message_type: int  # See `StreamMessageTypes`.
+    payload: bytes
+
+
+def encode_controller_event(
+    timestamp: float, event_type: int, controller_role: int, button_id: int, age_seconds: float
+) -> bytes:
+    """Encode a controller event to the payload of `StreamMessageTypes.CONTROLLER_EVENT`."""
+    return controller_event_struct.pack(timestamp, event_type, controller_role, button_id, age_seconds)
+
+
+def decode_controller_event(payload: bytes) -> dict:
+    """Decode the payload of `StreamMessageTypes.CONTROLLER_EVENT`.
+
+    Returns:
+        dict: The event keyed by the CSV header names of `ControllerEventRecorder`.
+    """
+    timestamp, event_type, controller_role, button_id, age_seconds = controller_event_struct.unpack(payload)
+    return {
+        HN.TIMESTAMP: timestamp,
+        HN.EVENT_TYPE: event_type,
+        HN.CONTROLLER_ROLE: controller_role,
+        HN.BUTTON_ID: button_id,
+        HN.AGE_SECONDS: age_seconds,
+    }
+
+
+def encode_osc_feedback(timestamp: float, address: str, value: Any) -> bytes:
+    """Encode an OSC feedback value to the payload of `StreamMessageTypes.OSC_FEEDBACK`.
+
+    Raises:
+        ValueError: The type of the value is not supported.
+    """
+    address = address.encode("utf-8")
+    head = osc_feedback_header_struct.pack(timestamp, len(address)) + address
+
+    data_type = get_data_type_name(value)
+    if data_type == DataTypeNames.STRING:
+        value = value.encode("utf-8")
+        return head + _osc_string_code + osc_string_size_struct.pack(len(value)) + value
+    if data_type not in osc_value_codes:
+        raise ValueError(f"Unsupported OSC value type: {type(value)}")
+    code = osc_value_codes[data_type]
+    return head + code + _osc_value_structs[code].pack(value)
+
+
+def decode_osc_feedback(payload: bytes) -> dict:
+    """Decode the payload of `StreamMessageTypes.OSC_FEEDBACK`.
+
+    Returns:
+        dict: The value keyed by the CSV header names of `OSCFeedbackRecorder`.
+    """
+    timestamp, address_size = osc_feedback_header_struct.unpack_from(payload)
+    offset = osc_feedback_header_struct.size
+    address = payload[offset : offset + address_size].decode("utf-8")
+    offset += address_size
+    code = payload[offset : offset + 1]
+    offset += 1
+
+    if code == _osc_string_code:
+        (size,) = osc_string_size_struct.unpack_from(payload, offset)
+        offset += osc_string_size_struct.size
+        value = payload[offset : offset + size].decode("utf-8")
+    else:
+        (value,) = _osc_value_structs[code].unpack_from(payload, offset)
+    return {
+        HN.TIMESTAMP: timestamp,
+        HN.PARAMETER_NAME: address,
+        HN.DATA_TYPE: get_data_type_name(value),
+        HN.VALUE: value,
+    }
+
+
+def decode_batch(batch: bytes) -> list[StreamMessage]:
+    """Decode a batch of messages.
+
+    Raises:
+        ValueError: The batch is broken.
+    """
+    if len(batch) < batch_header_struct.size:
+        raise ValueError("Stream batch is truncated.")
+    magic, num_messages = batch_header_struct.unpack_from(batch)
+    if magic != STREAM_MAGIC:
+        raise ValueError(f"Unknown stream magic: {magic!r}")
+
+    messages = []
+    offset = batch_header_struct.size
+    for _ in range(num_messages):
+        if offset + message_header_struct.size > len(batch):
+            raise ValueError("Stream batch is truncated.")
+        message_type, size = message_header_struct.unpack_from(batch, offset)
+        offset += message_header_struct.size
+        if offset + size > len(batch):
+            raise ValueError("Stream batch is truncated.")
+        messages.append(StreamMessage(message_type, batch[offset : offset + size]))
+        offset += size
+    return messages
+
+
+class StreamSink:
+    """This class sends messages to a local endpoint in a background thread.
+
+    `send` only puts the message into a bounded queue, so it never blocks the sampling loop: messages are dropped and
+    counted in `dropped_messages` when the queue is full or the endpoint is not reachable. The sender thread sends all
+    queued messages at once in batches of up to `max_batch_size` bytes, so the messages are batched under load without
+    waiting for a batch to fill.
+
+    `send` may be called from any thread. The counters are guarded by a lock, since they are updated by the sending
+    threads and the sender thread.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9100,
+        protocol: str = StreamProtocols.UDP,
+        capacity: int = 4096,
+        max_batch_size: int = 32768,
+        reconnect_interval: float = 1.0,
+        close_timeout: float = 5.0,
+    ) -> None:
+        """Initialize StreamSink.
+
+        Args:
+            host (str): Host of the endpoint.
+            port (int): Port of the endpoint.
+            protocol (str): Transport protocol. See `StreamProtocols`.
+            capacity (int): Number of messages the queue holds.
+            max_batch_size (int): Maximum size of a batch. (bytes) A larger message is sent alone.
+            reconnect_interval (float): Interval to retry the TCP connection. (seconds)
+            close_timeout (float): Time `close` waits for the sender thread to send the queued messages. (seconds)
+
+        Raises:
+            ValueError: Unknown protocol.
+        """
+        if protocol not in (StreamProtocols.UDP, StreamProtocols.TCP):
+            raise ValueError(f"Unknown stream protocol: {protocol}")
+
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.capacity = capacity
+        self.max_batch_size = (
+            min(max_batch_size, max_datagram_size) if protocol == StreamProtocols.UDP else max_batch_size
+        )
+        self.reconnect_interval = reconnect_interval
+        self.close_timeout = close_timeout
+
+        self._queue: queue.Queue = queue.Queue(capacity)
+        self._socket: Optional[socket.socket] = None
+        self._next_connect_time = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._sent_messages = 0
+        self._sent_batches = 0
+        self._dropped_messages = 0
+
+    @property
+    def sent_messages(self) -> int:
+        """Returns the number of messages sent."""
+        return self._sent_messages
+
+    @property
+    def sent_batches(self) -> int:
+        """Returns the number of batches sent."""
+        return self._sent_batches
+
+    @property
+    def dropped_messages(self) -> int:
+        """Returns the number of messages dropped because the queue was full or sending failed."""
+        return self._dropped_messages
+
+    def start(self) -> None:
+        """Start the sender thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, message_type: int, payload) -> bool:
+        """Queue a message.
+
+        Args:
+            message_type (int): See `StreamMessageTypes`.
+            payload: Bytes-like object. It is copied.
+
+        Returns:
+            bool: False if the message is dropped.
+        """
+        try:
+            self._queue.put_nowait(message_header_struct.pack(message_type, len(payload)) + payload)
+            return True
+        except queue.Full:
+            self._count_dropped(1)
+            return False
+
+    def send_frame(self, frame) -> bool:
+        """Queue a tracking frame. See `send`."""
+        return self.send(StreamMessageTypes.TRACKING_FRAME, frame)
+
+    def send_controller_event(
+        self, timestamp: float, event_type: int, controller_role: int, button_id: int, age_seconds: float
+    ) -> bool:
+        """Queue a controller event. See `send`."""
+        return self.send(
+            StreamMessageTypes.CONTROLLER_EVENT,
+            encode_controller_event(timestamp, event_type, controller_role, button_id, age_seconds),
+        )
+
+    def send_osc_feedback(self, timestamp: float, address: str, value: Any) -> bool:
+        """Queue an OSC feedback value. Values of unsupported types are dropped. See `send`."""
+        try:
+            payload = encode_osc_feedback(timestamp, address, value)
+        except ValueError:
+            self._count_dropped(1)
+            return False
+        return self.send(StreamMessageTypes.OSC_FEEDBACK, payload)
+
+    def _run(self) -> None:
+        """Send queued messages until closed."""
+        while True:
+            message = self._queue.get()
+            messages: list[bytes] = []
+            size = 0
+            while message is not None:  # None is the sentinel of `close`.
+                messages.append(message)
+                size += len(message)
+                if size >= self.max_batch_size:
+                    break
+                try:
+                    message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            for batch in self._split_batches(messages):
+                self._send_batch(batch)
+            if message is None:
+                break
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _split_batches(self, messages: list[bytes]) -> Iterator[list[bytes]]:
+        """Split messages into batches of up to `max_batch_size` bytes."""
+        batch: list[bytes] = []
+        size = batch_header_struct.size
+        for message in messages:
+            if batch and size + len(message) > self.max_batch_size:
+                yield batch
+                batch, size = [], batch_header_struct.size
+            batch.append(message)
+            size += len(message)
+        if batch:
+            yield batch
+
+    def _send_batch(self, messages: list[bytes]) -> None:
+        """Send a batch. The messages are dropped if it fails."""
+        batch = batch_header_struct.pack(STREAM_MAGIC, len(messages)) + b"".join(messages)
+        try:
+            if self.protocol == StreamProtocols.UDP:
+                if self._socket is None:
+                    self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._socket.sendto(batch, (self.host, self.port))
+            else:
+                if self._socket is None and not self._connect():
+                    self._count_dropped(len(messages))
+                    return
+                self._socket.sendall(tcp_size_struct.pack(len(batch)) + batch)
+        except OSError as e:
+            logger.debug(f"Failed to send a stream batch to {self.host}:{self.port}: {e}")
+            self._count_dropped(len(messages))
+            if self.protocol == StreamProtocols.TCP and self._socket is not None:
+                self._socket.close()
+                self._socket = None
+            return
+
+        with self._lock:
+            self._sent_messages += len(messages)
+            self._sent_batches += 1
+
+    def _count_dropped(self, num_messages: int) -> None:
+        """Count dropped messages."""
+        with self._lock:
+            self._dropped_messages += num_messages
+
+    def _connect(self) -> bool:
+        """Connect to the TCP endpoint, at most once per `reconnect_interval`.
+
+        Returns:
+            bool: True if connected.
+        """
+        now = time.monotonic()
+        if now < self._next_connect_time:
+            return False
+        self._next_connect_time = now + self.reconnect_interval
+        try:
+            self._socket = socket.create_connection((self.host, self.port), timeout=self.reconnect_interval)
+        except OSError as e:
+            logger.debug(f"Failed to connect to {self.host}:{self.port}: {e}")
+            return False
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return True
+
+    def close(self) -> None:
+        """Send all queued messages and stop the sender thread.
+
+        It waits for the sender thread at most `close_timeout` seconds, e.g. when a TCP endpoint stops reading. The
+        thread is a daemon, so it does not keep the process alive then.
+        """
+        if self._thread is None:
+            return
+        thread, self._thread = self._thread, None
+        if not thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=self.close_timeout)
+        except queue.Full:
+            logger.warning(f"{self} could not stop the sender thread: the queue is full.")
+            return
+        thread.join(self.close_timeout)
+        if thread.is_alive():
+            logger.warning(f"{self} did not send the queued messages within {self.close_timeout} seconds.")
+
+    def summary(self) -> str:
+        """Returns a summary of the counters for logging."""
+        with self._lock:
+            return (
+                f"{self._sent_messages} messages sent in {self._sent_batches} batches, "
+                f"{self._dropped_messages} messages dropped."
+            )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(host={self.host}, port={self.port}, protocol={self.protocol})"
+
+
+class StreamReceiver:
+    """This class receives the messages sent by `StreamSink`.
+
+    Usage:
+        ```python
+        with StreamReceiver("127.0.0.1", 9100) as receiver:
+            for message in receiver:
+                ...
+        ```
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 9100, protocol: str = StreamProtocols.UDP, timeout: float = 1.0
+    ) -> None:
+        """Initialize StreamReceiver and bind the endpoint.
+
+        Args:
+            host (str): Host to bind.
+            port (int): Port to bind. If 0, a free port is chosen, which is `port`.
+            protocol (str): Transport protocol. See `StreamProtocols`.
+            timeout (float): Timeout of `receive`. (seconds)
+
+        Raises:
+            ValueError: Unknown protocol.
+        """
+        if protocol == StreamProtocols.UDP:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        elif protocol == StreamProtocols.TCP:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        else:
+            raise ValueError(f"Unknown stream protocol: {protocol}")
+
+        self._socket.bind((host, port))
+        if protocol == StreamProtocols.TCP:
+            self._socket.listen(1)
+        self._socket.settimeout(timeout)
+        self.host, self.port = self._socket.getsockname()[:2]
+        self.protocol = protocol
+        self.timeout = timeout
+        self._connection: Optional[socket.socket] = None
+        self._received = bytearray()
+
+    def receive(self) -> list[StreamMessage]:
+        """Receive the messages of a batch.
+
+        Returns:
+            list[StreamMessage]: Messages. Empty if nothing is received within `timeout`, or the batch is broken.
+        """
+        try:
+            batch = self._receive_batch()
+        except socket.timeout:
+            return []
+        if batch is None:
+            return []
+        try:
+            return decode_batch(batch)
+        except ValueError as e:
+            logger.warning(f"Broken stream batch: {e}")
+            return []
+
+    def _receive_batch(self) -> Optional[bytes]:
+        """Receive a batch. None if the TCP connection is closed."""
+        if self.protocol == StreamProtocols.UDP:
+            return self._socket.recv(max_datagram_size)
+
+        if self._connection is None:
+            self._connection, _ = self._socket.accept()
+            self._connection.settimeout(self.timeout)
+            self._received.clear()
+
+        while True:
+            if len(self._received) >= tcp_size_struct.size:
+                (size,) = tcp_size_struct.unpack_from(self._received)
+                end = tcp_size_struct.size + size
+                if len(self._received) >= end:
+                    batch = bytes(self._received[tcp_size_struct.size : end])
+                    del self._received[:end]
+                    return batch
+
+            data = self._connection.recv(65536)
+            if not data:  # the sink has disconnected.
+                self._connection.close()
+                self._connection = None
+                return None
+            self._received += data
+
+    def __iter__(self) -> Iterator[StreamMessage]:
+        """Iterate received messages forever."""
+        while True:
+            yield from self.receive()
+
+    def close(self) -> None:
+        """Close the sockets."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(host={self.host}, port={self.port}, protocol={self.protocol})"
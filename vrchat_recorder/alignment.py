@@ -0,0 +1,299 @@
+"""This file contains the alignment of the streams of a `.vrcrec` session on a common time axis.
+
+The streams carry their times differently:
+    - Event streams have a unix time per row: the frames of the VR tracking file and the rows of the CSV logs (OSC
+      feedback, controller events, gamepad).
+    - Sampled streams only carry the start time in the date part of their file name (see `name_utils`), and a fixed
+      rate: the audio files (sample rate in the file) and the OBS video (frame rate given by the user).
+
+`TimeIndex` holds the sorted timestamps of an event stream and `SampleClock` the start time and rate of a sampled
+stream. `SessionAlignment` loads them from a session, builds vectorized lookup tables from the rows of every event
+stream to the sample index of every sampled stream, and slices every stream for a time window by binary search.
+
+Usage:
+    ```python
+    alignment = SessionAlignment.load("path/to/<date>.vrcrec", video_frame_rate=60)
+    window = alignment.window(start_time, start_time + 5.0)
+    window["tracking"]  # rows of the tracking file.
+    window["mic"]  # slice of the audio samples.
+
+    mic_indices = alignment.lookup("tracking", "mic")  # audio sample index of each tracking frame.
+    ```
+"""
+
+import csv
+import glob
+import os
+from typing import Optional, Union
+
+import numpy as np
+import soundfile as sf
+
+from .data_constants import CSVHeaderNames as HN
+from .data_constants import FileExtensions as FE
+from .date_utils import parse_date_str
+from .vr.constants import HeaderNames, HeaderVersions
+from .vr.export import iter_column_batches
+from .vr.tracking_reader import TrackingReader
+
+default_date_format = "%Y-%m-%d-%H-%M-%S-%f"
+
+
+class StreamNames:
+    """This class contains the names of the streams of a session."""
+
+    TRACKING: str = "tracking"
+    CONTROLLER_EVENT: str = "controller_event"
+    OSC_FEEDBACK: str = "osc_feedback"
+    GAMEPAD: str = "gamepad"
+    MIC: str = "mic"
+    SPEAKER: str = "speaker"
+    VIDEO: str = "video"
+
+
+def get_file_start_time(file_path: str, date_format: str = default_date_format) -> float:
+    """Get the start time of a file from the date part of its name, e.g. `<date>.mic.wav`.
+
+    Args:
+        file_path (str): Path to the file.
+        date_format (str): The date format of the recording (`--date_format`). It must not contain dots.
+
+    Returns:
+        float: The unix time.
+    """
+    return parse_date_str(os.path.basename(file_path).partition(".")[0], date_format)
+
+
+def read_tracking_timestamps(input_file_path: str) -> np.ndarray:
+    """Read the timestamps of a tracking file.
+
+    Args:
+        input_file_path (str): Path to the tracking file.
+
+    Returns:
+        np.ndarray: float64 timestamps of the frames.
+    """
+    with TrackingReader(input_file_path) as reader:
+        if reader.header[HeaderNames.VERSION] != HeaderVersions.V1:
+            return np.array(reader.as_array()["timestamp"], dtype=np.float64)
+        batches = [columns["timestamp"] for columns in iter_column_batches(reader)]
+    return np.concatenate(batches).astype(np.float64) if batches else np.zeros(0)
+
+
+def read_csv_timestamps(input_file_path: str) -> np.ndarray:
+    """Read the timestamp column of a CSV log.
+
+    Args:
+        input_file_path (str): Path to the CSV file.
+
+    Returns:
+        np.ndarray: float64 timestamps of the rows.
+    """
+    with open(input_file_path, newline="") as f:
+        reader = csv.reader(f)
+        column = next(reader).index(HN.TIMESTAMP)
+        return np.fromiter((float(row[column]) for row in reader), dtype=np.float64)
+
+
+class TimeIndex:
+    """This class holds the timestamps of an event stream and finds the rows of time windows by binary search.
+
+    Rows are sorted by time once with a stable sort, so rows that were written out of order (e.g. after a clock
+    adjustment) are still found.
+    """
+
+    def __init__(self, timestamps: np.ndarray) -> None:
+        """Initialize TimeIndex.
+
+        Args:
+            timestamps (np.ndarray): Unix time of each row.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.order: Optional[np.ndarray] = None  # row of each sorted timestamp. None if already sorted.
+        if np.any(np.diff(timestamps) < 0):
+            self.order = np.argsort(timestamps, kind="stable")
+            timestamps = timestamps[self.order]
+        self.timestamps = timestamps
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def row_timestamps(self) -> np.ndarray:
+        """Returns the timestamps in row order."""
+        if self.order is None:
+            return self.timestamps
+        timestamps = np.empty_like(self.timestamps)
+        timestamps[self.order] = self.timestamps
+        return timestamps
+
+    def window(self, start_time: float, stop_time: float) -> Union[slice, np.ndarray]:
+        """Find the rows in a time window.
+
+        Args:
+            start_time (float): Start of the window. (inclusive)
+            stop_time (float): End of the window. (exclusive)
+
+        Returns:
+            Union[slice, np.ndarray]: Slice of the rows, or row indices in time order if the rows are not sorted.
+        """
+        start, stop = np.searchsorted(self.timestamps, [start_time, stop_time], side="left")
+        if self.order is None:
+            return slice(int(start), int(stop))
+        return self.order[start:stop]
+
+
+class SampleClock:
+    """This class maps unix times to the sample indices of a sampled stream, e.g. audio samples or video frames."""
+
+    def __init__(self, start_time: float, rate: float, num_samples: Optional[int] = None) -> None:
+        """Initialize SampleClock.
+
+        Args:
+            start_time (float): Unix time of the first sample.
+            rate (float): Samples per second.
+            num_samples (Optional[int]): Number of samples if known. Indices are clipped to it by `window`.
+        """
+        self.start_time = start_time
+        self.rate = rate
+        self.num_samples = num_samples
+
+    @classmethod
+    def from_audio_file(cls, file_path: str, date_format: str = default_date_format) -> "SampleClock":
+        """Create the clock of an audio file. The start time is read from the file name, the rate and the number of
+        samples from the file."""
+        info = sf.info(file_path)
+        return cls(get_file_start_time(file_path, date_format), info.samplerate, info.frames)
+
+    @classmethod
+    def from_video_file(
+        cls, file_path: str, frame_rate: float, date_format: str = default_date_format
+    ) -> "SampleClock":
+        """Create the clock of a video file. The start time is read from the file name."""
+        return cls(get_file_start_time(file_path, date_format), frame_rate)
+
+    def index_at(self, times: np.ndarray) -> np.ndarray:
+        """Get the index of the sample being played at each time.
+
+        Args:
+            times (np.ndarray): Unix times.
+
+        Returns:
+            np.ndarray: int64 sample indices. They are negative before the first sample, and may be `num_samples` or
+                more after the last one.
+        """
+        return np.floor((np.asarray(times, dtype=np.float64) - self.start_time) * self.rate).astype(np.int64)
+
+    def time_at(self, indices: np.ndarray) -> np.ndarray:
+        """Get the unix time of sample indices."""
+        return self.start_time + np.asarray(indices, dtype=np.float64) / self.rate
+
+    def window(self, start_time: float, stop_time: float) -> slice:
+        """Get the samples in a time window.
+
+        Args:
+            start_time (float): Start of the window. (inclusive)
+            stop_time (float): End of the window. (exclusive)
+
+        Returns:
+            slice: Slice of the samples, clipped to the samples of the stream.
+        """
+        start, stop = np.ceil((np.array([start_time, stop_time]) - self.start_time) * self.rate).astype(np.int64)
+        upper = self.num_samples if self.num_samples is not None else max(stop, 0)
+        return slice(int(np.clip(start, 0, upper)), int(np.clip(stop, 0, upper)))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(start_time={self.start_time}, rate={self.rate})"
+
+
+class SessionAlignment:
+    """This class aligns the streams of a session. See the module docstring."""
+
+    def __init__(self, streams: dict[str, TimeIndex], clocks: dict[str, SampleClock]) -> None:
+        """Initialize SessionAlignment.
+
+        Args:
+            streams (dict[str, TimeIndex]): Event streams keyed by name.
+            clocks (dict[str, SampleClock]): Sampled streams keyed by name.
+        """
+        self.streams = streams
+        self.clocks = clocks
+        self._tables: dict[tuple[str, str], np.ndarray] = {}
+
+    @classmethod
+    def load(
+        cls, session_dir: str, date_format: str = default_date_format, video_frame_rate: Optional[float] = None
+    ) -> "SessionAlignment":
+        """Load the streams of a `.vrcrec` session. Missing files are skipped.
+
+        Args:
+            session_dir (str): Path to the `.vrcrec` directory.
+            date_format (str): The date format of the recording (`--date_format`).
+            video_frame_rate (Optional[float]): Frame rate of the OBS video. If None, the video is not aligned.
+
+        Returns:
+            SessionAlignment: The alignment of the streams found.
+        """
+
+        def find(*patterns: str) -> Optional[str]:
+            paths = sorted(glob.glob(os.path.join(glob.escape(session_dir), *patterns)))
+            return paths[0] if paths else None
+
+        streams = {}
+        if path := find("vr", f"*.{FE.TRACKING}.{FE.BINARY}"):
+            streams[StreamNames.TRACKING] = TimeIndex(read_tracking_timestamps(path))
+        for name, patterns in [
+            (StreamNames.CONTROLLER_EVENT, ("vr", f"*.{FE.EVENT}.{FE.CONTROLLER}.{FE.CSV}")),
+            (StreamNames.OSC_FEEDBACK, (f"*.{FE.OSCFEEDBACK}.{FE.CSV}",)),
+            (StreamNames.GAMEPAD, (f"*.{FE.GAMEPAD}.{FE.CSV}",)),
+        ]:
+            if path := find(*patterns):
+                streams[name] = TimeIndex(read_csv_timestamps(path))
+
+        clocks = {}
+        for name, extension in [(StreamNames.MIC, FE.MICROPHONE), (StreamNames.SPEAKER, FE.SPEAKER)]:
+            if path := find("audio", f"*.{extension}.{FE.WAV}"):
+                clocks[name] = SampleClock.from_audio_file(path, date_format)
+        if video_frame_rate is not None and (path := find(f"*.{FE.VIDEO}.*")):
+            clocks[StreamNames.VIDEO] = SampleClock.from_video_file(path, video_frame_rate, date_format)
+        return cls(streams, clocks)
+
+    def lookup(self, stream_name: str, clock_name: str) -> np.ndarray:
+        """Get the lookup table from the rows of an event stream to the sample indices of a sampled stream. Tables are
+        built once by `SampleClock.index_at` and cached.
+
+        Args:
+            stream_name (str): Name of the event stream, e.g. `StreamNames.TRACKING`.
+            clock_name (str): Name of the sampled stream, e.g. `StreamNames.MIC`.
+
+        Returns:
+            np.ndarray: int64 sample index of each row in row order.
+
+        Raises:
+            KeyError: The session does not have the stream.
+        """
+        key = (stream_name, clock_name)
+        if key not in self._tables:
+            self._tables[key] = self.clocks[clock_name].index_at(self.streams[stream_name].row_timestamps)
+        return self._tables[key]
+
+    def window(self, start_time: float, stop_time: float) -> dict[str, Union[slice, np.ndarray]]:
+        """Slice every stream for a time window by binary search.
+
+        Args:
+            start_time (float): Start of the window. (inclusive)
+            stop_time (float): End of the window. (exclusive)
+
+        Returns:
+            dict[str, Union[slice, np.ndarray]]: Rows of each event stream (see `TimeIndex.window`) and the slice of
+                samples of each sampled stream, keyed by stream name.
+        """
+        windows: dict[str, Union[slice, np.ndarray]] = {}
+        for name, stream in self.streams.items():
+            windows[name] = stream.window(start_time, stop_time)
+        for name, clock in self.clocks.items():
+            windows[name] = clock.window(start_time, stop_time)
+        return windows
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(streams={list(self.streams)}, clocks={list(self.clocks)})"
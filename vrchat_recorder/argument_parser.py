@@ -16,6 +16,7 @@ def get_parser() -> ArgumentParser:
     parser = get_mic_parser(parser)
     parser = get_speaker_parser(parser)
     parser = get_vr_parser(parser)
+    parser = get_stream_parser(parser)
 
     return parser
 
@@ -154,6 +155,62 @@ def get_vr_parser(parser: ArgumentParser) -> ArgumentParser:
         default=1000,
         help="The number of frames to flush to the file at once.",
     )
+    parser.add_argument(
+        "--vr_tracking_missed_deadline_policy",
+        default="skip",
+        choices=["skip", "catch_up"],
+        help="Whether to skip or catch up VR tracking frames whose deadline has passed.",
+    )
+    parser.add_argument(
+        "--vr_tracking_buffer_capacity",
+        type=int,
+        default=4096,
+        help="The number of VR tracking frames buffered before they are written to the file.",
+    )
+    parser.add_argument(
+        "--vr_tracking_backpressure_policy",
+        default="block",
+        choices=["block", "drop"],
+        help="Whether to wait or drop VR tracking frames when the buffer is full.",
+    )
+    parser.add_argument(
+        "--vr_tracking_format",
+        default="v0",
+        choices=["v0", "v1", "v2"],
+        help="The VR tracking file format. v0 records the HMD and both controllers, v1 records all connected devices, "
+        "v2 records the same data as v0 in chunks with checksums and an index.",
+    )
+    parser.add_argument(
+        "--vr_tracking_frames_per_chunk",
+        type=int,
+        default=720,
+        help="The number of VR tracking frames in a chunk of the v2 format.",
+    )
+    parser.add_argument(
+        "--vr_tracking_compression",
+        default="none",
+        choices=["none", "zlib", "lzma"],
+        help="The compression of VR tracking chunks of the v2 format.",
+    )
+    parser.add_argument(
+        "--vr_tracking_record_layout",
+        default="float",
+        choices=["float", "quantized", "extended"],
+        help="The record layout of VR tracking data of the v0 and v2 formats. quantized stores fixed-point values, "
+        "and extended also stores velocities and tracking validity.",
+    )
+    parser.add_argument(
+        "--vr_tracking_shared_memory_name",
+        default=None,
+        help="If given, VR tracking frames are also published to a shared memory ring buffer of this name, so other "
+        "processes can read the latest frames.",
+    )
+    parser.add_argument(
+        "--vr_tracking_shared_memory_capacity",
+        type=int,
+        default=1024,
+        help="The number of the latest VR tracking frames kept in the shared memory ring buffer.",
+    )
     parser.add_argument(
         "--vr_controller_event_poll_interval",
         type=float,
@@ -168,3 +225,33 @@ def get_vr_parser(parser: ArgumentParser) -> ArgumentParser:
     )
 
     return parser
+
+
+def get_stream_parser(parser: ArgumentParser) -> ArgumentParser:
+    """Add arguments for streaming the recorded data to a local endpoint.
+
+    Args:
+        parser (ArgumentParser): The parser.
+
+    Returns:
+        parser (ArgumentParser): The parser with the arguments.
+    """
+
+    parser.add_argument(
+        "--stream_port",
+        type=int,
+        default=None,
+        help="If given, VR tracking frames, controller events and OSC feedback are also streamed to this port.",
+    )
+    parser.add_argument("--stream_host", default="127.0.0.1", help="The host to stream the recorded data to.")
+    parser.add_argument(
+        "--stream_protocol", default="udp", choices=["udp", "tcp"], help="The protocol to stream the recorded data."
+    )
+    parser.add_argument(
+        "--stream_capacity",
+        type=int,
+        default=4096,
+        help="The number of messages queued for streaming. Messages are dropped when the queue is full.",
+    )
+
+    return parser
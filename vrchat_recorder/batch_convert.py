@@ -0,0 +1,347 @@
+"""This file contains the batch driver that converts the files of many `.vrcrec` sessions in parallel.
+
+Every `<date>.vrcrec` directory under a root is searched for input files, and a job per file (see `ConversionJobs`)
+is run on a `ProcessPoolExecutor` with a worker per core:
+    - tracking_export: `vr/<date>.tracking.bin` -> `vr/<date>.tracking.<format>` by `vr.export.export_tracking`.
+    - csv_compaction: `<name>.csv` -> `<name>.csv.gz`. The original CSV is kept.
+    - audio_stats: `audio/<name>.wav` -> `audio/<name>.wav.stats.json` (sample rate, duration, peak and RMS per
+      channel).
+
+Disk reads of all workers share a semaphore of `io_concurrency` slots that is held only while a block is read, so
+the CPU-bound parts (formatting, compression, statistics) use every core while the disk serves a few sequential
+readers at a time.
+
+When every job of a session succeeded, the completion marker `completion_marker_name` is written into the session
+with the names of the jobs. Sessions whose marker already has the requested jobs are skipped, so an interrupted run
+is resumed by running the same command again.
+
+Usage:
+    ```
+    python -m vrchat_recorder.batch_convert path/to/archive --jobs tracking_export audio_stats --format npz
+    ```
+"""
+
+import argparse
+import contextlib
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Sequence
+
+import numpy as np
+import soundfile as sf
+
+from .data_constants import FileExtensions as FE
+from .date_utils import get_now_str
+from .vr.export import ExportFormats, export_formats, export_tracking, get_export_path
+
+logger = logging.getLogger(__name__)
+
+completion_marker_name = ".batch_convert.json"
+default_io_concurrency = 2
+io_block_size = 1 << 20  # bytes of CSV, or frames of audio read at once.
+
+
+class ConversionJobs:
+    """This class contains the jobs of the batch conversion."""
+
+    TRACKING_EXPORT: str = "tracking_export"
+    CSV_COMPACTION: str = "csv_compaction"
+    AUDIO_STATS: str = "audio_stats"
+
+
+conversion_jobs = [ConversionJobs.TRACKING_EXPORT, ConversionJobs.CSV_COMPACTION, ConversionJobs.AUDIO_STATS]
+
+_io_semaphore = None  # Set in each worker process by `_init_worker`.
+
+
+def _init_worker(io_semaphore) -> None:
+    global _io_semaphore
+    _io_semaphore = io_semaphore
+
+
+def _io_slot():
+    """Returns the context manager held while a block is read from the disk."""
+    return _io_semaphore or contextlib.nullcontext()
+
+
+def find_sessions(root_dir: str) -> list[str]:
+    """Find the `.vrcrec` session directories under a directory.
+
+    Args:
+        root_dir (str): The directory to search recursively. It may be a session itself.
+
+    Returns:
+        list[str]: Paths of the sessions, sorted.
+    """
+    sessions = []
+    for dir_path, dir_names, _ in os.walk(root_dir):
+        if dir_path.endswith(f".{FE.VRCREC}"):
+            sessions.append(dir_path)
+            dir_names.clear()  # sessions are not nested.
+    return sorted(sessions)
+
+
+def find_jobs(session_dir: str, jobs: Sequence[str] = conversion_jobs) -> list[tuple[str, str]]:
+    """Find the input files of the jobs in a session.
+
+    Args:
+        session_dir (str): Path to the `.vrcrec` directory.
+        jobs (Sequence[str]): See `ConversionJobs`.
+
+    Returns:
+        list[tuple[str, str]]: Pairs of the job and the input file path.
+    """
+    found = []
+    for dir_path, dir_names, file_names in os.walk(session_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            path = os.path.join(dir_path, file_name)
+            if ConversionJobs.TRACKING_EXPORT in jobs and file_name.endswith(f".{FE.TRACKING}.{FE.BINARY}"):
+                found.append((ConversionJobs.TRACKING_EXPORT, path))
+            # Exported tracking CSVs are not compacted, since they may not exist yet when the jobs are found.
+            elif (
+                ConversionJobs.CSV_COMPACTION in jobs
+                and file_name.endswith(f".{FE.CSV}")
+                and not file_name.endswith(f".{FE.TRACKING}.{FE.CSV}")
+            ):
+                found.append((ConversionJobs.CSV_COMPACTION, path))
+            elif ConversionJobs.AUDIO_STATS in jobs and file_name.endswith(f".{FE.WAV}"):
+                found.append((ConversionJobs.AUDIO_STATS, path))
+    return found
+
+
+def read_completed_jobs(session_dir: str) -> list[str]:
+    """Returns the jobs in the completion marker of a session. Empty if there is no valid marker."""
+    try:
+        with open(os.path.join(session_dir, completion_marker_name)) as f:
+            return list(json.load(f)["jobs"])
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+        return []
+
+
+def is_completed(session_dir: str, jobs: Sequence[str] = conversion_jobs) -> bool:
+    """Returns whether the completion marker of a session has all the jobs."""
+    return set(jobs) <= set(read_completed_jobs(session_dir))
+
+
+def write_completion_marker(session_dir: str, jobs: Sequence[str]) -> None:
+    """Write the completion marker of a session. The jobs are added to those already in the marker, so a run of
+    other jobs does not undo the completion of earlier runs. It is replaced atomically, so a crash never leaves a
+    broken marker.
+
+    Args:
+        session_dir (str): Path to the `.vrcrec` directory.
+        jobs (Sequence[str]): Completed jobs.
+    """
+    marker_path = os.path.join(session_dir, completion_marker_name)
+    jobs = set(jobs) | set(read_completed_jobs(session_dir))
+    with open(marker_path + ".tmp", "w") as f:
+        json.dump({"jobs": sorted(jobs), "completed_at": get_now_str()}, f)
+    os.replace(marker_path + ".tmp", marker_path)
+
+
+def compact_csv(input_file_path: str) -> str:
+    """Compress a CSV file to `<name>.csv.gz`.
+
+    Args:
+        input_file_path (str): Path to the CSV file.
+
+    Returns:
+        str: Path to the compressed file.
+    """
+    output_file_path = input_file_path + ".gz"
+    with open(input_file_path, "rb") as src, gzip.open(output_file_path + ".tmp", "wb") as dst:
+        while True:
+            with _io_slot():
+                block = src.read(io_block_size)
+            if not block:
+                break
+            dst.write(block)
+    os.replace(output_file_path + ".tmp", output_file_path)
+    return output_file_path
+
+
+def compute_audio_stats(input_file_path: str) -> str:
+    """Compute the statistics of an audio file and write them to `<name>.wav.stats.json`.
+
+    Args:
+        input_file_path (str): Path to the audio file.
+
+    Returns:
+        str: Path to the statistics file.
+    """
+    num_frames = 0
+    with sf.SoundFile(input_file_path) as f:
+        peak = np.zeros(f.channels)
+        sum_of_squares = np.zeros(f.channels)
+        while True:
+            with _io_slot():
+                block = f.read(io_block_size, dtype="float64", always_2d=True)
+            if len(block) == 0:
+                break
+            peak = np.maximum(peak, np.abs(block).max(axis=0))
+            sum_of_squares += np.square(block).sum(axis=0)
+            num_frames += len(block)
+        stats = {
+            "sample_rate": f.samplerate,
+            "channels": f.channels,
+            "num_frames": num_frames,
+            "duration": num_frames / f.samplerate,
+            "peak": peak.tolist(),
+            "rms": np.sqrt(sum_of_squares / max(num_frames, 1)).tolist(),
+        }
+
+    output_file_path = input_file_path + ".stats.json"
+    with open(output_file_path, "w") as f:
+        json.dump(stats, f, indent=2)
+    return output_file_path
+
+
+def run_job(job: str, input_file_path: str, export_format: str = ExportFormats.NPZ) -> tuple[str, int]:
+    """Run a conversion job. This function is called in the worker processes.
+
+    Args:
+        job (str): See `ConversionJobs`.
+        input_file_path (str): Path to the input file.
+        export_format (str): Format of `ConversionJobs.TRACKING_EXPORT`. See `vr.export.ExportFormats`.
+
+    Returns:
+        tuple[str, int]: Path to the output file and the size of the input file. (bytes)
+
+    Raises:
+        ValueError: Unknown job.
+    """
+    input_size = os.path.getsize(input_file_path)
+    if job == ConversionJobs.TRACKING_EXPORT:
+        output_file_path = get_export_path(input_file_path, export_format)
+        export_tracking(input_file_path, output_file_path, export_format, io_lock=_io_slot())
+    elif job == ConversionJobs.CSV_COMPACTION:
+        output_file_path = compact_csv(input_file_path)
+    elif job == ConversionJobs.AUDIO_STATS:
+        output_file_path = compute_audio_stats(input_file_path)
+    else:
+        raise ValueError(f"Unknown conversion job: {job}")
+    return output_file_path, input_size
+
+
+def convert_sessions(
+    root_dir: str,
+    jobs: Sequence[str] = conversion_jobs,
+    export_format: str = ExportFormats.NPZ,
+    max_workers: Optional[int] = None,
+    io_concurrency: int = default_io_concurrency,
+    force: bool = False,
+) -> dict[str, int]:
+    """Run the conversion jobs of every session under a directory in parallel.
+
+    Args:
+        root_dir (str): The directory to search for `.vrcrec` sessions.
+        jobs (Sequence[str]): See `ConversionJobs`.
+        export_format (str): Format of `ConversionJobs.TRACKING_EXPORT`. See `vr.export.ExportFormats`.
+        max_workers (Optional[int]): Number of worker processes. Defaults to the number of cores.
+        io_concurrency (int): Maximum number of workers reading from the disk at once.
+        force (bool): If True, completed sessions are converted again.
+
+    Returns:
+        dict[str, int]: Numbers of `sessions`, `skipped` sessions, `completed` sessions, `jobs`, `failed` jobs and
+            read `bytes`.
+    """
+    sessions = find_sessions(root_dir)
+    pending = [s for s in sessions if force or not is_completed(s, jobs)]
+    summary = {"sessions": len(sessions), "skipped": len(sessions) - len(pending), "completed": 0}
+    session_jobs = {session: find_jobs(session, jobs) for session in pending}
+    remaining = {session: len(found) for session, found in session_jobs.items()}
+    failed_sessions: set[str] = set()
+    num_jobs = sum(remaining.values())
+    logger.info(
+        f"Converting {len(pending)} sessions ({num_jobs} jobs). {summary['skipped']} completed sessions are skipped."
+    )
+
+    for session, count in remaining.items():
+        if count == 0:
+            write_completion_marker(session, jobs)
+            summary["completed"] += 1
+
+    num_done = num_failed = total_bytes = 0
+    start = time.perf_counter()
+    io_semaphore = multiprocessing.Semaphore(io_concurrency)
+    with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(io_semaphore,)) as executor:
+        futures = {
+            executor.submit(run_job, job, path, export_format): (session, job, path)
+            for session, found in session_jobs.items()
+            for job, path in found
+        }
+        for future in as_completed(futures):
+            session, job, path = futures[future]
+            num_done += 1
+            remaining[session] -= 1
+            try:
+                output_file_path, input_size = future.result()
+            except Exception:
+                logger.exception(f"Failed {job}: {path}")
+                num_failed += 1
+                failed_sessions.add(session)
+                continue
+            finally:
+                if remaining[session] == 0 and session not in failed_sessions:
+                    write_completion_marker(session, jobs)
+                    summary["completed"] += 1
+
+            total_bytes += input_size
+            elapsed = max(time.perf_counter() - start, 1e-9)
+            logger.info(
+                f"[{num_done}/{num_jobs}] {job}: {output_file_path} | sessions {summary['completed']}/{len(pending)} | "
+                f"{total_bytes / elapsed / 1e6:.1f} MB/s, {num_done / elapsed:.1f} jobs/s"
+            )
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Converted {summary['completed']}/{len(pending)} sessions, {num_done - num_failed}/{num_jobs} jobs "
+        f"({num_failed} failed), {total_bytes / 1e6:.1f} MB in {elapsed:.2f} s "
+        f"({total_bytes / max(elapsed, 1e-9) / 1e6:.1f} MB/s)."
+    )
+    summary.update(jobs=num_jobs, failed=num_failed, bytes=total_bytes)
+    return summary
+
+
+def main(arg_list: Optional[Sequence[str]] = None) -> None:
+    """Entry point of `python -m vrchat_recorder.batch_convert`.
+
+    Args:
+        arg_list (Optional[Sequence[str]]): List of arguments to parse. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(description="Convert the files of many .vrcrec sessions in parallel.")
+    parser.add_argument("root_dir", help="The directory to search for .vrcrec sessions.")
+    parser.add_argument(
+        "--jobs", nargs="+", default=conversion_jobs, choices=conversion_jobs, help="The conversion jobs to run."
+    )
+    parser.add_argument(
+        "--format", default=ExportFormats.NPZ, choices=export_formats, help="The format of the tracking export."
+    )
+    parser.add_argument(
+        "--max_workers", type=int, default=None, help="The number of worker processes. Defaults to the number of cores."
+    )
+    parser.add_argument(
+        "--io_concurrency",
+        type=int,
+        default=default_io_concurrency,
+        help="The maximum number of workers reading from the disk at once.",
+    )
+    parser.add_argument("--force", action="store_true", help="Convert completed sessions again.")
+    parser.add_argument("--log_level", default="INFO", help="The log level.")
+    args = parser.parse_args(arg_list)
+
+    logging.basicConfig(stream=sys.stdout, level=args.log_level, format="%(message)s")
+    summary = convert_sessions(args.root_dir, args.jobs, args.format, args.max_workers, args.io_concurrency, args.force)
+    if summary["failed"] > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,3 +12,15 @@ def get_now_str(format: str = "%Y-%m-%d-%H-%M-%S-%f") -> str:
     now = datetime.now()
     now_str = now.strftime(format)
     return now_str
+
+
+def parse_date_str(date_str: str, format: str = "%Y-%m-%d-%H-%M-%S-%f") -> float:
+    """Parse a string of `get_now_str` as a unix time.
+
+    Args:
+        date_str (str): The time string, e.g. the date part of a file name.
+        format (str): The format of the time string.
+    Returns:
+        timestamp (float): The unix time of the local time string.
+    """
+    return datetime.strptime(date_str, format).timestamp()
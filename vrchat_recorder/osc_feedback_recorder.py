@@ -9,6 +9,7 @@ from pythonosc import osc_server
 from pythonosc.dispatcher import Dispatcher
 
 from .abc.csv_recorder import CSVRecorder as ABC_CSVRecorder
+from .abc.stream_sink import StreamSink
 from .data_constants import CSVHeaderNames as HN
 from .data_constants import get_data_type_name
 
@@ -26,7 +27,15 @@ class OSCFeedbackRecorder(ABC_CSVRecorder):
         ```
     """
 
-    def __init__(self, output_file_path: Any, host: Any, port: int, address: Any, timeout: float = 1.0) -> None:
+    def __init__(
+        self,
+        output_file_path: Any,
+        host: Any,
+        port: int,
+        address: Any,
+        timeout: float = 1.0,
+        stream_sink: Optional[StreamSink] = None,
+    ) -> None:
         """Create a OSCFeedbackRecorder object.
 
         Args:
@@ -35,6 +44,8 @@ class OSCFeedbackRecorder(ABC_CSVRecorder):
             port (int): The port of the VRChat OSC server.
             address (Any): The OSC address to record.
             timeout (float): The timeout for the OSC server.
+            stream_sink (Optional[StreamSink]): If given, every received value is also sent to the sink as
+                `StreamMessageTypes.OSC_FEEDBACK`. The sink is started and closed by the caller.
         """
 
         csv_headers = [HN.TIMESTAMP, HN.PARAMETER_NAME, HN.DATA_TYPE, HN.VALUE]
@@ -44,6 +55,7 @@ class OSCFeedbackRecorder(ABC_CSVRecorder):
         self.port = port
         self.address = address
         self.timeout = timeout
+        self.stream_sink = stream_sink
 
     csv_writer: Optional[csv.DictWriter] = None
     server_thread: Optional[threading.Thread] = None
@@ -86,3 +98,5 @@ class OSCFeedbackRecorder(ABC_CSVRecorder):
                 HN.VALUE: value,
             }
         )
+        if self.stream_sink is not None:
+            self.stream_sink.send_osc_feedback(timestamp, address, value)
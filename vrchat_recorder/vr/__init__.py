@@ -1,3 +1,4 @@
 from .controller_event_recorder import ControllerEventRecorder
+from .device_topology import DeviceTopologyCache
 from .tracking_reader import TrackingReader
 from .tracking_recorder import TrackingRecorder
@@ -1,30 +1,87 @@
 """This file contains features that converts DataHolder class to binary data."""
+import lzma
 import struct
+import zlib
 from typing import Optional
 
+import numpy as np
+
+from .constants import Compressions
+from .record_schema import QuantizationKinds, RecordSchema, SchemaField, binary_dtype
 from .tracking_data_holders import VRDeviceTrackingDataHolder, create_empty_data_holder
 
-binary_format = " ".join(
-    [
-        "d",  # timestamp
-        "fff",  # hmd position
-        "ffff",  # hmd orientation
-        "fff",  # left controller position
-        "ffff",  # left controller orientation
-        "ff",  # left controller thumb stick
-        "ff",  # left controller first trigger
-        "ff",  # left controller second trigger
-        "ff",  # left controller third trigger
-        "ff",  # left controller fourth trigger
-        "fff",  # right controller position
-        "ffff",  # right controller orientation
-        "ff",  # right controller thumb stick
-        "ff",  # right controller first trigger
-        "ff",  # right controller second trigger
-        "ff",  # right controller third trigger
-        "ff",  # right controller fourth trigger
+# Attribute paths of `VRDeviceTrackingDataHolder` for the parts of a record.
+pose_field_names = ["position.x", "position.y", "position.z"] + [f"orientation.{c}" for c in "xyzw"]
+axes_field_names = [
+    f"{axis}.{c}"
+    for axis in ["thumb_stick", "first_trigger", "second_trigger", "third_trigger", "fourth_trigger"]
+    for c in "xy"
+]
+
+
+def _pose_fields(device: str) -> list[SchemaField]:
+    """Position and orientation of a device."""
+    return [SchemaField(f"{device}.position.{c}", "f", QuantizationKinds.POSITION) for c in "xyz"] + [
+        SchemaField(f"{device}.orientation.{c}", "f", QuantizationKinds.ORIENTATION) for c in "xyzw"
+    ]
+
+
+def _axes_fields(controller: str) -> list[SchemaField]:
+    """Thumb stick and first to fourth triggers of a controller."""
+    return [SchemaField(f"{controller}.{name}", "f", QuantizationKinds.AXIS) for name in axes_field_names]
+
+
+binary_schema = RecordSchema(
+    [SchemaField("timestamp", "d", QuantizationKinds.TIMESTAMP)]
+    + _pose_fields("hmd")
+    + _pose_fields("controller.left")
+    + _axes_fields("controller.left")
+    + _pose_fields("controller.right")
+    + _axes_fields("controller.right"),
+    create_holder=create_empty_data_holder,
+)
+binary_format = binary_schema.format  # "d fff ffff fff ffff ff ff ff ff ff fff ffff ff ff ff ff ff"
+binary_struct = binary_schema.struct
+binary_field_names = binary_schema.field_names
+
+# Structs of the parts of `binary_format` and their byte offsets, for writing a frame in place.
+timestamp_struct = struct.Struct("d")
+pose_struct = struct.Struct("fff ffff")  # position and orientation
+axes_struct = struct.Struct("ff ff ff ff ff")  # thumb stick and first to fourth triggers
+
+hmd_offset = timestamp_struct.size
+left_controller_offset = hmd_offset + pose_struct.size
+left_controller_axes_offset = left_controller_offset + pose_struct.size
+right_controller_offset = left_controller_axes_offset + axes_struct.size
+right_controller_axes_offset = right_controller_offset + pose_struct.size
+
+# `RecordLayouts.EXTENDED` appends the pose state of the hmd, left and right controller to `binary_format`.
+pose_state_field_names = [f"{name}.{c}" for name in ["velocity", "angular_velocity"] for c in "xyz"] + [
+    "tracking_result",
+    "pose_is_valid",
+]
+pose_state_codes = ["f"] * 6 + ["H", "?"]  # velocity, angular velocity, tracking result and whether the pose is valid
+pose_state_format = RecordSchema(
+    [SchemaField(name, code) for name, code in zip(pose_state_field_names, pose_state_codes)]
+).format  # "fff fff H ?"
+pose_state_struct = struct.Struct(pose_state_format)
+extended_schema = RecordSchema(
+    binary_schema.fields
+    + [
+        SchemaField(f"{device}.{name}", code)
+        for device in ["hmd", "controller.left", "controller.right"]
+        for name, code in zip(pose_state_field_names, pose_state_codes)
     ]
 )
+extended_binary_format = extended_schema.format
+extended_binary_struct = extended_schema.struct
+extended_field_names = extended_schema.field_names
+
+# The pose states are padded to the alignment of their velocity.
+pose_state_stride = struct.calcsize(pose_state_format + " 0f")
+hmd_state_offset = binary_struct.size
+left_controller_state_offset = hmd_state_offset + pose_state_stride
+right_controller_state_offset = left_controller_state_offset + pose_state_stride
 
 
 def holder_to_binary(holder: VRDeviceTrackingDataHolder) -> bytes:
@@ -36,56 +93,7 @@ def holder_to_binary(holder: VRDeviceTrackingDataHolder) -> bytes:
     Returns:
         bytes: Binary data.
     """
-
-    data = [
-        holder.timestamp,
-        # HMD
-        holder.hmd.position.x,
-        holder.hmd.position.y,
-        holder.hmd.position.z,
-        holder.hmd.orientation.x,
-        holder.hmd.orientation.y,
-        holder.hmd.orientation.z,
-        holder.hmd.orientation.w,
-        # Controllers
-        # Left
-        holder.controller.left.position.x,
-        holder.controller.left.position.y,
-        holder.controller.left.position.z,
-        holder.controller.left.orientation.x,
-        holder.controller.left.orientation.y,
-        holder.controller.left.orientation.z,
-        holder.controller.left.orientation.w,
-        holder.controller.left.thumb_stick.x,
-        holder.controller.left.thumb_stick.y,
-        holder.controller.left.first_trigger.x,
-        holder.controller.left.first_trigger.y,
-        holder.controller.left.second_trigger.x,
-        holder.controller.left.second_trigger.y,
-        holder.controller.left.third_trigger.x,
-        holder.controller.left.third_trigger.y,
-        holder.controller.left.fourth_trigger.x,
-        holder.controller.left.fourth_trigger.y,
-        # Right
-        holder.controller.right.position.x,
-        holder.controller.right.position.y,
-        holder.controller.right.position.z,
-        holder.controller.right.orientation.x,
-        holder.controller.right.orientation.y,
-        holder.controller.right.orientation.z,
-        holder.controller.right.orientation.w,
-        holder.controller.right.thumb_stick.x,
-        holder.controller.right.thumb_stick.y,
-        holder.controller.right.first_trigger.x,
-        holder.controller.right.first_trigger.y,
-        holder.controller.right.second_trigger.x,
-        holder.controller.right.second_trigger.y,
-        holder.controller.right.third_trigger.x,
-        holder.controller.right.third_trigger.y,
-        holder.controller.right.fourth_trigger.x,
-        holder.controller.right.fourth_trigger.y,
-    ]
-    return struct.pack(binary_format, *data)
+    return binary_schema.encode(holder)
 
 
 def binary_to_holder(binary: bytes, dst: Optional[VRDeviceTrackingDataHolder] = None) -> VRDeviceTrackingDataHolder:
@@ -98,73 +106,120 @@ def binary_to_holder(binary: bytes, dst: Optional[VRDeviceTrackingDataHolder] =
     Returns:
         VRDeviceTrackingDataHolder: DataHolder class.
     """
+    return binary_schema.decode(binary, dst)
 
-    binary = struct.unpack(binary_format, binary)
-    if dst is None:
-        holder = create_empty_data_holder()
-    else:
-        holder = dst
-
-    holder.timestamp = binary[0]
-
-    # HMD
-    holder.hmd.position.x = binary[1]
-    holder.hmd.position.y = binary[2]
-    holder.hmd.position.z = binary[3]
 
-    holder.hmd.orientation.x = binary[4]
-    holder.hmd.orientation.y = binary[5]
-    holder.hmd.orientation.z = binary[6]
-    holder.hmd.orientation.w = binary[7]
+def _integer_view_dtype(dtype: np.dtype) -> np.dtype:
+    """Replace each numeric field of a structured dtype with the unsigned integer of the same size and byte order."""
 
-    # Left controller
-    holder.controller.left.position.x = binary[8]
-    holder.controller.left.position.y = binary[9]
-    holder.controller.left.position.z = binary[10]
+    def to_unsigned(field_dtype: np.dtype) -> np.dtype:
+        if field_dtype.kind not in "fiub":
+            return field_dtype
+        return np.dtype(f"u{field_dtype.itemsize}").newbyteorder(field_dtype.byteorder)
 
-    holder.controller.left.orientation.x = binary[11]
-    holder.controller.left.orientation.y = binary[12]
-    holder.controller.left.orientation.z = binary[13]
-    holder.controller.left.orientation.w = binary[14]
+    return np.dtype(
+        {
+            "names": dtype.names,
+            "formats": [to_unsigned(dtype.fields[name][0]) for name in dtype.names],
+            "offsets": [dtype.fields[name][1] for name in dtype.names],
+            "itemsize": dtype.itemsize,
+        }
+    )
 
-    holder.controller.left.thumb_stick.x = binary[15]
-    holder.controller.left.thumb_stick.y = binary[16]
 
-    holder.controller.left.first_trigger.x = binary[17]
-    holder.controller.left.first_trigger.y = binary[18]
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == Compressions.ZLIB:
+        return zlib.compress(data, 6)
+    elif compression == Compressions.LZMA:
+        return lzma.compress(data, preset=1)
+    elif compression == Compressions.NONE:
+        return data
+    raise ValueError(f"Unknown compression: {compression}")
 
-    holder.controller.left.second_trigger.x = binary[19]
-    holder.controller.left.second_trigger.y = binary[20]
 
-    holder.controller.left.third_trigger.x = binary[21]
-    holder.controller.left.third_trigger.y = binary[22]
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == Compressions.ZLIB:
+        return zlib.decompress(data)
+    elif compression == Compressions.LZMA:
+        return lzma.decompress(data)
+    elif compression == Compressions.NONE:
+        return data
+    raise ValueError(f"Unknown compression: {compression}")
 
-    holder.controller.left.fourth_trigger.x = binary[23]
-    holder.controller.left.fourth_trigger.y = binary[24]
 
-    # Right controller
-    holder.controller.right.position.x = binary[25]
-    holder.controller.right.position.y = binary[26]
-    holder.controller.right.position.z = binary[27]
+def encode_chunk(payload: bytes, binary_format: str = binary_format, compression: str = Compressions.ZLIB) -> bytes:
+    """Encode the records of a chunk for compact storage.
 
-    holder.controller.right.orientation.x = binary[28]
-    holder.controller.right.orientation.y = binary[29]
-    holder.controller.right.orientation.z = binary[30]
-    holder.controller.right.orientation.w = binary[31]
+    Each numeric column is replaced with its difference from the previous frame: integer columns by subtraction
+    (delta) and float columns by XOR of their bits, which is lossless and leaves mostly zero high bytes for slowly
+    changing values. The bytes are then transposed so that the same byte of a column is contiguous across frames, and
+    compressed.
+    With `Compressions.NONE`, the payload is returned as it is.
 
-    holder.controller.right.thumb_stick.x = binary[32]
-    holder.controller.right.thumb_stick.y = binary[33]
-
-    holder.controller.right.first_trigger.x = binary[34]
-    holder.controller.right.first_trigger.y = binary[35]
+    Args:
+        payload (bytes): Records of `binary_format`.
+        binary_format (str): Struct format of the records.
+        compression (str): Compression of the encoded bytes. See `Compressions`.
 
-    holder.controller.right.second_trigger.x = binary[36]
-    holder.controller.right.second_trigger.y = binary[37]
+    Returns:
+        bytes: Encoded chunk.
+    """
+    if compression == Compressions.NONE:
+        return bytes(payload)
+
+    dtype = binary_dtype(binary_format)
+    records = np.frombuffer(payload, dtype=_integer_view_dtype(dtype))
+    # Copied as bytes, since copies of structured arrays do not keep the padding bytes.
+    encoded = np.frombuffer(bytearray(payload), dtype=records.dtype)
+    for name in dtype.names:
+        column, out = records[name], encoded[name]
+        kind = dtype.fields[name][0].kind
+        if kind not in "fiub":
+            continue
+        if kind == "f":
+            np.bitwise_xor(column[1:], column[:-1], out=out[1:])
+        else:
+            np.subtract(column[1:], column[:-1], out=out[1:])
+
+    planes = np.frombuffer(encoded.data, dtype=np.uint8).reshape(len(records), dtype.itemsize).T
+    return _compress(np.ascontiguousarray(planes).tobytes(), compression)
+
+
+def decode_chunk(data: bytes, binary_format: str = binary_format, compression: str = Compressions.ZLIB) -> bytes:
+    """Decode a chunk encoded by `encode_chunk`.
 
-    holder.controller.right.third_trigger.x = binary[38]
-    holder.controller.right.third_trigger.y = binary[39]
+    Args:
+        data (bytes): Encoded chunk.
+        binary_format (str): Struct format of the records.
+        compression (str): Compression of the encoded bytes. See `Compressions`.
 
-    holder.controller.right.fourth_trigger.x = binary[40]
-    holder.controller.right.fourth_trigger.y = binary[41]
+    Returns:
+        bytes: Records of `binary_format`.
 
-    return holder
+    Raises:
+        ValueError: The chunk can not be decoded.
+    """
+    if compression == Compressions.NONE:
+        return bytes(data)
+
+    dtype = binary_dtype(binary_format)
+    try:
+        planes = np.frombuffer(_decompress(data, compression), dtype=np.uint8)
+    except (zlib.error, lzma.LZMAError) as e:
+        raise ValueError("Failed to decompress the chunk.") from e
+    if len(planes) % dtype.itemsize != 0:
+        raise ValueError("Decoded size is not a multiple of the record size.")
+
+    num_frames = len(planes) // dtype.itemsize
+    frames = planes.reshape(dtype.itemsize, num_frames).T.copy()
+    records = frames.view(_integer_view_dtype(dtype)).reshape(num_frames)
+    for name in dtype.names:
+        column = records[name]
+        kind = dtype.fields[name][0].kind
+        if kind not in "fiub":
+            continue
+        if kind == "f":
+            np.bitwise_xor.accumulate(column, out=column)
+        else:
+            np.add.accumulate(column, out=column)
+    return frames.tobytes()
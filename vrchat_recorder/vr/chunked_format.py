@@ -0,0 +1,345 @@
+"""This file contains features for the chunked container format (`HeaderVersions.V2`) of vr tracking data.
+
+V2 files store the same fixed-size records as V0 (`HeaderNames.BINARY_FORMAT`), grouped into chunks of
+`HeaderNames.FRAMES_PER_CHUNK` frames. Only the last chunk may hold fewer frames.
+
+After the header, a V2 file is laid out as follows:
+    - Chunks: `chunk_header_format` (magic, first and last timestamp, number of frames, payload size and CRC32 of the
+      chunk header fields and the payload) followed by the payload, i.e. the records of the chunk encoded by
+      `binary_converter.encode_chunk` with `HeaderNames.COMPRESSION`.
+    - Footer: `footer_header_format` (magic and number of chunks) followed by `index_entry_format` (offset, first and
+      last timestamp and number of frames) of each chunk.
+    - Trailer: `trailer_format` (offset of the footer, CRC32 of the footer and magic) at the very end of the file.
+
+The footer is written when the recording is closed. If it is missing or broken (e.g. the recorder crashed or is
+still recording), the chunks are found by scanning their headers instead. Chunks whose CRC does not match are skipped
+by the reader.
+"""
+
+import contextlib
+import logging
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, ContextManager, Optional
+
+from .binary_converter import timestamp_struct
+
+logger = logging.getLogger(__name__)
+
+CHUNK_MAGIC = b"VRCK"
+FOOTER_MAGIC = b"VRCI"
+TRAILER_MAGIC = b"VRCE"
+
+chunk_header_format = "<4s d d I I I"  # magic, first timestamp, last timestamp, number of frames, payload size, crc32
+footer_header_format = "<4s I"  # magic, number of chunks
+index_entry_format = "<Q d d I"  # offset, first timestamp, last timestamp, number of frames
+trailer_format = "<Q I 4s"  # footer offset, crc32 of footer, magic
+
+chunk_header_struct = struct.Struct(chunk_header_format)
+footer_header_struct = struct.Struct(footer_header_format)
+index_entry_struct = struct.Struct(index_entry_format)
+trailer_struct = struct.Struct(trailer_format)
+
+# The CRC of a chunk covers the header fields before the crc itself.
+_crc_covered_size = chunk_header_struct.size - 4
+
+
+def get_frame_timestamp(frame) -> float:
+    """Get the timestamp of a record of `binary_format`, which starts with it.
+
+    Args:
+        frame: Bytes-like object of a record.
+
+    Returns:
+        float: Timestamp. (seconds)
+    """
+    return timestamp_struct.unpack_from(frame)[0]
+
+
+@dataclass
+class ChunkInfo:
+    """Index entry of a chunk."""
+
+    offset: int
+    first_timestamp: float
+    last_timestamp: float
+    num_frames: int
+
+
+class ChunkedFrameEncoder:
+    """This class writes fixed-size frames to a file in V2 format.
+
+    It has `write` and `flush` methods, so it can be given to `BackgroundFrameWriter` as the output file. Frames are
+    kept in memory until a chunk is full, so `flush` only flushes the complete chunks. `close` writes the remaining
+    frames and the footer.
+
+    Usage:
+        ```python
+        encoder = ChunkedFrameEncoder(outfile, binary_struct.size, frames_per_chunk=720)
+        writer = BackgroundFrameWriter(encoder, binary_struct.size)
+        ...
+        writer.close()
+        encoder.close()
+        ```
+    """
+
+    def __init__(
+        self,
+        outfile: BinaryIO,
+        frame_size: int,
+        frames_per_chunk: int = 720,
+        get_timestamp: Callable[..., float] = get_frame_timestamp,
+        encode_payload: Optional[Callable[[bytes], bytes]] = None,
+    ) -> None:
+        """Initialize ChunkedFrameEncoder.
+
+        Args:
+            outfile (BinaryIO): The output file. The header must be written beforehand.
+            frame_size (int): Size of a frame. (bytes)
+            frames_per_chunk (int): Number of frames in a chunk.
+            get_timestamp (Callable[..., float]): Function that returns the timestamp of a frame.
+            encode_payload (Optional[Callable[[bytes], bytes]]): Function that encodes the records of a chunk, e.g.
+                `binary_converter.encode_chunk`. If None, the records are written as they are.
+        """
+        self.outfile = outfile
+        self.frame_size = frame_size
+        self.frames_per_chunk = frames_per_chunk
+        self.get_timestamp = get_timestamp
+        self.encode_payload = encode_payload
+        self.chunks: list[ChunkInfo] = []
+
+        self._chunk = bytearray(frame_size * frames_per_chunk)
+        self._num_frames = 0
+        self._closed = False
+
+    def write(self, data) -> None:
+        """Append frames, and write the chunks that are filled.
+
+        Args:
+            data: Bytes-like object of a multiple of `frame_size` bytes.
+        """
+        data = memoryview(data)
+        while len(data) > 0:
+            start = self._num_frames * self.frame_size
+            size = min(len(data), len(self._chunk) - start)
+            self._chunk[start : start + size] = data[:size]
+            self._num_frames += size // self.frame_size
+            data = data[size:]
+
+            if self._num_frames == self.frames_per_chunk:
+                self._write_chunk()
+
+    def _write_chunk(self) -> None:
+        """Write the buffered frames as a chunk."""
+        payload = memoryview(self._chunk)[: self._num_frames * self.frame_size]
+        first_timestamp = self.get_timestamp(payload[: self.frame_size])
+        last_timestamp = self.get_timestamp(payload[-self.frame_size :])
+        if self.encode_payload is not None:
+            payload = self.encode_payload(payload)
+
+        header = chunk_header_struct.pack(
+            CHUNK_MAGIC, first_timestamp, last_timestamp, self._num_frames, len(payload), 0
+        )
+        crc = zlib.crc32(payload, zlib.crc32(header[:_crc_covered_size]))
+        header = header[:_crc_covered_size] + crc.to_bytes(4, "little")
+
+        self.chunks.append(ChunkInfo(self.outfile.tell(), first_timestamp, last_timestamp, self._num_frames))
+        self.outfile.write(header)
+        self.outfile.write(payload)
+        self._num_frames = 0
+
+    def flush(self) -> None:
+        """Flush the output file."""
+        self.outfile.flush()
+
+    def close(self) -> None:
+        """Write the remaining frames and the footer, and flush the output file. The file itself is not closed."""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._num_frames > 0:
+            self._write_chunk()
+
+        footer_offset = self.outfile.tell()
+        footer = footer_header_struct.pack(FOOTER_MAGIC, len(self.chunks)) + b"".join(
+            index_entry_struct.pack(chunk.offset, chunk.first_timestamp, chunk.last_timestamp, chunk.num_frames)
+            for chunk in self.chunks
+        )
+        self.outfile.write(footer)
+        self.outfile.write(trailer_struct.pack(footer_offset, zlib.crc32(footer), TRAILER_MAGIC))
+        self.outfile.flush()
+
+
+class ChunkedFrameReader:
+    """This class reads chunks of a V2 file.
+
+    The chunk index is read from the footer, so any chunk is reached with a single seek. If the footer is missing or
+    broken, the chunks are found by scanning the file once.
+    """
+
+    def __init__(
+        self,
+        infile: BinaryIO,
+        data_offset: int,
+        frame_size: int,
+        decode_payload: Optional[Callable[[bytes], bytes]] = None,
+        io_lock: Optional[ContextManager] = None,
+    ) -> None:
+        """Initialize ChunkedFrameReader.
+
+        Args:
+            infile (BinaryIO): Input file.
+            data_offset (int): Offset of the first chunk, i.e. the end of the header.
+            frame_size (int): Size of a frame. (bytes)
+            decode_payload (Optional[Callable[[bytes], bytes]]): Function that decodes the payload of a chunk, e.g.
+                `binary_converter.decode_chunk`. It raises ValueError for undecodable payloads. If None, payloads are
+                the records as they are.
+            io_lock (Optional[ContextManager]): Lock or semaphore held while a chunk is read from the file. It is
+                released before the chunk is checked and decoded.
+        """
+        self.infile = infile
+        self.data_offset = data_offset
+        self.frame_size = frame_size
+        self.decode_payload = decode_payload
+        self.io_lock = io_lock or contextlib.nullcontext()
+        self.corrupt_chunk_indices: set[int] = set()
+        self.has_footer = False
+
+        # Offset from which `refresh` looks for appended chunks.
+        self._scan_offset = data_offset
+        chunks = self._read_footer()
+        if chunks is None:
+            logger.warning(f"Chunk index of {getattr(infile, 'name', infile)} is not found. Scanning chunks.")
+            chunks = self._scan_chunks()
+        self.chunks: list[ChunkInfo] = chunks
+
+    @property
+    def num_frames(self) -> int:
+        """Returns the number of frames in all chunks."""
+        return sum(chunk.num_frames for chunk in self.chunks)
+
+    @property
+    def num_corrupt_chunks(self) -> int:
+        """Returns the number of distinct chunks found corrupt so far. A chunk read again is counted once."""
+        return len(self.corrupt_chunk_indices)
+
+    def _read_footer(self) -> Optional[list[ChunkInfo]]:
+        """Read the chunk index from the footer.
+
+        Returns:
+            Optional[list[ChunkInfo]]: Chunk index. None if the footer is missing or broken.
+        """
+        file_size = self.infile.seek(0, 2)
+        if file_size - self.data_offset < footer_header_struct.size + trailer_struct.size:
+            return None
+
+        self.infile.seek(file_size - trailer_struct.size)
+        footer_offset, crc, magic = trailer_struct.unpack(self.infile.read(trailer_struct.size))
+        if magic != TRAILER_MAGIC or not self.data_offset <= footer_offset <= file_size - trailer_struct.size:
+            return None
+
+        self.infile.seek(footer_offset)
+        footer = self.infile.read(file_size - trailer_struct.size - footer_offset)
+        if zlib.crc32(footer) != crc:
+            return None
+
+        magic, num_chunks = footer_header_struct.unpack_from(footer)
+        if magic != FOOTER_MAGIC or len(footer) != footer_header_struct.size + num_chunks * index_entry_struct.size:
+            return None
+        self._scan_offset = footer_offset
+        self.has_footer = True
+        return [
+            ChunkInfo(*entry)
+            for entry in index_entry_struct.iter_unpack(memoryview(footer)[footer_header_struct.size :])
+        ]
+
+    def _scan_chunks(self) -> list[ChunkInfo]:
+        """Find the chunks after `_scan_offset` by their headers. Broken headers are skipped up to the next chunk
+        magic, and a chunk that is not completely written yet is left for the next scan.
+
+        Returns:
+            list[ChunkInfo]: Chunk index.
+        """
+        chunks = []
+        file_size = self.infile.seek(0, 2)
+        if file_size <= self._scan_offset:
+            return chunks
+
+        with mmap.mmap(self.infile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = self._scan_offset
+            while offset + chunk_header_struct.size <= file_size:
+                magic, first_timestamp, last_timestamp, num_frames, payload_size, _ = chunk_header_struct.unpack_from(
+                    data, offset
+                )
+                end = offset + chunk_header_struct.size + payload_size
+                if magic == CHUNK_MAGIC and end <= file_size:
+                    chunks.append(ChunkInfo(offset, first_timestamp, last_timestamp, num_frames))
+                    offset = self._scan_offset = end
+                    continue
+
+                if data[offset : offset + len(FOOTER_MAGIC)] == FOOTER_MAGIC:
+                    break
+                offset = data.find(CHUNK_MAGIC, offset + 1)
+                if offset < 0:
+                    break
+        return chunks
+
+    @property
+    def truncated_bytes(self) -> int:
+        """Returns the size of the bytes after the last complete chunk, e.g. of a chunk cut off by a crash. 0 if the
+        file has a valid footer."""
+        if self.has_footer:
+            return 0
+        return max(os.fstat(self.infile.fileno()).st_size - self._scan_offset, 0)
+
+    def refresh(self) -> list[ChunkInfo]:
+        """Find the complete chunks appended after the known ones, e.g. while the file is being recorded.
+
+        Returns:
+            list[ChunkInfo]: The new chunks, which are also appended to `chunks`.
+        """
+        chunks = self._scan_chunks()
+        self.chunks.extend(chunks)
+        return chunks
+
+    def read_chunk(self, chunk_index: int) -> Optional[bytes]:
+        """Read the payload of a chunk, verify its CRC and decode it.
+
+        Args:
+            chunk_index (int): Index of the chunk.
+
+        Returns:
+            Optional[bytes]: Records of the chunk. None if the chunk is corrupt.
+        """
+        chunk = self.chunks[chunk_index]
+        with self.io_lock:
+            self.infile.seek(chunk.offset)
+            header = self.infile.read(chunk_header_struct.size)
+            payload = None
+            if len(header) == chunk_header_struct.size:
+                magic, _, _, num_frames, payload_size, crc = chunk_header_struct.unpack(header)
+                if magic == CHUNK_MAGIC and num_frames == chunk.num_frames:
+                    payload = self.infile.read(payload_size)
+
+        if payload is not None and zlib.crc32(payload, zlib.crc32(header[:_crc_covered_size])) == crc:
+            payload = self._decode(payload)
+            if payload is not None and len(payload) == num_frames * self.frame_size:
+                return payload
+
+        if chunk_index not in self.corrupt_chunk_indices:
+            self.corrupt_chunk_indices.add(chunk_index)
+            logger.warning(f"Chunk {chunk_index} at offset {chunk.offset} is corrupt, skipped.")
+        return None
+
+    def _decode(self, payload: bytes) -> Optional[bytes]:
+        if self.decode_payload is None:
+            return payload
+        try:
+            return self.decode_payload(payload)
+        except ValueError as e:
+            logger.warning(f"Failed to decode a chunk: {e}")
+            return None
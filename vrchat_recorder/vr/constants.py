@@ -1,10 +1,18 @@
 """This file contains various constants used in vr recorder."""
 
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
 
 class HeaderVersions:
     """This class contains version information."""
 
     V0: str = "v0"
+    V1: str = "v1"  # Only connected devices are stored in each frame. See `variable_device_format.py`.
+    V2: str = "v2"  # Records of V0 in chunks with CRC and a footer index. See `chunked_format.py`.
 
 
 class HeaderNames:
@@ -12,3 +20,187 @@ class HeaderNames:
 
     VERSION: str = "version"
     BINARY_FORMAT: str = "binary_format"
+    DEVICE_FORMAT: str = "device_format"
+    CONTROLLER_FORMAT: str = "controller_format"
+    FRAMES_PER_CHUNK: str = "frames_per_chunk"
+    COMPRESSION: str = "compression"
+    RECORD_LAYOUT: str = "record_layout"
+    FRAME_RATE: str = "frame_rate"
+    CLOCK: str = "clock"
+    DEVICE_REGISTRY: str = "device_registry"
+
+
+class BlockTypes:
+    """This class contains the types of blocks in V1 files."""
+
+    FRAME: bytes = b"F"
+    REGISTRY: bytes = b"R"
+
+
+class RegistryNames:
+    """This class contains the names of device registry entries in V1 files."""
+
+    INDEX: str = "index"
+    SERIAL: str = "serial"
+    DEVICE_CLASS: str = "device_class"
+    CONTROLLER_ROLE: str = "controller_role"
+
+
+class Compressions:
+    """This class contains the compressions of chunks in V2 files. See `binary_converter.encode_chunk`."""
+
+    NONE: str = "none"
+    ZLIB: str = "zlib"
+    LZMA: str = "lzma"
+
+
+class RecordLayouts:
+    """This class contains the layouts of records in V0 and V2 files. Files without the header key are `FLOAT`."""
+
+    FLOAT: str = "float"  # `binary_converter.binary_format`
+    QUANTIZED: str = "quantized"  # `quantization.quantized_binary_format`
+    EXTENDED: str = "extended"  # `binary_converter.extended_binary_format`
+
+
+class Clocks:
+    """This class contains the clocks of the timestamps in tracking files. Files without the header key are
+    `UNIX_TIME`."""
+
+    UNIX_TIME: str = "unix_time"  # seconds since the epoch by `time.time()`.
+
+
+class DeviceRegistries:
+    """This class contains where the devices of a tracking file are described."""
+
+    FIXED: str = "fixed"  # the HMD and the left and right controllers at fixed positions of the record.
+    INLINE: str = "inline"  # registry blocks in the stream whenever the devices change. See `BlockTypes.REGISTRY`.
+
+
+@dataclass(frozen=True)
+class HeaderSchema:
+    """Schema of the header of a file version.
+
+    Attributes:
+        version (str): File format version. See `HeaderVersions`.
+        required (tuple[str, ...]): Header names that must be present.
+        defaults (dict[str, Any]): Header names that may be missing, e.g. in files of older recorders, and their
+            values in that case. `None` means the value is unknown.
+        choices (dict[str, tuple]): Allowed values of header names that the reader interprets.
+        known_values (dict[str, tuple]): Known values of header names that the reader does not interpret. Other values
+            are kept with a warning.
+    """
+
+    version: str
+    required: tuple[str, ...]
+    defaults: dict[str, Any] = field(default_factory=dict)
+    choices: dict[str, tuple] = field(default_factory=dict)
+    known_values: dict[str, tuple] = field(default_factory=dict)
+
+    def validate(self, header: dict) -> dict:
+        """Validate a header and fill the missing optional values. Unknown header names are kept, so headers written
+        by newer recorders with additional information can still be read.
+
+        Args:
+            header (dict): Header read from a file.
+
+        Returns:
+            dict: Header with the defaults filled in.
+
+        Raises:
+            ValueError: A required name is missing, or a value of `choices` is not allowed.
+        """
+        missing = [name for name in self.required if name not in header]
+        if missing:
+            raise ValueError(f"Header of version {self.version} is missing {missing}.")
+
+        header = {**self.defaults, **header}
+        for name, allowed in self.choices.items():
+            if header[name] not in allowed:
+                raise ValueError(f"Unknown {name} for version {self.version}: {header[name]}")
+        for name, known in self.known_values.items():
+            if header[name] not in known:
+                logger.warning(f"Unknown {name} for version {self.version}: {header[name]}. The value is kept.")
+        return header
+
+
+_common_defaults = {HeaderNames.FRAME_RATE: None, HeaderNames.CLOCK: Clocks.UNIX_TIME}
+_record_layouts = (RecordLayouts.FLOAT, RecordLayouts.QUANTIZED, RecordLayouts.EXTENDED)
+
+# Header schemas of the supported file versions. A new layout registers its version here, and `TrackingReader`
+# dispatches to the reader of the version.
+header_schemas: dict[str, HeaderSchema] = {
+    HeaderVersions.V0: HeaderSchema(
+        HeaderVersions.V0,
+        required=(HeaderNames.VERSION, HeaderNames.BINARY_FORMAT),
+        defaults={
+            **_common_defaults,
+            HeaderNames.RECORD_LAYOUT: RecordLayouts.FLOAT,
+            HeaderNames.DEVICE_REGISTRY: DeviceRegistries.FIXED,
+        },
+        choices={
+            HeaderNames.RECORD_LAYOUT: _record_layouts,
+        },
+        known_values={
+            HeaderNames.CLOCK: (Clocks.UNIX_TIME,),
+            HeaderNames.DEVICE_REGISTRY: (DeviceRegistries.FIXED,),
+        },
+    ),
+    HeaderVersions.V1: HeaderSchema(
+        HeaderVersions.V1,
+        required=(
+            HeaderNames.VERSION,
+            HeaderNames.BINARY_FORMAT,
+            HeaderNames.DEVICE_FORMAT,
+            HeaderNames.CONTROLLER_FORMAT,
+        ),
+        defaults={
+            **_common_defaults,
+            HeaderNames.RECORD_LAYOUT: RecordLayouts.FLOAT,
+            HeaderNames.DEVICE_REGISTRY: DeviceRegistries.INLINE,
+        },
+        choices={
+            HeaderNames.RECORD_LAYOUT: (RecordLayouts.FLOAT,),
+        },
+        known_values={
+            HeaderNames.CLOCK: (Clocks.UNIX_TIME,),
+            HeaderNames.DEVICE_REGISTRY: (DeviceRegistries.INLINE,),
+        },
+    ),
+    HeaderVersions.V2: HeaderSchema(
+        HeaderVersions.V2,
+        required=(HeaderNames.VERSION, HeaderNames.BINARY_FORMAT),
+        defaults={
+            **_common_defaults,
+            HeaderNames.RECORD_LAYOUT: RecordLayouts.FLOAT,
+            HeaderNames.DEVICE_REGISTRY: DeviceRegistries.FIXED,
+            HeaderNames.FRAMES_PER_CHUNK: None,
+            HeaderNames.COMPRESSION: Compressions.NONE,
+        },
+        choices={
+            HeaderNames.RECORD_LAYOUT: _record_layouts,
+            HeaderNames.COMPRESSION: (Compressions.NONE, Compressions.ZLIB, Compressions.LZMA),
+        },
+        known_values={
+            HeaderNames.CLOCK: (Clocks.UNIX_TIME,),
+            HeaderNames.DEVICE_REGISTRY: (DeviceRegistries.FIXED,),
+        },
+    ),
+}
+
+
+def validate_header(header: dict) -> dict:
+    """Validate a header by the schema of its version. See `HeaderSchema.validate`.
+
+    Args:
+        header (dict): Header read from a file.
+
+    Returns:
+        dict: Header with the defaults filled in.
+
+    Raises:
+        ValueError: The version is not supported, or the header does not match its schema.
+    """
+    version = header.get(HeaderNames.VERSION)
+    if version not in header_schemas:
+        raise ValueError(f"Unsupported header version: {version}. Supported versions: {list(header_schemas)}")
+    return header_schemas[version].validate(header)
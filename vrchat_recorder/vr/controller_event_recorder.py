@@ -3,12 +3,15 @@
 import csv
 import logging
 import time
-from typing import TextIO
+from typing import Optional, TextIO
 
 import openvr
 
 from ..abc.csv_recorder import CSVRecorder
+from ..abc.frame_scheduler import FrameScheduler
+from ..abc.stream_sink import StreamSink
 from ..data_constants import CSVHeaderNames as HN
+from .device_topology import DeviceTopologyCache
 
 logger = logging.getLogger(__name__)
 
@@ -39,15 +42,27 @@ class ControllerEventRecorder(CSVRecorder):
         vrsystem: openvr.IVRSystem,
         poll_interval: float = 0.001,
         flush_interval: float = 10.0,
+        device_topology: Optional[DeviceTopologyCache] = None,
+        stream_sink: Optional[StreamSink] = None,
     ) -> None:
         """Initialize ControllerEventRecorder.
 
         Args:
             output_file_path (str): Path to save file.
             vrsystem (openvr.IVRSystem): OpenVR system object.
-            poll_interval (float): Interval to poll controller events.
+            poll_interval (float): Interval to poll controller events. (seconds) Must be positive.
             flush_interval (float): Interval to flush file.
+            device_topology (Optional[DeviceTopologyCache]): Cache of device classes and roles. It is invalidated by
+                the polled events. If None, a new one is created.
+            stream_sink (Optional[StreamSink]): If given, every event is also sent to the sink as
+                `StreamMessageTypes.CONTROLLER_EVENT`. The sink is started and closed by the caller.
+
+        Raises:
+            ValueError: `poll_interval` is not positive.
         """
+        if not poll_interval > 0:
+            raise ValueError(f"poll_interval must be positive, but got {poll_interval}.")
+
         csv_headers = [
             HN.TIMESTAMP,
             HN.EVENT_TYPE,
@@ -59,6 +74,12 @@ class ControllerEventRecorder(CSVRecorder):
         self.vrsystem = vrsystem
         self.poll_interval = poll_interval
         self.flush_interval = flush_interval
+        # Polling does not need sub-millisecond accuracy, so the scheduler does not busy-wait.
+        self.scheduler = FrameScheduler(1 / poll_interval, spin_threshold=0.0)
+        if device_topology is None:
+            device_topology = DeviceTopologyCache(vrsystem)
+        self.device_topology = device_topology
+        self.stream_sink = stream_sink
 
     def record(self) -> None:
         """Record data to the output file until Keyboard interrupt or shutdown."""
@@ -69,14 +90,17 @@ class ControllerEventRecorder(CSVRecorder):
             previous_flush = time.time()
 
             try:
+                self.scheduler.start()
                 while not self._shutdown:
                     self._record_controller_events(writer)
                     previous_flush = self._flush_file_if_needed(csvfile, previous_flush)
-                    time.sleep(self.poll_interval)
+                    self.scheduler.wait()
             except KeyboardInterrupt:
                 pass
 
         logger.info("Recording finished.")
+        logger.debug(f"Controller event polling: {self.scheduler.summary()}")
+        logger.debug(f"Device topology cache: {self.device_topology}")
 
     def _record_controller_events(self, writer: csv.DictWriter) -> None:
         """Record controller events if any.
@@ -88,9 +112,18 @@ class ControllerEventRecorder(CSVRecorder):
 
         while self.vrsystem.pollNextEvent(event):
             timestamp = time.time()
+            self.device_topology.handle_event(event)
             if self._is_controller_event(event):
                 data = self._extract_event_data(event, timestamp)
                 writer.writerow(data)
+                if self.stream_sink is not None:
+                    self.stream_sink.send_controller_event(
+                        timestamp,
+                        data[HN.EVENT_TYPE],
+                        data[HN.CONTROLLER_ROLE],
+                        data[HN.BUTTON_ID],
+                        data[HN.AGE_SECONDS],
+                    )
 
     def _is_controller_event(self, event: openvr.VREvent_t) -> bool:
         """Check if the given event is a controller event.
@@ -98,19 +131,14 @@ class ControllerEventRecorder(CSVRecorder):
         Args:
             event (openvr.VREvent_t): Event to check.
         """
-        device_index = event.trackedDeviceIndex
-        device_class = self.vrsystem.getTrackedDeviceClass(device_index)
-
-        if device_class == openvr.TrackedDeviceClass_Controller:
-            event_type = event.eventType
-
-            if event_type in [
-                openvr.VREvent_ButtonPress,
-                openvr.VREvent_ButtonUnpress,
-                openvr.VREvent_ButtonTouch,
-                openvr.VREvent_ButtonUntouch,
-            ]:
-                return True
+        if event.eventType in [
+            openvr.VREvent_ButtonPress,
+            openvr.VREvent_ButtonUnpress,
+            openvr.VREvent_ButtonTouch,
+            openvr.VREvent_ButtonUntouch,
+        ]:
+            device_class = self.device_topology.get_device_class(event.trackedDeviceIndex)
+            return device_class == openvr.TrackedDeviceClass_Controller
 
         return False
 
@@ -122,7 +150,7 @@ class ControllerEventRecorder(CSVRecorder):
             timestamp (float): Timestamp of the event.
         """
         device_index = event.trackedDeviceIndex
-        controller_role = self.vrsystem.getControllerRoleForTrackedDeviceIndex(device_index)
+        controller_role = self.device_topology.get_controller_role(device_index)
         event_type = event.eventType
         button_id = event.data.controller.button
         age_seconds = event.eventAgeSeconds
@@ -0,0 +1,170 @@
+"""This file contains DeviceTopologyCache class that caches the class, role and serial of tracked devices."""
+
+import logging
+import threading
+from typing import Any, Callable, Optional
+
+import openvr
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceTopologyCache:
+    """This class caches the device class, controller role and serial number of each tracked device index.
+
+    Querying them from OpenVR costs a ctypes round trip per call, but they only change when a device is
+    (de)activated or a controller role is reassigned. Cached values are dropped when one of `invalidating_events` is
+    passed to `handle_event`, and are queried again on the next access.
+
+    Usage:
+        ```python
+        from vrchat_recorder.vr.device_topology import DeviceTopologyCache
+
+        vrsystem = openvr.init(openvr.VRApplication_Background)
+        topology = DeviceTopologyCache(vrsystem)
+        device_class = topology.get_device_class(0)
+
+        # Call this for every polled event.
+        topology.handle_event(event)
+        ```
+
+    You can see how well the cache works by `hits` and `misses` properties.
+    """
+
+    invalidating_events = (
+        openvr.VREvent_TrackedDeviceActivated,
+        openvr.VREvent_TrackedDeviceDeactivated,
+        openvr.VREvent_TrackedDeviceRoleChanged,
+    )
+
+    def __init__(self, vrsystem: openvr.IVRSystem) -> None:
+        """Initialize DeviceTopologyCache.
+
+        Args:
+            vrsystem (openvr.IVRSystem): OpenVR system object.
+        """
+        self.vrsystem = vrsystem
+        self._device_classes: dict[int, int] = {}
+        self._controller_roles: dict[int, int] = {}
+        self._serials: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._generation = 0
+
+    @property
+    def hits(self) -> int:
+        """Returns the number of lookups answered from the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Returns the number of lookups that queried OpenVR."""
+        return self._misses
+
+    @property
+    def generation(self) -> int:
+        """Returns the number of invalidations so far. It changes whenever the cached topology may have changed."""
+        return self._generation
+
+    def _lookup(self, cache: dict, device_index: int, query: Callable[[int], Any]) -> Any:
+        """Get a cached value, or query and cache it.
+
+        The lookups run on the sampling and event threads while `invalidate` may run on another one. The value is
+        only cached if no invalidation happened while OpenVR was queried, so a stale value is never kept.
+        """
+        with self._lock:
+            value = cache.get(device_index)
+            if value is not None:
+                self._hits += 1
+                return value
+            self._misses += 1
+            generation = self._generation
+
+        value = query(device_index)
+        with self._lock:
+            if self._generation == generation:
+                cache[device_index] = value
+        return value
+
+    def get_device_class(self, device_index: int) -> int:
+        """Get the device class of the given device index.
+
+        Args:
+            device_index (int): Tracked device index.
+
+        Returns:
+            int: Device class. See `ETrackedDeviceClass` of OpenVR API (openvr.h).
+        """
+        return self._lookup(self._device_classes, device_index, self.vrsystem.getTrackedDeviceClass)
+
+    def get_controller_role(self, device_index: int) -> int:
+        """Get the controller role of the given device index.
+
+        Args:
+            device_index (int): Tracked device index.
+
+        Returns:
+            int: Controller role. Left is 1, right is 2. See `ETrackedControllerRole` of OpenVR API (openvr.h).
+        """
+        return self._lookup(self._controller_roles, device_index, self.vrsystem.getControllerRoleForTrackedDeviceIndex)
+
+    def _query_serial(self, device_index: int) -> str:
+        try:
+            return self.vrsystem.getStringTrackedDeviceProperty(device_index, openvr.Prop_SerialNumber_String)
+        except openvr.error_code.TrackedPropertyError:
+            return ""
+
+    def get_serial(self, device_index: int) -> str:
+        """Get the serial number of the given device index.
+
+        Args:
+            device_index (int): Tracked device index.
+
+        Returns:
+            str: Serial number. Empty string if the device does not report it.
+        """
+        return self._lookup(self._serials, device_index, self._query_serial)
+
+    def invalidate(self, device_index: Optional[int] = None) -> None:
+        """Drop cached values.
+
+        Args:
+            device_index (Optional[int]): Device index to drop. If None, all devices are dropped.
+        """
+        with self._lock:
+            if device_index is None:
+                self._device_classes.clear()
+                self._controller_roles.clear()
+                self._serials.clear()
+            else:
+                self._device_classes.pop(device_index, None)
+                self._controller_roles.pop(device_index, None)
+                self._serials.pop(device_index, None)
+            self._generation += 1
+
+    def handle_event(self, event: openvr.VREvent_t) -> bool:
+        """Invalidate the cache if the given event changes the device topology.
+
+        Role changes may swap roles between devices, so they drop the whole cache.
+
+        Args:
+            event (openvr.VREvent_t): Polled event.
+
+        Returns:
+            bool: True if the cache is invalidated.
+        """
+        event_type = event.eventType
+        if event_type not in self.invalidating_events:
+            return False
+
+        if event_type == openvr.VREvent_TrackedDeviceRoleChanged:
+            self.invalidate()
+        else:
+            self.invalidate(event.trackedDeviceIndex)
+
+        logger.debug(f"Device topology cache invalidated by event {event_type}.")
+        return True
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(hits={self._hits}, misses={self._misses}, generation={self._generation})"
@@ -0,0 +1,267 @@
+"""This file contains the command that exports tracking files to columnar analysis formats.
+
+Frames are read from `TrackingReader` in batches of a fixed number of frames and written to the output one batch at a
+time, so the memory use does not depend on the length of the recording. The columns are the field names of
+`TrackingReader.read_all`, e.g. `timestamp` or `controller.left.thumb_stick.x`.
+
+Formats (see `ExportFormats`):
+    - csv: A header line of the column names and a line per frame. Floats are written with enough digits to be read
+      back exactly.
+    - npz: An array per column, which `np.load` reads like `read_all`. Columns are written to temporary files next to
+      the output and stored into the archive at the end.
+    - parquet: A row group per batch. It requires pyarrow.
+
+Usage:
+    ```
+    python -m vrchat_recorder.vr.export path/to/<date>.tracking.bin --format npz
+    ```
+"""
+
+import argparse
+import csv
+import io
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from typing import ContextManager, Iterator, Optional, Sequence
+
+import numpy as np
+
+from .binary_converter import (
+    binary_dtype,
+    binary_field_names,
+    binary_format,
+    holder_to_binary,
+)
+from .constants import HeaderNames, HeaderVersions
+from .tracking_reader import TrackingReader
+
+
+class ExportFormats:
+    """This class contains the formats that tracking files are exported to."""
+
+    CSV: str = "csv"
+    NPZ: str = "npz"
+    PARQUET: str = "parquet"
+
+
+export_formats = [ExportFormats.CSV, ExportFormats.NPZ, ExportFormats.PARQUET]
+default_batch_size = 65536
+
+# Enough significant digits to read the floats back exactly.
+_float_formats = {"f4": "%.9g", "f8": "%.17g"}
+
+
+def get_export_path(input_file_path: str, export_format: str) -> str:
+    """Get the output path of a tracking file, e.g. `<date>.tracking.csv` for `<date>.tracking.bin`.
+
+    Args:
+        input_file_path (str): Path to the tracking file.
+        export_format (str): See `ExportFormats`.
+
+    Returns:
+        str: The output path.
+    """
+    root, ext = os.path.splitext(input_file_path)
+    if ext != ".bin":
+        root = input_file_path
+    return f"{root}.{export_format}"
+
+
+def iter_column_batches(
+    reader: TrackingReader, batch_size: int = default_batch_size
+) -> Iterator[dict[str, np.ndarray]]:
+    """Iterate the frames of a tracking file as batches of columns from the current position.
+
+    Files of `HeaderVersions.V1` are converted to the columns of `binary_format` (the HMD and both controllers) one
+    frame at a time.
+
+    Args:
+        reader (TrackingReader): The reader.
+        batch_size (int): Maximum number of frames of a batch.
+
+    Yields:
+        dict[str, np.ndarray]: Columns keyed by field name.
+    """
+    if reader.header[HeaderNames.VERSION] != HeaderVersions.V1:
+        while (columns := reader.read_batch(batch_size)) is not None:
+            yield columns
+        return
+
+    dtype = binary_dtype(binary_format, binary_field_names)
+    buffer = bytearray()
+    while (holder := reader.read()) is not None:
+        buffer += holder_to_binary(holder)
+        if len(buffer) == batch_size * dtype.itemsize:
+            records = np.frombuffer(bytes(buffer), dtype=dtype)
+            buffer.clear()
+            yield {name: records[name] for name in dtype.names}
+    if buffer:
+        records = np.frombuffer(bytes(buffer), dtype=dtype)
+        yield {name: records[name] for name in dtype.names}
+
+
+class _CSVWriter:
+    """Writes batches of columns to a CSV file."""
+
+    def __init__(self, output_file_path: str) -> None:
+        self._file = open(output_file_path, "w", newline="")
+        self._format: Optional[str] = None
+
+    def write(self, columns: dict[str, np.ndarray]) -> None:
+        if self._format is None:
+            csv.writer(self._file).writerow(columns.keys())
+            self._format = ",".join(
+                _float_formats.get(f"{c.dtype.kind}{c.dtype.itemsize}", "%d") for c in columns.values()
+            )
+        records = np.rec.fromarrays(list(columns.values()), names=[f"f{i}" for i in range(len(columns))])
+        np.savetxt(self._file, records, fmt=self._format)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _NPZWriter:
+    """Writes batches of columns to an NPZ file through a temporary file per column."""
+
+    def __init__(self, output_file_path: str) -> None:
+        self.output_file_path = output_file_path
+        self._tmp_dir = tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_file_path)))
+        self._files: dict[str, io.BufferedWriter] = {}
+        self._dtypes: dict[str, np.dtype] = {}
+        self._num_frames = 0
+
+    def write(self, columns: dict[str, np.ndarray]) -> None:
+        if not self._files:
+            for index, (name, column) in enumerate(columns.items()):
+                self._files[name] = open(os.path.join(self._tmp_dir.name, f"{index}.raw"), "wb")
+                self._dtypes[name] = column.dtype
+        for name, column in columns.items():
+            self._files[name].write(np.ascontiguousarray(column).tobytes())
+        self._num_frames += len(next(iter(columns.values())))
+
+    def close(self) -> None:
+        try:
+            with zipfile.ZipFile(self.output_file_path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for name, raw_file in self._files.items():
+                    raw_file.close()
+                    header = {
+                        "descr": np.lib.format.dtype_to_descr(self._dtypes[name]),
+                        "fortran_order": False,
+                        "shape": (self._num_frames,),
+                    }
+                    with archive.open(f"{name}.npy", "w", force_zip64=True) as entry:
+                        np.lib.format.write_array_header_2_0(entry, header)
+                        with open(raw_file.name, "rb") as f:
+                            shutil.copyfileobj(f, entry)
+        finally:
+            self._tmp_dir.cleanup()
+
+
+class _ParquetWriter:
+    """Writes batches of columns to a Parquet file with a row group per batch."""
+
+    def __init__(self, output_file_path: str) -> None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Exporting to parquet requires pyarrow. Install it by `pip install pyarrow`.") from e
+        self._pyarrow = pyarrow
+        self.output_file_path = output_file_path
+        self._writer = None
+
+    def write(self, columns: dict[str, np.ndarray]) -> None:
+        table = self._pyarrow.Table.from_pydict(columns)
+        if self._writer is None:
+            self._writer = self._pyarrow.parquet.ParquetWriter(self.output_file_path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+_writers = {ExportFormats.CSV: _CSVWriter, ExportFormats.NPZ: _NPZWriter, ExportFormats.PARQUET: _ParquetWriter}
+
+
+def export_tracking(
+    input_file_path: str,
+    output_file_path: Optional[str] = None,
+    export_format: str = ExportFormats.CSV,
+    batch_size: int = default_batch_size,
+    io_lock: Optional[ContextManager] = None,
+) -> int:
+    """Export a tracking file to a columnar format with constant memory use.
+
+    Args:
+        input_file_path (str): Path to the tracking file.
+        output_file_path (Optional[str]): Path to the output file. Defaults to `get_export_path`.
+        export_format (str): See `ExportFormats`.
+        batch_size (int): Number of frames read and written at once.
+        io_lock (Optional[ContextManager]): Lock or semaphore held while the frames are read from the disk, to limit
+            the disk reads of exports running in parallel. Decoding and writing run without it. See
+            `TrackingReader`.
+
+    Returns:
+        int: Number of exported frames.
+
+    Raises:
+        ValueError: Unknown export format.
+        ImportError: pyarrow is not installed for `ExportFormats.PARQUET`.
+    """
+    if export_format not in _writers:
+        raise ValueError(f"Unknown export format: {export_format}")
+    if output_file_path is None:
+        output_file_path = get_export_path(input_file_path, export_format)
+
+    num_frames = 0
+    with TrackingReader(input_file_path, io_lock) as reader:
+        writer = _writers[export_format](output_file_path)
+        try:
+            for columns in iter_column_batches(reader, batch_size):
+                writer.write(columns)
+                num_frames += len(columns["timestamp"])
+        finally:
+            writer.close()
+    return num_frames
+
+
+def main(arg_list: Optional[Sequence[str]] = None) -> None:
+    """Entry point of `python -m vrchat_recorder.vr.export`.
+
+    Args:
+        arg_list (Optional[Sequence[str]]): List of arguments to parse. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(description="Export VR tracking files to columnar analysis formats.")
+    parser.add_argument("input_file_paths", nargs="+", help="The tracking files (`*.tracking.bin`).")
+    parser.add_argument("--format", default=ExportFormats.CSV, choices=export_formats, help="The output format.")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="The output file. Only for a single input. Defaults to the input path "
+        "with the extension of the format.",
+    )
+    parser.add_argument(
+        "--batch_size", type=int, default=default_batch_size, help="The number of frames read and written at once."
+    )
+    args = parser.parse_args(arg_list)
+    if args.output is not None and len(args.input_file_paths) > 1:
+        parser.error("--output can only be used with a single input file.")
+
+    for input_file_path in args.input_file_paths:
+        output_file_path = args.output or get_export_path(input_file_path, args.format)
+        start = time.perf_counter()
+        num_frames = export_tracking(input_file_path, output_file_path, args.format, args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{input_file_path} -> {output_file_path}: {num_frames} frames in {elapsed:.2f} s "
+            f"({num_frames / max(elapsed, 1e-9):.0f} frames/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""This file contains FrameView class, a lazy view of a record of vr tracking data.
+
+`binary_to_holder` unpacks every item of a record into a new `VRDeviceTrackingDataHolder`. A `FrameView` keeps a
+reference to the record instead, and an item is unpacked only when its attribute is accessed. The attribute paths are
+the same as `VRDeviceTrackingDataHolder`, e.g. `view.hmd.position.x` or `view.controller.left.thumb_stick.y`.
+
+The view is only valid while the underlying buffer is not modified. Use `to_holder` to keep the values.
+"""
+
+import struct
+from typing import Optional
+
+from .binary_converter import (
+    binary_struct,
+    binary_to_holder,
+    hmd_offset,
+    left_controller_axes_offset,
+    left_controller_offset,
+    right_controller_axes_offset,
+    right_controller_offset,
+)
+from .tracking_data_holders import VRDeviceTrackingDataHolder
+
+_float_struct = struct.Struct("f")
+_timestamp_struct = struct.Struct("d")
+
+
+def _float_property(index: int) -> property:
+    """Create a property that unpacks the `index`-th float from the offset of the view."""
+
+    def get(self) -> float:
+        return _float_struct.unpack_from(self._buffer, self._offset + index * _float_struct.size)[0]
+
+    return property(get)
+
+
+class _View:
+    """Base class of the views. It holds the buffer of the record and the byte offset of the part."""
+
+    __slots__ = ("_buffer", "_offset")
+
+    def __init__(self, buffer, offset: int) -> None:
+        self._buffer = buffer
+        self._offset = offset
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{self.__class__.__name__}({values})"
+
+
+class PositionView(_View):
+    """View of `Position`."""
+
+    __slots__ = ()
+    _fields = ("x", "y", "z")
+    x = _float_property(0)
+    y = _float_property(1)
+    z = _float_property(2)
+
+
+class OrientationView(_View):
+    """View of `Orientation`."""
+
+    __slots__ = ()
+    _fields = ("x", "y", "z", "w")
+    x = _float_property(0)
+    y = _float_property(1)
+    z = _float_property(2)
+    w = _float_property(3)
+
+
+class AxisView(_View):
+    """View of `Axis`."""
+
+    __slots__ = ()
+    _fields = ("x", "y")
+    x = _float_property(0)
+    y = _float_property(1)
+
+
+class TrackingDataView(_View):
+    """View of `TrackingData`."""
+
+    __slots__ = ()
+    _fields = ("position", "orientation")
+
+    @property
+    def position(self) -> PositionView:
+        return PositionView(self._buffer, self._offset)
+
+    @property
+    def orientation(self) -> OrientationView:
+        return OrientationView(self._buffer, self._offset + 3 * _float_struct.size)
+
+
+def _axis_property(index: int) -> property:
+    """Create a property that returns the view of the `index`-th axis of a controller."""
+
+    def get(self) -> AxisView:
+        return AxisView(self._buffer, self._axes_offset + index * 2 * _float_struct.size)
+
+    return property(get)
+
+
+class ControllerTrackingDataView(TrackingDataView):
+    """View of `ControllerTrackingData`."""
+
+    __slots__ = ("_axes_offset",)
+    _fields = TrackingDataView._fields + (
+        "thumb_stick",
+        "first_trigger",
+        "second_trigger",
+        "third_trigger",
+        "fourth_trigger",
+    )
+
+    def __init__(self, buffer, offset: int, axes_offset: int) -> None:
+        super().__init__(buffer, offset)
+        self._axes_offset = axes_offset
+
+    thumb_stick = _axis_property(0)
+    first_trigger = _axis_property(1)
+    second_trigger = _axis_property(2)
+    third_trigger = _axis_property(3)
+    fourth_trigger = _axis_property(4)
+
+
+class BothControllerTrackingDataView(_View):
+    """View of `BothControllerTrackingData`."""
+
+    __slots__ = ()
+    _fields = ("left", "right")
+
+    @property
+    def left(self) -> ControllerTrackingDataView:
+        return ControllerTrackingDataView(
+            self._buffer, self._offset + left_controller_offset, self._offset + left_controller_axes_offset
+        )
+
+    @property
+    def right(self) -> ControllerTrackingDataView:
+        return ControllerTrackingDataView(
+            self._buffer, self._offset + right_controller_offset, self._offset + right_controller_axes_offset
+        )
+
+
+class FrameView(_View):
+    """Lazy view of a record of `binary_format` with the attribute paths of `VRDeviceTrackingDataHolder`.
+
+    Records of `RecordLayouts.EXTENDED` start with `binary_format`, so they can be viewed as well.
+
+    Usage:
+        ```python
+        from vrchat_recorder.vr.frame_view import FrameView
+
+        view = FrameView(records, offset=frame_index * binary_struct.size)
+        view.hmd.position.x  # only this float is unpacked.
+        ```
+    """
+
+    __slots__ = ()
+    _fields = ("timestamp", "hmd", "controller")
+
+    def __init__(self, buffer, offset: int = 0) -> None:
+        """Initialize FrameView.
+
+        Args:
+            buffer: Bytes-like object that contains the record. It is not copied.
+            offset (int): Byte offset of the record in the buffer.
+        """
+        super().__init__(buffer, offset)
+
+    @property
+    def timestamp(self) -> float:
+        return _timestamp_struct.unpack_from(self._buffer, self._offset)[0]
+
+    @property
+    def hmd(self) -> TrackingDataView:
+        return TrackingDataView(self._buffer, self._offset + hmd_offset)
+
+    @property
+    def controller(self) -> BothControllerTrackingDataView:
+        return BothControllerTrackingDataView(self._buffer, self._offset)
+
+    def to_holder(self, dst: Optional[VRDeviceTrackingDataHolder] = None) -> VRDeviceTrackingDataHolder:
+        """Converts the record to DataHolder class.
+
+        Args:
+            dst (Optional[VRDeviceTrackingDataHolder], optional): Destination DataHolder class. Defaults to None.
+
+        Returns:
+            VRDeviceTrackingDataHolder: DataHolder class.
+        """
+        return binary_to_holder(memoryview(self._buffer)[self._offset : self._offset + binary_struct.size], dst)
@@ -0,0 +1,192 @@
+"""This file contains the quantized record layout (`RecordLayouts.QUANTIZED`) of vr tracking data.
+
+The quantized layout stores the same values as `binary_converter.binary_format` in fixed point:
+    - timestamp: int64 nanoseconds.
+    - position: int32 micrometres per axis.
+    - orientation: smallest-three encoding. The component with the largest magnitude is dropped (its index is stored
+      in 2 bits of `orientation_indices`) and made positive by negating the quaternion, and the other three are
+      stored as int16 scaled from [-1/sqrt(2), 1/sqrt(2)]. A zero quaternion (never tracked device) is stored as
+      `zero_quaternion_marker`.
+    - thumb stick and triggers: int8 scaled from [-1, 1]. Values outside the range are clipped. A step of 1 / 127 is
+      finer than the noise of the analog inputs, and int16 would take 20 more bytes per record.
+
+Non-finite values would be undefined when cast to integers, so NaN is stored as 0 and infinities are clipped like
+other out-of-range values. A quaternion with a non-finite component is stored as a zero quaternion.
+
+A record is `quantized_binary_format` (83 bytes instead of 172, 48% of the size). Records are quantized on the writer thread by
+`QuantizingSink`, and `TrackingReader` dequantizes them automatically when `HeaderNames.RECORD_LAYOUT` says so.
+
+Error bounds of the dequantized values compared with the recorded values (checked by the tests):
+    - timestamp: `timestamp_error_bound` (0.5 microseconds, dominated by float64 resolution of unix time in ns).
+    - position: `position_error_bound` (1 micrometre) per axis within 8 metres of the origin: 0.5 micrometres of
+      quantization plus the float32 rounding of the dequantized value. Positions are clipped to +-2147 metres.
+    - orientation: `orientation_error_bound` (4e-5) per component of the normalized quaternion, up to the sign of
+      the whole quaternion (q and -q are the same rotation). This is below 0.01 degrees of rotation.
+    - thumb stick and triggers: `axis_error_bound` (4e-3, half a step of 1 / 127 plus float32 rounding) per value in
+      [-1, 1].
+"""
+
+import math
+import struct
+
+import numpy as np
+
+from .binary_converter import axes_field_names, binary_dtype, binary_schema
+from .record_schema import QuantizationKinds
+
+_pose_names = ["position.x", "position.y", "position.z", "orientation.a", "orientation.b", "orientation.c"]
+
+quantized_binary_format = " ".join(
+    [
+        "<",
+        "q",  # timestamp (ns)
+        "B",  # orientation indices of hmd, left and right controller (2 bits each)
+        "3i 3h",  # hmd position (um) and orientation
+        "3i 3h",  # left controller position (um) and orientation
+        "10b",  # left controller thumb stick and first to fourth triggers
+        "3i 3h",  # right controller position (um) and orientation
+        "10b",  # right controller thumb stick and first to fourth triggers
+    ]
+)
+quantized_field_names = (
+    ["timestamp", "orientation_indices"]
+    + [f"hmd.{name}" for name in _pose_names]
+    + [f"controller.{side}.{name}" for side in ["left", "right"] for name in _pose_names + axes_field_names]
+)
+quantized_struct = struct.Struct(quantized_binary_format)
+quantized_dtype = binary_dtype(quantized_binary_format, quantized_field_names)
+float_dtype = binary_schema.dtype
+
+_devices = ["hmd", "controller.left", "controller.right"]
+_position_scale = 1e6
+_orientation_scale = 32767 * math.sqrt(2)
+_axis_scale = 127
+zero_quaternion_marker = -32768
+
+timestamp_error_bound = 0.5e-6
+position_error_bound = 1 / _position_scale
+orientation_error_bound = 4e-5
+axis_error_bound = 4e-3
+
+_int64_max = 2**63 - 1024  # largest float64 below 2**63.
+
+# Indices of the three stored components for each index of the dropped one.
+_kept_components = np.array([[j for j in range(4) if j != i] for i in range(4)])
+
+
+def _to_fixed_point(values: np.ndarray, scale: float, low: float, high: float) -> np.ndarray:
+    """Scale, round and clip values to fixed point. NaN is converted to 0, and infinities are clipped."""
+    return np.clip(np.nan_to_num(np.round(values * scale), nan=0.0), low, high)
+
+
+def quantize_records(binary) -> bytes:
+    """Quantize records of `binary_format`.
+
+    Args:
+        binary: Bytes-like object of records of `binary_format`.
+
+    Returns:
+        bytes: Records of `quantized_binary_format`.
+    """
+    records = np.frombuffer(binary, dtype=float_dtype)
+    quantized = np.zeros(len(records), dtype=quantized_dtype)
+    quantized["timestamp"] = _to_fixed_point(records["timestamp"], 1e9, -_int64_max, _int64_max)
+
+    for name in binary_schema.paths(QuantizationKinds.POSITION):
+        quantized[name] = _to_fixed_point(records[name], _position_scale, -(2**31), 2**31 - 1)
+    for name in binary_schema.paths(QuantizationKinds.AXIS):
+        quantized[name] = _to_fixed_point(records[name], _axis_scale, -_axis_scale, _axis_scale)
+
+    rows = np.arange(len(records))[:, None]
+    for device_index, device in enumerate(_devices):
+        quaternion = np.stack([records[f"{device}.orientation.{c}"] for c in "xyzw"], axis=1).astype(float)
+        quaternion[~np.all(np.isfinite(quaternion), axis=1)] = 0.0
+        norm = np.linalg.norm(quaternion, axis=1)
+        is_zero = norm == 0
+        quaternion /= np.where(is_zero, 1.0, norm)[:, None]
+
+        largest = np.argmax(np.abs(quaternion), axis=1)
+        sign = np.where(quaternion[rows[:, 0], largest] < 0, -1.0, 1.0)
+        kept = quaternion[rows, _kept_components[largest]] * sign[:, None]
+        kept = np.clip(np.round(kept * _orientation_scale), -32767, 32767)
+        kept[is_zero] = zero_quaternion_marker
+        for name, column in zip(["a", "b", "c"], kept.T):
+            quantized[f"{device}.orientation.{name}"] = column
+        quantized["orientation_indices"] |= (np.where(is_zero, 0, largest) << (2 * device_index)).astype(np.uint8)
+
+    return quantized.tobytes()
+
+
+def dequantize_records(binary) -> bytes:
+    """Dequantize records of `quantized_binary_format`.
+
+    Args:
+        binary: Bytes-like object of records of `quantized_binary_format`.
+
+    Returns:
+        bytes: Records of `binary_format`.
+    """
+    quantized = np.frombuffer(binary, dtype=quantized_dtype)
+    records = np.zeros(len(quantized), dtype=float_dtype)
+    records["timestamp"] = quantized["timestamp"] / 1e9
+
+    for name in binary_schema.paths(QuantizationKinds.POSITION):
+        records[name] = quantized[name] / _position_scale
+    for name in binary_schema.paths(QuantizationKinds.AXIS):
+        records[name] = quantized[name] / _axis_scale
+
+    rows = np.arange(len(quantized))[:, None]
+    for device_index, device in enumerate(_devices):
+        kept = np.stack([quantized[f"{device}.orientation.{name}"] for name in "abc"], axis=1)
+        is_zero = kept[:, 0] == zero_quaternion_marker
+        kept = kept / _orientation_scale
+        largest = (quantized["orientation_indices"] >> (2 * device_index)) & 3
+
+        quaternion = np.zeros((len(quantized), 4))
+        quaternion[rows, _kept_components[largest]] = kept
+        quaternion[rows[:, 0], largest] = np.sqrt(np.maximum(0.0, 1.0 - np.sum(kept**2, axis=1)))
+        quaternion[is_zero] = 0.0
+        for c, column in zip("xyzw", quaternion.T):
+            records[f"{device}.orientation.{c}"] = column
+
+    return records.tobytes()
+
+
+def get_quantized_timestamp(frame) -> float:
+    """Get the timestamp of a record of `quantized_binary_format`.
+
+    Args:
+        frame: Bytes-like object of a record.
+
+    Returns:
+        float: Timestamp. (seconds)
+    """
+    return quantized_struct.unpack_from(frame)[0] / 1e9
+
+
+class QuantizingSink:
+    """This class quantizes records of `binary_format` and writes them to another file.
+
+    It has `write` and `flush` methods, so it can be given to `BackgroundFrameWriter` as the output file, and the
+    quantization runs on the writer thread.
+    """
+
+    def __init__(self, outfile) -> None:
+        """Initialize QuantizingSink.
+
+        Args:
+            outfile: The output file, or another sink such as `ChunkedFrameEncoder`.
+        """
+        self.outfile = outfile
+
+    def write(self, data) -> None:
+        """Quantize and write records.
+
+        Args:
+            data: Bytes-like object of records of `binary_format`.
+        """
+        self.outfile.write(quantize_records(data))
+
+    def flush(self) -> None:
+        """Flush the output file."""
+        self.outfile.flush()
@@ -0,0 +1,203 @@
+"""This file contains the declarative schema of fixed-size records of vr tracking data.
+
+A `RecordSchema` is a list of `SchemaField`s (attribute path of `VRDeviceTrackingDataHolder`, struct code and
+optional quantization kind). The struct format, the precompiled `struct.Struct`, the NumPy dtype and the field names
+are derived from it, and the encoder and decoder between holders and records are generated as specialised Python
+functions once, so the order of the values is never written by hand.
+
+Usage:
+    ```python
+    schema = RecordSchema(
+        [SchemaField("timestamp", "d"), SchemaField("hmd.position.x", "f"), ...],
+        create_holder=create_empty_data_holder,
+    )
+    binary = schema.encode(holder)
+    holder = schema.decode(binary)
+    ```
+"""
+
+import re
+import struct
+from typing import Callable, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+
+class QuantizationKinds:
+    """This class contains the kinds of values that `quantization` stores in fixed point."""
+
+    TIMESTAMP: str = "timestamp"
+    POSITION: str = "position"
+    ORIENTATION: str = "orientation"
+    AXIS: str = "axis"
+
+
+class SchemaField(NamedTuple):
+    """Field of a record."""
+
+    path: str  # attribute path of the holder, e.g. `hmd.position.x`.
+    code: str  # struct code, e.g. `f`.
+    quantization: Optional[str] = None  # See `QuantizationKinds`.
+
+
+_format_item_pattern = re.compile(r"(\d*)([xcbB?hHiIlLqQnNefds])")
+_byte_orders = {"<": "<", ">": ">", "!": ">", "=": "=", "@": "="}
+
+
+def binary_dtype(binary_format: str, names: Optional[Sequence[str]] = None) -> np.dtype:
+    """Create the NumPy structured dtype of a struct format, with the same offsets and size.
+
+    Args:
+        binary_format (str): Struct format, e.g. `binary_format`.
+        names (Optional[Sequence[str]]): Field names. Defaults to `f0`, `f1`, ...
+
+    Returns:
+        np.dtype: Structured dtype. Each item of the format is a field, and pad bytes are skipped.
+    """
+    byte_order = "="
+    prefix = ""
+    if binary_format[:1] in _byte_orders:
+        byte_order = _byte_orders[binary_format[0]]
+        prefix = binary_format[0]
+        binary_format = binary_format[1:]
+
+    formats, offsets = [], []
+    consumed = prefix
+    for count, char in _format_item_pattern.findall(binary_format):
+        count = int(count) if count else 1
+        if char == "x":
+            consumed += f"{count}x"
+            continue
+        if char == "s":
+            items = [(f"S{count}", f"{count}s")]
+        elif char in "c?":
+            items = [("S1" if char == "c" else "?", char)] * count
+        else:
+            kind = "f" if char in "efd" else ("u" if char in "BHILQN" else "i")
+            items = [(f"{byte_order}{kind}{struct.calcsize(prefix + char)}", char)] * count
+        for numpy_format, item in items:
+            consumed += item
+            offsets.append(struct.calcsize(consumed) - struct.calcsize(prefix + item))
+            formats.append(numpy_format)
+
+    if names is None:
+        names = [f"f{i}" for i in range(len(formats))]
+    return np.dtype(
+        {
+            "names": list(names),
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": struct.calcsize(prefix + binary_format),
+        }
+    )
+
+
+def _parent_path(path: str) -> str:
+    return path.rpartition(".")[0]
+
+
+class _LocalNames:
+    """Names of the local variables that hold the intermediate objects of attribute paths in generated code."""
+
+    def __init__(self, root: str) -> None:
+        self.names = {"": root}
+        self.lines: list[str] = []
+
+    def get(self, path: str) -> str:
+        """Returns the local variable of the object at `path`, emitting its assignment on first use."""
+        if path not in self.names:
+            parent, _, attribute = path.rpartition(".")
+            parent_name = self.get(parent)
+            name = f"o{len(self.names)}"
+            self.lines.append(f"    {name} = {parent_name}.{attribute}")
+            self.names[path] = name
+        return self.names[path]
+
+    def attribute(self, path: str) -> str:
+        """Returns the expression of the attribute at `path`."""
+        parent, _, attribute = path.rpartition(".")
+        return f"{self.get(parent)}.{attribute}"
+
+
+class RecordSchema:
+    """This class is a schema of fixed-size records, from which the codec is generated.
+
+    Attributes:
+        fields (list[SchemaField]): Fields in record order.
+        format (str): Struct format. Codes of consecutive fields with the same parent path and code are written
+            together, e.g. `d fff ffff`.
+        struct (struct.Struct): Precompiled struct of `format`.
+        field_names (list[str]): Attribute paths of the fields.
+        dtype (np.dtype): NumPy structured dtype of the records, named by `field_names`.
+    """
+
+    def __init__(self, fields: Sequence[SchemaField], create_holder: Optional[Callable[[], object]] = None) -> None:
+        """Initialize RecordSchema and generate its codec.
+
+        Args:
+            fields (Sequence[SchemaField]): Fields in record order.
+            create_holder (Optional[Callable[[], object]]): Function that creates an empty holder, used by `decode`
+                without `dst`. If None, only the format and dtype are derived and `encode` and `decode` are not
+                available, e.g. for layouts with values that holders do not have.
+        """
+        self.fields = list(fields)
+        self.field_names = [f.path for f in self.fields]
+        if len(set(self.field_names)) != len(self.field_names):
+            raise ValueError("Field paths of a record schema must be unique.")
+
+        groups: list[str] = []
+        previous = None
+        for f in self.fields:
+            if previous is not None and (_parent_path(f.path), f.code) == (_parent_path(previous.path), previous.code):
+                groups[-1] += f.code
+            else:
+                groups.append(f.code)
+            previous = f
+        self.format = " ".join(groups)
+        self.struct = struct.Struct(self.format)
+        self.dtype = binary_dtype(self.format, self.field_names)
+
+        self.create_holder = create_holder
+        if create_holder is not None:
+            self.encode, self.decode = self._generate_codec()
+
+    def paths(self, quantization: str) -> list[str]:
+        """Returns the attribute paths of the fields of a quantization kind. See `QuantizationKinds`."""
+        return [f.path for f in self.fields if f.quantization == quantization]
+
+    def _generate_codec(self) -> tuple[Callable, Callable]:
+        """Generate the encoder and decoder functions.
+
+        Each intermediate object of the attribute paths (e.g. `holder.controller.left`) is loaded once into a local
+        variable, and all values are packed or unpacked by a single struct call.
+
+        Returns:
+            tuple[Callable, Callable]: `encode(holder) -> bytes` and `decode(binary, dst=None) -> holder`.
+        """
+        values = [f"v{i}" for i in range(len(self.fields))]
+
+        encoder = _LocalNames("holder")
+        arguments = [encoder.attribute(path) for path in self.field_names]
+        encoder_source = "\n".join(
+            ["def encode(holder):"] + encoder.lines + [f"    return _pack({', '.join(arguments)})"]
+        )
+
+        decoder = _LocalNames("holder")
+        assignments = [f"    {decoder.attribute(path)} = {value}" for path, value in zip(self.field_names, values)]
+        decoder_source = "\n".join(
+            [
+                "def decode(binary, dst=None):",
+                f"    ({', '.join(values)},) = _unpack(binary)",
+                "    holder = _create_holder() if dst is None else dst",
+            ]
+            + decoder.lines
+            + assignments
+            + ["    return holder"]
+        )
+
+        namespace = {"_pack": self.struct.pack, "_unpack": self.struct.unpack, "_create_holder": self.create_holder}
+        exec(compile(encoder_source + "\n\n\n" + decoder_source, f"<record schema {self.format}>", "exec"), namespace)
+        return namespace["encode"], namespace["decode"]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(format={self.format!r})"
@@ -0,0 +1,214 @@
+"""This file contains the resampler of vr tracking data to a uniform time grid.
+
+The timestamps written by `TrackingRecorder` are irregular because of the jitter of the sampling loop. The resampler
+interpolates the columns of `TrackingReader.read_batch` (or `read_all`) at `start_time + k / frame_rate`:
+    - Quaternions (`<device>.orientation.x`, `y`, `z`, `w`) are interpolated by slerp. The second quaternion is
+      negated when it is on the other hemisphere, so the shorter rotation is taken. Zero quaternions (never tracked
+      devices) hold the previous sample.
+    - Other float columns (positions, axes, velocities) are interpolated linearly.
+    - Other columns (flags, tracking results) hold the previous sample.
+
+All values are computed by NumPy over whole batches. `StreamingResampler` carries the last frame of a batch over to the
+next one, so a multi-hour file is resampled batch by batch with constant memory and the same result as at once.
+Timestamps must be non-decreasing.
+
+Usage:
+    ```python
+    with TrackingReader("path/to/file.bin") as reader:
+        for columns in resample_reader(reader, 90):
+            columns["hmd.position.x"]
+    ```
+"""
+
+import math
+from typing import Iterator, Optional
+
+import numpy as np
+
+from .export import default_batch_size, iter_column_batches
+from .tracking_reader import TrackingReader
+
+_quaternion_components = "xyzw"
+
+
+def _quaternion_groups(names) -> list[list[str]]:
+    """Returns the names of the x, y, z and w columns of each quaternion in the columns."""
+    groups = []
+    for name in names:
+        if name.endswith(".orientation.x"):
+            group = [name[:-1] + c for c in _quaternion_components]
+            if all(n in names for n in group):
+                groups.append(group)
+    return groups
+
+
+def slerp(q0: np.ndarray, q1: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    """Spherical linear interpolation of quaternions with hemisphere correction.
+
+    Args:
+        q0 (np.ndarray): Quaternions of shape (n, 4).
+        q1 (np.ndarray): Quaternions of shape (n, 4).
+        alpha (np.ndarray): Interpolation weights of shape (n,), 0 for `q0` and 1 for `q1`.
+
+    Returns:
+        np.ndarray: Unit quaternions of shape (n, 4). Rows where `q0` or `q1` is zero are `q0`.
+    """
+    q0 = np.asarray(q0, dtype=np.float64)
+    q1 = np.asarray(q1, dtype=np.float64)
+    norm0 = np.linalg.norm(q0, axis=1)
+    norm1 = np.linalg.norm(q1, axis=1)
+    is_zero = (norm0 == 0) | (norm1 == 0)
+    u0 = q0 / np.where(norm0 == 0, 1.0, norm0)[:, None]
+    u1 = q1 / np.where(norm1 == 0, 1.0, norm1)[:, None]
+
+    dot = np.einsum("ij,ij->i", u0, u1)
+    u1 = np.where(dot[:, None] < 0, -u1, u1)  # q and -q are the same rotation.
+    theta = np.arccos(np.clip(np.abs(dot), 0.0, 1.0))
+    sin_theta = np.sin(theta)
+    is_close = sin_theta < 1e-6  # linear interpolation, normalized below.
+    sin_theta = np.where(is_close, 1.0, sin_theta)
+    w0 = np.where(is_close, 1 - alpha, np.sin((1 - alpha) * theta) / sin_theta)
+    w1 = np.where(is_close, alpha, np.sin(alpha * theta) / sin_theta)
+
+    q = w0[:, None] * u0 + w1[:, None] * u1
+    norm = np.linalg.norm(q, axis=1)
+    q /= np.where(norm == 0, 1.0, norm)[:, None]
+    q[is_zero] = q0[is_zero]
+    return q
+
+
+def resample_columns(columns: dict[str, np.ndarray], times: np.ndarray) -> dict[str, np.ndarray]:
+    """Interpolate columns at the given times. Times out of the range of the timestamps hold the first or last frame.
+
+    Args:
+        columns (dict[str, np.ndarray]): Columns keyed by field name with a `timestamp` column, e.g. of `read_batch`.
+            The timestamps must be non-decreasing.
+        times (np.ndarray): Times to interpolate at.
+
+    Returns:
+        dict[str, np.ndarray]: Columns of the same names and dtypes. The `timestamp` column is `times`.
+
+    Raises:
+        ValueError: The columns have no frames.
+    """
+    timestamps = np.asarray(columns["timestamp"], dtype=np.float64)
+    times = np.asarray(times, dtype=np.float64)
+    if len(timestamps) == 0:
+        raise ValueError("Columns without frames can not be resampled.")
+
+    lower = np.clip(np.searchsorted(timestamps, times, side="right") - 1, 0, len(timestamps) - 1)
+    upper = np.minimum(lower + 1, len(timestamps) - 1)
+    interval = timestamps[upper] - timestamps[lower]
+    alpha = np.divide(times - timestamps[lower], interval, out=np.zeros(len(times)), where=interval > 0)
+    alpha = np.clip(alpha, 0.0, 1.0)
+
+    groups = _quaternion_groups(columns)
+    quaternion_names = {name for group in groups for name in group}
+    resampled = {}
+    for name, column in columns.items():
+        if name in quaternion_names:
+            continue
+        if column.dtype.kind == "f":
+            v0 = column[lower].astype(np.float64)
+            resampled[name] = (v0 + alpha * (column[upper] - v0)).astype(column.dtype)
+        else:
+            resampled[name] = column[lower]
+
+    for group in groups:
+        q0 = np.stack([columns[name][lower] for name in group], axis=1)
+        q1 = np.stack([columns[name][upper] for name in group], axis=1)
+        for name, component in zip(group, slerp(q0, q1, alpha).T):
+            resampled[name] = component.astype(columns[name].dtype)
+
+    resampled["timestamp"] = times.astype(columns["timestamp"].dtype)
+    return {name: resampled[name] for name in columns}
+
+
+class StreamingResampler:
+    """This class resamples batches of columns to a uniform time grid, carrying the last frame of a batch over to the
+    next one.
+
+    Usage:
+        ```python
+        resampler = StreamingResampler(90)
+        while (columns := reader.read_batch(65536)) is not None:
+            resampled = resampler.resample(columns)
+        ```
+    """
+
+    def __init__(self, frame_rate: float, start_time: Optional[float] = None) -> None:
+        """Initialize StreamingResampler.
+
+        Args:
+            frame_rate (float): Frame rate of the grid. (Hz)
+            start_time (Optional[float]): Time of the first grid point. Defaults to the first timestamp. Grid points
+                before the first timestamp are not output.
+
+        Raises:
+            ValueError: The frame rate is not positive.
+        """
+        if frame_rate <= 0:
+            raise ValueError(f"Frame rate must be positive: {frame_rate}")
+        self.frame_rate = frame_rate
+        self.start_time = start_time
+        self._next_index: Optional[int] = None
+        self._last: Optional[dict[str, np.ndarray]] = None
+
+    def resample(self, columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        """Resample the next batch. Grid points up to the last timestamp of the batch are output.
+
+        Args:
+            columns (dict[str, np.ndarray]): Columns keyed by field name with a `timestamp` column, following the
+                previous batch.
+
+        Returns:
+            dict[str, np.ndarray]: Resampled columns. They may have no frames if the batch is shorter than a period.
+        """
+        if self._last is not None:
+            columns = {name: np.concatenate([self._last[name], column]) for name, column in columns.items()}
+        timestamps = columns["timestamp"]
+        if len(timestamps) == 0:
+            return {name: column[:0] for name, column in columns.items()}
+
+        if self.start_time is None:
+            self.start_time = float(timestamps[0])
+        if self._next_index is None:
+            self._next_index = max(0, math.ceil((timestamps[0] - self.start_time) * self.frame_rate))
+        stop_index = max(self._next_index, math.floor((timestamps[-1] - self.start_time) * self.frame_rate) + 1)
+
+        times = self.start_time + np.arange(self._next_index, stop_index) / self.frame_rate
+        self._next_index = stop_index
+        self._last = {name: column[-1:].copy() for name, column in columns.items()}
+        return resample_columns(columns, times)
+
+
+def resample_reader(
+    reader: TrackingReader,
+    frame_rate: Optional[float] = None,
+    start_time: Optional[float] = None,
+    batch_size: int = default_batch_size,
+) -> Iterator[dict[str, np.ndarray]]:
+    """Resample the frames of a tracking file from the current position batch by batch.
+
+    Args:
+        reader (TrackingReader): The reader.
+        frame_rate (Optional[float]): Frame rate of the grid. Defaults to the frame rate of the header.
+        start_time (Optional[float]): Time of the first grid point. Defaults to the first timestamp.
+        batch_size (int): Number of frames read at once.
+
+    Yields:
+        dict[str, np.ndarray]: Resampled columns keyed by field name.
+
+    Raises:
+        ValueError: No frame rate is given and the header does not have one.
+    """
+    if frame_rate is None:
+        frame_rate = reader.frame_rate
+    if frame_rate is None:
+        raise ValueError("The header has no frame rate. Specify the frame rate to resample to.")
+
+    resampler = StreamingResampler(frame_rate, start_time)
+    for columns in iter_column_batches(reader, batch_size):
+        resampled = resampler.resample(columns)
+        if len(resampled["timestamp"]) > 0:
+            yield resampled
@@ -0,0 +1,249 @@
+"""This file contains the shared memory ring buffer that publishes the latest frames of vr tracking data.
+
+`TrackingRecorder` writes every sampled frame into a `multiprocessing.shared_memory` block by
+`SharedFramePublisher`, and other processes on the machine (overlays, online labelling, ...) read the latest frames
+by `SharedFrameSubscriber` instead of opening their own OpenVR connection.
+
+The block is laid out as follows:
+    - Header: `ring_header_format` (magic, capacity, frame size, number of published frames and the struct format of
+      the frames, or empty for frames without a fixed format such as `DeviceFrame`).
+    - Slots: `capacity` slots of `slot_sequence_format` (sequence number) followed by the frame, padded to 8 bytes.
+
+Each slot is a seqlock: the publisher sets its sequence number to `2 * i + 1` before writing the `i`-th frame and to
+`2 * i + 2` after, and then increments the number of published frames. A subscriber copies the slots and checks their
+sequence numbers before and after the copy, so frames that were being overwritten are dropped without any lock and
+the publisher never waits for subscribers.
+
+Usage:
+    ```python
+    # recording process
+    publisher = SharedFramePublisher("vrchat_recorder_tracking", binary_struct.size, binary_format)
+    publisher.publish(frame.buffer)
+
+    # other process
+    subscriber = SharedFrameSubscriber("vrchat_recorder_tracking")
+    records = subscriber.read_latest(72)
+    records["hmd.position.x"]
+    ```
+"""
+
+import os
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+import numpy as np
+
+from .binary_converter import (
+    binary_dtype,
+    binary_field_names,
+    binary_format,
+    extended_binary_format,
+    extended_field_names,
+)
+
+RING_MAGIC = b"VRSR"
+
+ring_header_format = "<4s I I 4x Q 232s"  # magic, capacity, frame size, number of published frames, binary format
+slot_sequence_format = "<Q"
+
+ring_header_struct = struct.Struct(ring_header_format)
+slot_sequence_struct = struct.Struct(slot_sequence_format)
+
+published_count_offset = 16
+binary_format_offset = 24
+
+_known_field_names = {binary_format: binary_field_names, extended_binary_format: extended_field_names}
+
+
+def get_slot_size(frame_size: int) -> int:
+    """Returns the size of a slot, i.e. the sequence number and the frame padded to 8 bytes."""
+    return slot_sequence_struct.size + (frame_size + 7) // 8 * 8
+
+
+def get_frame_dtype(frame_format: str, frame_size: int) -> np.dtype:
+    """Returns the NumPy dtype of the frames. Frames of known formats have the field names of `binary_field_names`
+    (or `extended_field_names`), and frames without a format are opaque."""
+    if not frame_format:
+        return np.dtype(f"V{frame_size}")
+    return binary_dtype(frame_format, _known_field_names.get(frame_format))
+
+
+class _SharedFrameRing:
+    """Base class of the publisher and the subscriber. It holds the views of the shared memory block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, frame_size: int, frame_format: str) -> None:
+        self._shm = shm
+        self.name = shm.name
+        self.capacity = capacity
+        self.frame_size = frame_size
+        self.binary_format = frame_format
+        self.dtype = get_frame_dtype(frame_format, frame_size)
+
+        slot_size = get_slot_size(frame_size)
+        buffer = shm.buf
+        self._published = np.ndarray((1,), dtype="<u8", buffer=buffer, offset=published_count_offset)
+        self._sequences = np.ndarray(
+            (capacity,), dtype="<u8", buffer=buffer, offset=ring_header_struct.size, strides=(slot_size,)
+        )
+        self._records = np.ndarray(
+            (capacity,),
+            dtype=self.dtype,
+            buffer=buffer,
+            offset=ring_header_struct.size + slot_sequence_struct.size,
+            strides=(slot_size,),
+        )
+
+    @property
+    def num_published(self) -> int:
+        """Returns the number of frames published since the ring was created."""
+        return int(self._published[0])
+
+    def _release(self) -> None:
+        # The views must be released before the shared memory is closed.
+        self._published = self._sequences = self._records = None
+        self._shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name!r}, capacity={self.capacity}, frame_size={self.frame_size})"
+
+
+class SharedFramePublisher(_SharedFrameRing):
+    """This class publishes frames into a shared memory ring buffer. See the module docstring for the layout.
+
+    `publish` copies the frame into its slot once and never blocks, so it is called from the sampling loop. Only one
+    publisher may write to a ring.
+    """
+
+    def __init__(self, name: Optional[str], frame_size: int, frame_format: str = "", capacity: int = 1024) -> None:
+        """Initialize SharedFramePublisher and create the shared memory block.
+
+        Args:
+            name (Optional[str]): Name of the shared memory block. If None, a unique name is generated, which is
+                `name`.
+            frame_size (int): Size of a frame. (bytes)
+            frame_format (str): Struct format of the frames, e.g. `binary_format`. Empty for frames without a fixed
+                format.
+            capacity (int): Number of the latest frames kept in the ring.
+
+        Raises:
+            FileExistsError: A shared memory block of the name already exists.
+            ValueError: The format is too long or does not match the frame size.
+        """
+        encoded_format = frame_format.encode("ascii")
+        if len(encoded_format) > ring_header_struct.size - binary_format_offset:
+            raise ValueError(f"Binary format is too long: {frame_format}")
+        if frame_format and struct.calcsize(frame_format) != frame_size:
+            raise ValueError(f"Size of {frame_format} does not match the frame size {frame_size}.")
+
+        shm = shared_memory.SharedMemory(
+            name, create=True, size=ring_header_struct.size + capacity * get_slot_size(frame_size)
+        )
+        ring_header_struct.pack_into(shm.buf, 0, RING_MAGIC, capacity, frame_size, 0, encoded_format)
+        super().__init__(shm, capacity, frame_size, frame_format)
+        self._slot_size = get_slot_size(frame_size)
+        self._count = 0
+
+    def publish(self, frame) -> None:
+        """Publish a frame.
+
+        Args:
+            frame: Bytes-like object of `frame_size` bytes, e.g. `TrackingFrame.buffer`.
+        """
+        index = self._count
+        slot = index % self.capacity
+        offset = ring_header_struct.size + slot * self._slot_size + slot_sequence_struct.size
+        self._sequences[slot] = 2 * index + 1
+        self._shm.buf[offset : offset + self.frame_size] = frame
+        self._sequences[slot] = 2 * index + 2
+        self._count = index + 1
+        self._published[0] = self._count
+
+    def close(self) -> None:
+        """Close and remove the shared memory block. Subscribers keep their mapping until they close it."""
+        if self._shm is None:
+            return
+        self._release()
+        self._shm.unlink()
+        self._shm = None
+
+
+class SharedFrameSubscriber(_SharedFrameRing):
+    """This class reads the latest frames of a shared memory ring buffer created by `SharedFramePublisher`.
+
+    Reads never lock or wait for the publisher. Frames that are overwritten while they are read are dropped.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialize SharedFrameSubscriber and attach the shared memory block.
+
+        Args:
+            name (str): Name of the shared memory block.
+
+        Raises:
+            FileNotFoundError: The shared memory block does not exist.
+            ValueError: The block is not a frame ring.
+        """
+        # Attached blocks are registered to the resource tracker by default, which would remove the block when this
+        # process exits. Only the publisher owns it.
+        try:
+            shm = shared_memory.SharedMemory(name, track=False)
+        except TypeError:  # Python < 3.13
+            shm = shared_memory.SharedMemory(name)
+            if os.name == "posix":
+                resource_tracker.unregister(shm._name, "shared_memory")
+
+        magic, capacity, frame_size, _, encoded_format = ring_header_struct.unpack_from(shm.buf)
+        if magic != RING_MAGIC:
+            shm.close()
+            raise ValueError(f"Shared memory {name} is not a frame ring.")
+        super().__init__(shm, capacity, frame_size, encoded_format.rstrip(b"\0").decode("ascii"))
+
+    def read_latest(self, num_frames: int = 1) -> np.ndarray:
+        """Read the latest frames.
+
+        Args:
+            num_frames (int): Maximum number of frames, up to `capacity`.
+
+        Returns:
+            np.ndarray: Frames of `dtype`, oldest first. Fewer frames are returned if fewer are published, or if some
+                were overwritten while they were read.
+        """
+        return self.read_since(max(self.num_published - min(num_frames, self.capacity), 0))[0]
+
+    def read_since(self, count: int) -> tuple[np.ndarray, int]:
+        """Read the frames published after the first `count` frames, e.g. to process every frame.
+
+        Args:
+            count (int): Number of frames already read. Pass the returned count to the next call.
+
+        Returns:
+            tuple[np.ndarray, int]: Frames of `dtype`, oldest first, and the number of published frames. Frames that
+                are no longer in the ring, or were overwritten while they were read, are left out.
+        """
+        published = self.num_published
+        indices = np.arange(max(count, published - self.capacity), published, dtype=np.uint64)
+        slots = indices % np.uint64(self.capacity)
+
+        before = self._sequences[slots]
+        records = self._records[slots]
+        after = self._sequences[slots]
+
+        expected = 2 * indices + 2
+        valid = (before == expected) & (after == expected)
+        if not valid.all():
+            records = records[valid]
+        return records, published
+
+    def close(self) -> None:
+        """Detach the shared memory block."""
+        if self._shm is None:
+            return
+        self._release()
+        self._shm = None
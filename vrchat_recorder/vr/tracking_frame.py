@@ -0,0 +1,180 @@
+"""This file contains TrackingFrame class that holds a frame of vr tracking data as binary."""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import openvr
+
+from .binary_converter import (
+    axes_struct,
+    binary_struct,
+    binary_to_holder,
+    extended_binary_struct,
+    hmd_offset,
+    hmd_state_offset,
+    left_controller_axes_offset,
+    left_controller_offset,
+    left_controller_state_offset,
+    pose_state_struct,
+    pose_struct,
+    right_controller_axes_offset,
+    right_controller_offset,
+    right_controller_state_offset,
+    timestamp_struct,
+)
+from .tracking_data_holders import VRDeviceTrackingDataHolder
+
+
+def pack_controller_axes(buffer: bytearray, offset: int, axes) -> None:
+    """Pack the thumb stick and trigger values of a controller with `axes_struct`.
+
+    Args:
+        buffer (bytearray): Destination buffer.
+        offset (int): Byte offset in the buffer.
+        axes: `rAxis` of `openvr.VRControllerState_t`. The first five axes are written.
+    """
+    axes_struct.pack_into(
+        buffer,
+        offset,
+        axes[0].x,
+        axes[0].y,
+        axes[1].x,
+        axes[1].y,
+        axes[2].x,
+        axes[2].y,
+        axes[3].x,
+        axes[3].y,
+        axes[4].x,
+        axes[4].y,
+    )
+
+
+class TrackingFrame:
+    """This class holds a frame of vr tracking data in a preallocated buffer of `binary_format`.
+
+    Values are written in place by precompiled structs, so no objects are kept per frame and `buffer` can be written
+    to a file as it is. Use `to_holder` when you need the `VRDeviceTrackingDataHolder` view of the frame.
+
+    Usage:
+        ```python
+        from vrchat_recorder.vr.binary_converter import hmd_offset
+        from vrchat_recorder.vr.tracking_frame import TrackingFrame
+
+        frame = TrackingFrame()
+        frame.set_timestamp(time.time())
+        frame.set_pose(hmd_offset, [x, y, z, qx, qy, qz, qw])
+        outfile.write(frame.buffer)
+        ```
+    """
+
+    def __init__(self, extended: bool = False) -> None:
+        """Initialize TrackingFrame. All values are initialized with `0.0`.
+
+        Args:
+            extended (bool): If True, the buffer is `extended_binary_format` and `set_device` also writes the pose
+                states of the devices.
+        """
+        self.extended = extended
+        self.buffer = bytearray(extended_binary_struct.size if extended else binary_struct.size)
+
+    @property
+    def timestamp(self) -> float:
+        """Returns the timestamp of the frame."""
+        return timestamp_struct.unpack_from(self.buffer)[0]
+
+    def set_timestamp(self, timestamp: float) -> None:
+        """Set the timestamp of the frame.
+
+        Args:
+            timestamp (float): Timestamp. (seconds)
+        """
+        timestamp_struct.pack_into(self.buffer, 0, timestamp)
+
+    def set_pose(self, offset: int, pose: Sequence[float]) -> None:
+        """Set the position and orientation of a device.
+
+        Args:
+            offset (int): Byte offset of the device. e.g. `binary_converter.hmd_offset`.
+            pose (Sequence[float]): Position (x, y, z) followed by orientation quaternion (x, y, z, w).
+        """
+        pose_struct.pack_into(self.buffer, offset, *pose)
+
+    def set_controller_axes(self, offset: int, axes) -> None:
+        """Set the thumb stick and trigger values of a controller.
+
+        Args:
+            offset (int): Byte offset of the controller axes. e.g. `binary_converter.left_controller_axes_offset`.
+            axes: `rAxis` of `openvr.VRControllerState_t`. The first five axes are written.
+        """
+        pack_controller_axes(self.buffer, offset, axes)
+
+    def set_connected(self, connected: np.ndarray) -> None:
+        """Set which devices are connected. `binary_format` has no field for it, so this does nothing.
+
+        Args:
+            connected (np.ndarray): Boolean array of `openvr.k_unMaxTrackedDeviceCount` elements.
+        """
+
+    def set_pose_state(self, offset: int, state: Sequence) -> None:
+        """Set the pose state of a device. The frame must be extended.
+
+        Args:
+            offset (int): Byte offset of the pose state. e.g. `binary_converter.hmd_state_offset`.
+            state (Sequence): Velocity (x, y, z), angular velocity (x, y, z), tracking result and whether the pose is
+                valid. See `binary_converter.pose_state_format`.
+        """
+        pose_state_struct.pack_into(self.buffer, offset, *state)
+
+    def set_device(
+        self,
+        device_index: int,
+        device_class: int,
+        controller_role: int,
+        pose: Sequence[float],
+        axes=None,
+        state: Optional[Sequence] = None,
+    ) -> None:
+        """Set a device by its class and role. Only the HMD and the left and right controllers are stored.
+
+        Args:
+            device_index (int): Tracked device index.
+            device_class (int): Device class. See `ETrackedDeviceClass` of OpenVR API (openvr.h).
+            controller_role (int): Controller role. See `ETrackedControllerRole` of OpenVR API (openvr.h).
+            pose (Sequence[float]): Position (x, y, z) followed by orientation quaternion (x, y, z, w).
+            axes: `rAxis` of `openvr.VRControllerState_t` for controllers, otherwise None.
+            state (Optional[Sequence]): Pose state of the device. See `set_pose_state`. It is only written to
+                extended frames.
+        """
+        if device_class == openvr.TrackedDeviceClass_HMD:
+            self.set_pose(hmd_offset, pose)
+            state_offset = hmd_state_offset
+        elif device_class != openvr.TrackedDeviceClass_Controller:
+            return
+        elif controller_role == openvr.TrackedControllerRole_LeftHand:
+            self.set_pose(left_controller_offset, pose)
+            self.set_controller_axes(left_controller_axes_offset, axes)
+            state_offset = left_controller_state_offset
+        elif controller_role == openvr.TrackedControllerRole_RightHand:
+            self.set_pose(right_controller_offset, pose)
+            self.set_controller_axes(right_controller_axes_offset, axes)
+            state_offset = right_controller_state_offset
+        else:
+            return
+
+        if self.extended and state is not None:
+            self.set_pose_state(state_offset, state)
+
+    def clear(self) -> None:
+        """Reset all values to `0.0`."""
+        self.buffer[:] = bytes(len(self.buffer))
+
+    def to_holder(self, dst: Optional[VRDeviceTrackingDataHolder] = None) -> VRDeviceTrackingDataHolder:
+        """Converts the frame to DataHolder class.
+
+        Args:
+            dst (Optional[VRDeviceTrackingDataHolder], optional): Destination DataHolder class. Defaults to None.
+
+        Returns:
+            VRDeviceTrackingDataHolder: DataHolder class.
+        """
+        return binary_to_holder(memoryview(self.buffer)[: binary_struct.size], dst)
@@ -1,12 +1,43 @@
 """This file contains TrackingReader class that reads vr tracking data."""
 
+import asyncio
+import bisect
+import contextlib
+import functools
+import itertools
 import json
+import os
 import struct
-from typing import Optional
+import time
+from typing import AsyncIterator, Callable, ContextManager, Iterator, Optional
 
-from .binary_converter import binary_to_holder
-from .constants import HeaderNames, HeaderVersions
+import numpy as np
+
+from .binary_converter import (
+    binary_dtype,
+    binary_field_names,
+    binary_struct,
+    binary_to_holder,
+    decode_chunk,
+    extended_field_names,
+)
+from .chunked_format import ChunkedFrameReader, get_frame_timestamp
+from .constants import (
+    Compressions,
+    HeaderNames,
+    HeaderVersions,
+    RecordLayouts,
+    validate_header,
+)
+from .frame_view import FrameView
+from .quantization import (
+    dequantize_records,
+    float_dtype,
+    get_quantized_timestamp,
+    quantized_field_names,
+)
 from .tracking_data_holders import VRDeviceTrackingDataHolder
+from .variable_device_format import VariableDeviceDecoder
 
 
 class TrackingReader:
@@ -22,32 +53,120 @@ class TrackingReader:
     You can get stored frame num by `num_frames` property,
     and current count of read frames by `read_count` property.
     You can see binary format in `vrchat_recorder.vr.binary_converter.binary_format`.
+    Files of `HeaderVersions.V1` are also read, and all recorded devices are set to `devices` of the holder.
+    Files of `HeaderVersions.V2` are read chunk by chunk. Corrupt chunks are skipped (their frames still count in
+    `read_count`, so it stays the index of the next frame), and you can jump to any chunk by `seek_chunk`.
+    Records of `RecordLayouts.QUANTIZED` are dequantized automatically.
+    You can jump to any frame by `seek`, and `find_time` finds the frame of a timestamp by binary search. A range of
+    frames is read as an array by `read_range`.
+
+    The reader is iterable and a context manager, and `read_batch` reads many frames at once as columns:
+        ```python
+        with TrackingReader("path/to/file.bin") as tr:
+            for data_holder in tr:
+                ...
+            tr.reset()
+            while (batch := tr.read_batch(4096)) is not None:
+                batch["hmd.position.x"]
+        ```
+    `iter_views` yields lazy `FrameView`s, which unpack only the accessed values with the same attribute paths.
+    The pose states of `RecordLayouts.EXTENDED` records are read as arrays by `read_pose_states`.
+    The header is validated against `constants.header_schemas` and kept in `header` with the defaults of the keys
+    that older recorders did not write, and the file is opened by the method registered for its version.
+    Files that are being recorded are read live by `follow` (or `follow_async`), which waits for appended frames.
+
+    To load a whole V0 or V2 file at once, use `as_array` (a NumPy structured array with a field per item of
+    `binary_format`, named by the attribute paths of the holder such as `hmd.position.x`) or `read_all` (its
+    columns). Uncompressed V0 files are memory-mapped, so no data is copied until the columns are used.
     """
 
-    def __init__(self, input_file_path: str) -> None:
+    def __init__(self, input_file_path: str, io_lock: Optional[ContextManager] = None) -> None:
         """Initialize TrackingReader.
 
         Args:
             input_file_path (str): Path to read file.
+            io_lock (Optional[ContextManager]): Lock or semaphore held while frames are read from the file, to limit
+                the disk reads of readers running in parallel. It is released before the frames are decoded. See
+                `vrchat_recorder.batch_convert`.
         """
         self.input_file_path = input_file_path
+        self._io_lock = io_lock or contextlib.nullcontext()
         self._file = open(input_file_path, "rb")
         header_size, header = self.get_header()
-        if header[HeaderNames.VERSION] != HeaderVersions.V0:
-            raise ValueError("Invalid header version.")
+        header = validate_header(header)
 
-        binary_format = header[HeaderNames.BINARY_FORMAT]
-
-        self._binary_format = binary_format
+        self.header = header
+        self._version = header[HeaderNames.VERSION]
+        self._binary_format = header[HeaderNames.BINARY_FORMAT]
         self._header_size = header_size
         self._header_size_with_initial = header_size + 4
-
-        self._binary_size = struct.calcsize(binary_format)
-        self._num_frames = (self._file.seek(0, 2) - self._header_size_with_initial) // self._binary_size
         self._count = 0
+        self._record_layout = header[HeaderNames.RECORD_LAYOUT]
+        self._decoder = None
+        self._chunks = None
+        self._get_timestamp, self._decode_holder = self._select_record_codec(self._record_layout)
 
+        openers = {
+            HeaderVersions.V0: self._open_fixed,
+            HeaderVersions.V1: self._open_variable,
+            HeaderVersions.V2: self._open_chunked,
+        }
+        openers[self._version](header)
         self.reset()
 
+    @staticmethod
+    def _select_record_codec(record_layout: str) -> tuple[Callable, Callable]:
+        """Select the functions that read the timestamp of a record and decode a record to a holder for a layout.
+
+        Returns:
+            tuple[Callable, Callable]: `get_timestamp(record) -> float` and `decode(record) -> holder`.
+        """
+        if record_layout == RecordLayouts.QUANTIZED:
+            return get_quantized_timestamp, lambda binary: binary_to_holder(dequantize_records(binary))
+        elif record_layout == RecordLayouts.EXTENDED:
+            return get_frame_timestamp, lambda binary: binary_to_holder(binary[: binary_struct.size])
+        return get_frame_timestamp, binary_to_holder
+
+    def _open_fixed(self, header: dict) -> None:
+        """Open a file of `HeaderVersions.V0`: fixed-size records after the header."""
+        self._binary_size = struct.calcsize(self._binary_format)
+        self._num_frames = (self._file.seek(0, 2) - self._header_size_with_initial) // self._binary_size
+
+    def _open_chunked(self, header: dict) -> None:
+        """Open a file of `HeaderVersions.V2`: fixed-size records in chunks."""
+        self._binary_size = struct.calcsize(self._binary_format)
+        compression = header[HeaderNames.COMPRESSION]
+        decode_payload = None
+        if compression != Compressions.NONE:
+            decode_payload = functools.partial(decode_chunk, binary_format=self._binary_format, compression=compression)
+        self._chunks = ChunkedFrameReader(
+            self._file, self._header_size_with_initial, self._binary_size, decode_payload, self._io_lock
+        )
+        self._num_frames = self._chunks.num_frames
+        # Index of the first frame of each chunk, and the end of the last chunk.
+        self._chunk_starts = list(itertools.accumulate((chunk.num_frames for chunk in self._chunks.chunks), initial=0))
+
+    def _open_variable(self, header: dict) -> None:
+        """Open a file of `HeaderVersions.V1`: frames of the connected devices with inline device registry."""
+        self._decoder = VariableDeviceDecoder(
+            frame_format=self._binary_format,
+            device_format=header[HeaderNames.DEVICE_FORMAT],
+            controller_format=header[HeaderNames.CONTROLLER_FORMAT],
+        )
+        # Frames are counted by another decoder, whose registry follows the counted blocks instead of the read ones.
+        self._frame_counter = VariableDeviceDecoder(
+            frame_format=self._binary_format,
+            device_format=header[HeaderNames.DEVICE_FORMAT],
+            controller_format=header[HeaderNames.CONTROLLER_FORMAT],
+        )
+        self._counted_offset = self._header_size_with_initial
+        self._num_frames = self._count_frames()
+
+    @property
+    def frame_rate(self) -> Optional[int]:
+        """Returns the frame rate the file was recorded at. None for files of older recorders."""
+        return self.header[HeaderNames.FRAME_RATE]
+
     @property
     def num_frames(self) -> int:
         """Returns the number of frames in the file."""
@@ -71,10 +190,239 @@ class TrackingReader:
         header = json.loads(self._file.read(header_size).decode("utf-8"))
         return header_size, header
 
+    def _count_frames(self) -> int:
+        """Count the frames of a V1 file after the counted ones by reading their blocks. A truncated last frame is not
+        counted, and it is counted again by the next call."""
+        self._file.seek(self._counted_offset)
+        num_frames = 0
+        while self._frame_counter.read_block(self._file) is not None:
+            num_frames += 1
+            self._counted_offset = self._file.tell()
+        return num_frames
+
+    def refresh(self) -> int:
+        """Update `num_frames` with the frames appended since the file was opened, e.g. while it is being recorded.
+        Only complete records (and complete chunks of V2 files) are counted. The read position is not moved.
+
+        Returns:
+            int: Number of new frames.
+        """
+        previous = self._num_frames
+        if self._decoder is not None:
+            position = self._file.tell()
+            self._num_frames += self._count_frames()
+            self._file.seek(position)
+        elif self._chunks is not None:
+            new_chunks = self._chunks.refresh()
+            starts = itertools.accumulate((chunk.num_frames for chunk in new_chunks), initial=self._chunk_starts[-1])
+            self._chunk_starts.extend(list(starts)[1:])
+            self._num_frames = self._chunk_starts[-1]
+        else:
+            file_size = os.fstat(self._file.fileno()).st_size
+            self._num_frames = (file_size - self._header_size_with_initial) // self._binary_size
+        return self._num_frames - previous
+
+    @property
+    def truncated_bytes(self) -> int:
+        """Returns the size of the bytes after the last complete frame (or chunk of V2 files), which are not read."""
+        if self._decoder is not None:
+            return os.fstat(self._file.fileno()).st_size - self._counted_offset
+        if self._chunks is not None:
+            return self._chunks.truncated_bytes
+        return (os.fstat(self._file.fileno()).st_size - self._header_size_with_initial) % self._binary_size
+
+    @property
+    def num_corrupt_chunks(self) -> int:
+        """Returns the number of distinct corrupt chunks skipped so far. 0 for files without chunks."""
+        if self._chunks is None:
+            return 0
+        return self._chunks.num_corrupt_chunks
+
+    @property
+    def num_chunks(self) -> int:
+        """Returns the number of chunks in the file. Files without chunks have one."""
+        if self._chunks is None:
+            return 1
+        return len(self._chunks.chunks)
+
     def reset(self):
         """Resets file pointer to the beginning of the file."""
         self._file.seek(self._header_size_with_initial)
         self._count = 0
+        if self._decoder is not None:
+            self._decoder.reset()
+        if self._chunks is not None:
+            self.seek_chunk(0)
+
+    def seek_chunk(self, chunk_index: int) -> None:
+        """Move to the first frame of a chunk. Only files of `HeaderVersions.V2` have chunks.
+
+        Args:
+            chunk_index (int): Index of the chunk.
+
+        Raises:
+            ValueError: The file has no chunks.
+        """
+        if self._chunks is None:
+            raise ValueError(f"Files of version {self._version} have no chunks.")
+        self._chunk_index = chunk_index
+        self._chunk_payload = b""
+        self._chunk_position = 0
+        self._count = self._chunk_starts[min(chunk_index, len(self._chunks.chunks))]
+
+    def seek(self, frame_index: int) -> None:
+        """Move to a frame, so that the next `read` returns it.
+
+        V0 and V2 files are seeked directly (a V2 chunk is decoded once). V1 frames do not have a fixed size, so they
+        are read from the beginning up to the frame. Seeking into a corrupt V2 chunk moves to the start of the next
+        good chunk.
+
+        Args:
+            frame_index (int): Index of the frame, up to `num_frames`.
+
+        Raises:
+            ValueError: The index is out of range.
+        """
+        if not 0 <= frame_index <= self._num_frames:
+            raise ValueError(f"Frame index {frame_index} is out of range [0, {self._num_frames}].")
+
+        if self._decoder is not None:
+            self.reset()
+            for _ in range(frame_index):
+                self._decoder.read_block(self._file)
+            self._count = frame_index
+        elif self._chunks is not None:
+            chunk_index = bisect.bisect_right(self._chunk_starts, frame_index) - 1
+            self.seek_chunk(chunk_index)
+            if chunk_index < len(self._chunks.chunks) and frame_index > self._count:
+                # A corrupt chunk is loaded as empty, so the next read starts at the next good chunk.
+                self._load_chunk()
+                if self._chunk_payload:
+                    self._chunk_position = (frame_index - self._count) * self._binary_size
+                    self._count = frame_index
+        else:
+            self._file.seek(self._header_size_with_initial + frame_index * self._binary_size)
+            self._count = frame_index
+
+    def _load_chunk(self) -> None:
+        """Load the next chunk as the current payload. A corrupt chunk is loaded as empty and its frames are counted
+        as read."""
+        payload = self._chunks.read_chunk(self._chunk_index)
+        if payload is None:
+            self._count += self._chunks.chunks[self._chunk_index].num_frames
+            payload = b""
+        self._chunk_index += 1
+        self._chunk_payload = payload
+        self._chunk_position = 0
+
+    def _read_timestamp(self, frame_index: int) -> float:
+        """Read the timestamp of a frame of a V0 file."""
+        self._file.seek(self._header_size_with_initial + frame_index * self._binary_size)
+        return self._get_timestamp(self._file.read(self._binary_size))
+
+    def find_time(self, timestamp: float) -> int:
+        """Find the first frame whose timestamp is at or after `timestamp` by binary search. The read position is not
+        moved.
+
+        Timestamps are read from O(log n) records of V0 files. V2 files are searched in the chunk index first, and
+        only the found chunk is read.
+
+        Args:
+            timestamp (float): Timestamp. (seconds)
+
+        Returns:
+            int: Index of the frame. `num_frames` if all frames are before `timestamp`. Use it with `seek`.
+
+        Raises:
+            ValueError: The file is `HeaderVersions.V1`, whose frames can not be searched.
+        """
+        if self._decoder is not None:
+            raise ValueError(f"Files of version {self._version} can not be searched by time.")
+
+        if self._chunks is not None:
+            chunks = self._chunks.chunks
+            chunk_index = bisect.bisect_left([chunk.last_timestamp for chunk in chunks], timestamp)
+            if chunk_index == len(chunks):
+                return self._num_frames
+            payload = self._chunks.read_chunk(chunk_index)
+            if payload is None:
+                return self._chunk_starts[chunk_index]
+            timestamps = [self._get_timestamp(record) for record in self._iter_records(payload)]
+            return self._chunk_starts[chunk_index] + bisect.bisect_left(timestamps, timestamp)
+
+        position = self._file.tell()
+        low, high = 0, self._num_frames
+        while low < high:
+            middle = (low + high) // 2
+            if self._read_timestamp(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        self._file.seek(position)
+        return low
+
+    def _iter_records(self, payload: bytes):
+        """Iterate the records of a chunk payload as memoryviews."""
+        payload = memoryview(payload)
+        for offset in range(0, len(payload), self._binary_size):
+            yield payload[offset : offset + self._binary_size]
+
+    def read_range(self, start: int, stop: int) -> np.ndarray:
+        """Read the frames from `start` to `stop` (exclusive) as a NumPy structured array. See `as_array`. The read
+        position is not moved.
+
+        Only the records in the range are read: V0 files are sliced from the memory map, and only the V2 chunks in
+        the range are decoded. Frames of corrupt chunks are left out.
+
+        Args:
+            start (int): Index of the first frame.
+            stop (int): Index after the last frame. Clipped to `num_frames`.
+
+        Returns:
+            np.ndarray: Records of the frames in the range. Frames of corrupt chunks are left out, so there may be
+                fewer than `stop - start` records.
+
+        Raises:
+            ValueError: The file is `HeaderVersions.V1`, or the range is invalid.
+        """
+        stop = min(stop, self._num_frames)
+        if not 0 <= start <= stop:
+            raise ValueError(f"Invalid frame range: [{start}, {stop}).")
+        if self._chunks is None:
+            return self._to_float_records(self._map_records()[start:stop])
+
+        first_chunk = bisect.bisect_right(self._chunk_starts, start) - 1
+        last_chunk = bisect.bisect_left(self._chunk_starts, stop)
+        payloads = []
+        for chunk_index in range(first_chunk, min(last_chunk, len(self._chunks.chunks))):
+            payload = self._chunks.read_chunk(chunk_index)
+            if payload is None:
+                continue
+            chunk_start = self._chunk_starts[chunk_index]
+            begin = max(start - chunk_start, 0) * self._binary_size
+            end = (min(stop, self._chunk_starts[chunk_index + 1]) - chunk_start) * self._binary_size
+            payloads.append(payload[begin:end])
+
+        return self._to_float_records(np.frombuffer(b"".join(payloads), dtype=self._record_dtype()))
+
+    def _read_chunked_binary(self, num_records: int = 1) -> Optional[bytes]:
+        """Read records from the chunks, skipping corrupt chunks.
+
+        Args:
+            num_records (int): Maximum number of records. Records are not read across chunks.
+
+        Returns:
+            Optional[bytes]: Records. None if EOF.
+        """
+        while self._chunk_position >= len(self._chunk_payload):
+            if self._chunk_index >= len(self._chunks.chunks):
+                return None
+            self._load_chunk()
+
+        size = num_records * self._binary_size
+        binary = self._chunk_payload[self._chunk_position : self._chunk_position + size]
+        self._chunk_position += len(binary)
+        return binary
 
     def read(self) -> Optional[VRDeviceTrackingDataHolder]:
         """Reads a vr tracking data. If EOF, returns None.
@@ -82,13 +430,274 @@ class TrackingReader:
         Returns:
             VRDeviceTrackingDataHolder: DataHolder class.
         """
-        binary = self._file.read(self._binary_size)
+        if self._decoder is not None:
+            position = self._file.tell()
+            with self._io_lock:
+                holder = self._decoder.read(self._file)
+            if holder is None:  # a truncated last frame is not read.
+                self._file.seek(position)
+                return None
+            self._holder = holder
+            self._count += 1
+            return self._holder
+
+        if self._chunks is not None:
+            binary = self._read_chunked_binary()
+        else:
+            with self._io_lock:
+                binary = self._file.read(self._binary_size)
+            if len(binary) < self._binary_size:  # a truncated last frame is not read.
+                self._file.seek(-len(binary), 1)
+                return None
         if not binary:
             return None
-        self._holder = binary_to_holder(binary)
+        self._holder = self._decode_holder(binary)
         self._count += 1
         return self._holder
 
+    def read_batch(self, num_frames: int) -> Optional[dict[str, np.ndarray]]:
+        """Reads up to `num_frames` frames of a V0 or V2 file as columns. If EOF, returns None.
+
+        The records are read with one file read (or one slice per chunk) and decoded by a single `np.frombuffer`, so
+        there is no per-frame Python overhead. `read_count` is advanced by the frames read, and `read` continues after
+        them.
+
+        Args:
+            num_frames (int): Maximum number of frames.
+
+        Returns:
+            Optional[dict[str, np.ndarray]]: Columns keyed by field name like `read_all`. Fewer frames are returned at
+                the end of the file.
+
+        Raises:
+            ValueError: The file is `HeaderVersions.V1`, whose frames do not have a fixed size.
+        """
+        binary = self._read_records(num_frames)
+        if binary is None:
+            return None
+
+        records = self._to_float_records(np.frombuffer(binary, dtype=self._record_dtype()))
+        self._count += len(records)
+        return {name: records[name] for name in records.dtype.names}
+
+    def iter_views(self, batch_size: int = 4096) -> Iterator[FrameView]:
+        """Iterate the frames of a V0 or V2 file from the current position as lazy `FrameView`s.
+
+        Records are read `batch_size` frames at a time, and a view only unpacks the values that are accessed.
+        `read_count` is advanced as the views are yielded.
+
+        Args:
+            batch_size (int): Number of frames read at once.
+
+        Yields:
+            FrameView: View of a frame. It stays valid after the iteration.
+
+        Raises:
+            ValueError: The file is `HeaderVersions.V1`, whose frames do not have a fixed size.
+        """
+        record_size = self._binary_size
+        if self._record_layout == RecordLayouts.QUANTIZED:
+            record_size = binary_struct.size
+
+        while (binary := self._read_records(batch_size)) is not None:
+            if self._record_layout == RecordLayouts.QUANTIZED:
+                binary = dequantize_records(binary)
+            for offset in range(0, len(binary), record_size):
+                self._count += 1
+                yield FrameView(binary, offset)
+
+    def _read_records(self, num_frames: int) -> Optional[bytes]:
+        """Read up to `num_frames` stored records of a V0 or V2 file from the current position. `read_count` is not
+        advanced.
+
+        Returns:
+            Optional[bytes]: Records. None if EOF.
+
+        Raises:
+            ValueError: The file is `HeaderVersions.V1`, whose frames do not have a fixed size.
+        """
+        if self._decoder is not None:
+            raise ValueError(f"Files of version {self._version} can not be read in batches.")
+
+        if self._chunks is not None:
+            binaries = []
+            remaining = num_frames
+            while remaining > 0 and (binary := self._read_chunked_binary(remaining)):  # empty is EOF as well.
+                binaries.append(binary)
+                remaining -= len(binary) // self._binary_size
+            binary = b"".join(binaries)
+        else:
+            with self._io_lock:
+                binary = self._file.read(num_frames * self._binary_size)
+            truncated_size = len(binary) % self._binary_size  # a truncated last frame is not read.
+            self._file.seek(-truncated_size, 1)
+            binary = binary[: len(binary) - truncated_size]
+        if not binary:
+            return None
+        return binary
+
+    def _read_all_records(self) -> bytes:
+        """Read the records of all chunks of a V2 file. Corrupt chunks are skipped."""
+        payloads = (self._chunks.read_chunk(i) for i in range(len(self._chunks.chunks)))
+        return b"".join(payload for payload in payloads if payload is not None)
+
+    def _record_dtype(self) -> np.dtype:
+        """Returns the NumPy dtype of the stored records, named by the attribute paths of the holder if known."""
+        field_names = {
+            RecordLayouts.FLOAT: binary_field_names,
+            RecordLayouts.QUANTIZED: quantized_field_names,
+            RecordLayouts.EXTENDED: extended_field_names,
+        }[self._record_layout]
+        dtype = binary_dtype(self._binary_format)
+        if len(dtype.names) != len(field_names):
+            return dtype
+        return binary_dtype(self._binary_format, field_names)
+
+    def as_array(self) -> np.ndarray:
+        """Load all frames of a V0 or V2 file as a NumPy structured array. The read position is not moved.
+
+        V0 files are memory-mapped and the array is a read-only view of the file. Records of V2 files are read chunk
+        by chunk (corrupt chunks are skipped) into a new array. Records of `RecordLayouts.QUANTIZED` are dequantized
+        into `binary_format`.
+
+        Returns:
+            np.ndarray: Records of shape `(num_frames,)`.
+
+        Raises:
+            ValueError: The file is `HeaderVersions.V1`, whose frames do not have a fixed size.
+        """
+        if self._decoder is not None:
+            raise ValueError(f"Files of version {self._version} can not be read as an array.")
+
+        if self._chunks is not None:
+            records = np.frombuffer(self._read_all_records(), dtype=self._record_dtype())
+        else:
+            records = self._map_records()
+        return self._to_float_records(records)
+
+    def _map_records(self) -> np.ndarray:
+        """Memory-map the stored records of a V0 file."""
+        if self._num_frames == 0:
+            return np.zeros(0, dtype=self._record_dtype())
+        return np.memmap(
+            self.input_file_path,
+            dtype=self._record_dtype(),
+            mode="r",
+            offset=self._header_size_with_initial,
+            shape=(self._num_frames,),
+        )
+
+    def _to_float_records(self, records: np.ndarray) -> np.ndarray:
+        """Dequantize records of `RecordLayouts.QUANTIZED`. Records of other layouts are returned as they are."""
+        if self._record_layout == RecordLayouts.QUANTIZED:
+            return np.frombuffer(dequantize_records(records), dtype=float_dtype)
+        return records
+
+    def read_all(self) -> dict[str, np.ndarray]:
+        """Load all frames of a V0 or V2 file as named columns. See `as_array`.
+
+        Returns:
+            dict[str, np.ndarray]: Column views of `as_array` keyed by field name, e.g. `timestamp` or
+                `controller.left.thumb_stick.x`.
+        """
+        records = self.as_array()
+        return {name: records[name] for name in records.dtype.names}
+
+    def read_pose_states(self) -> dict[str, np.ndarray]:
+        """Read the pose states of all frames of a `RecordLayouts.EXTENDED` file as arrays.
+
+        Returns:
+            dict[str, np.ndarray]: Arrays keyed by `<device>.<name>`, where device is `hmd`, `controller.left` or
+                `controller.right`. `velocity` and `angular_velocity` are `(num_frames, 3)` float arrays,
+                `tracking_result` is an integer array (`ETrackingResult` of OpenVR API) and `pose_is_valid` is a
+                boolean array.
+
+        Raises:
+            ValueError: The records are not `RecordLayouts.EXTENDED`.
+        """
+        if self._record_layout != RecordLayouts.EXTENDED:
+            raise ValueError(f"Pose states are only recorded in {RecordLayouts.EXTENDED} records.")
+
+        records = self.as_array()
+        pose_states = {}
+        for device in ["hmd", "controller.left", "controller.right"]:
+            for name in ["velocity", "angular_velocity"]:
+                pose_states[f"{device}.{name}"] = np.stack([records[f"{device}.{name}.{c}"] for c in "xyz"], axis=1)
+            pose_states[f"{device}.tracking_result"] = records[f"{device}.tracking_result"].copy()
+            pose_states[f"{device}.pose_is_valid"] = records[f"{device}.pose_is_valid"].copy()
+        return pose_states
+
+    def _read_followed(self) -> Optional[VRDeviceTrackingDataHolder]:
+        """Read the next frame, looking for appended frames at EOF."""
+        holder = self.read()
+        if holder is None and self.refresh() > 0:
+            holder = self.read()
+        return holder
+
+    def follow(
+        self, poll_interval: float = 0.01, idle_timeout: Optional[float] = None
+    ) -> Iterator[VRDeviceTrackingDataHolder]:
+        """Iterate the frames from the read position, and wait for frames appended while the file is being recorded.
+
+        At EOF, the file size is polled every `poll_interval` seconds, which costs a single `fstat` for V0 files.
+        Partial trailing records are not read until they are complete. Frames appear when the recorder flushes them:
+        `BackgroundFrameWriter` flushes within its `max_flush_interval` (0.05 s), so frames of V0 and V1 files appear
+        within about 0.1 s. Frames of V2 files appear only when their chunk is complete, so the latency is bounded by
+        `frames_per_chunk / frame_rate` (10 s at the default 720 frames and 72 fps); record with a small
+        `frames_per_chunk` for low latency.
+
+        Args:
+            poll_interval (float): Interval to check for appended frames at EOF. (seconds)
+            idle_timeout (Optional[float]): The iteration ends when no frame is appended for this time. (seconds)
+                If None, it never ends.
+
+        Yields:
+            VRDeviceTrackingDataHolder: DataHolder class of each frame.
+        """
+        last_frame_time = time.monotonic()
+        while True:
+            holder = self._read_followed()
+            if holder is not None:
+                last_frame_time = time.monotonic()
+                yield holder
+                continue
+            if idle_timeout is not None and time.monotonic() - last_frame_time >= idle_timeout:
+                return
+            time.sleep(poll_interval)
+
+    async def follow_async(
+        self, poll_interval: float = 0.01, idle_timeout: Optional[float] = None
+    ) -> AsyncIterator[VRDeviceTrackingDataHolder]:
+        """Asynchronous version of `follow`, which waits for appended frames with `asyncio.sleep`.
+
+        Usage:
+            ```python
+            async for data_holder in tr.follow_async():
+                ...
+            ```
+        """
+        last_frame_time = time.monotonic()
+        while True:
+            holder = self._read_followed()
+            if holder is not None:
+                last_frame_time = time.monotonic()
+                yield holder
+                continue
+            if idle_timeout is not None and time.monotonic() - last_frame_time >= idle_timeout:
+                return
+            await asyncio.sleep(poll_interval)
+
+    def __iter__(self) -> Iterator[VRDeviceTrackingDataHolder]:
+        """Iterate the frames from the current position by `read`."""
+        while (holder := self.read()) is not None:
+            yield holder
+
+    def __enter__(self) -> "TrackingReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def close(self):
         """Closes file."""
         self._file.close()
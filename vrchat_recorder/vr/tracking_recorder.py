@@ -1,21 +1,166 @@
 """This file contains TrackingRecorder class that records vr tracking data continuously."""
 
+import ctypes
+import functools
 import json
 import logging
 import time
-from typing import BinaryIO, List
+from typing import BinaryIO, Optional, Sequence
 
 import numpy as np
 import openvr
-from scipy.spatial.transform import Rotation
 
+from ..abc.background_writer import BackgroundFrameWriter, BackpressurePolicy
 from ..abc.base_recorder import BaseRecorder
-from .binary_converter import binary_format, holder_to_binary
-from .constants import HeaderNames, HeaderVersions
-from .tracking_data_holders import Axis, Orientation, Position, create_empty_data_holder
+from ..abc.frame_scheduler import FrameScheduler, MissedDeadlinePolicy
+from ..abc.stream_sink import StreamSink
+from .binary_converter import (
+    binary_format,
+    binary_struct,
+    encode_chunk,
+    extended_binary_format,
+    extended_binary_struct,
+    pose_state_field_names,
+    pose_state_format,
+)
+from .chunked_format import ChunkedFrameEncoder, get_frame_timestamp
+from .constants import (
+    Clocks,
+    Compressions,
+    DeviceRegistries,
+    HeaderNames,
+    HeaderVersions,
+    RecordLayouts,
+)
+from .device_topology import DeviceTopologyCache
+from .quantization import (
+    QuantizingSink,
+    get_quantized_timestamp,
+    quantized_binary_format,
+    quantized_struct,
+)
+from .record_schema import binary_dtype
+from .shared_frame_ring import SharedFramePublisher
+from .tracking_data_holders import VRDeviceTrackingDataHolder
+from .tracking_frame import TrackingFrame
+from .variable_device_format import (
+    DeviceFrame,
+    VariableDeviceEncoder,
+    controller_format,
+    device_format,
+    frame_format,
+)
 
 logger = logging.getLogger(__name__)
 
+# NumPy view of `openvr.TrackedDevicePose_t`. Offsets are taken from ctypes so that a whole pose array returned by
+# `getDeviceToAbsoluteTrackingPose` can be read without a per-device Python loop.
+_pose_struct = openvr.TrackedDevicePose_t
+pose_dtype = np.dtype(
+    {
+        "names": [
+            "mDeviceToAbsoluteTracking",
+            "vVelocity",
+            "vAngularVelocity",
+            "eTrackingResult",
+            "bPoseIsValid",
+            "bDeviceIsConnected",
+        ],
+        "formats": [("=f4", (3, 4)), ("=f4", (3,)), ("=f4", (3,)), "=u4", "u1", "u1"],
+        "offsets": [
+            _pose_struct.mDeviceToAbsoluteTracking.offset,
+            _pose_struct.vVelocity.offset,
+            _pose_struct.vAngularVelocity.offset,
+            _pose_struct.eTrackingResult.offset,
+            _pose_struct.bPoseIsValid.offset,
+            _pose_struct.bDeviceIsConnected.offset,
+        ],
+        "itemsize": ctypes.sizeof(_pose_struct),
+    }
+)
+
+
+class PoseConverter:
+    """This class converts the pose matrices of all devices to positions and quaternions in preallocated arrays.
+
+    The quaternions are computed by the formula of `scipy.spatial.transform.Rotation.from_matrix` with the same
+    operations in the same order, so they are bit-for-bit equal to it: of the 4 candidate quaternions, the one computed
+    from the largest of w, x, y and z (decided by the trace and the diagonal) is normalized. The candidates of all
+    devices are computed by element-wise ufuncs on views of the matrices, and every step writes into a fixed-size
+    buffer, so no array is allocated per frame.
+    """
+
+    def __init__(self, num_devices: int) -> None:
+        """Initialize PoseConverter.
+
+        Args:
+            num_devices (int): Number of devices.
+        """
+        self.matrices = np.zeros((num_devices, 3, 4))
+        self.poses = np.zeros((num_devices, 7))
+        self._positions = self.poses[:, :3]
+        self._translations = self.matrices[:, :, 3]
+        self._orientations = self.poses[:, 3:]
+
+        self._decision = np.zeros((num_devices, 4))  # the diagonal and the trace.
+        self._trace = self._decision[:, 3]
+        self._diagonal = np.diagonal(self.matrices, axis1=1, axis2=2)
+        self._choice = np.zeros(num_devices, dtype=np.intp)
+        self._choice_offsets = np.arange(num_devices) * 4
+        self._candidates = np.zeros((num_devices * 4, 4))  # 4 candidates of each device.
+        self._one_minus_trace = np.zeros(num_devices)
+        self._double_diagonal = np.zeros((num_devices, 3))
+        self._quaternions = np.zeros((num_devices, 4))
+        self._squares = np.zeros((num_devices, 4))
+        self._norms = np.zeros((num_devices, 1))
+
+        m = self.matrices
+        candidates = self._candidates.reshape(num_devices, 4, 4)
+        # (out, a, b) of `out = a + b` and `out = a - b` for the candidate components other than the diagonal ones.
+        self._sums = []
+        self._differences = []
+        for i in range(3):
+            j, k = (i + 1) % 3, (i + 2) % 3
+            self._sums.append((candidates[:, i, j], m[:, j, i], m[:, i, j]))
+            self._sums.append((candidates[:, i, k], m[:, k, i], m[:, i, k]))
+            self._differences.append((candidates[:, i, 3], m[:, k, j], m[:, j, k]))
+            self._differences.append((candidates[:, 3, i], m[:, k, j], m[:, j, k]))
+        # i-th component of the i-th candidate: `1 - trace + 2 * m[i, i]`, and w of the last one: `1 + trace`.
+        self._largest_components = [(candidates[:, i, i], self._double_diagonal[:, i]) for i in range(3)]
+        self._largest_w = candidates[:, 3, 3]
+        self._square_columns = [self._squares[:, i] for i in range(4)]
+        self._norms_1d = self._norms[:, 0]
+
+    def convert(self) -> None:
+        """Convert `matrices` to positions (x, y, z) and quaternions (x, y, z, w) in `poses`."""
+        np.copyto(self._positions, self._translations)
+
+        np.copyto(self._decision[:, :3], self._diagonal)
+        np.add(self._diagonal[:, 0], self._diagonal[:, 1], out=self._trace)
+        np.add(self._trace, self._diagonal[:, 2], out=self._trace)
+        np.argmax(self._decision, axis=1, out=self._choice)
+
+        np.subtract(1.0, self._trace, out=self._one_minus_trace)
+        np.multiply(self._diagonal, 2.0, out=self._double_diagonal)
+        for out, double_diagonal in self._largest_components:
+            np.add(self._one_minus_trace, double_diagonal, out=out)
+        np.add(1.0, self._trace, out=self._largest_w)
+        for out, a, b in self._sums:
+            np.add(a, b, out=out)
+        for out, a, b in self._differences:
+            np.subtract(a, b, out=out)
+
+        np.add(self._choice, self._choice_offsets, out=self._choice)
+        np.take(self._candidates, self._choice, axis=0, out=self._quaternions)
+
+        # The norm is summed in the order of the components, as scipy does.
+        np.multiply(self._quaternions, self._quaternions, out=self._squares)
+        np.add(self._square_columns[0], self._square_columns[1], out=self._norms_1d)
+        np.add(self._norms_1d, self._square_columns[2], out=self._norms_1d)
+        np.add(self._norms_1d, self._square_columns[3], out=self._norms_1d)
+        np.sqrt(self._norms, out=self._norms)
+        np.divide(self._quaternions, self._norms, out=self._orientations)
+
 
 class TrackingRecorder(BaseRecorder):
     """This class records vr tracking data continuously.
@@ -39,6 +184,21 @@ class TrackingRecorder(BaseRecorder):
         - controller triggers (first to fourth).
 
     You can see binary format in `vrchat_recorder.vr.binary_converter.binary_format`.
+    With `header_version=HeaderVersions.V1`, every connected device (trackers, base stations, ...) is recorded with
+    its serial number instead. See `vrchat_recorder.vr.variable_device_format`.
+    With `header_version=HeaderVersions.V2`, the records are grouped into CRC-checked chunks of `frames_per_chunk`
+    frames with an index at the end of the file. See `vrchat_recorder.vr.chunked_format`. The chunks can be
+    compressed by `compression` on the writer thread.
+    With `record_layout=RecordLayouts.QUANTIZED`, V0 and V2 records are stored in fixed point on the writer thread.
+    See `vrchat_recorder.vr.quantization` for the layout and its error bounds.
+    With `record_layout=RecordLayouts.EXTENDED`, V0 and V2 records also store the velocity, angular velocity, tracking
+    result and pose validity of the devices. See `vrchat_recorder.vr.binary_converter.extended_binary_format`.
+    Each frame is written into a preallocated `TrackingFrame` (or `DeviceFrame`) buffer, and you can get the latest
+    frame as `VRDeviceTrackingDataHolder` by `holder` property.
+    With `shared_memory_name`, each frame is also published to a shared memory ring buffer, so other processes read
+    the latest frames by `SharedFrameSubscriber` instead of opening their own OpenVR connection. See
+    `vrchat_recorder.vr.shared_frame_ring`.
+    With `stream_sink`, each frame is also streamed to a local endpoint. See `vrchat_recorder.abc.stream_sink`.
 
     Header is written at the beginning of the file, and json format is used.
     Structure of the header is can be seen `create_header` function.
@@ -52,6 +212,17 @@ class TrackingRecorder(BaseRecorder):
         vrsystem: openvr.IVRSystem,
         frame_rate: int = 72,
         num_frames_per_flush: int = 1000,
+        device_topology: Optional[DeviceTopologyCache] = None,
+        missed_deadline_policy: str = MissedDeadlinePolicy.SKIP,
+        buffer_capacity: int = 4096,
+        backpressure_policy: str = BackpressurePolicy.BLOCK,
+        header_version: str = HeaderVersions.V0,
+        frames_per_chunk: int = 720,
+        compression: str = Compressions.NONE,
+        record_layout: str = RecordLayouts.FLOAT,
+        shared_memory_name: Optional[str] = None,
+        shared_memory_capacity: int = 1024,
+        stream_sink: Optional[StreamSink] = None,
     ):
         """Initialize TrackingRecorder.
 
@@ -60,152 +231,391 @@ class TrackingRecorder(BaseRecorder):
             vr_system (openvr.IVRSystem): OpenVR system object.
             frame_rate (int): Frame rate to record. Defaults to 72.
             num_frames_per_flush (int): Number of frames to record before flushing to disk.
+            device_topology (Optional[DeviceTopologyCache]): Cache of device classes and roles. Share it with
+                `ControllerEventRecorder` so that it is invalidated by polled events. If None, a new one is created.
+            missed_deadline_policy (str): What to do when frames are late. See `MissedDeadlinePolicy`.
+            buffer_capacity (int): Number of frames buffered between the sampling loop and the writer thread.
+            backpressure_policy (str): What to do when the buffer is full. See `BackpressurePolicy`.
+            header_version (str): File format version. `HeaderVersions.V0` records the HMD and both controllers, and
+                `HeaderVersions.V1` records all connected devices. `HeaderVersions.V2` records the same data as V0 in
+                chunks.
+            frames_per_chunk (int): Number of frames in a chunk of `HeaderVersions.V2`. Frames are kept in memory
+                until their chunk is full, which bounds the latency of `TrackingReader.follow`.
+            compression (str): Compression of the chunks of `HeaderVersions.V2`. See `Compressions`.
+            record_layout (str): Layout of the records of `HeaderVersions.V0` and `HeaderVersions.V2`. See
+                `RecordLayouts`.
+            shared_memory_name (Optional[str]): If given, every sampled frame is also published to a shared memory
+                ring buffer of this name. See `SharedFramePublisher`.
+            shared_memory_capacity (int): Number of the latest frames kept in the shared memory ring buffer.
+            stream_sink (Optional[StreamSink]): If given, every sampled frame is also sent to the sink as
+                `StreamMessageTypes.TRACKING_FRAME`. The sink is started and closed by the caller.
+
+        Raises:
+            ValueError: Unsupported header version, compression or record layout.
         """
+        if header_version not in (HeaderVersions.V0, HeaderVersions.V1, HeaderVersions.V2):
+            raise ValueError(f"Unsupported header version: {header_version}")
+        if compression not in (Compressions.NONE, Compressions.ZLIB, Compressions.LZMA):
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression != Compressions.NONE and header_version != HeaderVersions.V2:
+            raise ValueError(f"Compression is only supported by {HeaderVersions.V2}.")
+        if record_layout not in (RecordLayouts.FLOAT, RecordLayouts.QUANTIZED, RecordLayouts.EXTENDED):
+            raise ValueError(f"Unknown record layout: {record_layout}")
+        if record_layout != RecordLayouts.FLOAT and header_version == HeaderVersions.V1:
+            raise ValueError(f"Record layouts are not supported by {HeaderVersions.V1}.")
+
         self.output_file_path = output_file_path
         self.vrsystem = vrsystem
         self.frame_rate = frame_rate
         self.num_frames_per_flush = num_frames_per_flush
-        self._holder = create_empty_data_holder()
+        if device_topology is None:
+            device_topology = DeviceTopologyCache(vrsystem)
+        self.device_topology = device_topology
+        self.scheduler = FrameScheduler(frame_rate, missed_deadline_policy=missed_deadline_policy)
+        self.buffer_capacity = buffer_capacity
+        self.backpressure_policy = backpressure_policy
+        self.writer: Optional[BackgroundFrameWriter] = None
+        self.header_version = header_version
+        self.frames_per_chunk = frames_per_chunk
+        self.compression = compression
+        self.record_layout = record_layout
+        self._extended = record_layout == RecordLayouts.EXTENDED
+        self.shared_memory_name = shared_memory_name
+        self.shared_memory_capacity = shared_memory_capacity
+        self.publisher: Optional[SharedFramePublisher] = None
+        self.stream_sink = stream_sink
+        if header_version == HeaderVersions.V1:
+            self._frame = DeviceFrame()
+        else:
+            self._frame = TrackingFrame(extended=self._extended)
+
+        num_devices = openvr.k_unMaxTrackedDeviceCount
+        self._device_poses = (openvr.TrackedDevicePose_t * num_devices)()
+        self._device_pose_array = np.frombuffer(self._device_poses, dtype=pose_dtype)
+        self._device_pose_fields = {name: self._device_pose_array[name] for name in pose_dtype.names}
+        self._pose_converter = PoseConverter(num_devices)
+        self._pose_matrices = self._pose_converter.matrices
+        self._poses = self._pose_converter.poses
+        self._pose_rows = list(self._poses)  # views passed to the frame, so that no view is created per device.
+        self._connected = np.zeros(num_devices, dtype=bool)
+
+        # Pose states in the layout of `pose_state_format`. Each row is passed to the frame as is, and the arrays
+        # below are views of its fields.
+        self._pose_states = np.zeros(num_devices, dtype=binary_dtype(pose_state_format, pose_state_field_names))
+        self._pose_state_rows = list(self._pose_states)
+        state_fields = self._pose_states.dtype.fields
+        self._velocities, self._angular_velocities = [
+            np.ndarray(
+                (num_devices, 3),
+                np.float32,
+                self._pose_states,
+                state_fields[f"{name}.x"][1],
+                (self._pose_states.itemsize, np.dtype(np.float32).itemsize),
+            )
+            for name in ["velocity", "angular_velocity"]
+        ]
+        self._tracking_results = self._pose_states["tracking_result"]
+        self._pose_is_valid = self._pose_states["pose_is_valid"]
+
+    @property
+    def holder(self) -> VRDeviceTrackingDataHolder:
+        """Returns a `VRDeviceTrackingDataHolder` view of the latest frame. A new holder is created on every access."""
+        return self._frame.to_holder()
 
     def _update_timestamp(self) -> None:
-        """Update the timestamp in the data holder."""
-        self._holder.timestamp = time.time()
+        """Update the timestamp in the frame."""
+        self._frame.set_timestamp(time.time())
 
-    def _get_device_poses(self) -> List[openvr.TrackedDevicePose_t]:
+    def _get_device_poses(self) -> Sequence[openvr.TrackedDevicePose_t]:
         """Get the device poses from the VR system.
 
         Returns:
-            List[openvr.TrackedDevicePose_t]: A list containing the poses of all tracked devices.
+            Sequence[openvr.TrackedDevicePose_t]: The poses of all tracked devices. The array is reused every frame.
         """
 
-        poses = openvr.TrackedDevicePose_t * openvr.k_unMaxTrackedDeviceCount
-        device_poses = poses()
-        self.vrsystem.getDeviceToAbsoluteTrackingPose(openvr.TrackingUniverseStanding, 0, device_poses)
-        return device_poses
+        self.vrsystem.getDeviceToAbsoluteTrackingPose(openvr.TrackingUniverseStanding, 0, self._device_poses)
+        return self._device_poses
+
+    def _copy_pose_matrices(self, device_poses: Sequence[openvr.TrackedDevicePose_t]) -> np.ndarray:
+        """Copy the pose matrices of all devices into the preallocated `(N, 3, 4)` array.
 
-    def _update_data_holder(self, device_poses: List[openvr.TrackedDevicePose_t]) -> None:
-        """Update the data holder with the device poses.
+        For the extended record layout, the velocities, angular velocities, tracking results and pose validity are
+        copied into their preallocated arrays as well. A ctypes pose array is read at once through `pose_dtype`. Other
+        sequences (e.g. lists of poses) are copied device by device.
 
         Args:
-            device_poses (List[openvr.TrackedDevicePose_t]): A list containing the poses of all tracked devices.
+            device_poses (Sequence[openvr.TrackedDevicePose_t]): The poses of all tracked devices.
+
+        Returns:
+            np.ndarray: Indices of the connected devices.
         """
+        if isinstance(device_poses, ctypes.Array):
+            if device_poses is self._device_poses:
+                poses = self._device_pose_fields
+            else:
+                poses = np.frombuffer(device_poses, dtype=pose_dtype)
+            np.copyto(self._pose_matrices, poses["mDeviceToAbsoluteTracking"])
+            np.not_equal(poses["bDeviceIsConnected"], 0, out=self._connected)
+            if self._extended:
+                np.copyto(self._velocities, poses["vVelocity"])
+                np.copyto(self._angular_velocities, poses["vAngularVelocity"])
+                np.copyto(self._tracking_results, poses["eTrackingResult"])
+                np.not_equal(poses["bPoseIsValid"], 0, out=self._pose_is_valid)
+        else:
+            for device_index, device_pose in enumerate(device_poses):
+                connected = bool(device_pose.bDeviceIsConnected)
+                self._connected[device_index] = connected
+                if connected:
+                    self._pose_matrices[device_index] = device_pose.mDeviceToAbsoluteTracking
+                    if self._extended:
+                        self._velocities[device_index] = device_pose.vVelocity
+                        self._angular_velocities[device_index] = device_pose.vAngularVelocity
+                        self._tracking_results[device_index] = device_pose.eTrackingResult
+                        self._pose_is_valid[device_index] = bool(device_pose.bPoseIsValid)
+
+        return np.flatnonzero(self._connected)
+
+    def _update_frame(self, device_poses: Sequence[openvr.TrackedDevicePose_t]) -> None:
+        """Update the frame with the device poses.
+
+        The pose matrices of all devices are copied into one preallocated array and converted to positions and
+        quaternions by `PoseConverter`. The values are written into the frame buffer in place from preallocated rows,
+        and the frame decides which devices it stores.
+
+        Args:
+            device_poses (Sequence[openvr.TrackedDevicePose_t]): The poses of all tracked devices.
+        """
+
+        connected_indices = self._copy_pose_matrices(device_poses)
+        self._frame.set_connected(self._connected)
+        if len(connected_indices) > 0:
+            self._pose_converter.convert()
 
-        for device_index in range(openvr.k_unMaxTrackedDeviceCount):
-            device_class = self.vrsystem.getTrackedDeviceClass(device_index)
-            device_pose = device_poses[device_index]
-
-            if device_pose.bDeviceIsConnected:
-                pose_matrix = np.zeros((3, 4), dtype=float)
-                pose_matrix[:] = device_pose.mDeviceToAbsoluteTracking
-                position = pose_matrix[:3, 3]
-                rotation = Rotation.from_matrix(pose_matrix[:3, :3])
-                quaternion = rotation.as_quat()
-
-                if device_class == openvr.TrackedDeviceClass_HMD:
-                    self._holder.hmd.position = Position(position[0], position[1], position[2])
-                    self._holder.hmd.orientation = Orientation(
-                        quaternion[0], quaternion[1], quaternion[2], quaternion[3]
-                    )
-
-                elif device_class == openvr.TrackedDeviceClass_Controller:
-                    controller_role = self.vrsystem.getControllerRoleForTrackedDeviceIndex(device_index)
-                    state = self.vrsystem.getControllerState(device_index)[1]
-                    if controller_role == openvr.TrackedControllerRole_LeftHand:
-                        self._holder.controller.left.position = Position(position[0], position[1], position[2])
-                        self._holder.controller.left.orientation = Orientation(
-                            quaternion[0], quaternion[1], quaternion[2], quaternion[3]
-                        )
-                        self._holder.controller.left.thumb_stick = Axis(state.rAxis[0].x, state.rAxis[0].y)
-                        self._holder.controller.left.first_trigger = Axis(state.rAxis[1].x, state.rAxis[1].y)
-                        self._holder.controller.left.second_trigger = Axis(state.rAxis[2].x, state.rAxis[2].y)
-                        self._holder.controller.left.third_trigger = Axis(state.rAxis[3].x, state.rAxis[3].y)
-                        self._holder.controller.left.fourth_trigger = Axis(state.rAxis[4].x, state.rAxis[4].y)
-
-                    elif controller_role == openvr.TrackedControllerRole_RightHand:
-                        self._holder.controller.right.position = Position(position[0], position[1], position[2])
-                        self._holder.controller.right.orientation = Orientation(
-                            quaternion[0], quaternion[1], quaternion[2], quaternion[3]
-                        )
-                        self._holder.controller.right.thumb_stick = Axis(state.rAxis[0].x, state.rAxis[0].y)
-                        self._holder.controller.right.first_trigger = Axis(state.rAxis[1].x, state.rAxis[1].y)
-                        self._holder.controller.right.second_trigger = Axis(state.rAxis[2].x, state.rAxis[2].y)
-                        self._holder.controller.right.third_trigger = Axis(state.rAxis[3].x, state.rAxis[3].y)
-                        self._holder.controller.right.fourth_trigger = Axis(state.rAxis[4].x, state.rAxis[4].y)
+        for device_index in connected_indices.tolist():
+            device_class = self.device_topology.get_device_class(device_index)
+            controller_role = openvr.TrackedControllerRole_Invalid
+            axes = None
+
+            if device_class == openvr.TrackedDeviceClass_Controller:
+                controller_role = self.device_topology.get_controller_role(device_index)
+                axes = self.vrsystem.getControllerState(device_index)[1].rAxis
+
+            state = self._pose_state_rows[device_index] if self._extended else None
+            self._frame.set_device(
+                device_index, device_class, controller_role, self._pose_rows[device_index], axes, state
+            )
+
+        # Serial numbers are resolved here rather than on the writer thread, so that it never calls OpenVR. They are
+        # kept out of the frame, and only when the topology changes.
+        if self.header_version == HeaderVersions.V1 and self._frame.update_topology():
+            self._frame.set_serials(
+                {index: self.device_topology.get_serial(index) for index in connected_indices.tolist()}
+            )
 
     @staticmethod
-    def _write_header(outfile: BinaryIO) -> None:
+    def _write_header(
+        outfile: BinaryIO,
+        header_version: str = HeaderVersions.V0,
+        frames_per_chunk: int = 720,
+        compression: str = Compressions.NONE,
+        record_layout: str = RecordLayouts.FLOAT,
+        frame_rate: Optional[int] = None,
+    ) -> None:
         """Write the header to the output file.
 
         Args:
             outfile (BinaryIO): The output file to write the header to.
+            header_version (str): File format version.
+            frames_per_chunk (int): Number of frames in a chunk of `HeaderVersions.V2`.
+            compression (str): Compression of the chunks of `HeaderVersions.V2`.
+            record_layout (str): Layout of the records of `HeaderVersions.V0` and `HeaderVersions.V2`.
+            frame_rate (Optional[int]): Frame rate of the recording.
         """
-        header = create_header()
+        header = create_header(header_version, frames_per_chunk, compression, record_layout, frame_rate)
         header_size = len(header)
         outfile.write(header_size.to_bytes(4, byteorder="little"))
         outfile.write(header)
 
-    def _write_binary_data(self, outfile: BinaryIO, frame_count: int) -> int:
-        """Write the binary data to the output file and update the frame count.
+    def _write_binary_data(self, writer: BackgroundFrameWriter) -> None:
+        """Queue the binary data of the current frame to the background writer.
 
         Args:
-            outfile (BinaryIO): The output file to write the binary data to.
-            frame_count (int): The current frame count.
+            writer (BackgroundFrameWriter): The writer of the output file.
+        """
+        writer.push(self._frame.buffer)
+
+    def _create_publisher(self) -> Optional[SharedFramePublisher]:
+        """Create the shared memory publisher of the frames.
 
         Returns:
-            int: The updated frame count.
+            Optional[SharedFramePublisher]: The publisher. None if `shared_memory_name` is not given.
         """
-        binary = holder_to_binary(self._holder)
-        outfile.write(binary)
-        frame_count += 1
+        if self.shared_memory_name is None:
+            return None
+
+        if self.header_version == HeaderVersions.V1:
+            frame_format = ""  # `DeviceFrame` has no struct format.
+        elif self._extended:
+            frame_format = extended_binary_format
+        else:
+            frame_format = binary_format
+        return SharedFramePublisher(
+            self.shared_memory_name, len(self._frame.buffer), frame_format, self.shared_memory_capacity
+        )
+
+    def _create_chunk_encoder(self, outfile: BinaryIO) -> Optional[ChunkedFrameEncoder]:
+        """Create the chunk encoder of `HeaderVersions.V2` for the record layout and compression.
 
-        if frame_count % self.num_frames_per_flush == 0:
-            outfile.flush()
-            frame_count = 0
+        Args:
+            outfile (BinaryIO): The output file.
 
-        return frame_count
+        Returns:
+            Optional[ChunkedFrameEncoder]: The chunk encoder. None for other versions.
+        """
+        if self.header_version != HeaderVersions.V2:
+            return None
+
+        if self.record_layout == RecordLayouts.QUANTIZED:
+            record_format, record_size, get_timestamp = (
+                quantized_binary_format,
+                quantized_struct.size,
+                get_quantized_timestamp,
+            )
+        elif self.record_layout == RecordLayouts.EXTENDED:
+            record_format, record_size, get_timestamp = (
+                extended_binary_format,
+                extended_binary_struct.size,
+                get_frame_timestamp,
+            )
+        else:
+            record_format, record_size, get_timestamp = binary_format, binary_struct.size, get_frame_timestamp
+
+        encode_payload = None
+        if self.compression != Compressions.NONE:
+            encode_payload = functools.partial(encode_chunk, binary_format=record_format, compression=self.compression)
+        return ChunkedFrameEncoder(outfile, record_size, self.frames_per_chunk, get_timestamp, encode_payload)
 
     def record(self) -> None:
         """Record data to the output file until Keyboard interrupt or shutdown.
 
         You can quit the recording by pressing Ctrl+C or `self.shutdown()`(setting `self._shutdown` to True).
+        Frames are written to the file by a background writer thread, so disk stalls do not delay sampling.
         """
         logger.info(f"VR Tracking Recorder started. Output to {self.output_file_path}")
 
         self._shutdown = False
-        frame_count = 0
-        self._holder = create_empty_data_holder()
-
-        try:
-            with open(self.output_file_path, "wb") as outfile:
-
-                self._write_header(outfile)
-
+        self._frame.clear()
+
+        with open(self.output_file_path, "wb") as outfile:
+            self._write_header(
+                outfile,
+                self.header_version,
+                self.frames_per_chunk,
+                self.compression,
+                self.record_layout,
+                self.frame_rate,
+            )
+            chunk_encoder = self._create_chunk_encoder(outfile)
+            if self.header_version == HeaderVersions.V1:
+                sink = VariableDeviceEncoder(outfile, self._frame.serials)
+            elif chunk_encoder is not None:
+                sink = chunk_encoder
+            else:
+                sink = outfile
+            if self.record_layout == RecordLayouts.QUANTIZED:
+                sink = QuantizingSink(sink)
+            self.writer = BackgroundFrameWriter(
+                sink,
+                len(self._frame.buffer),
+                capacity=self.buffer_capacity,
+                backpressure_policy=self.backpressure_policy,
+                num_frames_per_flush=self.num_frames_per_flush,
+            )
+            self.publisher = self._create_publisher()
+
+            try:
+                self.writer.start()
+                self.scheduler.start()
                 while self._shutdown is False:
-
-                    if (time.time() - self._holder.timestamp) < (1 / self.frame_rate):
-                        time.sleep(1 / self.frame_rate - (time.time() - self._holder.timestamp))
-
+                    self.scheduler.wait()
                     self._update_timestamp()
                     device_poses = self._get_device_poses()
-                    self._update_data_holder(device_poses)
-                    frame_count = self._write_binary_data(outfile, frame_count)
-
-        except KeyboardInterrupt:
-            pass
+                    self._update_frame(device_poses)
+                    self._write_binary_data(self.writer)
+                    if self.publisher is not None:
+                        self.publisher.publish(self._frame.buffer)
+                    if self.stream_sink is not None:
+                        self.stream_sink.send_frame(self._frame.buffer)
+
+            except KeyboardInterrupt:
+                pass
+            finally:
+                if self.publisher is not None:
+                    self.publisher.close()
+                self.writer.close()
+                if chunk_encoder is not None:
+                    chunk_encoder.close()
 
         logger.info("VR Tracking Recorder stopped.")
-
-
-def create_header() -> bytes:
+        logger.info(f"VR tracking frame rate: {self.scheduler.summary()}")
+        logger.info(f"VR tracking writer: {self.writer.summary()}")
+        logger.debug(f"Device topology cache: {self.device_topology}")
+
+
+def create_header(
+    header_version: str = HeaderVersions.V0,
+    frames_per_chunk: int = 720,
+    compression: str = Compressions.NONE,
+    record_layout: str = RecordLayouts.FLOAT,
+    frame_rate: Optional[int] = None,
+) -> bytes:
     """Create the header for the output file.
 
+    Args:
+        header_version (str): File format version.
+        frames_per_chunk (int): Number of frames in a chunk of `HeaderVersions.V2`.
+        compression (str): Compression of the chunks of `HeaderVersions.V2`.
+        record_layout (str): Layout of the records of `HeaderVersions.V0` and `HeaderVersions.V2`. The key is only
+            written for layouts other than `RecordLayouts.FLOAT`.
+        frame_rate (Optional[int]): Frame rate of the recording. The key is only written if given.
+
     Returns:
         bytes: The header.
     """
 
-    header = {
-        HeaderNames.VERSION: HeaderVersions.V0,
-        HeaderNames.BINARY_FORMAT: binary_format,
-    }
+    if header_version == HeaderVersions.V1:
+        header = {
+            HeaderNames.VERSION: HeaderVersions.V1,
+            HeaderNames.BINARY_FORMAT: frame_format,
+            HeaderNames.DEVICE_FORMAT: device_format,
+            HeaderNames.CONTROLLER_FORMAT: controller_format,
+        }
+    elif header_version == HeaderVersions.V2:
+        header = {
+            HeaderNames.VERSION: HeaderVersions.V2,
+            HeaderNames.BINARY_FORMAT: binary_format,
+            HeaderNames.FRAMES_PER_CHUNK: frames_per_chunk,
+            HeaderNames.COMPRESSION: compression,
+        }
+    else:
+        header = {
+            HeaderNames.VERSION: HeaderVersions.V0,
+            HeaderNames.BINARY_FORMAT: binary_format,
+        }
+
+    if header_version != HeaderVersions.V1:
+        if record_layout == RecordLayouts.QUANTIZED:
+            header[HeaderNames.BINARY_FORMAT] = quantized_binary_format
+            header[HeaderNames.RECORD_LAYOUT] = record_layout
+        elif record_layout == RecordLayouts.EXTENDED:
+            header[HeaderNames.BINARY_FORMAT] = extended_binary_format
+            header[HeaderNames.RECORD_LAYOUT] = record_layout
+
+    if frame_rate is not None:
+        header[HeaderNames.FRAME_RATE] = frame_rate
+    header[HeaderNames.CLOCK] = Clocks.UNIX_TIME
+    header[HeaderNames.DEVICE_REGISTRY] = (
+        DeviceRegistries.INLINE if header_version == HeaderVersions.V1 else DeviceRegistries.FIXED
+    )
 
     return json.dumps(header).encode("utf-8")
@@ -0,0 +1,250 @@
+"""This file contains the validator of tracking files, e.g. for a nightly check of the archive.
+
+A file is read in batches of columns (`TrackingReader.read_batch`) and every check is computed by NumPy over the
+batches, so the validation runs at the speed of the disk with constant memory:
+    - Frame rate: the achieved frame rate, and a histogram of the intervals between frames in periods of the header
+      frame rate (or of the median interval of the first batch for files without one). Intervals of 1.5 periods or
+      more are gaps, and `round(interval / period) - 1` frames are counted as dropped.
+    - Timestamps: intervals below zero (non-monotonic) and of zero (duplicate timestamps).
+    - Values: NaN or infinite floats, and quaternions whose norm is not 1 within `quaternion_tolerance`. Zero
+      quaternions (never tracked devices) are counted separately.
+    - File: bytes after the last complete frame (or chunk), and corrupt chunks of V2 files.
+
+Files are validated in parallel by `validate_files`.
+
+Usage:
+    ```
+    python -m vrchat_recorder.vr.validate path/to/archive --max_workers 8
+    ```
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ..data_constants import FileExtensions as FE
+from .constants import HeaderNames
+from .export import default_batch_size, iter_column_batches
+from .tracking_reader import TrackingReader
+
+default_quaternion_tolerance = 1e-3
+
+# Upper edges of the bins of the gap histogram in periods, and their labels.
+gap_bin_edges = np.array([0.5, 1.5, 2.5, 3.5, 5.5, 10.5])
+gap_bin_labels = ["0", "1", "2", "3", "4-5", "6-10", ">10"]
+
+
+@dataclass
+class ValidationReport:
+    """Result of the validation of a tracking file. See the module docstring for the checks."""
+
+    file_path: str
+    header_version: Optional[str] = None
+    num_frames: int = 0
+    duration: float = 0.0  # seconds from the first to the last frame.
+    header_frame_rate: Optional[float] = None
+    achieved_frame_rate: Optional[float] = None
+    gap_histogram: dict[str, int] = field(default_factory=lambda: dict.fromkeys(gap_bin_labels, 0))
+    num_dropped_frames: int = 0
+    num_non_monotonic: int = 0
+    num_duplicate_timestamps: int = 0
+    num_non_finite_values: int = 0
+    num_zero_quaternions: dict[str, int] = field(default_factory=dict)  # per device.
+    num_non_unit_quaternions: dict[str, int] = field(default_factory=dict)  # per device.
+    truncated_bytes: int = 0
+    num_corrupt_chunks: int = 0
+    error: Optional[str] = None  # The file could not be read.
+
+    @property
+    def ok(self) -> bool:
+        """Returns whether the file is intact: readable, monotonic, finite, with unit quaternions, and not truncated
+        or corrupt. Dropped frames are reported but do not fail the check."""
+        return (
+            self.error is None
+            and self.num_non_monotonic == 0
+            and self.num_non_finite_values == 0
+            and not any(self.num_non_unit_quaternions.values())
+            and self.truncated_bytes == 0
+            and self.num_corrupt_chunks == 0
+        )
+
+    def summary(self) -> str:
+        """Returns a line of the report."""
+        if self.error is not None:
+            return f"NG {self.file_path}: {self.error}"
+        achieved = f"{self.achieved_frame_rate:.2f}" if self.achieved_frame_rate is not None else "-"
+        return (
+            f"{'OK' if self.ok else 'NG'} {self.file_path}: {self.num_frames} frames, {self.duration:.1f} s, "
+            f"{achieved}/{self.header_frame_rate} fps, {self.num_dropped_frames} dropped, "
+            f"{self.num_non_monotonic} non-monotonic, {self.num_non_finite_values} non-finite, "
+            f"{sum(self.num_non_unit_quaternions.values())} non-unit quaternions, "
+            f"{self.truncated_bytes} truncated bytes, {self.num_corrupt_chunks} corrupt chunks"
+        )
+
+
+def _quaternion_devices(names) -> list[str]:
+    """Returns the devices with the x, y, z and w columns of an orientation in the columns."""
+    return [
+        name[: -len(".orientation.x")]
+        for name in names
+        if name.endswith(".orientation.x") and all(name[:-1] + c in names for c in "yzw")
+    ]
+
+
+def validate_tracking_file(
+    input_file_path: str,
+    quaternion_tolerance: float = default_quaternion_tolerance,
+    batch_size: int = default_batch_size,
+) -> ValidationReport:
+    """Validate a tracking file.
+
+    Args:
+        input_file_path (str): Path to the tracking file.
+        quaternion_tolerance (float): Tolerance of the norm of quaternions from 1.
+        batch_size (int): Number of frames read at once.
+
+    Returns:
+        ValidationReport: The report. Files that can not be read have `error`.
+    """
+    report = ValidationReport(input_file_path)
+    try:
+        with TrackingReader(input_file_path) as reader:
+            report.header_version = reader.header[HeaderNames.VERSION]
+            report.header_frame_rate = reader.frame_rate
+            period = 1 / reader.frame_rate if reader.frame_rate else None
+            first_timestamp = previous_timestamp = None
+            gap_counts = np.zeros(len(gap_bin_labels), dtype=np.int64)
+
+            for columns in iter_column_batches(reader, batch_size):
+                timestamps = columns["timestamp"].astype(np.float64)
+                if first_timestamp is None:
+                    first_timestamp = timestamps[0]
+                    devices = _quaternion_devices(columns)
+                    report.num_zero_quaternions = dict.fromkeys(devices, 0)
+                    report.num_non_unit_quaternions = dict.fromkeys(devices, 0)
+                else:
+                    timestamps = np.concatenate([[previous_timestamp], timestamps])
+                previous_timestamp = timestamps[-1]
+                report.num_frames += len(columns["timestamp"])
+
+                intervals = np.diff(timestamps)
+                if period is None and len(intervals) > 0:
+                    period = float(np.median(intervals)) or None
+                report.num_non_monotonic += int(np.count_nonzero(intervals < 0))
+                report.num_duplicate_timestamps += int(np.count_nonzero(intervals == 0))
+                if period is not None:
+                    periods = intervals[intervals >= 0] / period
+                    gap_counts += np.bincount(np.searchsorted(gap_bin_edges, periods), minlength=len(gap_bin_labels))
+                    gaps = periods[periods >= 1.5]
+                    report.num_dropped_frames += int(np.sum(np.round(gaps) - 1))
+
+                for column in columns.values():
+                    if column.dtype.kind == "f":
+                        report.num_non_finite_values += int(np.count_nonzero(~np.isfinite(column)))
+                for device in report.num_zero_quaternions:
+                    quaternion = np.stack([columns[f"{device}.orientation.{c}"] for c in "xyzw"], axis=1)
+                    norm = np.linalg.norm(quaternion.astype(np.float64), axis=1)
+                    is_zero = norm == 0
+                    report.num_zero_quaternions[device] += int(np.count_nonzero(is_zero))
+                    report.num_non_unit_quaternions[device] += int(
+                        np.count_nonzero(~is_zero & ~(np.abs(norm - 1) <= quaternion_tolerance))
+                    )
+
+            report.gap_histogram = dict(zip(gap_bin_labels, gap_counts.tolist()))
+            if first_timestamp is not None:
+                report.duration = float(previous_timestamp - first_timestamp)
+                if report.duration > 0:
+                    report.achieved_frame_rate = (report.num_frames - 1) / report.duration
+            report.truncated_bytes = reader.truncated_bytes
+            report.num_corrupt_chunks = reader.num_corrupt_chunks
+    except (OSError, ValueError) as e:
+        report.error = f"{type(e).__name__}: {e}"
+    return report
+
+
+def find_tracking_files(paths: Sequence[str]) -> list[str]:
+    """Find the tracking files (`*.tracking.bin`) in files and directories.
+
+    Args:
+        paths (Sequence[str]): Files, or directories searched recursively.
+
+    Returns:
+        list[str]: Paths of the tracking files. Files given directly are kept whatever their names are.
+    """
+    found = []
+    for path in paths:
+        if not os.path.isdir(path):
+            found.append(path)
+            continue
+        for dir_path, dir_names, file_names in os.walk(path):
+            dir_names.sort()
+            found += [
+                os.path.join(dir_path, name)
+                for name in sorted(file_names)
+                if name.endswith(f".{FE.TRACKING}.{FE.BINARY}")
+            ]
+    return found
+
+
+def validate_files(
+    input_file_paths: Sequence[str],
+    max_workers: Optional[int] = None,
+    quaternion_tolerance: float = default_quaternion_tolerance,
+) -> list[ValidationReport]:
+    """Validate tracking files in parallel.
+
+    Args:
+        input_file_paths (Sequence[str]): Paths to the tracking files.
+        max_workers (Optional[int]): Number of worker processes. Defaults to the number of cores.
+        quaternion_tolerance (float): Tolerance of the norm of quaternions from 1.
+
+    Returns:
+        list[ValidationReport]: Reports in the order of the files.
+    """
+    with ProcessPoolExecutor(max_workers) as executor:
+        return list(
+            executor.map(
+                validate_tracking_file, input_file_paths, [quaternion_tolerance] * len(input_file_paths), chunksize=1
+            )
+        )
+
+
+def main(arg_list: Optional[Sequence[str]] = None) -> None:
+    """Entry point of `python -m vrchat_recorder.vr.validate`. Exits with 1 if any file is not intact.
+
+    Args:
+        arg_list (Optional[Sequence[str]]): List of arguments to parse. If None, sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(description="Validate VR tracking files.")
+    parser.add_argument("paths", nargs="+", help="The tracking files, or directories to search for them.")
+    parser.add_argument(
+        "--max_workers", type=int, default=None, help="The number of worker processes. Defaults to the number of cores."
+    )
+    parser.add_argument(
+        "--quaternion_tolerance",
+        type=float,
+        default=default_quaternion_tolerance,
+        help="The tolerance of the norm of quaternions from 1.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON lines.")
+    args = parser.parse_args(arg_list)
+
+    reports = validate_files(find_tracking_files(args.paths), args.max_workers, args.quaternion_tolerance)
+    for report in reports:
+        if args.json:
+            print(json.dumps({**dataclasses.asdict(report), "ok": report.ok}))
+        else:
+            print(report.summary())
+    if not all(report.ok for report in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
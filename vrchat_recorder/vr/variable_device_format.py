@@ -0,0 +1,478 @@
+"""This file contains features for the variable-device format (`HeaderVersions.V1`) of vr tracking data.
+
+V0 files store exactly one HMD and two controllers per frame. V1 files store every connected tracked device, so
+trackers and base stations are recorded too, and frames only contain the devices that are actually connected.
+
+After the header, a V1 file is a sequence of blocks starting with a one-byte type (`BlockTypes`):
+    - Registry block: `registry_size_format` length followed by a json list of the connected devices. Each entry has
+      the keys of `RegistryNames`. It is written before the first frame and whenever a device is connected or
+      disconnected or its class or role changes.
+    - Frame block: `frame_format` (timestamp and 64-bit mask of connected device indices) followed by
+      `device_format` (position and orientation) for each set bit in ascending order of device index. Controllers are
+      followed by `controller_format` (thumb stick and first to fourth triggers).
+
+The sampling loop fills a fixed-size `DeviceFrame`, and `VariableDeviceEncoder` compacts it on the writer thread of
+`BackgroundFrameWriter`, so the variable-length encoding does not cost anything in the sampling loop. Serial numbers
+are kept out of the frames: the sampling thread resolves them when the connected devices change, and stores them in
+the serial table shared with the encoder under a new topology generation. Each frame only carries the generation, and
+the encoder looks the serial numbers up when it writes a registry block, so the writer thread never calls OpenVR.
+"""
+
+import json
+import struct
+from typing import BinaryIO, Optional, Sequence
+
+import numpy as np
+import openvr
+
+from .binary_converter import axes_struct, pose_struct, timestamp_struct
+from .constants import BlockTypes, RegistryNames
+from .tracking_data_holders import (
+    Axis,
+    DeviceInfo,
+    DeviceTrackingData,
+    Orientation,
+    Position,
+    VRDeviceTrackingDataHolder,
+    create_empty_data_holder,
+)
+from .tracking_frame import pack_controller_axes
+
+frame_format = "d Q"  # timestamp and connected device mask
+device_format = "fff ffff"  # position and orientation
+controller_format = "ff ff ff ff ff"  # thumb stick and first to fourth triggers
+registry_size_format = "I"
+generation_format = "Q"  # topology generation. See `DeviceFrame.update_topology`.
+
+frame_struct = struct.Struct(frame_format)
+registry_size_struct = struct.Struct(registry_size_format)
+generation_struct = struct.Struct(generation_format)
+
+max_devices = openvr.k_unMaxTrackedDeviceCount
+
+# Layout of `DeviceFrame.buffer`. It is only kept in memory, and is not written to files as it is.
+mask_offset = timestamp_struct.size
+device_classes_offset = frame_struct.size
+controller_roles_offset = device_classes_offset + max_devices
+generation_offset = controller_roles_offset + max_devices
+device_poses_offset = generation_offset + generation_struct.size
+controller_axes_offset = device_poses_offset + max_devices * pose_struct.size
+device_frame_size = controller_axes_offset + max_devices * axes_struct.size
+
+
+class DeviceFrame:
+    """This class holds a frame of all tracked devices in a preallocated fixed-size buffer.
+
+    It has the same setter interface as `TrackingFrame`, so `TrackingRecorder` fills either of them. `buffer` is
+    pushed to `BackgroundFrameWriter` as a fixed-size frame, and `VariableDeviceEncoder` writes it in V1 format.
+
+    Serial numbers are not stored in `buffer`. They are set to `serials` (the serial table, keyed by topology
+    generation and then by device index) for the generation of the frame, and the table is shared with
+    `VariableDeviceEncoder`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize DeviceFrame. All values are initialized with `0`."""
+        self.buffer = bytearray(device_frame_size)
+        self.serials: dict[int, dict[int, str]] = {}
+        self._mask = np.frombuffer(self.buffer, dtype=np.uint8, count=8, offset=mask_offset)
+        self._device_classes = np.frombuffer(
+            self.buffer, dtype=np.uint8, count=max_devices, offset=device_classes_offset
+        )
+        self._controller_roles = np.frombuffer(
+            self.buffer, dtype=np.uint8, count=max_devices, offset=controller_roles_offset
+        )
+        self._disconnected = np.zeros(max_devices, dtype=bool)
+        self._topology = np.frombuffer(
+            self.buffer, dtype=np.uint8, count=generation_offset - mask_offset, offset=mask_offset
+        )
+        self._previous_topology = self._topology.copy()
+
+    @property
+    def generation(self) -> int:
+        """Returns the topology generation of the frame."""
+        return get_generation(self.buffer)
+
+    @property
+    def timestamp(self) -> float:
+        """Returns the timestamp of the frame."""
+        return timestamp_struct.unpack_from(self.buffer)[0]
+
+    def set_timestamp(self, timestamp: float) -> None:
+        """Set the timestamp of the frame.
+
+        Args:
+            timestamp (float): Timestamp. (seconds)
+        """
+        timestamp_struct.pack_into(self.buffer, 0, timestamp)
+
+    def set_connected(self, connected: np.ndarray) -> None:
+        """Set which devices are connected. Classes and roles of the disconnected devices are reset.
+
+        Args:
+            connected (np.ndarray): Boolean array of `openvr.k_unMaxTrackedDeviceCount` elements.
+        """
+        self._mask[:] = np.packbits(connected, bitorder="little")
+        np.logical_not(connected, out=self._disconnected)
+        np.copyto(self._device_classes, openvr.TrackedDeviceClass_Invalid, where=self._disconnected)
+        np.copyto(self._controller_roles, openvr.TrackedControllerRole_Invalid, where=self._disconnected)
+
+    def set_device(
+        self,
+        device_index: int,
+        device_class: int,
+        controller_role: int,
+        pose: Sequence[float],
+        axes=None,
+        state: Optional[Sequence] = None,
+    ) -> None:
+        """Set a connected device.
+
+        Args:
+            device_index (int): Tracked device index.
+            device_class (int): Device class. See `ETrackedDeviceClass` of OpenVR API (openvr.h).
+            controller_role (int): Controller role. See `ETrackedControllerRole` of OpenVR API (openvr.h).
+            pose (Sequence[float]): Position (x, y, z) followed by orientation quaternion (x, y, z, w).
+            axes: `rAxis` of `openvr.VRControllerState_t` for controllers, otherwise None.
+            state (Optional[Sequence]): Pose state of the device. V1 has no field for it, so it is ignored.
+        """
+        self._device_classes[device_index] = device_class
+        self._controller_roles[device_index] = controller_role
+        pose_struct.pack_into(self.buffer, device_poses_offset + device_index * pose_struct.size, *pose)
+        if axes is not None:
+            pack_controller_axes(self.buffer, controller_axes_offset + device_index * axes_struct.size, axes)
+
+    def set_serials(self, serials: dict[int, str]) -> None:
+        """Set the serial numbers of the devices of the current topology generation.
+
+        Args:
+            serials (dict[int, str]): Serial numbers keyed by tracked device index.
+        """
+        self.serials[self.generation] = serials
+
+    def update_topology(self) -> bool:
+        """Start a new topology generation if the connected devices or their classes or roles changed since the last
+        call. Call it after setting all devices of a frame.
+
+        Returns:
+            bool: True if a new generation is started, i.e. the serial numbers must be set.
+        """
+        if np.array_equal(self._topology, self._previous_topology):
+            return False
+        np.copyto(self._previous_topology, self._topology)
+        generation_struct.pack_into(self.buffer, generation_offset, self.generation + 1)
+        return True
+
+    def clear(self) -> None:
+        """Reset all values to `0` and clear the serial table."""
+        self.buffer[:] = bytes(len(self.buffer))
+        self._previous_topology[:] = 0
+        self.serials.clear()
+
+    def to_holder(self, dst: Optional[VRDeviceTrackingDataHolder] = None) -> VRDeviceTrackingDataHolder:
+        """Converts the frame to DataHolder class.
+
+        Args:
+            dst (Optional[VRDeviceTrackingDataHolder], optional): Destination DataHolder class. Defaults to None.
+
+        Returns:
+            VRDeviceTrackingDataHolder: DataHolder class.
+        """
+        serials = self.serials.get(self.generation, {})
+        registry = {
+            device_index: DeviceInfo(device_index, serials.get(device_index, ""), device_class, controller_role)
+            for device_index, device_class, controller_role in iter_devices(self.buffer)
+        }
+        return VariableDeviceDecoder(registry).decode_frame(encode_frame(self.buffer), dst)
+
+
+def iter_devices(frame: bytes):
+    """Iterate over the connected devices of a `DeviceFrame` buffer.
+
+    Args:
+        frame (bytes): Buffer of `DeviceFrame`.
+
+    Yields:
+        tuple[int, int, int]: Device index, device class and controller role.
+    """
+    mask = np.frombuffer(frame, dtype=np.uint8, count=8, offset=mask_offset)
+    for device_index in np.flatnonzero(np.unpackbits(mask, bitorder="little")).tolist():
+        yield device_index, frame[device_classes_offset + device_index], frame[controller_roles_offset + device_index]
+
+
+def get_generation(frame: bytes) -> int:
+    """Get the topology generation of a `DeviceFrame` buffer.
+
+    Args:
+        frame (bytes): Buffer of `DeviceFrame`.
+
+    Returns:
+        int: Topology generation.
+    """
+    return generation_struct.unpack_from(frame, generation_offset)[0]
+
+
+def encode_frame(frame: bytes) -> bytes:
+    """Encode a `DeviceFrame` buffer to a frame block without the block type.
+
+    Args:
+        frame (bytes): Buffer of `DeviceFrame`.
+
+    Returns:
+        bytes: `frame_format` followed by the connected devices.
+    """
+    parts = [frame[: frame_struct.size]]
+    for device_index, device_class, _ in iter_devices(frame):
+        offset = device_poses_offset + device_index * pose_struct.size
+        parts.append(frame[offset : offset + pose_struct.size])
+        if device_class == openvr.TrackedDeviceClass_Controller:
+            offset = controller_axes_offset + device_index * axes_struct.size
+            parts.append(frame[offset : offset + axes_struct.size])
+    return b"".join(parts)
+
+
+class VariableDeviceEncoder:
+    """This class writes `DeviceFrame` buffers to a file in V1 format.
+
+    It has `write` and `flush` methods, so it can be given to `BackgroundFrameWriter` as the output file. The serial
+    numbers of the registry blocks are looked up in the serial table by the topology generation of the frame
+    (`DeviceFrame.serials`), and the entries of older generations are removed.
+
+    Usage:
+        ```python
+        encoder = VariableDeviceEncoder(outfile, frame.serials)
+        writer = BackgroundFrameWriter(encoder, device_frame_size)
+        ```
+    """
+
+    def __init__(self, outfile: BinaryIO, serials: Optional[dict[int, dict[int, str]]] = None) -> None:
+        """Initialize VariableDeviceEncoder.
+
+        Args:
+            outfile (BinaryIO): The output file. The header must be written beforehand.
+            serials (Optional[dict[int, dict[int, str]]]): Serial table of `DeviceFrame.serials`. If None, the serial
+                numbers are written as empty.
+        """
+        self.outfile = outfile
+        self.serials = {} if serials is None else serials
+        self._topology: Optional[bytes] = None
+
+    def write(self, data) -> None:
+        """Encode and write frames.
+
+        Args:
+            data: Bytes-like object of a multiple of `device_frame_size` bytes.
+        """
+        data = memoryview(data)
+        for offset in range(0, len(data), device_frame_size):
+            frame = data[offset : offset + device_frame_size]
+
+            topology = frame[mask_offset:device_poses_offset]
+            if topology != self._topology:
+                self._write_registry(frame)
+                self._topology = bytes(topology)
+
+            self.outfile.write(BlockTypes.FRAME + encode_frame(frame))
+
+    def _write_registry(self, frame) -> None:
+        """Write a registry block of the connected devices of the frame.
+
+        Args:
+            frame: Buffer of `DeviceFrame`.
+        """
+        generation = get_generation(frame)
+        serials = self.serials.get(generation, {})
+        # The sampling thread only adds newer generations, so the older ones are no longer needed.
+        for old_generation in [g for g in list(self.serials) if g < generation]:
+            self.serials.pop(old_generation, None)
+
+        registry = [
+            {
+                RegistryNames.INDEX: device_index,
+                RegistryNames.SERIAL: serials.get(device_index, ""),
+                RegistryNames.DEVICE_CLASS: device_class,
+                RegistryNames.CONTROLLER_ROLE: controller_role,
+            }
+            for device_index, device_class, controller_role in iter_devices(frame)
+        ]
+        binary = json.dumps(registry).encode("utf-8")
+        self.outfile.write(BlockTypes.REGISTRY + registry_size_struct.pack(len(binary)) + binary)
+
+    def flush(self) -> None:
+        """Flush the output file."""
+        self.outfile.flush()
+
+
+class VariableDeviceDecoder:
+    """This class reads frames of V1 format from a file.
+
+    The device registry is updated by registry blocks while reading, so frames must be read in order from the
+    beginning of the blocks. Call `reset` when seeking back to the beginning.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[dict[int, DeviceInfo]] = None,
+        frame_format: str = frame_format,
+        device_format: str = device_format,
+        controller_format: str = controller_format,
+    ) -> None:
+        """Initialize VariableDeviceDecoder.
+
+        Args:
+            registry (Optional[dict[int, DeviceInfo]]): Initial device registry. Defaults to empty.
+            frame_format (str): `HeaderNames.BINARY_FORMAT` of the header.
+            device_format (str): `HeaderNames.DEVICE_FORMAT` of the header.
+            controller_format (str): `HeaderNames.CONTROLLER_FORMAT` of the header.
+        """
+        self.registry: dict[int, DeviceInfo] = {} if registry is None else registry
+        self._frame_struct = struct.Struct(frame_format)
+        self._device_struct = struct.Struct(device_format)
+        self._controller_struct = struct.Struct(controller_format)
+
+    def reset(self) -> None:
+        """Clear the device registry."""
+        self.registry = {}
+
+    def _is_controller(self, device_index: int) -> bool:
+        info = self.registry.get(device_index)
+        return info is not None and info.device_class == openvr.TrackedDeviceClass_Controller
+
+    def _frame_body_size(self, mask: int) -> int:
+        size = 0
+        for device_index in range(max_devices):
+            if mask >> device_index & 1:
+                size += self._device_struct.size
+                if self._is_controller(device_index):
+                    size += self._controller_struct.size
+        return size
+
+    def read_block(self, infile: BinaryIO) -> Optional[bytes]:
+        """Read blocks until a frame block. Registry blocks are applied to the registry.
+
+        Args:
+            infile (BinaryIO): Input file positioned at the beginning of a block.
+
+        Returns:
+            Optional[bytes]: Frame block without the block type. None if EOF or the block is truncated.
+
+        Raises:
+            ValueError: Unknown block type.
+        """
+        while True:
+            block_type = infile.read(1)
+            if not block_type:
+                return None
+
+            if block_type == BlockTypes.REGISTRY:
+                size_binary = infile.read(registry_size_struct.size)
+                if len(size_binary) < registry_size_struct.size:
+                    return None
+                (size,) = registry_size_struct.unpack(size_binary)
+                binary = infile.read(size)
+                if len(binary) < size:
+                    return None
+                self.registry = {
+                    entry[RegistryNames.INDEX]: DeviceInfo(
+                        entry[RegistryNames.INDEX],
+                        entry[RegistryNames.SERIAL],
+                        entry[RegistryNames.DEVICE_CLASS],
+                        entry[RegistryNames.CONTROLLER_ROLE],
+                    )
+                    for entry in json.loads(binary.decode("utf-8"))
+                }
+
+            elif block_type == BlockTypes.FRAME:
+                head = infile.read(self._frame_struct.size)
+                if len(head) < self._frame_struct.size:
+                    return None
+                body_size = self._frame_body_size(self._frame_struct.unpack(head)[1])
+                body = infile.read(body_size)
+                if len(body) < body_size:
+                    return None
+                return head + body
+
+            else:
+                raise ValueError(f"Unknown block type: {block_type!r}")
+
+    def decode_frame(
+        self, binary: bytes, dst: Optional[VRDeviceTrackingDataHolder] = None
+    ) -> VRDeviceTrackingDataHolder:
+        """Converts a frame block to DataHolder class.
+
+        The first HMD and the left and right controllers are also set to `hmd` and `controller` as in V0, and devices
+        that are not connected in the frame are left as they are in `dst`.
+
+        Args:
+            binary (bytes): Frame block without the block type.
+            dst (Optional[VRDeviceTrackingDataHolder], optional): Destination DataHolder class. Defaults to None.
+
+        Returns:
+            VRDeviceTrackingDataHolder: DataHolder class.
+        """
+        holder = create_empty_data_holder() if dst is None else dst
+        holder.timestamp, mask = self._frame_struct.unpack_from(binary)
+        holder.devices = []
+
+        offset = self._frame_struct.size
+        hmd_found = False
+        for device_index in range(max_devices):
+            if not mask >> device_index & 1:
+                continue
+
+            pose = self._device_struct.unpack_from(binary, offset)
+            offset += self._device_struct.size
+            info = self.registry.get(device_index)
+            if info is None:
+                info = DeviceInfo(
+                    device_index, "", openvr.TrackedDeviceClass_Invalid, openvr.TrackedControllerRole_Invalid
+                )
+            device = DeviceTrackingData(position=Position(*pose[:3]), orientation=Orientation(*pose[3:]), info=info)
+
+            if info.device_class == openvr.TrackedDeviceClass_Controller:
+                values = self._controller_struct.unpack_from(binary, offset)
+                offset += self._controller_struct.size
+                device.axes = [Axis(values[i], values[i + 1]) for i in range(0, len(values), 2)]
+
+                if info.controller_role == openvr.TrackedControllerRole_LeftHand:
+                    controller = holder.controller.left
+                elif info.controller_role == openvr.TrackedControllerRole_RightHand:
+                    controller = holder.controller.right
+                else:
+                    controller = None
+                if controller is not None:
+                    controller.position = Position(*pose[:3])
+                    controller.orientation = Orientation(*pose[3:])
+                    (
+                        controller.thumb_stick,
+                        controller.first_trigger,
+                        controller.second_trigger,
+                        controller.third_trigger,
+                        controller.fourth_trigger,
+                    ) = (Axis(axis.x, axis.y) for axis in device.axes)
+
+            elif info.device_class == openvr.TrackedDeviceClass_HMD and not hmd_found:
+                hmd_found = True
+                holder.hmd.position = Position(*pose[:3])
+                holder.hmd.orientation = Orientation(*pose[3:])
+
+            holder.devices.append(device)
+
+        return holder
+
+    def read(
+        self, infile: BinaryIO, dst: Optional[VRDeviceTrackingDataHolder] = None
+    ) -> Optional[VRDeviceTrackingDataHolder]:
+        """Read a frame.
+
+        Args:
+            infile (BinaryIO): Input file positioned at the beginning of a block.
+            dst (Optional[VRDeviceTrackingDataHolder], optional): Destination DataHolder class. Defaults to None.
+
+        Returns:
+            Optional[VRDeviceTrackingDataHolder]: DataHolder class. None if EOF.
+        """
+        binary = self.read_block(infile)
+        if binary is None:
+            return None
+        return self.decode_frame(binary, dst)